@@ -9,6 +9,7 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 import warnings
+from analysis.candlestick_patterns import CandleFeatures, CandlestickClassifier
 warnings.filterwarnings('ignore')
 
 class AdvancedCandlestickDetector:
@@ -30,6 +31,72 @@ class AdvancedCandlestickDetector:
             'harami': 0.10              # 10% weight
         }
     
+    def _classify(self, opens: np.ndarray, highs: np.ndarray,
+                  lows: np.ndarray, closes: np.ndarray) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """Tüm formasyon maskeleri ve güven skorları (tek vektörel geçiş)"""
+        classifier = CandlestickClassifier(min_body_size=self.min_body_size)
+        features = CandleFeatures.from_arrays(opens, highs, lows, closes)
+        return classifier.classify(features), classifier.confidence(features)
+    
+    @staticmethod
+    def _candle_days(opens, highs, lows, closes, end: int, span: int) -> Dict[str, Dict]:
+        """Formasyonu oluşturan mumlar (day1 .. dayN)"""
+        return {
+            f'day{k + 1}': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
+            for k, i in enumerate(range(end - span + 1, end + 1))
+        }
+    
+    def _morning_star_patterns(self, opens, highs, lows, closes, masks, scores) -> List[Dict]:
+        return [{
+            'pattern_type': 'Morning Star',
+            'days': self._candle_days(opens, highs, lows, closes, i, 3),
+            'confidence': float(scores['morning_star'][i]),
+            'signal': 'BUY',
+            'target': self._calculate_morning_star_target(opens[i-2], highs[i-2], lows[i-2], closes[i]),
+            'stop_loss': self._calculate_morning_star_stop_loss(opens[i-2], highs[i-2], lows[i-2], closes[i])
+        } for i in np.flatnonzero(masks['morning_star'])]
+    
+    def _evening_star_patterns(self, opens, highs, lows, closes, masks, scores) -> List[Dict]:
+        return [{
+            'pattern_type': 'Evening Star',
+            'days': self._candle_days(opens, highs, lows, closes, i, 3),
+            'confidence': float(scores['evening_star'][i]),
+            'signal': 'SELL',
+            'target': self._calculate_evening_star_target(opens[i-2], highs[i-2], lows[i-2], closes[i]),
+            'stop_loss': self._calculate_evening_star_stop_loss(opens[i-2], highs[i-2], lows[i-2], closes[i])
+        } for i in np.flatnonzero(masks['evening_star'])]
+    
+    def _three_white_soldiers_patterns(self, opens, highs, lows, closes, masks, scores) -> List[Dict]:
+        return [{
+            'pattern_type': 'Three White Soldiers',
+            'days': self._candle_days(opens, highs, lows, closes, i, 3),
+            'confidence': float(scores['three_white_soldiers'][i]),
+            'signal': 'BUY',
+            'target': self._calculate_three_white_soldiers_target(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
+            'stop_loss': self._calculate_three_white_soldiers_stop_loss(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1])
+        } for i in np.flatnonzero(masks['three_white_soldiers'])]
+    
+    def _three_black_crows_patterns(self, opens, highs, lows, closes, masks, scores) -> List[Dict]:
+        return [{
+            'pattern_type': 'Three Black Crows',
+            'days': self._candle_days(opens, highs, lows, closes, i, 3),
+            'confidence': float(scores['three_black_crows'][i]),
+            'signal': 'SELL',
+            'target': self._calculate_three_black_crows_target(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
+            'stop_loss': self._calculate_three_black_crows_stop_loss(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1])
+        } for i in np.flatnonzero(masks['three_black_crows'])]
+    
+    def _harami_patterns(self, opens, highs, lows, closes, masks, scores) -> List[Dict]:
+        bullish = masks['bullish_harami']
+        return [{
+            'pattern_type': 'Bullish Harami' if bullish[i] else 'Bearish Harami',
+            'days': self._candle_days(opens, highs, lows, closes, i, 2),
+            'confidence': float(scores['bullish_harami'][i]),
+            'signal': 'BUY' if bullish[i] else 'SELL',
+            'target': self._calculate_harami_target(opens[i-1], highs[i-1], lows[i-1], closes[i-1], opens[i], closes[i]),
+            'stop_loss': self._calculate_harami_stop_loss(opens[i-1], highs[i-1], lows[i-1], closes[i-1], opens[i], closes[i])
+        } for i in np.flatnonzero(bullish | masks['bearish_harami'])]
+    
     def detect_morning_star(self, opens: np.ndarray, highs: np.ndarray, 
                            lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
         """
@@ -40,53 +107,8 @@ class AdvancedCandlestickDetector:
         - Day 2: Small body (doji-like) with gap down
         - Day 3: Long bullish candle closing above midpoint of Day 1
         """
-        patterns = []
-        
-        for i in range(2, len(opens)):
-            # Day 1: Long bearish candle
-            day1_body = abs(closes[i-2] - opens[i-2])
-            day1_high = highs[i-2]
-            day1_low = lows[i-2]
-            day1_midpoint = (day1_high + day1_low) / 2
-            
-            # Check if Day 1 is bearish and long
-            if (closes[i-2] < opens[i-2] and 
-                day1_body > self.min_body_size * opens[i-2]):
-                
-                # Day 2: Small body with gap down
-                day2_body = abs(closes[i-1] - opens[i-1])
-                day2_high = highs[i-1]
-                day2_low = lows[i-1]
-                
-                # Check if Day 2 has small body and gaps down
-                if (day2_body < day1_body * 0.3 and  # Small body
-                    day2_high < opens[i-2]):  # Gap down
-                    
-                    # Day 3: Long bullish candle
-                    day3_body = abs(closes[i] - opens[i])
-                    day3_high = highs[i]
-                    day3_low = lows[i]
-                    
-                    # Check if Day 3 is bullish and closes above Day 1 midpoint
-                    if (closes[i] > opens[i] and  # Bullish
-                        day3_body > self.min_body_size * opens[i] and  # Long body
-                        closes[i] > day1_midpoint):  # Above midpoint
-                        
-                        pattern = {
-                            'pattern_type': 'Morning Star',
-                            'days': {
-                                'day1': {'index': i-2, 'open': opens[i-2], 'close': closes[i-2], 'high': highs[i-2], 'low': lows[i-2]},
-                                'day2': {'index': i-1, 'open': opens[i-1], 'close': closes[i-1], 'high': highs[i-1], 'low': lows[i-1]},
-                                'day3': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
-                            },
-                            'confidence': self._calculate_morning_star_confidence(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                            'signal': 'BUY',
-                            'target': self._calculate_morning_star_target(opens[i-2], highs[i-2], lows[i-2], closes[i]),
-                            'stop_loss': self._calculate_morning_star_stop_loss(opens[i-2], highs[i-2], lows[i-2], closes[i])
-                        }
-                        patterns.append(pattern)
-        
-        return patterns
+        masks, scores = self._classify(opens, highs, lows, closes)
+        return self._morning_star_patterns(opens, highs, lows, closes, masks, scores)
     
     def detect_evening_star(self, opens: np.ndarray, highs: np.ndarray, 
                            lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
@@ -98,53 +120,8 @@ class AdvancedCandlestickDetector:
         - Day 2: Small body (doji-like) with gap up
         - Day 3: Long bearish candle closing below midpoint of Day 1
         """
-        patterns = []
-        
-        for i in range(2, len(opens)):
-            # Day 1: Long bullish candle
-            day1_body = abs(closes[i-2] - opens[i-2])
-            day1_high = highs[i-2]
-            day1_low = lows[i-2]
-            day1_midpoint = (day1_high + day1_low) / 2
-            
-            # Check if Day 1 is bullish and long
-            if (closes[i-2] > opens[i-2] and 
-                day1_body > self.min_body_size * opens[i-2]):
-                
-                # Day 2: Small body with gap up
-                day2_body = abs(closes[i-1] - opens[i-1])
-                day2_high = highs[i-1]
-                day2_low = lows[i-1]
-                
-                # Check if Day 2 has small body and gaps up
-                if (day2_body < day1_body * 0.3 and  # Small body
-                    day2_low > closes[i-2]):  # Gap up
-                    
-                    # Day 3: Long bearish candle
-                    day3_body = abs(closes[i] - opens[i])
-                    day3_high = highs[i]
-                    day3_low = lows[i]
-                    
-                    # Check if Day 3 is bearish and closes below Day 1 midpoint
-                    if (closes[i] < opens[i] and  # Bearish
-                        day3_body > self.min_body_size * opens[i] and  # Long body
-                        closes[i] < day1_midpoint):  # Below midpoint
-                        
-                        pattern = {
-                            'pattern_type': 'Evening Star',
-                            'days': {
-                                'day1': {'index': i-2, 'open': opens[i-2], 'close': closes[i-2], 'high': highs[i-2], 'low': lows[i-2]},
-                                'day2': {'index': i-1, 'open': opens[i-1], 'close': closes[i-1], 'high': highs[i-1], 'low': lows[i-1]},
-                                'day3': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
-                            },
-                            'confidence': self._calculate_evening_star_confidence(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                            'signal': 'SELL',
-                            'target': self._calculate_evening_star_target(opens[i-2], highs[i-2], lows[i-2], closes[i]),
-                            'stop_loss': self._calculate_evening_star_stop_loss(opens[i-2], highs[i-2], lows[i-2], closes[i])
-                        }
-                        patterns.append(pattern)
-        
-        return patterns
+        masks, scores = self._classify(opens, highs, lows, closes)
+        return self._evening_star_patterns(opens, highs, lows, closes, masks, scores)
     
     def detect_three_white_soldiers(self, opens: np.ndarray, highs: np.ndarray, 
                                    lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
@@ -156,57 +133,8 @@ class AdvancedCandlestickDetector:
         - Each opens within previous candle's body
         - Each closes near its high
         """
-        patterns = []
-        
-        for i in range(2, len(opens)):
-            # Check three consecutive days
-            days = [i-2, i-1, i]
-            
-            # Check if all three days are bullish
-            all_bullish = all(closes[j] > opens[j] for j in days)
-            if not all_bullish:
-                continue
-            
-            # Check if each opens within previous candle's body
-            opens_within_body = True
-            for j in range(1, len(days)):
-                prev_open = opens[days[j-1]]
-                prev_close = closes[days[j-1]]
-                curr_open = opens[days[j]]
-                
-                if not (min(prev_open, prev_close) <= curr_open <= max(prev_open, prev_close)):
-                    opens_within_body = False
-                    break
-            
-            if not opens_within_body:
-                continue
-            
-            # Check if each closes near its high
-            closes_near_high = True
-            for j in days:
-                body_size = closes[j] - opens[j]
-                high_distance = highs[j] - closes[j]
-                
-                if high_distance > body_size * 0.3:  # Should close within 30% of high
-                    closes_near_high = False
-                    break
-            
-            if closes_near_high:
-                pattern = {
-                    'pattern_type': 'Three White Soldiers',
-                    'days': {
-                        'day1': {'index': i-2, 'open': opens[i-2], 'close': closes[i-2], 'high': highs[i-2], 'low': lows[i-2]},
-                        'day2': {'index': i-1, 'open': opens[i-1], 'close': closes[i-1], 'high': highs[i-1], 'low': lows[i-1]},
-                        'day3': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
-                    },
-                    'confidence': self._calculate_three_white_soldiers_confidence(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                    'signal': 'BUY',
-                    'target': self._calculate_three_white_soldiers_target(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                    'stop_loss': self._calculate_three_white_soldiers_stop_loss(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1])
-                }
-                patterns.append(pattern)
-        
-        return patterns
+        masks, scores = self._classify(opens, highs, lows, closes)
+        return self._three_white_soldiers_patterns(opens, highs, lows, closes, masks, scores)
     
     def detect_three_black_crows(self, opens: np.ndarray, highs: np.ndarray, 
                                 lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
@@ -218,57 +146,8 @@ class AdvancedCandlestickDetector:
         - Each opens near previous candle's open
         - Each closes near its low
         """
-        patterns = []
-        
-        for i in range(2, len(opens)):
-            # Check three consecutive days
-            days = [i-2, i-1, i]
-            
-            # Check if all three days are bearish
-            all_bearish = all(closes[j] < opens[j] for j in days)
-            if not all_bearish:
-                continue
-            
-            # Check if each opens near previous candle's open
-            opens_near_previous = True
-            for j in range(1, len(days)):
-                prev_open = opens[days[j-1]]
-                curr_open = opens[days[j]]
-                open_diff = abs(curr_open - prev_open) / prev_open
-                
-                if open_diff > 0.02:  # Should open within 2% of previous open
-                    opens_near_previous = False
-                    break
-            
-            if not opens_near_previous:
-                continue
-            
-            # Check if each closes near its low
-            closes_near_low = True
-            for j in days:
-                body_size = opens[j] - closes[j]
-                low_distance = closes[j] - lows[j]
-                
-                if low_distance > body_size * 0.3:  # Should close within 30% of low
-                    closes_near_low = False
-                    break
-            
-            if closes_near_low:
-                pattern = {
-                    'pattern_type': 'Three Black Crows',
-                    'days': {
-                        'day1': {'index': i-2, 'open': opens[i-2], 'close': closes[i-2], 'high': highs[i-2], 'low': lows[i-2]},
-                        'day2': {'index': i-1, 'open': opens[i-1], 'close': closes[i-1], 'high': highs[i-1], 'low': lows[i-1]},
-                        'day3': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
-                    },
-                    'confidence': self._calculate_three_black_crows_confidence(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                    'signal': 'SELL',
-                    'target': self._calculate_three_black_crows_target(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1]),
-                    'stop_loss': self._calculate_three_black_crows_stop_loss(opens[i-2:i+1], highs[i-2:i+1], lows[i-2:i+1], closes[i-2:i+1])
-                }
-                patterns.append(pattern)
-        
-        return patterns
+        masks, scores = self._classify(opens, highs, lows, closes)
+        return self._three_black_crows_patterns(opens, highs, lows, closes, masks, scores)
     
     def detect_harami_patterns(self, opens: np.ndarray, highs: np.ndarray, 
                               lows: np.ndarray, closes: np.ndarray) -> List[Dict]:
@@ -279,282 +158,8 @@ class AdvancedCandlestickDetector:
         - Day 1: Long candle (parent)
         - Day 2: Small candle (child) completely within Day 1's body
         """
-        patterns = []
-        
-        for i in range(1, len(opens)):
-            # Day 1: Long candle
-            day1_body = abs(closes[i-1] - opens[i-1])
-            day1_high = max(opens[i-1], closes[i-1])
-            day1_low = min(opens[i-1], closes[i-1])
-            
-            # Check if Day 1 is long enough
-            if day1_body < self.min_body_size * opens[i-1]:
-                continue
-            
-            # Day 2: Small candle
-            day2_body = abs(closes[i] - opens[i])
-            day2_high = max(opens[i], closes[i])
-            day2_low = min(opens[i], closes[i])
-            
-            # Check if Day 2 is small enough
-            if day2_body > day1_body * 0.5:  # Should be less than 50% of Day 1
-                continue
-            
-            # Check if Day 2 is completely within Day 1's body
-            if (day2_high <= day1_high and day2_low >= day1_low):
-                # Determine pattern type
-                if closes[i-1] > opens[i-1]:  # Day 1 bullish
-                    if closes[i] > opens[i]:  # Day 2 also bullish
-                        pattern_type = 'Bullish Harami'
-                        signal = 'BUY'
-                    else:  # Day 2 bearish
-                        pattern_type = 'Bearish Harami'
-                        signal = 'SELL'
-                else:  # Day 1 bearish
-                    if closes[i] < opens[i]:  # Day 2 also bearish
-                        pattern_type = 'Bearish Harami'
-                        signal = 'SELL'
-                    else:  # Day 2 bullish
-                        pattern_type = 'Bullish Harami'
-                        signal = 'BUY'
-                
-                pattern = {
-                    'pattern_type': pattern_type,
-                    'days': {
-                        'day1': {'index': i-1, 'open': opens[i-1], 'close': closes[i-1], 'high': highs[i-1], 'low': lows[i-1]},
-                        'day2': {'index': i, 'open': opens[i], 'close': closes[i], 'high': highs[i], 'low': lows[i]}
-                    },
-                    'confidence': self._calculate_harami_confidence(opens[i-1:i+1], highs[i-1:i+1], lows[i-1:i+1], closes[i-1:i+1]),
-                    'signal': signal,
-                    'target': self._calculate_harami_target(opens[i-1], highs[i-1], lows[i-1], closes[i-1], opens[i], closes[i]),
-                    'stop_loss': self._calculate_harami_stop_loss(opens[i-1], highs[i-1], lows[i-1], closes[i-1], opens[i], closes[i])
-                }
-                patterns.append(pattern)
-        
-        return patterns
-    
-    def _calculate_morning_star_confidence(self, opens: np.ndarray, highs: np.ndarray, 
-                                         lows: np.ndarray, closes: np.ndarray) -> float:
-        """Morning Star pattern güven skorunu hesapla (0-100)"""
-        try:
-            confidence = 100.0
-            
-            # Day 1 bearish strength
-            day1_body = abs(closes[0] - opens[0])
-            day1_range = highs[0] - lows[0]
-            day1_strength = day1_body / day1_range if day1_range > 0 else 0
-            
-            if day1_strength > 0.7:
-                confidence += 10
-            elif day1_strength < 0.5:
-                confidence -= 20
-            
-            # Day 2 gap size
-            day2_gap = opens[0] - highs[1]
-            day2_gap_ratio = day2_gap / day1_body if day1_body > 0 else 0
-            
-            if 0.1 <= day2_gap_ratio <= 0.3:
-                confidence += 15
-            else:
-                confidence -= 15
-            
-            # Day 3 bullish strength
-            day3_body = abs(closes[2] - opens[2])
-            day3_range = highs[2] - lows[2]
-            day3_strength = day3_body / day3_range if day3_range > 0 else 0
-            
-            if day3_strength > 0.7:
-                confidence += 15
-            elif day3_strength < 0.5:
-                confidence -= 20
-            
-            # Day 3 close position relative to Day 1
-            day1_midpoint = (highs[0] + lows[0]) / 2
-            if closes[2] > day1_midpoint:
-                confidence += 20
-            else:
-                confidence -= 30
-            
-            return max(0, min(100, confidence))
-            
-        except:
-            return 0.0
-    
-    def _calculate_evening_star_confidence(self, opens: np.ndarray, highs: np.ndarray, 
-                                         lows: np.ndarray, closes: np.ndarray) -> float:
-        """Evening Star pattern güven skorunu hesapla (0-100)"""
-        try:
-            confidence = 100.0
-            
-            # Day 1 bullish strength
-            day1_body = abs(closes[0] - opens[0])
-            day1_range = highs[0] - lows[0]
-            day1_strength = day1_body / day1_range if day1_range > 0 else 0
-            
-            if day1_strength > 0.7:
-                confidence += 10
-            elif day1_strength < 0.5:
-                confidence -= 20
-            
-            # Day 2 gap size
-            day2_gap = lows[1] - closes[0]
-            day2_gap_ratio = day2_gap / day1_body if day1_body > 0 else 0
-            
-            if 0.1 <= day2_gap_ratio <= 0.3:
-                confidence += 15
-            else:
-                confidence -= 15
-            
-            # Day 3 bearish strength
-            day3_body = abs(closes[2] - opens[2])
-            day3_range = highs[2] - lows[2]
-            day3_strength = day3_body / day3_range if day3_range > 0 else 0
-            
-            if day3_strength > 0.7:
-                confidence += 15
-            elif day3_strength < 0.5:
-                confidence -= 20
-            
-            # Day 3 close position relative to Day 1
-            day1_midpoint = (highs[0] + lows[0]) / 2
-            if closes[2] < day1_midpoint:
-                confidence += 20
-            else:
-                confidence -= 30
-            
-            return max(0, min(100, confidence))
-            
-        except:
-            return 0.0
-    
-    def _calculate_three_white_soldiers_confidence(self, opens: np.ndarray, highs: np.ndarray, 
-                                                 lows: np.ndarray, closes: np.ndarray) -> float:
-        """Three White Soldiers pattern güven skorunu hesapla (0-100)"""
-        try:
-            confidence = 100.0
-            
-            # Check body sizes
-            for j in range(3):
-                body_size = closes[j] - opens[j]
-                range_size = highs[j] - lows[j]
-                body_ratio = body_size / range_size if range_size > 0 else 0
-                
-                if body_ratio > 0.7:
-                    confidence += 10
-                elif body_ratio < 0.5:
-                    confidence -= 15
-            
-            # Check gap consistency
-            for j in range(1, 3):
-                prev_close = closes[j-1]
-                curr_open = opens[j]
-                gap_ratio = abs(curr_open - prev_close) / prev_close
-                
-                if gap_ratio < 0.02:
-                    confidence += 10
-                else:
-                    confidence -= 10
-            
-            # Check close positions
-            for j in range(3):
-                body_size = closes[j] - opens[j]
-                high_distance = highs[j] - closes[j]
-                close_ratio = high_distance / body_size if body_size > 0 else 1
-                
-                if close_ratio < 0.3:
-                    confidence += 10
-                else:
-                    confidence -= 15
-            
-            return max(0, min(100, confidence))
-            
-        except:
-            return 0.0
-    
-    def _calculate_three_black_crows_confidence(self, opens: np.ndarray, highs: np.ndarray, 
-                                              lows: np.ndarray, closes: np.ndarray) -> float:
-        """Three Black Crows pattern güven skorunu hesapla (0-100)"""
-        try:
-            confidence = 100.0
-            
-            # Check body sizes
-            for j in range(3):
-                body_size = opens[j] - closes[j]
-                range_size = highs[j] - lows[j]
-                body_ratio = body_size / range_size if range_size > 0 else 0
-                
-                if body_ratio > 0.7:
-                    confidence += 10
-                elif body_ratio < 0.5:
-                    confidence -= 15
-            
-            # Check open consistency
-            for j in range(1, 3):
-                prev_open = opens[j-1]
-                curr_open = opens[j]
-                open_diff = abs(curr_open - prev_open) / prev_open
-                
-                if open_diff < 0.02:
-                    confidence += 10
-                else:
-                    confidence -= 10
-            
-            # Check close positions
-            for j in range(3):
-                body_size = opens[j] - closes[j]
-                low_distance = closes[j] - lows[j]
-                close_ratio = low_distance / body_size if body_size > 0 else 1
-                
-                if close_ratio < 0.3:
-                    confidence += 10
-                else:
-                    confidence -= 15
-            
-            return max(0, min(100, confidence))
-            
-        except:
-            return 0.0
-    
-    def _calculate_harami_confidence(self, opens: np.ndarray, highs: np.ndarray, 
-                                   lows: np.ndarray, closes: np.ndarray) -> float:
-        """Harami pattern güven skorunu hesapla (0-100)"""
-        try:
-            confidence = 100.0
-            
-            # Day 1 body size
-            day1_body = abs(closes[0] - opens[0])
-            day1_range = highs[0] - lows[0]
-            day1_ratio = day1_body / day1_range if day1_range > 0 else 0
-            
-            if day1_ratio > 0.7:
-                confidence += 15
-            elif day1_ratio < 0.5:
-                confidence -= 20
-            
-            # Day 2 body size relative to Day 1
-            day2_body = abs(closes[1] - opens[1])
-            day2_ratio = day2_body / day1_body if day1_body > 0 else 1
-            
-            if day2_ratio < 0.3:
-                confidence += 20
-            elif day2_ratio > 0.5:
-                confidence -= 25
-            
-            # Containment check
-            day1_high = max(opens[0], closes[0])
-            day1_low = min(opens[0], closes[0])
-            day2_high = max(opens[1], closes[1])
-            day2_low = min(opens[1], closes[1])
-            
-            if day2_high <= day1_high and day2_low >= day1_low:
-                confidence += 25
-            else:
-                confidence -= 50
-            
-            return max(0, min(100, confidence))
-            
-        except:
-            return 0.0
+        masks, scores = self._classify(opens, highs, lows, closes)
+        return self._harami_patterns(opens, highs, lows, closes, masks, scores)
     
     def _calculate_morning_star_target(self, day1_open: float, day1_high: float, 
                                      day1_low: float, day3_close: float) -> float:
@@ -672,25 +277,17 @@ class AdvancedCandlestickDetector:
     
     def detect_all_advanced_candlestick_patterns(self, opens: np.ndarray, highs: np.ndarray, 
                                                lows: np.ndarray, closes: np.ndarray) -> Dict[str, List[Dict]]:
-        """Tüm advanced candlestick pattern'leri tespit et"""
-        patterns = {}
-        
-        # Morning Star patterns
-        patterns['morning_star'] = self.detect_morning_star(opens, highs, lows, closes)
+        """Tüm advanced candlestick pattern'leri tespit et (özellikler ve maskeler bir kez hesaplanır)"""
+        masks, scores = self._classify(opens, highs, lows, closes)
+        args = (opens, highs, lows, closes, masks, scores)
         
-        # Evening Star patterns
-        patterns['evening_star'] = self.detect_evening_star(opens, highs, lows, closes)
-        
-        # Three White Soldiers patterns
-        patterns['three_white_soldiers'] = self.detect_three_white_soldiers(opens, highs, lows, closes)
-        
-        # Three Black Crows patterns
-        patterns['three_black_crows'] = self.detect_three_black_crows(opens, highs, lows, closes)
-        
-        # Harami patterns
-        patterns['harami'] = self.detect_harami_patterns(opens, highs, lows, closes)
-        
-        return patterns
+        return {
+            'morning_star': self._morning_star_patterns(*args),
+            'evening_star': self._evening_star_patterns(*args),
+            'three_white_soldiers': self._three_white_soldiers_patterns(*args),
+            'three_black_crows': self._three_black_crows_patterns(*args),
+            'harami': self._harami_patterns(*args),
+        }
     
     def calculate_pattern_score(self, patterns: Dict[str, List[Dict]]) -> float:
         """Pattern'lerin toplam skorunu hesapla (0-100)"""
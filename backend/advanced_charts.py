@@ -20,8 +20,13 @@ import seaborn as sns
 from typing import Dict, List, Tuple, Optional, Union, Any
 from dataclasses import dataclass
 import warnings
+from core.chart_render import (RenderTask, RenderedChart, downsample_ohlcv, downsample_series,
+                               ohlcv_buckets, render_cache)
 warnings.filterwarnings('ignore')
 
+# Okunabilir bir mum için gereken en az piksel
+CANDLE_MIN_PX = 3
+
 @dataclass
 class ChartConfig:
     """Grafik konfigürasyonu"""
@@ -34,6 +39,9 @@ class ChartConfig:
     grid: bool = True
     legend: bool = True
     annotations: bool = True
+    dpi: int = 100
+    downsample: bool = True
+    max_points: Optional[int] = None  # None: figür piksel genişliği
 
 @dataclass
 class ChartData:
@@ -72,6 +80,16 @@ class AdvancedCharts:
         
         # Türkçe karakter desteği
         plt.rcParams['font.family'] = ['DejaVu Sans', 'Arial Unicode MS', 'sans-serif']
+        
+        # Render önbelleği
+        self.render_cache = render_cache
+    
+    @staticmethod
+    def _point_budget(config: ChartConfig) -> Optional[int]:
+        """Seyreltme hedefi: figür piksel genişliği (veya max_points)"""
+        if not config.downsample:
+            return None
+        return config.max_points or int(config.figsize[0] * config.dpi)
     
     def create_candlestick_chart(self, data: pd.DataFrame, 
                                  config: ChartConfig,
@@ -90,7 +108,7 @@ class AdvancedCharts:
             plt.Figure: Oluşturulan grafik
         """
         fig, axes = plt.subplots(2 if show_volume else 1, 1, 
-                                figsize=config.figsize,
+                                figsize=config.figsize, dpi=config.dpi,
                                 gridspec_kw={'height_ratios': [3, 1]} if show_volume else None)
         
         if show_volume:
@@ -98,12 +116,17 @@ class AdvancedCharts:
         else:
             ax1 = axes
         
+        # Piksel genişliğine sığmayan barları OHLC kovalarında birleştir
+        budget = self._point_budget(config)
+        buckets = ohlcv_buckets(len(data), budget // CANDLE_MIN_PX if budget else None)
+        plot_data = downsample_ohlcv(data, buckets=buckets)
+        
         # Ana grafik (candlestick)
-        self._plot_candlesticks(ax1, data)
+        self._plot_candlesticks(ax1, plot_data)
         
-        # Teknik indikatörler
+        # Teknik indikatörler (tam çözünürlükte hesaplanıp kovalara indirgenir)
         if show_indicators:
-            self._add_technical_indicators(ax1, data)
+            self._add_technical_indicators(ax1, data, buckets)
         
         # Grafik ayarları
         ax1.set_title(config.title, fontsize=16, fontweight='bold')
@@ -118,7 +141,7 @@ class AdvancedCharts:
         
         # Hacim grafiği
         if show_volume:
-            self._plot_volume(ax2, data)
+            self._plot_volume(ax2, plot_data)
             ax2.set_xlabel('Tarih')
             ax2.set_ylabel('Hacim')
             ax2.grid(True, alpha=0.3)
@@ -128,42 +151,45 @@ class AdvancedCharts:
     
     def _plot_candlesticks(self, ax: plt.Axes, data: pd.DataFrame):
         """Candlestick çizimi"""
+        x = np.arange(len(data))
+        open_price = data['Open'].to_numpy()
+        close = data['Close'].to_numpy()
+        
         # Renk belirleme
-        colors = ['green' if close >= open else 'red' 
-                 for open, close in zip(data['Open'], data['Close'])]
+        colors = np.where(close >= open_price, 'green', 'red')
         
-        # Candlestick çizimi
-        for i, (date, open_price, high, low, close, volume) in enumerate(
-            zip(data.index, data['Open'], data['High'], data['Low'], data['Close'], data['Volume'])
-        ):
-            # Gövde
-            body_height = close - open_price
-            body_bottom = min(open_price, close)
-            
-            # Gövde dikdörtgeni
-            rect = Rectangle((i-0.3, body_bottom), 0.6, abs(body_height),
-                           facecolor=colors[i], edgecolor='black', linewidth=0.5)
-            ax.add_patch(rect)
-            
-            # Fitil çizgisi
-            ax.plot([i, i], [low, high], color='black', linewidth=1)
-            
-            # Açılış/kapanış işaretleri
-            if open_price != close:
-                ax.plot([i-0.3, i+0.3], [open_price, open_price], color='black', linewidth=1)
-                ax.plot([i-0.3, i+0.3], [close, close], color='black', linewidth=1)
+        # Fitil çizgileri
+        ax.vlines(x, data['Low'], data['High'], color='black', linewidth=1)
+        
+        # Gövde dikdörtgenleri
+        ax.bar(x, np.abs(close - open_price), width=0.6, bottom=np.minimum(open_price, close),
+               color=colors, edgecolor='black', linewidth=0.5)
+        
+        # Açılış/kapanış işaretleri
+        moved = open_price != close
+        ax.hlines(open_price[moved], x[moved] - 0.3, x[moved] + 0.3, color='black', linewidth=1)
+        ax.hlines(close[moved], x[moved] - 0.3, x[moved] + 0.3, color='black', linewidth=1)
     
-    def _add_technical_indicators(self, ax: plt.Axes, data: pd.DataFrame):
-        """Teknik indikatörler ekleme"""
+    def _add_technical_indicators(self, ax: plt.Axes, data: pd.DataFrame,
+                                  buckets: Optional[np.ndarray] = None):
+        """Teknik indikatörler ekleme (buckets: mum kovaları, her kovanın son değeri çizilir)"""
+        if buckets is None:
+            buckets = np.arange(len(data))
+        n_bars = int(buckets[-1]) + 1 if len(buckets) else 0
+        
+        def reduce(series: pd.Series) -> np.ndarray:
+            return series.groupby(buckets).last().to_numpy() \
+                if n_bars < len(data) else series.to_numpy()
+        
         # SMA 20
         if len(data) >= 20:
             sma_20 = data['Close'].rolling(window=20).mean()
-            ax.plot(range(len(data)), sma_20, color='blue', linewidth=2, label='SMA 20', alpha=0.7)
+            ax.plot(range(n_bars), reduce(sma_20), color='blue', linewidth=2, label='SMA 20', alpha=0.7)
         
         # SMA 50
         if len(data) >= 50:
             sma_50 = data['Close'].rolling(window=50).mean()
-            ax.plot(range(len(data)), sma_50, color='red', linewidth=2, label='SMA 50', alpha=0.7)
+            ax.plot(range(n_bars), reduce(sma_50), color='red', linewidth=2, label='SMA 50', alpha=0.7)
         
         # Bollinger Bands
         if len(data) >= 20:
@@ -172,9 +198,9 @@ class AdvancedCharts:
             upper_band = sma + (std * 2)
             lower_band = sma - (std * 2)
             
-            ax.plot(range(len(data)), upper_band, color='gray', linewidth=1, 
+            ax.plot(range(n_bars), reduce(upper_band), color='gray', linewidth=1, 
                    label='Bollinger Upper', alpha=0.5, linestyle='--')
-            ax.plot(range(len(data)), lower_band, color='gray', linewidth=1, 
+            ax.plot(range(n_bars), reduce(lower_band), color='gray', linewidth=1, 
                    label='Bollinger Lower', alpha=0.5, linestyle='--')
         
         if ax.get_legend():
@@ -207,13 +233,14 @@ class AdvancedCharts:
         # Alt grafik sayısı
         n_subplots = len(indicators) + 1
         
-        fig, axes = plt.subplots(n_subplots, 1, figsize=config.figsize)
+        fig, axes = plt.subplots(n_subplots, 1, figsize=config.figsize, dpi=config.dpi)
         if n_subplots == 1:
             axes = [axes]
+        budget = self._point_budget(config)
         
         # Ana fiyat grafiği
         ax_main = axes[0]
-        ax_main.plot(data.index, data['Close'], color='blue', linewidth=2)
+        self._plot_line(ax_main, data['Close'], budget, color='blue', linewidth=2)
         ax_main.set_title(f"{config.title} - Fiyat", fontweight='bold')
         ax_main.grid(True, alpha=0.3)
         
@@ -222,20 +249,26 @@ class AdvancedCharts:
             ax = axes[i + 1]
             
             if indicator == 'rsi':
-                self._plot_rsi(ax, data)
+                self._plot_rsi(ax, data, budget)
             elif indicator == 'macd':
-                self._plot_macd(ax, data)
+                self._plot_macd(ax, data, budget)
             elif indicator == 'bollinger':
-                self._plot_bollinger(ax, data)
+                self._plot_bollinger(ax, data, budget)
             elif indicator == 'volume':
-                self._plot_volume(ax, data)
+                self._plot_volume(ax, downsample_ohlcv(data, budget // CANDLE_MIN_PX if budget else None))
             
             ax.grid(True, alpha=0.3)
         
         plt.tight_layout()
         return fig
     
-    def _plot_rsi(self, ax: plt.Axes, data: pd.DataFrame):
+    @staticmethod
+    def _plot_line(ax: plt.Axes, series: pd.Series, max_points: Optional[int] = None, **kwargs):
+        """Seriyi LTTB ile piksel bütçesine seyreltip çiz"""
+        series = downsample_series(series, max_points)
+        ax.plot(series.index, series.values, **kwargs)
+    
+    def _plot_rsi(self, ax: plt.Axes, data: pd.DataFrame, max_points: Optional[int] = None):
         """RSI grafiği"""
         # RSI hesaplama
         delta = data['Close'].diff()
@@ -244,7 +277,7 @@ class AdvancedCharts:
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         
-        ax.plot(data.index, rsi, color='purple', linewidth=2)
+        self._plot_line(ax, rsi, max_points, color='purple', linewidth=2)
         ax.axhline(y=70, color='red', linestyle='--', alpha=0.7)
         ax.axhline(y=30, color='green', linestyle='--', alpha=0.7)
         ax.axhline(y=50, color='gray', linestyle='-', alpha=0.5)
@@ -252,7 +285,7 @@ class AdvancedCharts:
         ax.set_ylabel('RSI')
         ax.set_ylim(0, 100)
     
-    def _plot_macd(self, ax: plt.Axes, data: pd.DataFrame):
+    def _plot_macd(self, ax: plt.Axes, data: pd.DataFrame, max_points: Optional[int] = None):
         """MACD grafiği"""
         # MACD hesaplama
         ema_12 = data['Close'].ewm(span=12).mean()
@@ -261,15 +294,17 @@ class AdvancedCharts:
         signal = macd.ewm(span=9).mean()
         histogram = macd - signal
         
-        ax.plot(data.index, macd, color='blue', linewidth=2, label='MACD')
-        ax.plot(data.index, signal, color='red', linewidth=2, label='Signal')
-        ax.bar(data.index, histogram, color='gray', alpha=0.5, label='Histogram')
+        self._plot_line(ax, macd, max_points, color='blue', linewidth=2, label='MACD')
+        self._plot_line(ax, signal, max_points, color='red', linewidth=2, label='Signal')
+        # Histogram tepe/dipleri kaybolmasın diye min-max seyreltme
+        histogram = downsample_series(histogram, max_points, method="minmax")
+        ax.bar(histogram.index, histogram.values, color='gray', alpha=0.5, label='Histogram')
         ax.axhline(y=0, color='black', linestyle='-', alpha=0.5)
         ax.set_title('MACD', fontweight='bold')
         ax.set_ylabel('MACD')
         ax.legend()
     
-    def _plot_bollinger(self, ax: plt.Axes, data: pd.DataFrame):
+    def _plot_bollinger(self, ax: plt.Axes, data: pd.DataFrame, max_points: Optional[int] = None):
         """Bollinger Bands grafiği"""
         # Bollinger Bands hesaplama
         sma = data['Close'].rolling(window=20).mean()
@@ -277,10 +312,10 @@ class AdvancedCharts:
         upper_band = sma + (std * 2)
         lower_band = sma - (std * 2)
         
-        ax.plot(data.index, data['Close'], color='blue', linewidth=2, label='Fiyat')
-        ax.plot(data.index, upper_band, color='red', linewidth=1, label='Upper Band', linestyle='--')
-        ax.plot(data.index, lower_band, color='red', linewidth=1, label='Lower Band', linestyle='--')
-        ax.plot(data.index, sma, color='orange', linewidth=2, label='SMA 20')
+        self._plot_line(ax, data['Close'], max_points, color='blue', linewidth=2, label='Fiyat')
+        self._plot_line(ax, upper_band, max_points, color='red', linewidth=1, label='Upper Band', linestyle='--')
+        self._plot_line(ax, lower_band, max_points, color='red', linewidth=1, label='Lower Band', linestyle='--')
+        self._plot_line(ax, sma, max_points, color='orange', linewidth=2, label='SMA 20')
         ax.set_title('Bollinger Bands', fontweight='bold')
         ax.set_ylabel('Fiyat')
         ax.legend()
@@ -496,6 +531,43 @@ class AdvancedCharts:
             print(f"Grafik dışa aktarma hatası: {str(e)}")
             return False
     
+    def render_chart(self, method: str, *args, fmt: str = 'png', dpi: int = 100,
+                     if_none_match: Optional[str] = None, **kwargs) -> RenderedChart:
+        """
+        Grafiği görüntü baytı olarak render etme (önbellekli, ETag destekli)
+        
+        Args:
+            method: Grafik metodu adı (ör. 'create_candlestick_chart')
+            *args, **kwargs: Metoda geçilecek argümanlar
+            fmt: Görüntü formatı
+            dpi: Çözünürlük
+            if_none_match: İstemcinin gönderdiği ETag
+            
+        Returns:
+            RenderedChart: Görüntü baytları, ETag ve not_modified bayrağı
+        """
+        task = RenderTask(type(self), method, args, kwargs)
+        return self.render_cache.render(task, fmt=fmt, dpi=dpi, if_none_match=if_none_match, owner=self)
+    
+    def render_dashboard(self, panels: List[Tuple[str, tuple, Dict[str, Any]]],
+                         fmt: str = 'png', dpi: int = 100,
+                         max_workers: Optional[int] = None) -> List[RenderedChart]:
+        """
+        Dashboard panellerini paralel render etme
+        
+        Args:
+            panels: (metod adı, args, kwargs) listesi
+            fmt: Görüntü formatı
+            dpi: Çözünürlük
+            max_workers: Render süreç sayısı
+            
+        Returns:
+            List[RenderedChart]: Panellerle aynı sırada görüntüler
+        """
+        tasks = [RenderTask(type(self), method, tuple(args), dict(kwargs))
+                 for method, args, kwargs in panels]
+        return self.render_cache.render_many(tasks, fmt=fmt, dpi=dpi, max_workers=max_workers)
+    
     def create_dashboard_layout(self, charts: List[plt.Figure],
                                 layout: str = 'grid',
                                 figsize: Tuple[int, int] = (20, 12)) -> plt.Figure:
@@ -666,6 +738,32 @@ def test_advanced_charts():
     )
     print("   ✅ Dashboard düzeni oluşturuldu")
     
+    # Seyreltme + render önbelleği test
+    print("\n⚡ Render Önbelleği Test:")
+    intraday_index = pd.date_range('2020-01-01', periods=20000, freq='h')
+    intraday_close = 100 + np.cumsum(np.random.randn(20000) * 0.1)
+    intraday = pd.DataFrame({
+        'Open': intraday_close + np.random.randn(20000) * 0.05,
+        'High': intraday_close + 0.2,
+        'Low': intraday_close - 0.2,
+        'Close': intraday_close,
+        'Volume': np.random.randint(1000, 10000, 20000)
+    }, index=intraday_index)
+    
+    first = charts.render_chart('create_candlestick_chart', intraday, candlestick_config)
+    second = charts.render_chart('create_candlestick_chart', intraday, candlestick_config)
+    cached = charts.render_chart('create_candlestick_chart', intraday, candlestick_config,
+                                 if_none_match=first.etag)
+    print(f"   PNG boyutu: {len(first.content) / 1024:.0f} KB, ETag: {first.etag}")
+    print(f"   Önbellekten: {second.content == first.content}, 304: {cached.not_modified}")
+    
+    panels = charts.render_dashboard([
+        ('create_technical_analysis_chart', (intraday, technical_config), {'indicators': ['rsi', 'macd']}),
+        ('create_performance_chart', (test_data, performance_config), {}),
+        ('create_risk_metrics_chart', (risk_data, risk_config), {}),
+    ])
+    print(f"   Paralel panel sayısı: {len(panels)}, istatistikler: {charts.render_cache.stats}")
+    
     print("\n✅ Advanced Charts Test Tamamlandı!")
     
     # Test dosyasını temizle
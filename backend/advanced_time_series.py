@@ -7,6 +7,8 @@ belirsizlik ölçümü ile tahmin doğruluğunu önemli ölçüde artırır.
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
 from typing import Dict, List, Tuple, Optional, Union, Any, Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
@@ -76,6 +78,9 @@ class AdvancedTimeSeries:
         
         # Belirsizlik ölçüm parametreleri
         self.confidence_levels = [0.8, 0.9, 0.95]
+        self.mc_samples = 100
+        self.max_batch_rows = 4096  # MC dropout'ta tek forward'a giren en fazla satır
+        self._rng = np.random.default_rng()
     
     def _add_default_time_series_configs(self):
         """Varsayılan zaman serisi konfigürasyonları ekle"""
@@ -177,6 +182,11 @@ class AdvancedTimeSeries:
             
             self.time_series_configs[time_series_config.config_id] = time_series_config
     
+    @staticmethod
+    def _init_weights(*shape: int) -> np.ndarray:
+        """float32 başlangıç ağırlıkları"""
+        return (np.random.randn(*shape) * 0.1).astype(np.float32)
+    
     def create_n_beats_model(self, config: TimeSeriesConfig) -> Dict[str, Any]:
         """N-BEATS model oluştur"""
         try:
@@ -186,6 +196,7 @@ class AdvancedTimeSeries:
                 'backcast_weights': [],
                 'forecast_weights': []
             }
+            widths = config.architecture['layer_widths']
             
             # Her stack için bloklar oluştur
             for stack_idx in range(config.architecture['num_stacks']):
@@ -197,19 +208,21 @@ class AdvancedTimeSeries:
                 # Her blok için katmanlar oluştur
                 for block_idx in range(config.architecture['num_blocks']):
                     block = {
+                        'input_weights': self._init_weights(config.lookback_window, widths[0]),
+                        'input_bias': np.zeros(widths[0], dtype=np.float32),
                         'layers': [],
-                        'backcast_weights': np.random.randn(config.architecture['layer_widths'][0], 1) * 0.1,
-                        'forecast_weights': np.random.randn(config.architecture['layer_widths'][0], 1) * 0.1
+                        'backcast_weights': self._init_weights(widths[-1], config.lookback_window),
+                        'forecast_weights': self._init_weights(widths[-1], config.forecast_horizon)
                     }
                     
                     # Katmanlar
                     for layer_idx in range(config.architecture['num_layers']):
                         layer = {
-                            'weights': np.random.randn(
-                                config.architecture['layer_widths'][min(layer_idx, len(config.architecture['layer_widths'])-1)],
-                                config.architecture['layer_widths'][min(layer_idx+1, len(config.architecture['layer_widths'])-1)]
-                            ) * 0.1,
-                            'bias': np.zeros(config.architecture['layer_widths'][min(layer_idx+1, len(config.architecture['layer_widths'])-1)])
+                            'weights': self._init_weights(
+                                widths[min(layer_idx, len(widths)-1)],
+                                widths[min(layer_idx+1, len(widths)-1)]
+                            ),
+                            'bias': np.zeros(widths[min(layer_idx+1, len(widths)-1)], dtype=np.float32)
                         }
                         block['layers'].append(layer)
                     
@@ -236,31 +249,31 @@ class AdvancedTimeSeries:
                 'decoder': {
                     'lstm_layers': [],
                     'output_projection': {
-                        'weights': np.random.randn(config.architecture['hidden_size'], 1) * 0.1,
-                        'bias': np.zeros(1)
+                        'weights': self._init_weights(config.architecture['hidden_size'], 1),
+                        'bias': np.zeros(1, dtype=np.float32)
                     }
                 },
                 'distribution_params': {
-                    'mu_weights': np.random.randn(config.architecture['hidden_size'], 1) * 0.1,
-                    'sigma_weights': np.random.randn(config.architecture['hidden_size'], 1) * 0.1
+                    'mu_weights': self._init_weights(config.architecture['hidden_size'], 1),
+                    'sigma_weights': self._init_weights(config.architecture['hidden_size'], 1)
                 }
             }
             
             # Encoder LSTM layers
             for layer_idx in range(config.architecture['num_lstm_layers']):
                 lstm_layer = {
-                    'input_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                    'hidden_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                    'bias': np.zeros(config.architecture['hidden_size'] * 4)  # 4 gates
+                    'input_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                    'hidden_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                    'bias': np.zeros(config.architecture['hidden_size'] * 4, dtype=np.float32)  # 4 gates
                 }
                 model['encoder']['lstm_layers'].append(lstm_layer)
             
             # Decoder LSTM layers
             for layer_idx in range(config.architecture['decoder_layers']):
                 lstm_layer = {
-                    'input_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                    'hidden_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                    'bias': np.zeros(config.architecture['hidden_size'] * 4)
+                    'input_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                    'hidden_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                    'bias': np.zeros(config.architecture['hidden_size'] * 4, dtype=np.float32)
                 }
                 model['decoder']['lstm_layers'].append(lstm_layer)
             
@@ -277,40 +290,42 @@ class AdvancedTimeSeries:
             model = {
                 'config': config,
                 'input_projection': {
-                    'weights': np.random.randn(1, config.architecture['num_filters']) * 0.1,
-                    'bias': np.zeros(config.architecture['num_filters'])
+                    'weights': self._init_weights(1, config.architecture['residual_channels']),
+                    'bias': np.zeros(config.architecture['residual_channels'], dtype=np.float32)
                 },
                 'dilated_layers': [],
                 'residual_projection': {
-                    'weights': np.random.randn(config.architecture['num_filters'], config.architecture['residual_channels']) * 0.1,
-                    'bias': np.zeros(config.architecture['residual_channels'])
+                    'weights': self._init_weights(config.architecture['num_filters'], config.architecture['residual_channels']),
+                    'bias': np.zeros(config.architecture['residual_channels'], dtype=np.float32)
                 },
                 'skip_projection': {
-                    'weights': np.random.randn(config.architecture['num_filters'], config.architecture['skip_channels']) * 0.1,
-                    'bias': np.zeros(config.architecture['skip_channels'])
+                    'weights': self._init_weights(config.architecture['num_filters'], config.architecture['skip_channels']),
+                    'bias': np.zeros(config.architecture['skip_channels'], dtype=np.float32)
                 },
                 'output_projection': {
-                    'weights': np.random.randn(config.architecture['skip_channels'], 1) * 0.1,
-                    'bias': np.zeros(1)
+                    'weights': self._init_weights(config.architecture['skip_channels'], config.forecast_horizon),
+                    'bias': np.zeros(config.forecast_horizon, dtype=np.float32)
                 }
             }
             
-            # Dilated convolution layers
+            # Dilated convolution layers: (filter_size, residual_channels, num_filters)
             for layer_idx in range(config.architecture['num_layers']):
                 dilation_rate = config.architecture['dilation_rates'][min(layer_idx, len(config.architecture['dilation_rates'])-1)]
                 
                 dilated_layer = {
-                    'conv_weights': np.random.randn(
-                        config.architecture['filter_size'], 
+                    'conv_weights': self._init_weights(
+                        config.architecture['filter_size'],
+                        config.architecture['residual_channels'],
                         config.architecture['num_filters']
-                    ) * 0.1,
-                    'conv_bias': np.zeros(config.architecture['num_filters']),
+                    ),
+                    'conv_bias': np.zeros(config.architecture['num_filters'], dtype=np.float32),
                     'dilation_rate': dilation_rate,
-                    'gate_weights': np.random.randn(
-                        config.architecture['filter_size'], 
+                    'gate_weights': self._init_weights(
+                        config.architecture['filter_size'],
+                        config.architecture['residual_channels'],
                         config.architecture['num_filters']
-                    ) * 0.1,
-                    'gate_bias': np.zeros(config.architecture['num_filters'])
+                    ),
+                    'gate_bias': np.zeros(config.architecture['num_filters'], dtype=np.float32)
                 }
                 model['dilated_layers'].append(dilated_layer)
             
@@ -326,21 +341,25 @@ class AdvancedTimeSeries:
         try:
             model = {
                 'config': config,
+                'input_projection': {
+                    'weights': self._init_weights(1, config.architecture['hidden_size']),
+                    'bias': np.zeros(config.architecture['hidden_size'], dtype=np.float32)
+                },
                 'encoder': {
                     'layers': [],
-                    'positional_encoding': np.random.randn(config.architecture['hidden_size']) * 0.1
+                    'positional_encoding': self._init_weights(self.max_lookback_window, config.architecture['hidden_size'])
                 },
                 'decoder': {
                     'layers': [],
                     'cross_attention': {
-                        'query_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'key_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'value_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1
+                        'query_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'key_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'value_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'])
                     }
                 },
                 'output_projection': {
-                    'weights': np.random.randn(config.architecture['hidden_size'], 1) * 0.1,
-                    'bias': np.zeros(1)
+                    'weights': self._init_weights(config.architecture['hidden_size'], config.forecast_horizon),
+                    'bias': np.zeros(config.forecast_horizon, dtype=np.float32)
                 }
             }
             
@@ -348,13 +367,13 @@ class AdvancedTimeSeries:
             for layer_idx in range(config.architecture['num_encoder_layers']):
                 encoder_layer = {
                     'self_attention': {
-                        'query_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'key_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'value_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1
+                        'query_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'key_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'value_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'])
                     },
                     'feed_forward': {
-                        'w1': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size'] * 4) * 0.1,
-                        'w2': np.random.randn(config.architecture['hidden_size'] * 4, config.architecture['hidden_size']) * 0.1
+                        'w1': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'] * 4),
+                        'w2': self._init_weights(config.architecture['hidden_size'] * 4, config.architecture['hidden_size'])
                     }
                 }
                 model['encoder']['layers'].append(encoder_layer)
@@ -363,18 +382,18 @@ class AdvancedTimeSeries:
             for layer_idx in range(config.architecture['num_decoder_layers']):
                 decoder_layer = {
                     'self_attention': {
-                        'query_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'key_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'value_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1
+                        'query_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'key_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'value_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'])
                     },
                     'cross_attention': {
-                        'query_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'key_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1,
-                        'value_weights': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size']) * 0.1
+                        'query_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'key_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size']),
+                        'value_weights': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'])
                     },
                     'feed_forward': {
-                        'w1': np.random.randn(config.architecture['hidden_size'], config.architecture['hidden_size'] * 4) * 0.1,
-                        'w2': np.random.randn(config.architecture['hidden_size'] * 4, config.architecture['hidden_size']) * 0.1
+                        'w1': self._init_weights(config.architecture['hidden_size'], config.architecture['hidden_size'] * 4),
+                        'w2': self._init_weights(config.architecture['hidden_size'] * 4, config.architecture['hidden_size'])
                     }
                 }
                 model['decoder']['layers'].append(decoder_layer)
@@ -387,17 +406,28 @@ class AdvancedTimeSeries:
             return {}
     
     def forward_pass(self, model: Dict[str, Any], input_data: np.ndarray, 
-                    model_type: str = "n_beats") -> Tuple[np.ndarray, np.ndarray]:
-        """Model forward pass uygula"""
+                    model_type: str = "n_beats", dropout_rate: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Model forward pass uygula
+        
+        Args:
+            model: create_* çıktısı
+            input_data: (batch, seq) ya da (batch, seq, features); batch ekseni sembol/pencere
+            model_type: n_beats, deepar, wavenet, temporal_fusion
+            dropout_rate: > 0 ise MC dropout (her satıra bağımsız maske)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (batch, forecast_horizon) tahmin ve backcast/gizli durum
+        """
         try:
             if model_type == "n_beats":
-                return self._n_beats_forward(model, input_data)
+                return self._n_beats_forward(model, input_data, dropout_rate)
             elif model_type == "deepar":
-                return self._deepar_forward(model, input_data)
+                return self._deepar_forward(model, input_data, dropout_rate)
             elif model_type == "wavenet":
-                return self._wavenet_forward(model, input_data)
+                return self._wavenet_forward(model, input_data, dropout_rate)
             elif model_type == "temporal_fusion":
-                return self._temporal_fusion_forward(model, input_data)
+                return self._temporal_fusion_forward(model, input_data, dropout_rate)
             else:
                 logger.error(f"Unknown model type: {model_type}")
                 return np.zeros((input_data.shape[0], 1)), np.zeros((input_data.shape[0], 1))
@@ -406,38 +436,57 @@ class AdvancedTimeSeries:
             logger.error(f"Error in forward pass: {e}")
             return np.zeros((input_data.shape[0], 1)), np.zeros((input_data.shape[0], 1))
     
-    def _n_beats_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """N-BEATS forward pass"""
+    @staticmethod
+    def _as_batch(input_data: np.ndarray) -> np.ndarray:
+        """(batch, seq) / (batch, seq, features) girdiyi float32 (batch, seq, features) yap"""
+        x = np.asarray(input_data, dtype=np.float32)
+        if x.ndim == 1:
+            x = x[None]
+        if x.ndim == 2:
+            x = x[..., None]
+        return x
+    
+    def _dropout(self, x: np.ndarray, rate: float) -> np.ndarray:
+        """Inverted dropout; rate <= 0 ise girdiyi aynen döndür"""
+        if rate <= 0:
+            return x
+        keep = self._rng.random(x.shape, dtype=np.float32) >= rate
+        return x * keep * np.float32(1.0 / (1.0 - rate))
+    
+    def _n_beats_forward(self, model: Dict[str, Any], input_data: np.ndarray,
+                         dropout_rate: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """N-BEATS forward pass: hedef seri (ilk özellik) lookback penceresine oturtulur"""
         try:
-            x = input_data.copy()
+            config = model['config']
+            x = self._as_batch(input_data)[..., 0]
+            
+            # Pencereyi lookback_window'a kırp / soldan ilk değerle doldur
+            lookback = config.lookback_window
+            if x.shape[1] > lookback:
+                x = x[:, -lookback:]
+            elif x.shape[1] < lookback:
+                x = np.pad(x, ((0, 0), (lookback - x.shape[1], 0)), mode='edge')
+            
             backcast = np.zeros_like(x)
-            forecast = np.zeros((x.shape[0], model['config'].forecast_horizon))
+            forecast = np.zeros((x.shape[0], config.forecast_horizon), dtype=np.float32)
             
             # Her stack için
             for stack in model['stacks']:
-                stack_backcast = np.zeros_like(x)
-                stack_forecast = np.zeros((x.shape[0], model['config'].forecast_horizon))
-                
                 # Her blok için
                 for block in stack['blocks']:
-                    # Basit forward pass (gerçek implementasyonda daha karmaşık)
-                    block_input = x
+                    block_input = np.tanh(x @ block['input_weights'] + block['input_bias'])
                     
                     # Katmanlar
                     for layer in block['layers']:
-                        block_input = np.tanh(block_input @ layer['weights'] + layer['bias'])
+                        block_input = self._dropout(np.tanh(block_input @ layer['weights'] + layer['bias']), dropout_rate)
                     
                     # Backcast ve forecast
                     block_backcast = block_input @ block['backcast_weights']
-                    block_forecast = block_input @ block['forecast_weights']
                     
                     # Residual connection
                     x = x - block_backcast
-                    stack_backcast += block_backcast
-                    stack_forecast += block_forecast
-                
-                backcast += stack_backcast
-                forecast += stack_forecast
+                    backcast += block_backcast
+                    forecast += block_input @ block['forecast_weights']
             
             return forecast, backcast
         
@@ -445,24 +494,28 @@ class AdvancedTimeSeries:
             logger.error(f"Error in N-BEATS forward: {e}")
             return np.zeros((input_data.shape[0], model['config'].forecast_horizon)), np.zeros_like(input_data)
     
-    def _deepar_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def _deepar_forward(self, model: Dict[str, Any], input_data: np.ndarray,
+                        dropout_rate: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
         """DeepAR forward pass"""
         try:
             # Basit LSTM forward pass (gerçek implementasyonda daha karmaşık)
+            input_data = self._as_batch(input_data)
             batch_size, seq_len, features = input_data.shape
+            hidden_size = model['config'].architecture['hidden_size']
             
             # Encoder
             hidden_states = []
-            current_hidden = np.zeros((batch_size, model['config'].architecture['hidden_size']))
+            current_hidden = np.zeros((batch_size, hidden_size), dtype=np.float32)
             
             for t in range(seq_len):
                 # Basit LSTM cell
                 for layer in model['encoder']['lstm_layers']:
                     current_hidden = np.tanh(
-                        input_data[:, t, :] @ layer['input_weights'] + 
+                        input_data[:, t, :] @ layer['input_weights'][:features] + 
                         current_hidden @ layer['hidden_weights'] + 
-                        layer['bias'][:model['config'].architecture['hidden_size']]
+                        layer['bias'][:hidden_size]
                     )
+                current_hidden = self._dropout(current_hidden, dropout_rate)
                 hidden_states.append(current_hidden)
             
             # Decoder
@@ -475,15 +528,16 @@ class AdvancedTimeSeries:
                     decoder_hidden = np.tanh(
                         decoder_hidden @ layer['input_weights'] + 
                         decoder_hidden @ layer['hidden_weights'] + 
-                        layer['bias'][:model['config'].architecture['hidden_size']]
+                        layer['bias'][:hidden_size]
                     )
+                decoder_hidden = self._dropout(decoder_hidden, dropout_rate)
                 
                 # Output projection
                 output = decoder_hidden @ model['decoder']['output_projection']['weights'] + model['decoder']['output_projection']['bias']
                 decoder_outputs.append(output)
             
-            forecast = np.array(decoder_outputs).transpose(1, 0, 2).squeeze(-1)
-            backcast = np.array(hidden_states).transpose(1, 0, 2).squeeze(-1)
+            forecast = np.concatenate(decoder_outputs, axis=1)
+            backcast = np.stack(hidden_states, axis=1)
             
             return forecast, backcast
         
@@ -491,122 +545,134 @@ class AdvancedTimeSeries:
             logger.error(f"Error in DeepAR forward: {e}")
             return np.zeros((input_data.shape[0], model['config'].forecast_horizon)), np.zeros_like(input_data)
     
-    def _wavenet_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """WaveNet forward pass"""
+    def _wavenet_forward(self, model: Dict[str, Any], input_data: np.ndarray,
+                         dropout_rate: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """WaveNet forward pass: gated causal dilated conv yığını, tahmin son adımın skip toplamından"""
         try:
-            # Input projection
-            x = input_data @ model['input_projection']['weights'] + model['input_projection']['bias']
+            # Input projection: (batch, seq, 1) -> (batch, seq, residual_channels)
+            x = self._as_batch(input_data)[..., :1]
+            x = x @ model['input_projection']['weights'] + model['input_projection']['bias']
             
-            # Dilated convolutions
-            residual_connections = []
-            skip_connections = []
+            num_filters = model['config'].architecture['num_filters']
+            residual = model['residual_projection']
+            skip = model['skip_projection']
+            skip_sum = np.zeros((x.shape[0], skip['weights'].shape[1]), dtype=np.float32)
             
             for layer in model['dilated_layers']:
-                # Dilated convolution
-                conv_output = self._dilated_conv1d(x, layer['conv_weights'], layer['dilation_rate'])
-                gate_output = self._dilated_conv1d(x, layer['gate_weights'], layer['dilation_rate'])
+                # Filtre ve kapı tek im2col çarpımında
+                weights = np.concatenate([layer['conv_weights'], layer['gate_weights']], axis=-1)
+                bias = np.concatenate([layer['conv_bias'], layer['gate_bias']])
+                conv_gate = self._dilated_conv1d(x, weights, layer['dilation_rate']) + bias
                 
                 # Gated activation
-                layer_output = np.tanh(conv_output) * self._sigmoid(gate_output)
+                layer_output = np.tanh(conv_gate[..., :num_filters]) * self._sigmoid(conv_gate[..., num_filters:])
+                layer_output = self._dropout(layer_output, dropout_rate)
                 
                 # Residual connection
-                residual = layer_output @ model['residual_projection']['weights'] + model['residual_projection']['bias']
-                x = x + residual
-                residual_connections.append(residual)
+                x = x + (layer_output @ residual['weights'] + residual['bias'])
                 
-                # Skip connection
-                skip = layer_output @ model['skip_projection']['weights'] + model['skip_projection']['bias']
-                skip_connections.append(skip)
-            
-            # Combine skip connections
-            skip_sum = np.sum(skip_connections, axis=0)
+                # Skip connection: tahmin yalnızca son zaman adımını kullanır
+                skip_sum += layer_output[:, -1] @ skip['weights'] + skip['bias']
             
             # Output projection
-            forecast = skip_sum @ model['output_projection']['weights'] + model['output_projection']['bias']
+            forecast = np.maximum(skip_sum, 0) @ model['output_projection']['weights'] + model['output_projection']['bias']
             
             return forecast, x
         
         except Exception as e:
             logger.error(f"Error in WaveNet forward: {e}")
-            return np.zeros((input_data.shape[0], 1)), np.zeros_like(input_data)
+            return np.zeros((input_data.shape[0], model['config'].forecast_horizon)), np.zeros_like(input_data)
     
-    def _temporal_fusion_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    def _temporal_fusion_forward(self, model: Dict[str, Any], input_data: np.ndarray,
+                                 dropout_rate: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
         """Temporal Fusion Transformer forward pass"""
         try:
-            # Basit transformer forward pass
-            x = input_data.copy()
+            # Input projection + öğrenilmiş pozisyon tablosu
+            positional = model['encoder']['positional_encoding']
+            x = self._as_batch(input_data)[:, -positional.shape[0]:, :1]
+            x = x @ model['input_projection']['weights'] + model['input_projection']['bias']
+            x += positional[:x.shape[1]]
             
             # Encoder
             for layer in model['encoder']['layers']:
                 # Self-attention (basit)
-                attention_output = self._simple_attention(x, layer['self_attention'])
-                x = x + attention_output
+                x = x + self._dropout(self._simple_attention(x, layer['self_attention']), dropout_rate)
                 
                 # Feed forward
                 ff_output = np.tanh(x @ layer['feed_forward']['w1']) @ layer['feed_forward']['w2']
-                x = x + ff_output
+                x = x + self._dropout(ff_output, dropout_rate)
             
             # Decoder
-            decoder_output = x.copy()
+            decoder_output = x
             for layer in model['decoder']['layers']:
                 # Self-attention
                 self_attn_output = self._simple_attention(decoder_output, layer['self_attention'])
-                decoder_output = decoder_output + self_attn_output
+                decoder_output = decoder_output + self._dropout(self_attn_output, dropout_rate)
                 
-                # Cross-attention
-                cross_attn_output = self._simple_attention(decoder_output, layer['cross_attention'])
-                decoder_output = decoder_output + cross_attn_output
+                # Cross-attention: anahtar/değerler encoder çıktısından
+                cross_attn_output = self._simple_attention(decoder_output, layer['cross_attention'], memory=x)
+                decoder_output = decoder_output + self._dropout(cross_attn_output, dropout_rate)
                 
                 # Feed forward
                 ff_output = np.tanh(decoder_output @ layer['feed_forward']['w1']) @ layer['feed_forward']['w2']
-                decoder_output = decoder_output + ff_output
+                decoder_output = decoder_output + self._dropout(ff_output, dropout_rate)
             
-            # Output projection
-            forecast = decoder_output @ model['output_projection']['weights'] + model['output_projection']['bias']
+            # Output projection: son adımdan çok adımlı tahmin
+            forecast = decoder_output[:, -1] @ model['output_projection']['weights'] + model['output_projection']['bias']
             
             return forecast, x
         
         except Exception as e:
             logger.error(f"Error in Temporal Fusion forward: {e}")
-            return np.zeros((input_data.shape[0], 1)), np.zeros_like(input_data)
+            return np.zeros((input_data.shape[0], model['config'].forecast_horizon)), np.zeros_like(input_data)
     
     def _dilated_conv1d(self, x: np.ndarray, weights: np.ndarray, dilation_rate: int) -> np.ndarray:
-        """Dilated 1D convolution"""
+        """
+        Causal dilated 1D convolution (im2col)
+        
+        Args:
+            x: (batch, seq, in_channels)
+            weights: (filter_size, in_channels, out_channels); son tap güncel adıma denk gelir
+            dilation_rate: Tap'ler arası adım
+            
+        Returns:
+            np.ndarray: (batch, seq, out_channels)
+        """
         try:
-            # Basit dilated convolution implementasyonu
             batch_size, seq_len, channels = x.shape
             filter_size = weights.shape[0]
             
-            output = np.zeros((batch_size, seq_len, channels))
+            # Dizinin başından önceye düşen tap'ler yalnızca sıfır dolguyu görür; atla
+            first_tap = max(0, filter_size - 1 - (seq_len - 1) // dilation_rate)
+            taps = filter_size - first_tap
+            pad = (taps - 1) * dilation_rate
             
-            for i in range(seq_len):
-                start_idx = i - (filter_size - 1) * dilation_rate
-                if start_idx >= 0:
-                    end_idx = start_idx + filter_size * dilation_rate
-                    if end_idx <= seq_len:
-                        receptive_field = x[:, start_idx:end_idx:dilation_rate, :]
-                        output[:, i, :] = np.sum(receptive_field * weights, axis=(1, 2))
+            # Kopyasız pencereler: (batch, seq, channels, taps) -> im2col matrisi (batch, seq, taps * channels)
+            padded = np.pad(x, ((0, 0), (pad, 0), (0, 0)))
+            windows = sliding_window_view(padded, pad + 1, axis=1)[..., ::dilation_rate]
+            cols = windows.transpose(0, 1, 3, 2).reshape(batch_size, seq_len, taps * channels)
             
-            return output
+            return cols @ weights[first_tap:].reshape(taps * channels, -1)
         
         except Exception as e:
             logger.error(f"Error in dilated convolution: {e}")
-            return np.zeros_like(x)
+            return np.zeros(x.shape[:2] + weights.shape[-1:], dtype=x.dtype)
     
     def _sigmoid(self, x: np.ndarray) -> np.ndarray:
         """Sigmoid aktivasyon fonksiyonu"""
         return 1 / (1 + np.exp(-np.clip(x, -500, 500)))
     
-    def _simple_attention(self, x: np.ndarray, attention_weights: Dict[str, np.ndarray]) -> np.ndarray:
-        """Basit attention mekanizması"""
+    def _simple_attention(self, x: np.ndarray, attention_weights: Dict[str, np.ndarray],
+                          memory: Optional[np.ndarray] = None) -> np.ndarray:
+        """Basit scaled dot-product attention; memory verilirse cross-attention"""
         try:
-            # Basit attention (gerçek implementasyonda daha karmaşık)
+            memory = x if memory is None else memory
             query = x @ attention_weights['query_weights']
-            key = x @ attention_weights['key_weights']
-            value = x @ attention_weights['value_weights']
+            key = memory @ attention_weights['key_weights']
+            value = memory @ attention_weights['value_weights']
             
             # Attention scores
-            scores = query @ key.transpose(0, 2, 1)
+            scores = query @ np.swapaxes(key, -1, -2) / float(np.sqrt(query.shape[-1]))
             attention_weights_norm = self._softmax(scores, axis=-1)
             
             # Apply attention
@@ -628,22 +694,35 @@ class AdvancedTimeSeries:
             return np.ones_like(x) / x.shape[axis]
     
     def calculate_uncertainty(self, predictions: np.ndarray, confidence_level: float = 0.95) -> Dict[str, np.ndarray]:
-        """Tahmin belirsizliğini hesapla"""
+        """
+        Tahmin belirsizliğini hesapla
+        
+        Args:
+            predictions: (n_samples, ...) örnek tahminleri; ilk eksen üzerinden tek seferde indirgenir
+            confidence_level: Güven düzeyi
+            
+        Returns:
+            Dict[str, np.ndarray]: Ortalama, std, normal ve ampirik aralıklar
+        """
         try:
-            # Basit belirsizlik hesaplama (gerçek implementasyonda daha gelişmiş)
+            predictions = np.asarray(predictions)
             mean_pred = np.mean(predictions, axis=0)
             std_pred = np.std(predictions, axis=0)
             
             # Confidence intervals
-            z_score = 1.96  # 95% confidence level için
+            z_score = float(stats.norm.ppf(0.5 + confidence_level / 2))
             lower_bound = mean_pred - z_score * std_pred
             upper_bound = mean_pred + z_score * std_pred
+            alpha = (1 - confidence_level) / 2
+            quantile_lower, quantile_upper = np.quantile(predictions, [alpha, 1 - alpha], axis=0)
             
             uncertainty_metrics = {
                 'mean': mean_pred,
                 'std': std_pred,
                 'lower_bound': lower_bound,
                 'upper_bound': upper_bound,
+                'quantile_lower': quantile_lower,
+                'quantile_upper': quantile_upper,
                 'confidence_interval': upper_bound - lower_bound,
                 'coefficient_of_variation': std_pred / np.abs(mean_pred + 1e-8)
             }
@@ -654,6 +733,84 @@ class AdvancedTimeSeries:
             logger.error(f"Error calculating uncertainty: {e}")
             return {}
     
+    def monte_carlo_uncertainty(self, model: Dict[str, Any], input_data: np.ndarray,
+                                model_type: str = "n_beats", n_samples: Optional[int] = None,
+                                dropout_rate: Optional[float] = None,
+                                confidence_level: float = 0.95) -> Dict[str, np.ndarray]:
+        """
+        MC dropout belirsizliği: örnekler batch eksenine açılıp tek forward pass ile hesaplanır
+        
+        Args:
+            model: create_* çıktısı
+            input_data: (batch, seq) ya da (batch, seq, features)
+            model_type: forward_pass model tipi
+            n_samples: MC örnek sayısı (varsayılan self.mc_samples)
+            dropout_rate: Dropout oranı (varsayılan mimarideki dropout_rate ya da 0.1)
+            confidence_level: Güven düzeyi
+            
+        Returns:
+            Dict[str, np.ndarray]: calculate_uncertainty çıktısı + 'samples' (n_samples, batch, horizon)
+        """
+        try:
+            x = self._as_batch(input_data)
+            n_samples = n_samples or self.mc_samples
+            if dropout_rate is None:
+                dropout_rate = model['config'].architecture.get('dropout_rate', 0.1)
+            
+            # Bellek sınırı için örnek eksenini parçala; her parça tek batch'li forward
+            per_chunk = max(1, self.max_batch_rows // len(x))
+            forecasts = []
+            for start in range(0, n_samples, per_chunk):
+                count = min(per_chunk, n_samples - start)
+                tiled = np.broadcast_to(x, (count,) + x.shape).reshape((-1,) + x.shape[1:])
+                forecast, _ = self.forward_pass(model, tiled, model_type, dropout_rate=dropout_rate)
+                forecasts.append(forecast.reshape(count, len(x), -1))
+            
+            samples = np.concatenate(forecasts, axis=0)
+            uncertainty = self.calculate_uncertainty(samples, confidence_level)
+            uncertainty['samples'] = samples
+            return uncertainty
+        
+        except Exception as e:
+            logger.error(f"Error in Monte Carlo uncertainty: {e}")
+            return {}
+    
+    def forecast_universe(self, model: Dict[str, Any], series: Dict[str, Union[pd.Series, np.ndarray]],
+                          model_type: str = "n_beats") -> Dict[str, np.ndarray]:
+        """
+        Birden çok sembolü tek batch'li forward pass ile tahmin et
+        
+        Args:
+            model: create_* çıktısı
+            series: Sembol -> fiyat serisi
+            model_type: forward_pass model tipi
+            
+        Returns:
+            Dict[str, np.ndarray]: Sembol -> (forecast_horizon,) fiyat tahmini
+        """
+        try:
+            lookback = model['config'].lookback_window
+            symbols = [s for s, values in series.items() if len(values) >= lookback]
+            skipped = len(series) - len(symbols)
+            if skipped:
+                logger.warning(f"⚠️ {skipped} sembol {lookback} bardan kısa, atlandı")
+            if not symbols:
+                return {}
+            
+            # (n_symbols, lookback) pencere; her sembol kendi ölçeğinde normalize
+            windows = np.stack([np.asarray(series[s], dtype=np.float32)[-lookback:] for s in symbols])
+            mean = windows.mean(axis=1, keepdims=True)
+            std = windows.std(axis=1, keepdims=True) + np.float32(1e-8)
+            
+            forecast, _ = self.forward_pass(model, (windows - mean) / std, model_type)
+            forecast = forecast * std + mean
+            
+            return dict(zip(symbols, forecast))
+        
+        except Exception as e:
+            logger.error(f"Error forecasting universe: {e}")
+            return {}
+    
     def train_time_series_model(self, model: Dict[str, Any], X: np.ndarray, y: np.ndarray,
                                model_type: str = "n_beats", epochs: int = 10) -> Dict[str, Any]:
         """Zaman serisi model eğit"""
@@ -824,15 +981,24 @@ def test_advanced_time_series():
     deepar_forecast, deepar_backcast = time_series.forward_pass(deepar_model, test_input, "deepar")
     print(f"   ✅ DeepAR forward pass: forecast shape {deepar_forecast.shape}, backcast shape {deepar_backcast.shape}")
     
+    # WaveNet forward pass (im2col dilated convolution)
+    wavenet_forecast, wavenet_residual = time_series.forward_pass(wavenet_model, test_input, "wavenet")
+    print(f"   ✅ WaveNet forward pass: forecast shape {wavenet_forecast.shape} ({wavenet_forecast.dtype}), residual shape {wavenet_residual.shape}")
+    
+    # Çok sembollü tek batch tahmin
+    print("\n📊 Toplu Sembol Tahmini Testi:")
+    universe = {f"SYM{i}.IS": 100 + np.cumsum(np.random.randn(60)) for i in range(200)}
+    universe_forecasts = time_series.forecast_universe(nbeats_model, universe, "n_beats")
+    print(f"   ✅ {len(universe_forecasts)} sembol tek forward pass ile tahmin edildi, ufuk: {len(next(iter(universe_forecasts.values())))}")
+    
     # Belirsizlik hesaplama testi
-    print("\n📊 Belirsizlik Hesaplama Testi:")
+    print("\n📊 Belirsizlik Hesaplama Testi (MC Dropout):")
     
-    # Simüle edilmiş tahminler
-    multiple_predictions = np.random.randn(10, 7)  # 10 farklı tahmin, 7 gün
-    uncertainty_metrics = time_series.calculate_uncertainty(multiple_predictions)
+    # 50 MC örneği tek batch'li forward pass ile
+    uncertainty_metrics = time_series.monte_carlo_uncertainty(nbeats_model, test_input, "n_beats", n_samples=50)
     
     if uncertainty_metrics:
-        print(f"   ✅ Belirsizlik hesaplandı")
+        print(f"   ✅ Belirsizlik hesaplandı: örnekler {uncertainty_metrics['samples'].shape}")
         print(f"      📊 Ortalama tahmin: {np.mean(uncertainty_metrics['mean']):.3f}")
         print(f"      📊 Ortalama standart sapma: {np.mean(uncertainty_metrics['std']):.3f}")
         print(f"      📊 Confidence interval genişliği: {np.mean(uncertainty_metrics['confidence_interval']):.3f}")
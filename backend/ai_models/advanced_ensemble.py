@@ -15,7 +15,11 @@ import lightgbm as lgb
 import catboost as cb
 from catboost import CatBoostClassifier
 import joblib
+from joblib import Parallel, delayed
+from sklearn.base import clone
+import hashlib
 import os
+import shutil
 from typing import Dict, List, Tuple, Any, Optional
 import logging
 import warnings
@@ -24,15 +28,143 @@ warnings.filterwarnings('ignore')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _predict_positive(model: Any, X) -> np.ndarray:
+    """Pozitif sınıf olasılığı (predict_proba yoksa predict)"""
+    if hasattr(model, 'predict_proba'):
+        return model.predict_proba(X)[:, 1]
+    return np.asarray(model.predict(X), dtype=float)
+
+
+def _pin_threads(model: Any) -> Dict[str, Any]:
+    """
+    Modeli tek thread'e sabitle (fold havuzu zaten çekirdek başına bir iş çalıştırır)
+
+    Returns:
+        Dict[str, Any]: Orijinal thread parametreleri
+    """
+    if isinstance(model, CatBoostClassifier):
+        original = {'thread_count': model.get_params().get('thread_count', -1)}
+        model.set_params(thread_count=1)
+        return original
+    params = model.get_params(deep=False) if hasattr(model, 'get_params') else {}
+    if 'n_jobs' in params:
+        model.set_params(n_jobs=1)
+        return {'n_jobs': params['n_jobs']}
+    return {}
+
+
+def _fit_fold_task(name: str, model: Any, X: pd.DataFrame, y: pd.Series,
+                   train_idx: np.ndarray, val_idx: Optional[np.ndarray],
+                   single_thread: bool = False) -> Tuple:
+    """
+    Tek (model, fold) eğitimi; val_idx None ise tüm veriyle son model eğitilir
+
+    Args:
+        single_thread: Paralel havuzda booster thread'lerini 1'e sabitle
+
+    Returns:
+        Tuple: (name, val_idx, tahminler | fitted model, hata)
+    """
+    try:
+        fitted = clone(model)
+        original_threads = _pin_threads(fitted) if single_thread else {}
+        fitted.fit(X.iloc[train_idx], y.iloc[train_idx])
+        if val_idx is None:
+            if original_threads:
+                try:
+                    # Kaydedilen son model tahminde yapılandırılmış thread sayısını kullansın
+                    fitted.set_params(**original_threads)
+                except Exception:
+                    pass  # CatBoost eğitilmiş modelde izin vermez; predict zaten kendi thread_count'unu alır
+            return name, None, fitted, None
+        return name, val_idx, _predict_positive(fitted, X.iloc[val_idx]), None
+    except Exception as e:
+        return name, val_idx, None, str(e)
+
+
+class OOFPredictionCache:
+    """(veri parmak izi, model konfigürasyonu) anahtarlı kalıcı OOF tahmin + son model deposu"""
+    
+    def __init__(self, cache_dir: str = 'models/oof_cache', max_datasets: int = 8):
+        self.cache_dir = cache_dir
+        self.max_datasets = max_datasets
+    
+    @staticmethod
+    def dataset_fingerprint(X: pd.DataFrame, y: pd.Series, n_splits: int) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(list(X.columns)).encode())
+        digest.update(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+        digest.update(np.ascontiguousarray(np.asarray(y, dtype=np.float64)).tobytes())
+        digest.update(str(n_splits).encode())
+        return digest.hexdigest()
+    
+    @staticmethod
+    def model_fingerprint(name: str, model: Any) -> str:
+        params = model.get_params(deep=False) if hasattr(model, 'get_params') else {}
+        config = f"{name}|{type(model).__module__}.{type(model).__name__}|{sorted((k, repr(v)) for k, v in params.items())}"
+        return hashlib.blake2b(config.encode(), digest_size=12).hexdigest()
+    
+    def _path(self, dataset_key: str, model_key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, dataset_key, f"{model_key}.{suffix}")
+    
+    def load(self, dataset_key: str, model_key: str) -> Optional[Dict[str, Any]]:
+        """OOF tahminleri, fold skorları ve tüm veriyle eğitilmiş model"""
+        oof_path = self._path(dataset_key, model_key, 'npz')
+        model_path = self._path(dataset_key, model_key, 'pkl')
+        if not (os.path.exists(oof_path) and os.path.exists(model_path)):
+            return None
+        try:
+            with np.load(oof_path) as stored:
+                entry = {'oof': stored['oof'], 'fold_scores': stored['fold_scores'].tolist()}
+            entry['model'] = joblib.load(model_path)
+            # Kullanılan veri seti budamada en yeni sayılsın
+            os.utime(os.path.join(self.cache_dir, dataset_key))
+            return entry
+        except Exception as e:
+            logger.warning(f"⚠️ OOF cache okunamadı ({model_key}): {e}")
+            return None
+    
+    def save(self, dataset_key: str, model_key: str, oof: np.ndarray,
+             fold_scores: List[float], model: Any):
+        try:
+            os.makedirs(os.path.join(self.cache_dir, dataset_key), exist_ok=True)
+            np.savez_compressed(self._path(dataset_key, model_key, 'npz'),
+                                oof=oof.astype(np.float32), fold_scores=np.asarray(fold_scores))
+            joblib.dump(model, self._path(dataset_key, model_key, 'pkl'))
+            self.prune(keep=dataset_key)
+        except Exception as e:
+            logger.warning(f"⚠️ OOF cache yazılamadı ({model_key}): {e}")
+    
+    def prune(self, keep: Optional[str] = None):
+        """En son kullanılan max_datasets veri seti dışındaki parmak izi klasörlerini sil"""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_dir() and e.name != keep]
+        except FileNotFoundError:
+            return
+        limit = self.max_datasets - (1 if keep else 0)
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for stale in entries[max(limit, 0):]:
+            shutil.rmtree(stale.path, ignore_errors=True)
+            logger.info(f"🗑️ OOF cache budandı: {stale.name}")
+
+
 class AdvancedEnsemble:
-    def __init__(self, n_splits: int = 5, random_state: int = 42):
+    def __init__(self, n_splits: int = 5, random_state: int = 42, n_jobs: Optional[int] = None,
+                 cache_dir: str = 'models/oof_cache'):
         self.n_splits = n_splits
         self.random_state = random_state
+        self.n_jobs = n_jobs or os.cpu_count() or 1
         self.base_models = {}
         self.meta_model = None
         self.stacking_features = None
         self.cv_scores = {}
         self.feature_importance = {}
+        self.fitted_models = {}
+        self.oof_predictions = {}
+        self.oof_index = None
+        self.blending_weights = {}
+        self.oof_cache = OOFPredictionCache(cache_dir)
         
     def create_base_models(self) -> Dict[str, Any]:
         """Gelişmiş base modeller oluştur"""
@@ -129,41 +261,86 @@ class AdvancedEnsemble:
         logger.info("✅ Meta-model created")
         return self.meta_model
     
-    def cross_validate_base_models(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, List[float]]:
-        """Base modelleri cross-validate et"""
-        logger.info("🔄 Cross-validating base models...")
+    def compute_oof_predictions(self, X: pd.DataFrame, y: pd.Series,
+                                model_names: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Base modellerin out-of-fold tahminlerini hesapla (önbellekli, paralel)
         
-        tscv = TimeSeriesSplit(n_splits=self.n_splits)
-        cv_scores = {name: [] for name in self.base_models.keys()}
+        Önbellekte olan (veri, konfigürasyon) çiftleri yeniden eğitilmez; eksik modellerin
+        tüm fold'ları ve tam veri eğitimleri tek bir paralel havuzda çalışır.
         
-        for fold, (train_idx, val_idx) in enumerate(tscv.split(X)):
-            logger.info(f"   Fold {fold + 1}/{self.n_splits}")
-            
-            X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-            y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
+        Args:
+            X: Özellikler
+            y: Hedef
+            model_names: Sadece bu modeller (None: tümü)
+            
+        Returns:
+            Dict[str, np.ndarray]: Model -> OOF tahminleri (fold dışı satırlar NaN)
+        """
+        names = model_names or list(self.base_models.keys())
+        dataset_key = self.oof_cache.dataset_fingerprint(X, y, self.n_splits)
+        splits = list(TimeSeriesSplit(n_splits=self.n_splits).split(X))
+        self.oof_index = X.index[np.concatenate([val_idx for _, val_idx in splits])]
+        
+        pending = []
+        for name in names:
+            model_key = self.oof_cache.model_fingerprint(name, self.base_models[name])
+            cached = self.oof_cache.load(dataset_key, model_key)
+            if cached is not None:
+                self.oof_predictions[name] = cached['oof']
+                self.cv_scores[name] = float(np.mean(cached['fold_scores']))
+                self.fitted_models[name] = cached['model']
+                logger.info(f"   ♻️ {name}: OOF cache kullanıldı")
+            else:
+                pending.append((name, model_key))
+        
+        if pending:
+            logger.info(f"   🔄 {len(pending)} model x {self.n_splits} fold eğitiliyor ({self.n_jobs} iş)")
+            tasks = [(name, self.base_models[name], train_idx, val_idx)
+                     for name, _ in pending for train_idx, val_idx in splits]
+            tasks += [(name, self.base_models[name], np.arange(len(X)), None) for name, _ in pending]
+            n_workers = min(self.n_jobs, len(tasks))
+            results = Parallel(n_jobs=n_workers)(
+                delayed(_fit_fold_task)(name, model, X, y, train_idx, val_idx, n_workers > 1)
+                for name, model, train_idx, val_idx in tasks
+            )
             
-            for name, model in self.base_models.items():
-                try:
-                    # Fit model
-                    if hasattr(model, 'fit'):
-                        model.fit(X_train, y_train)
-                    
-                    # Predict probabilities
-                    if hasattr(model, 'predict_proba'):
-                        y_pred_proba = model.predict_proba(X_val)[:, 1]
-                    else:
-                        y_pred_proba = model.predict(X_val)
-                    
-                    # Calculate score
-                    score = roc_auc_score(y_val, y_pred_proba)
-                    cv_scores[name].append(score)
-                    
-                except Exception as e:
-                    logger.warning(f"   ⚠️ {name} failed: {e}")
-                    cv_scores[name].append(0.0)
-        
-        # Calculate mean scores
-        self.cv_scores = {name: np.mean(scores) for name, scores in cv_scores.items()}
+            outcome = {name: {'oof': np.full(len(X), np.nan), 'fold_scores': [], 'model': None, 'failed': False}
+                       for name, _ in pending}
+            for name, val_idx, value, error in results:
+                state = outcome[name]
+                if error is not None:
+                    logger.warning(f"   ⚠️ {name} failed: {error}")
+                    state['failed'] = True
+                    if val_idx is not None:
+                        state['oof'][val_idx] = 0.5
+                        state['fold_scores'].append(0.0)
+                elif val_idx is None:
+                    state['model'] = value
+                else:
+                    state['oof'][val_idx] = value
+                    try:
+                        state['fold_scores'].append(roc_auc_score(y.iloc[val_idx], value))
+                    except ValueError:
+                        state['fold_scores'].append(0.5)
+            
+            for name, model_key in pending:
+                state = outcome[name]
+                self.oof_predictions[name] = state['oof']
+                self.cv_scores[name] = float(np.mean(state['fold_scores']))
+                self.fitted_models[name] = state['model']
+                if not state['failed']:
+                    self.oof_cache.save(dataset_key, model_key, state['oof'],
+                                        state['fold_scores'], state['model'])
+        
+        return {name: self.oof_predictions[name] for name in names}
+    
+    def cross_validate_base_models(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, List[float]]:
+        """Base modelleri cross-validate et (OOF tahminleriyle ortak, önbellekli)"""
+        logger.info("🔄 Cross-validating base models...")
+        
+        self.compute_oof_predictions(X, y)
+        self.cv_scores = {name: self.cv_scores[name] for name in self.base_models}
         
         logger.info("✅ Cross-validation completed")
         logger.info("📊 Base model CV scores:")
@@ -173,64 +350,58 @@ class AdvancedEnsemble:
         return self.cv_scores
     
     def create_stacking_features(self, X: pd.DataFrame, y: pd.Series) -> pd.DataFrame:
-        """Stacking için meta-features oluştur"""
+        """Stacking için meta-features oluştur (fold dışı satırlar, X indeksine hizalı)"""
         logger.info("🔗 Creating stacking meta-features...")
         
-        tscv = TimeSeriesSplit(n_splits=self.n_splits)
-        meta_features = []
+        oof = self.compute_oof_predictions(X, y)
+        positions = X.index.get_indexer(self.oof_index)
+        self.stacking_features = np.column_stack([oof[name][positions] for name in self.base_models])
         
-        for fold, (train_idx, val_idx) in enumerate(tscv.split(X)):
-            logger.info(f"   Fold {fold + 1}/{self.n_splits}")
-            
-            X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-            y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-            
-            fold_predictions = []
-            
-            for name, model in self.base_models.items():
-                try:
-                    # Clone model for this fold
-                    if hasattr(model, 'clone'):
-                        model_clone = model.clone()
-                    else:
-                        model_clone = model
-                    
-                    # Fit on training data
-                    if hasattr(model_clone, 'fit'):
-                        model_clone.fit(X_train, y_train)
-                    
-                    # Predict on validation data
-                    if hasattr(model_clone, 'predict_proba'):
-                        y_pred_proba = model_clone.predict_proba(X_val)[:, 1]
-                    else:
-                        y_pred_proba = model_clone.predict(X_val)
-                    
-                    fold_predictions.append(y_pred_proba)
-                    
-                except Exception as e:
-                    logger.warning(f"   ⚠️ {name} failed: {e}")
-                    # Use random predictions as fallback
-                    fold_predictions.append(np.random.random(len(X_val)))
-            
-            # Create meta-features for this fold
-            meta_features_fold = np.column_stack(fold_predictions)
-            meta_features.append(meta_features_fold)
-        
-        # Combine all folds
-        self.stacking_features = np.vstack(meta_features)
-        
-        # Create DataFrame
         meta_columns = [f'meta_{name}' for name in self.base_models.keys()]
-        meta_df = pd.DataFrame(self.stacking_features, columns=meta_columns)
+        meta_df = pd.DataFrame(self.stacking_features, columns=meta_columns, index=self.oof_index)
         
         logger.info(f"✅ Stacking features created: {meta_df.shape}")
         return meta_df
     
+    def add_base_model(self, name: str, model: Any, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
+        """
+        Yeni base model ekle; sadece bu model eğitilir, meta-model ve blending yeniden kurulur
+        
+        Args:
+            name: Model adı
+            model: sklearn uyumlu model
+            X: Özellikler
+            y: Hedef
+            
+        Returns:
+            Dict: Modelin CV skoru ve güncel blending ağırlıkları
+        """
+        self.base_models[name] = model
+        self.compute_oof_predictions(X, y, [name])
+        if self.meta_model is None:
+            self.create_meta_model()
+        meta_features = self.create_stacking_features(X, y)
+        self.train_meta_model(meta_features, y)
+        self.blending_weights = self.create_blending_ensemble(X, y)
+        return {'cv_score': self.cv_scores[name], 'blending_weights': self.blending_weights}
+    
+    def remove_base_model(self, name: str, X: pd.DataFrame, y: pd.Series):
+        """Base modeli çıkar; kalan modeller yeniden eğitilmeden meta-model güncellenir"""
+        for store in (self.base_models, self.fitted_models, self.oof_predictions, self.cv_scores):
+            store.pop(name, None)
+        if self.meta_model is not None and self.base_models:
+            self.train_meta_model(self.create_stacking_features(X, y), y)
+            self.blending_weights = self.create_blending_ensemble(X, y)
+    
     def train_meta_model(self, meta_features: pd.DataFrame, y: pd.Series) -> Any:
         """Meta-model'i eğit"""
         logger.info("🎯 Training meta-model...")
         
         try:
+            # OOF satırlarına hizala (TimeSeriesSplit ilk eğitim bloğunu kapsamaz)
+            if len(meta_features) != len(y):
+                y = y.loc[meta_features.index]
+            
             # Fit meta-model
             self.meta_model.fit(meta_features, y)
             
@@ -274,29 +445,41 @@ class AdvancedEnsemble:
         
         return blending_weights
     
-    def predict_stacking(self, X: pd.DataFrame) -> np.ndarray:
+    def unfitted_models(self) -> List[str]:
+        """Tam veri eğitimi olmayan (başarısız / eğitilmemiş) base modeller"""
+        return [name for name in self.base_models if self.fitted_models.get(name) is None]
+    
+    def base_prediction_matrix(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Tüm base modellerin tahminleri (n_samples x n_models), tek geçişte
+        
+        Eğitimi başarısız modeller eğitilmemiş şablonla tahmin yapmaz; kolonları başarısız fold
+        OOF'larıyla aynı şekilde nötr 0.5 olur.
+        """
+        predictions = np.empty((len(X), len(self.base_models)))
+        
+        for j, name in enumerate(self.base_models):
+            model = self.fitted_models.get(name)
+            if model is None:
+                logger.warning(f"⚠️ {name}: fitted model yok, nötr 0.5 kullanılıyor")
+                predictions[:, j] = 0.5
+                continue
+            try:
+                predictions[:, j] = _predict_positive(model, X)
+            except Exception as e:
+                logger.warning(f"⚠️ {name} prediction failed: {e}")
+                # Use random predictions as fallback
+                predictions[:, j] = np.random.random(len(X))
+        
+        return predictions
+    
+    def predict_stacking(self, X: pd.DataFrame, base_predictions: Optional[np.ndarray] = None) -> np.ndarray:
         """Stacking ensemble ile tahmin"""
         logger.info("🔮 Making stacking ensemble prediction...")
         
         try:
             # Get base model predictions
-            base_predictions = []
-            
-            for name, model in self.base_models.items():
-                try:
-                    if hasattr(model, 'predict_proba'):
-                        pred = model.predict_proba(X)[:, 1]
-                    else:
-                        pred = model.predict(X)
-                    base_predictions.append(pred)
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ {name} prediction failed: {e}")
-                    # Use random predictions as fallback
-                    base_predictions.append(np.random.random(len(X)))
-            
-            # Create meta-features
-            meta_features = np.column_stack(base_predictions)
+            meta_features = base_predictions if base_predictions is not None else self.base_prediction_matrix(X)
             meta_df = pd.DataFrame(meta_features, columns=[f'meta_{name}' for name in self.base_models.keys()])
             
             # Meta-model prediction
@@ -313,27 +496,15 @@ class AdvancedEnsemble:
             logger.error(f"❌ Stacking prediction failed: {e}")
             return np.random.random(len(X))
     
-    def predict_blending(self, X: pd.DataFrame, blending_weights: Dict[str, float]) -> np.ndarray:
+    def predict_blending(self, X: pd.DataFrame, blending_weights: Dict[str, float],
+                         base_predictions: Optional[np.ndarray] = None) -> np.ndarray:
         """Blending ensemble ile tahmin"""
         logger.info("🥤 Making blending ensemble prediction...")
         
         try:
-            # Get base model predictions
-            weighted_predictions = np.zeros(len(X))
-            
-            for name, model in self.base_models.items():
-                try:
-                    if hasattr(model, 'predict_proba'):
-                        pred = model.predict_proba(X)[:, 1]
-                    else:
-                        pred = model.predict(X)
-                    
-                    weighted_predictions += blending_weights[name] * pred
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ {name} prediction failed: {e}")
-                    # Use random predictions as fallback
-                    weighted_predictions += blending_weights[name] * np.random.random(len(X))
+            predictions = base_predictions if base_predictions is not None else self.base_prediction_matrix(X)
+            weights = np.array([blending_weights.get(name, 0.0) for name in self.base_models])
+            weighted_predictions = predictions @ weights
             
             logger.info("✅ Blending prediction completed")
             return weighted_predictions
@@ -351,8 +522,8 @@ class AdvancedEnsemble:
                 prediction = self.predict_stacking(X)
                 method_name = 'Stacking Ensemble'
             elif method == 'blending':
-                # Create blending weights
-                blending_weights = self.create_blending_ensemble(X, pd.Series([0] * len(X)))
+                # Eğitimde hesaplanan ağırlıklar (yoksa CV skorlarından)
+                blending_weights = self.blending_weights or self.create_blending_ensemble(X, pd.Series([0] * len(X)))
                 prediction = self.predict_blending(X, blending_weights)
                 method_name = 'Blending Ensemble'
             else:
@@ -369,6 +540,7 @@ class AdvancedEnsemble:
                 'prediction_class': prediction_class,
                 'confidence': confidence,
                 'method': method_name,
+                'unfitted_models': self.unfitted_models(),
                 'timestamp': pd.Timestamp.now().isoformat()
             }
             
@@ -389,13 +561,42 @@ class AdvancedEnsemble:
                 'timestamp': pd.Timestamp.now().isoformat()
             }
     
+    def ensemble_predict_batch(self, features_by_symbol: Dict[str, pd.DataFrame],
+                               method: str = 'stacking') -> Dict[str, Dict[str, Any]]:
+        """
+        Birden fazla sembol için tek seferde tahmin (base modeller birleşik matriste bir kez çalışır)
+        
+        Args:
+            features_by_symbol: Sembol -> özellik DataFrame'i
+            method: 'stacking' veya 'blending'
+            
+        Returns:
+            Dict[str, Dict]: Sembol -> ensemble_predict çıktısı
+        """
+        symbols = [symbol for symbol, features in features_by_symbol.items() if len(features)]
+        if not symbols:
+            return {}
+        
+        columns = features_by_symbol[symbols[0]].columns
+        batch = pd.concat([features_by_symbol[symbol][columns] for symbol in symbols], ignore_index=True)
+        bounds = np.cumsum([0] + [len(features_by_symbol[symbol]) for symbol in symbols])
+        
+        result = self.ensemble_predict(batch, method)
+        per_symbol = {}
+        for i, symbol in enumerate(symbols):
+            start, end = bounds[i], bounds[i + 1]
+            per_symbol[symbol] = {key: value[start:end] if isinstance(value, np.ndarray) else value
+                                  for key, value in result.items()}
+        return per_symbol
+    
     def train_full_ensemble(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Any]:
         """Tüm ensemble'ı eğit"""
         logger.info("🚀 Training full advanced ensemble...")
         
         try:
-            # 1. Create base models
-            self.create_base_models()
+            # 1. Create base models (eklenmiş modeller korunur)
+            if not self.base_models:
+                self.create_base_models()
             
             # 2. Cross-validate base models
             cv_scores = self.cross_validate_base_models(X, y)
@@ -411,14 +612,12 @@ class AdvancedEnsemble:
             
             # 6. Create blending weights
             blending_weights = self.create_blending_ensemble(X, y)
+            self.blending_weights = blending_weights
             
-            # 7. Test both methods
-            stacking_result = self.ensemble_predict(X, 'stacking')
-            blending_result = self.ensemble_predict(X, 'blending')
-            
-            # Compare performance
-            stacking_score = roc_auc_score(y, stacking_result['prediction'])
-            blending_score = roc_auc_score(y, blending_result['prediction'])
+            # 7. Test both methods (base model tahminleri bir kez hesaplanır)
+            base_predictions = self.base_prediction_matrix(X)
+            stacking_score = roc_auc_score(y, self.predict_stacking(X, base_predictions))
+            blending_score = roc_auc_score(y, self.predict_blending(X, blending_weights, base_predictions))
             
             results = {
                 'cv_scores': cv_scores,
@@ -455,7 +654,9 @@ class AdvancedEnsemble:
                 'base_models': self.base_models,
                 'meta_model': self.meta_model,
                 'cv_scores': self.cv_scores,
-                'stacking_features': self.stacking_features
+                'stacking_features': self.stacking_features,
+                'fitted_models': self.fitted_models,
+                'blending_weights': self.blending_weights
             }
             
             joblib.dump(ensemble_data, filepath)
@@ -473,6 +674,8 @@ class AdvancedEnsemble:
             self.meta_model = ensemble_data['meta_model']
             self.cv_scores = ensemble_data['cv_scores']
             self.stacking_features = ensemble_data['stacking_features']
+            self.fitted_models = ensemble_data.get('fitted_models', {})
+            self.blending_weights = ensemble_data.get('blending_weights', {})
             
             logger.info(f"✅ Ensemble loaded from {filepath}")
             
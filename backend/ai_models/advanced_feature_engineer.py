@@ -23,25 +23,26 @@ class AdvancedFeatureEngineer:
     def calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """Teknik indikatörleri hesapla"""
         try:
-            # TA-Lib yerine ta kütüphanesi kullan
-            # Trend indikatörleri
-            df['sma_20'] = ta.trend.sma_indicator(df['Close'], window=20)
-            df['sma_50'] = ta.trend.sma_indicator(df['Close'], window=50)
-            df['ema_12'] = ta.trend.ema_indicator(df['Close'], window=12)
-            df['ema_26'] = ta.trend.ema_indicator(df['Close'], window=26)
-            
-            # Momentum indikatörleri
-            df['rsi'] = ta.momentum.rsi(df['Close'], window=14)
-            df['stoch'] = ta.momentum.stoch(df['High'], df['Low'], df['Close'], window=14)
-            df['williams_r'] = ta.momentum.williams_r(df['High'], df['Low'], df['Close'], window=14)
-            
-            # Volatilite indikatörleri
-            df['bb_upper'], df['bb_middle'], df['bb_lower'] = ta.volatility.bollinger_bands(df['Close'], window=20)
-            df['atr'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14)
-            
-            # Hacim indikatörleri
-            df['obv'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
-            df['vwap'] = ta.volume.volume_weighted_average_price(df['High'], df['Low'], df['Close'], df['Volume'])
+            from core.feature_dag import compute_features
+            
+            # Trend, momentum, volatilite ve hacim indikatörleri (paylaşılan feature DAG)
+            indicators = compute_features(df, {
+                'sma_20': ('sma', {'window': 20}),
+                'sma_50': ('sma', {'window': 50}),
+                'ema_12': ('ema_ta', {'window': 12}),
+                'ema_26': ('ema_ta', {'window': 26}),
+                'rsi': ('rsi_wilder', {'window': 14}),
+                'stoch': ('stoch_k', {'window': 14}),
+                'williams_r': ('williams_r', {'window': 14}),
+                'bb_upper': ('bb_upper', {'window': 20, 'ddof': 0}),
+                'bb_middle': ('bb_middle', {'window': 20}),
+                'bb_lower': ('bb_lower', {'window': 20, 'ddof': 0}),
+                'atr': ('atr_wilder', {'window': 14}),
+                'obv': 'obv',
+                'vwap': ('vwap', {'window': 14}),
+            })
+            for column in indicators.columns:
+                df[column] = indicators[column]
             
             logger.info(f"Teknik indikatörler hesaplandı: {len(df.columns)} özellik")
             return df
@@ -2,6 +2,10 @@
 """
 BIST AI Smart Trader - Hyperparameter Optimization Module
 Optuna ile tüm AI modellerinin doğruluk oranlarını maksimuma çıkarır
+
+Trial'lar paylaşılan bir Optuna storage (journal dosyası veya SQLite) üzerinden
+birden fazla worker process'te paralel koşar. Feature matrisi run başına bir kez
+float32 .npy dosyasına yazılır ve worker'lar tarafından memory-map ile okunur.
 """
 import optuna
 import numpy as np
@@ -13,18 +17,268 @@ import catboost as cb
 from catboost import CatBoostClassifier
 import joblib
 import os
-from typing import Dict, Tuple, Any
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple, Any, Optional, Callable
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _fold_slices(n_samples: int, n_splits: int = 5):
+    """TimeSeriesSplit fold'larını kopyasız slice olarak üret"""
+    tscv = TimeSeriesSplit(n_splits=n_splits)
+    for train_idx, val_idx in tscv.split(np.arange(n_samples)):
+        yield (slice(int(train_idx[0]), int(train_idx[-1]) + 1),
+               slice(int(val_idx[0]), int(val_idx[-1]) + 1))
+
+
+# Worker process'lerde model başına thread sayısı (None: kütüphane varsayılanı, tüm çekirdekler)
+_TRIAL_THREADS: Optional[int] = None
+
+
+def _init_worker(threads: int = 1):
+    """Worker process başlangıcı: n_jobs process x çekirdek sayısı kadar thread açılmasın"""
+    global _TRIAL_THREADS
+    _TRIAL_THREADS = threads
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    try:
+        # Fork ile gelen, zaten yüklenmiş BLAS/OpenMP havuzları için
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+    except ImportError:
+        pass
+
+
+def _lightgbm_params(trial) -> Dict[str, Any]:
+    return {
+        'objective': 'binary',
+        'metric': 'auc',
+        'boosting_type': 'gbdt',
+        'num_leaves': trial.suggest_int('num_leaves', 20, 300),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'feature_fraction': trial.suggest_float('feature_fraction', 0.4, 1.0),
+        'bagging_fraction': trial.suggest_float('bagging_fraction', 0.4, 1.0),
+        'bagging_freq': trial.suggest_int('bagging_freq', 1, 7),
+        'min_child_samples': trial.suggest_int('min_child_samples', 5, 100),
+        'min_child_weight': trial.suggest_float('min_child_weight', 1e-3, 1e3, log=True),
+        'reg_alpha': trial.suggest_float('reg_alpha', 1e-8, 10.0, log=True),
+        'reg_lambda': trial.suggest_float('reg_lambda', 1e-8, 10.0, log=True),
+        'n_estimators': trial.suggest_int('n_estimators', 100, 1000),
+        'max_depth': trial.suggest_int('max_depth', 3, 12),
+        'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+        'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+        'random_state': 42,
+        'n_jobs': _TRIAL_THREADS,
+        'verbose': -1
+    }
+
+
+def _catboost_params(trial) -> Dict[str, Any]:
+    return {
+        'iterations': trial.suggest_int('iterations', 100, 1000),
+        'depth': trial.suggest_int('depth', 4, 10),
+        'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+        'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1e-8, 10.0, log=True),
+        'border_count': trial.suggest_int('border_count', 32, 255),
+        'bagging_temperature': trial.suggest_float('bagging_temperature', 0.0, 1.0),
+        'random_strength': trial.suggest_float('random_strength', 1e-8, 10.0, log=True),
+        'scale_pos_weight': trial.suggest_float('scale_pos_weight', 0.1, 10.0),
+        'grow_policy': trial.suggest_categorical('grow_policy', ['SymmetricTree', 'Depthwise']),
+        'min_data_in_leaf': trial.suggest_int('min_data_in_leaf', 1, 100),
+        'random_seed': 42,
+        'thread_count': _TRIAL_THREADS or -1,
+        'verbose': False
+    }
+
+
+def _fit_lightgbm(params, X_train, y_train, X_val, y_val):
+    model = lgb.LGBMClassifier(**params)
+
+    # Fix for LightGBM compatibility
+    try:
+        # Try new API first
+        model.fit(X_train, y_train,
+                  eval_set=[(X_val, y_val)],
+                  callbacks=[lgb.early_stopping(50), lgb.log_evaluation(False)])
+    except:
+        try:
+            # Try old API
+            model.fit(X_train, y_train,
+                      eval_set=[(X_val, y_val)],
+                      early_stopping_rounds=50,
+                      verbose=False)
+        except:
+            # Fallback to basic fit
+            model.fit(X_train, y_train)
+
+    return model
+
+
+def _fit_catboost(params, X_train, y_train, X_val, y_val):
+    model = CatBoostClassifier(**params)
+
+    try:
+        model.fit(X_train, y_train,
+                  eval_set=(X_val, y_val),
+                  early_stopping_rounds=50,
+                  verbose=False)
+    except:
+        # Fallback to basic fit
+        model.fit(X_train, y_train, verbose=False)
+
+    return model
+
+
+def _report_fold(trial, scores, fold: int) -> float:
+    """Fold ortalamasını pruner'a bildir, gerekirse trial'ı buda"""
+    running_score = float(np.mean(scores))
+    trial.report(running_score, step=fold)
+    if trial.should_prune():
+        raise optuna.TrialPruned()
+    return running_score
+
+
+def _model_objective(trial, X: np.ndarray, y: np.ndarray, n_splits: int,
+                     build_params: Callable, fit_model: Callable) -> float:
+    params = build_params(trial)
+    scores = []
+
+    for fold, (train_sl, val_sl) in enumerate(_fold_slices(len(y), n_splits)):
+        # Slice'lar memmap üzerinde view döndürür, fold başına kopya yok
+        model = fit_model(params, X[train_sl], y[train_sl], X[val_sl], y[val_sl])
+        y_pred_proba = model.predict_proba(X[val_sl])[:, 1]
+        scores.append(roc_auc_score(y[val_sl], y_pred_proba))
+        _report_fold(trial, scores, fold)
+
+    return float(np.mean(scores))
+
+
+def _lightgbm_objective(trial, X, y, n_splits):
+    return _model_objective(trial, X, y, n_splits, _lightgbm_params, _fit_lightgbm)
+
+
+def _catboost_objective(trial, X, y, n_splits):
+    return _model_objective(trial, X, y, n_splits, _catboost_params, _fit_catboost)
+
+
+def _ensemble_weights_objective(trial, X, y, n_splits):
+    # Model ağırlıkları
+    lgb_weight = trial.suggest_float('lightgbm_weight', 0.1, 0.8)
+    cat_weight = trial.suggest_float('catboost_weight', 0.1, 0.8)
+    lstm_weight = trial.suggest_float('lstm_weight', 0.1, 0.8)
+    timegpt_weight = trial.suggest_float('timegpt_weight', 0.1, 0.8)
+
+    # Normalize weights
+    total_weight = lgb_weight + cat_weight + lstm_weight + timegpt_weight
+    weights = {
+        'lightgbm': lgb_weight / total_weight,
+        'catboost': cat_weight / total_weight,
+        'lstm': lstm_weight / total_weight,
+        'timegpt': timegpt_weight / total_weight
+    }
+
+    # Mock ensemble prediction (gerçek uygulamada model predictions kullanılır)
+    scores = []
+    for fold, (_, val_sl) in enumerate(_fold_slices(len(y), n_splits)):
+        y_val = y[val_sl]
+
+        # Mock predictions
+        rng = np.random.RandomState(42)
+        lgb_pred = rng.random_sample(len(y_val))
+        cat_pred = rng.random_sample(len(y_val))
+        lstm_pred = rng.random_sample(len(y_val))
+        timegpt_pred = rng.random_sample(len(y_val))
+
+        # Weighted ensemble
+        ensemble_pred = (weights['lightgbm'] * lgb_pred +
+                         weights['catboost'] * cat_pred +
+                         weights['lstm'] * lstm_pred +
+                         weights['timegpt'] * timegpt_pred)
+
+        scores.append(roc_auc_score(y_val, ensemble_pred))
+        _report_fold(trial, scores, fold)
+
+    return float(np.mean(scores))
+
+
+_OBJECTIVES = {
+    'lightgbm': _lightgbm_objective,
+    'catboost': _catboost_objective,
+    'ensemble_weights': _ensemble_weights_objective,
+}
+
+
+def _create_storage(storage: Optional[str]):
+    """Optuna storage oluştur: URL ise RDB (sqlite://), değilse journal dosyası"""
+    if storage is None:
+        return None
+    if '://' in storage:
+        return optuna.storages.RDBStorage(storage)
+
+    os.makedirs(os.path.dirname(storage) or '.', exist_ok=True)
+    try:
+        # Optuna >= 4.0
+        from optuna.storages.journal import JournalFileBackend
+        backend = JournalFileBackend(storage)
+    except ImportError:
+        backend = optuna.storages.JournalFileStorage(storage)
+    return optuna.storages.JournalStorage(backend)
+
+
+def _create_pruner(pruner: str, n_splits: int = 5):
+    """Fold skorlarını step olarak kullanan pruner (median / hyperband / none)"""
+    if pruner == 'hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=n_splits, reduction_factor=3)
+    if pruner == 'none':
+        return optuna.pruners.NopPruner()
+    return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+
+
+def _optimize_worker(study_name: str, storage: str, model_name: str, pruner: str,
+                     features_path: str, target_path: str, n_trials: int,
+                     timeout: Optional[float], n_splits: int, seed: int) -> int:
+    """Worker process: paylaşılan study'e bağlanıp trial'ları koşar"""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    # Memory-mapped: tüm worker'lar aynı page cache'i paylaşır
+    X = np.load(features_path, mmap_mode='r')
+    y = np.load(target_path, mmap_mode='r')
+
+    study = optuna.load_study(study_name=study_name,
+                              storage=_create_storage(storage),
+                              sampler=optuna.samplers.TPESampler(seed=seed),
+                              pruner=_create_pruner(pruner, n_splits))
+    objective = _OBJECTIVES[model_name]
+    study.optimize(lambda trial: objective(trial, X, y, n_splits),
+                   n_trials=n_trials, timeout=timeout)
+    return n_trials
+
+
 class HyperparameterOptimizer:
-    def __init__(self, data_path: str = "data/features.parquet"):
+    # Süre bütçesi run_full_optimization aşamalarına bu oranlarla dağıtılır
+    STAGE_BUDGET_SHARES = {'lightgbm': 0.45, 'catboost': 0.45, 'ensemble_weights': 0.10}
+
+    def __init__(self, data_path: str = "data/features.parquet",
+                 storage: Optional[str] = "models/optuna_journal.log",
+                 n_jobs: int = 1,
+                 pruner: str = "median",
+                 cache_dir: str = "data/cache",
+                 n_splits: int = 5):
         self.data_path = data_path
+        self.storage = storage
+        self.n_jobs = max(1, int(n_jobs))
+        self.pruner = pruner
+        self.cache_dir = cache_dir
+        self.n_splits = n_splits
         self.best_params = {}
         self.study_results = {}
-        
+        self.run_id = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+        self._shared_paths: Optional[Tuple[str, str]] = None
+
     def load_data(self) -> Tuple[pd.DataFrame, pd.Series]:
         """Veri yükleme ve hazırlama"""
         try:
@@ -41,24 +295,24 @@ class HyperparameterOptimizer:
                         raise Exception("No data file found")
             else:
                 raise Exception("Data file not found")
-            
+
             # Target variable hazırlama
             if 'target' not in data.columns:
                 if 'Close' in data.columns:
                     data['target'] = (data['Close'].shift(-1) > data['Close']).astype(int)
                 else:
                     data['target'] = np.random.randint(0, 2, len(data))
-            
+
             data = data.dropna()
-            
+
             # Feature engineering
             feature_cols = [col for col in data.columns if col not in ['target', 'Date', 'Symbol']]
             X = data[feature_cols]
             y = data['target']
-            
+
             logger.info(f"Data loaded: {X.shape[0]} samples, {X.shape[1]} features")
             return X, y
-            
+
         except Exception as e:
             logger.error(f"Data loading error: {e}")
             # Mock data oluştur
@@ -66,270 +320,226 @@ class HyperparameterOptimizer:
             X = pd.DataFrame(np.random.randn(1000, 50), columns=[f'feature_{i}' for i in range(50)])
             y = pd.Series(np.random.randint(0, 2, 1000))
             return X, y
-    
-    def optimize_lightgbm(self, n_trials: int = 100) -> Dict[str, Any]:
+
+    def prepare_shared_data(self) -> Tuple[str, str]:
+        """Veriyi run başına bir kez float32 .npy olarak yaz (worker'lar memmap ile okur)"""
+        if self._shared_paths is not None:
+            return self._shared_paths
+
+        X, y = self.load_data()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        features_path = os.path.join(self.cache_dir, f'hyperopt_features_{self.run_id}.npy')
+        target_path = os.path.join(self.cache_dir, f'hyperopt_target_{self.run_id}.npy')
+
+        np.save(features_path, np.ascontiguousarray(X.to_numpy(dtype=np.float32)))
+        np.save(target_path, y.to_numpy(dtype=np.int32))
+
+        logger.info(f"📦 Shared feature matrix: {features_path} ({X.shape[0]}x{X.shape[1]} float32)")
+        self._shared_paths = (features_path, target_path)
+        return self._shared_paths
+
+    def load_shared_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Paylaşılan feature matrisini memory-map olarak aç"""
+        features_path, target_path = self.prepare_shared_data()
+        return np.load(features_path, mmap_mode='r'), np.load(target_path, mmap_mode='r')
+
+    def cleanup_shared_data(self):
+        """Run sonunda memmap dosyalarını sil"""
+        if self._shared_paths is None:
+            return
+        for path in self._shared_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._shared_paths = None
+
+    def _run_study(self, model_name: str, n_trials: int, sampler_seed: int = 42,
+                   timeout: Optional[float] = None) -> optuna.Study:
+        """Study oluştur ve trial'ları sıralı ya da worker havuzunda koş"""
+        study_name = f"{model_name}_{self.run_id}"
+        storage = _create_storage(self.storage)
+        study = optuna.create_study(study_name=study_name,
+                                    storage=storage,
+                                    direction='maximize',
+                                    sampler=optuna.samplers.TPESampler(seed=sampler_seed),
+                                    pruner=_create_pruner(self.pruner, self.n_splits),
+                                    load_if_exists=True)
+
+        if self.n_jobs <= 1 or storage is None:
+            X, y = self.load_shared_arrays()
+            objective = _OBJECTIVES[model_name]
+            study.optimize(lambda trial: objective(trial, X, y, self.n_splits),
+                           n_trials=n_trials, timeout=timeout, show_progress_bar=True)
+            return study
+
+        features_path, target_path = self.prepare_shared_data()
+        trials_per_worker = math.ceil(n_trials / self.n_jobs)
+        logger.info(f"⚙️ {model_name}: {self.n_jobs} workers x {trials_per_worker} trials")
+
+        with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker) as executor:
+            futures = [
+                executor.submit(_optimize_worker, study_name, self.storage, model_name,
+                                self.pruner, features_path, target_path,
+                                trials_per_worker, timeout, self.n_splits,
+                                sampler_seed + worker_id)
+                for worker_id in range(self.n_jobs)
+            ]
+            for future in futures:
+                future.result()
+
+        # Worker'ların yazdığı trial'ları görmek için storage'dan yeniden yükle
+        return optuna.load_study(study_name=study_name, storage=storage)
+
+    @staticmethod
+    def _summarize_study(study: optuna.Study) -> Dict[str, int]:
+        states = [t.state for t in study.trials]
+        return {
+            'complete': sum(s == optuna.trial.TrialState.COMPLETE for s in states),
+            'pruned': sum(s == optuna.trial.TrialState.PRUNED for s in states),
+            'failed': sum(s == optuna.trial.TrialState.FAIL for s in states),
+        }
+
+    def _finish_study(self, model_name: str, label: str, study: optuna.Study) -> Optional[Dict[str, Any]]:
+        summary = self._summarize_study(study)
+        logger.info(f"📈 {label} trials: {summary}")
+
+        if summary['complete'] == 0:
+            logger.warning(f"⚠️ {label}: no completed trials within budget, keeping previous params")
+            self.study_results[model_name] = study
+            return None
+
+        logger.info(f"✅ {label} Best Score: {study.best_value:.4f}")
+        logger.info(f"🎯 Best Params: {study.best_params}")
+        self.study_results[model_name] = study
+        return study.best_params
+
+    def optimize_lightgbm(self, n_trials: int = 100, timeout: Optional[float] = None) -> Dict[str, Any]:
         """LightGBM hyperparameter optimization"""
         logger.info("🚀 LightGBM hyperparameter optimization başlıyor...")
-        
-        def objective(trial):
-            params = {
-                'objective': 'binary',
-                'metric': 'auc',
-                'boosting_type': 'gbdt',
-                'num_leaves': trial.suggest_int('num_leaves', 20, 300),
-                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
-                'feature_fraction': trial.suggest_float('feature_fraction', 0.4, 1.0),
-                'bagging_fraction': trial.suggest_float('bagging_fraction', 0.4, 1.0),
-                'bagging_freq': trial.suggest_int('bagging_freq', 1, 7),
-                'min_child_samples': trial.suggest_int('min_child_samples', 5, 100),
-                'min_child_weight': trial.suggest_float('min_child_weight', 1e-3, 1e3, log=True),
-                'reg_alpha': trial.suggest_float('reg_alpha', 1e-8, 10.0, log=True),
-                'reg_lambda': trial.suggest_float('reg_lambda', 1e-8, 10.0, log=True),
-                'n_estimators': trial.suggest_int('n_estimators', 100, 1000),
-                'max_depth': trial.suggest_int('max_depth', 3, 12),
-                'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-                'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
-                'random_state': 42,
-                'verbose': -1
-            }
-            
-            X, y = self.load_data()
-            
-            # Time series cross validation
-            tscv = TimeSeriesSplit(n_splits=5)
-            scores = []
-            
-            for train_idx, val_idx in tscv.split(X):
-                X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-                y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-                
-                model = lgb.LGBMClassifier(**params)
-                
-                # Fix for LightGBM compatibility
-                try:
-                    # Try new API first
-                    model.fit(X_train, y_train, 
-                             eval_set=[(X_val, y_val)],
-                             callbacks=[lgb.early_stopping(50), lgb.log_evaluation(False)])
-                except:
-                    try:
-                        # Try old API
-                        model.fit(X_train, y_train, 
-                                 eval_set=[(X_val, y_val)],
-                                 early_stopping_rounds=50,
-                                 verbose=False)
-                    except:
-                        # Fallback to basic fit
-                        model.fit(X_train, y_train)
-                
-                y_pred_proba = model.predict_proba(X_val)[:, 1]
-                score = roc_auc_score(y_val, y_pred_proba)
-                scores.append(score)
-            
-            return np.mean(scores)
-        
-        # Optuna study
-        study = optuna.create_study(direction='maximize', 
-                                  sampler=optuna.samplers.TPESampler(seed=42),
-                                  pruner=optuna.pruners.MedianPruner())
-        
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
-        
-        best_params = study.best_params
-        best_score = study.best_value
-        
-        logger.info(f"✅ LightGBM Best Score: {best_score:.4f}")
-        logger.info(f"🎯 Best Params: {best_params}")
-        
+
+        study = self._run_study('lightgbm', n_trials, timeout=timeout)
+        best_params = self._finish_study('lightgbm', 'LightGBM', study)
+        if best_params is None:
+            return self.best_params.get('lightgbm', {})
+
         self.best_params['lightgbm'] = best_params
-        self.study_results['lightgbm'] = study
-        
+
         return best_params
-    
-    def optimize_catboost(self, n_trials: int = 100) -> Dict[str, Any]:
+
+    def optimize_catboost(self, n_trials: int = 100, timeout: Optional[float] = None) -> Dict[str, Any]:
         """CatBoost hyperparameter optimization"""
         logger.info("🚀 CatBoost hyperparameter optimization başlıyor...")
-        
-        def objective(trial):
-            params = {
-                'iterations': trial.suggest_int('iterations', 100, 1000),
-                'depth': trial.suggest_int('depth', 4, 10),
-                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
-                'l2_leaf_reg': trial.suggest_float('l2_leaf_reg', 1e-8, 10.0, log=True),
-                'border_count': trial.suggest_int('border_count', 32, 255),
-                'bagging_temperature': trial.suggest_float('bagging_temperature', 0.0, 1.0),
-                'random_strength': trial.suggest_float('random_strength', 1e-8, 10.0, log=True),
-                                        'scale_pos_weight': trial.suggest_float('scale_pos_weight', 0.1, 10.0),
-                                        'grow_policy': trial.suggest_categorical('grow_policy', ['SymmetricTree', 'Depthwise']),
-                        'min_data_in_leaf': trial.suggest_int('min_data_in_leaf', 1, 100),
-                'random_seed': 42,
-                'verbose': False
-            }
-            
-            X, y = self.load_data()
-            
-            # Time series cross validation
-            tscv = TimeSeriesSplit(n_splits=5)
-            scores = []
-            
-            for train_idx, val_idx in tscv.split(X):
-                X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-                y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-                
-                model = CatBoostClassifier(**params)
-                
-                try:
-                    model.fit(X_train, y_train, 
-                             eval_set=(X_val, y_val),
-                             early_stopping_rounds=50,
-                             verbose=False)
-                except:
-                    # Fallback to basic fit
-                    model.fit(X_train, y_train, verbose=False)
-                
-                y_pred_proba = model.predict_proba(X_val)[:, 1]
-                score = roc_auc_score(y_val, y_pred_proba)
-                scores.append(score)
-            
-            return np.mean(scores)
-        
-        # Optuna study
-        study = optuna.create_study(direction='maximize',
-                                  sampler=optuna.samplers.TPESampler(seed=42),
-                                  pruner=optuna.pruners.MedianPruner())
-        
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
-        
-        best_params = study.best_params
-        best_score = study.best_value
-        
-        logger.info(f"✅ CatBoost Best Score: {best_score:.4f}")
-        logger.info(f"🎯 Best Params: {best_params}")
-        
+
+        study = self._run_study('catboost', n_trials, timeout=timeout)
+        best_params = self._finish_study('catboost', 'CatBoost', study)
+        if best_params is None:
+            return self.best_params.get('catboost', {})
+
         self.best_params['catboost'] = best_params
-        self.study_results['catboost'] = study
-        
+
         return best_params
-    
-    def optimize_ensemble_weights(self, n_trials: int = 200) -> Dict[str, float]:
+
+    def optimize_ensemble_weights(self, n_trials: int = 200, timeout: Optional[float] = None) -> Dict[str, float]:
         """Ensemble model ağırlıklarını optimize et"""
         logger.info("🚀 Ensemble weights optimization başlıyor...")
-        
-        def objective(trial):
-            # Model ağırlıkları
-            lgb_weight = trial.suggest_float('lightgbm_weight', 0.1, 0.8)
-            cat_weight = trial.suggest_float('catboost_weight', 0.1, 0.8)
-            lstm_weight = trial.suggest_float('lstm_weight', 0.1, 0.8)
-            timegpt_weight = trial.suggest_float('timegpt_weight', 0.1, 0.8)
-            
-            # Normalize weights
-            total_weight = lgb_weight + cat_weight + lstm_weight + timegpt_weight
-            weights = {
-                'lightgbm': lgb_weight / total_weight,
-                'catboost': cat_weight / total_weight,
-                'lstm': lstm_weight / total_weight,
-                'timegpt': timegpt_weight / total_weight
-            }
-            
-            # Mock ensemble prediction (gerçek uygulamada model predictions kullanılır)
-            X, y = self.load_data()
-            tscv = TimeSeriesSplit(n_splits=5)
-            scores = []
-            
-            for train_idx, val_idx in tscv.split(X):
-                X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-                y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
-                
-                # Mock predictions
-                np.random.seed(42)
-                lgb_pred = np.random.random(len(X_val))
-                cat_pred = np.random.random(len(X_val))
-                lstm_pred = np.random.random(len(X_val))
-                timegpt_pred = np.random.random(len(X_val))
-                
-                # Weighted ensemble
-                ensemble_pred = (weights['lightgbm'] * lgb_pred + 
-                               weights['catboost'] * cat_pred +
-                               weights['lstm'] * lstm_pred +
-                               weights['timegpt'] * timegpt_pred)
-                
-                score = roc_auc_score(y_val, ensemble_pred)
-                scores.append(score)
-            
-            return np.mean(scores)
-        
-        # Optuna study
-        study = optuna.create_study(direction='maximize',
-                                  sampler=optuna.samplers.TPESampler(seed=42))
-        
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
-        
-        best_weights = study.best_params
-        best_score = study.best_value
-        
+
+        study = self._run_study('ensemble_weights', n_trials, timeout=timeout)
+        best_weights = self._finish_study('ensemble_weights', 'Ensemble', study)
+        if best_weights is None:
+            return self.best_params.get('ensemble_weights', {})
+
         # Normalize final weights
         total_weight = sum(best_weights.values())
         final_weights = {k: v/total_weight for k, v in best_weights.items()}
-        
-        logger.info(f"✅ Ensemble Best Score: {best_score:.4f}")
+
         logger.info(f"🎯 Best Weights: {final_weights}")
-        
+
         self.best_params['ensemble_weights'] = final_weights
-        self.study_results['ensemble_weights'] = study
-        
+
         return final_weights
-    
-    def run_full_optimization(self) -> Dict[str, Any]:
-        """Tüm optimizasyonları çalıştır"""
+
+    def _stage_timeout(self, stage: str, remaining_stages, deadline: Optional[float]) -> Optional[float]:
+        """Kalan süreyi kalan aşamalara paylarına göre dağıt (kullanılmayan süre devreder)"""
+        if deadline is None:
+            return None
+        remaining = max(0.0, deadline - time.monotonic())
+        total_share = sum(self.STAGE_BUDGET_SHARES[s] for s in remaining_stages)
+        return remaining * self.STAGE_BUDGET_SHARES[stage] / total_share
+
+    def run_full_optimization(self, time_budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Tüm optimizasyonları çalıştır
+
+        time_budget_seconds verilirse tüm aşamalar bu duvar saati süresi içinde biter
+        (her aşama kalan sürenin kendi payı kadar timeout alır).
+        """
         logger.info("🚀 FULL HYPERPARAMETER OPTIMIZATION BAŞLIYOR...")
         logger.info("=" * 60)
-        
-        # LightGBM optimization
-        lgb_params = self.optimize_lightgbm(n_trials=50)  # Reduced for testing
-        
-        # CatBoost optimization  
-        cat_params = self.optimize_catboost(n_trials=50)  # Reduced for testing
-        
-        # Ensemble weights optimization
-        ensemble_weights = self.optimize_ensemble_weights(n_trials=100)  # Reduced for testing
-        
+
+        self.run_id = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+        start = time.monotonic()
+        deadline = start + time_budget_seconds if time_budget_seconds else None
+        stages = ['lightgbm', 'catboost', 'ensemble_weights']
+
+        try:
+            # LightGBM optimization
+            lgb_params = self.optimize_lightgbm(
+                n_trials=50, timeout=self._stage_timeout('lightgbm', stages, deadline))  # Reduced for testing
+
+            # CatBoost optimization
+            cat_params = self.optimize_catboost(
+                n_trials=50, timeout=self._stage_timeout('catboost', stages[1:], deadline))  # Reduced for testing
+
+            # Ensemble weights optimization
+            ensemble_weights = self.optimize_ensemble_weights(
+                n_trials=100, timeout=self._stage_timeout('ensemble_weights', stages[2:], deadline))  # Reduced for testing
+        finally:
+            self.cleanup_shared_data()
+
         # Results summary
         results = {
             'lightgbm': lgb_params,
             'catboost': cat_params,
             'ensemble_weights': ensemble_weights,
             'optimization_completed': True,
+            'elapsed_seconds': time.monotonic() - start,
+            'time_budget_seconds': time_budget_seconds,
+            'n_jobs': self.n_jobs,
+            'trial_summary': {name: self._summarize_study(study)
+                              for name, study in self.study_results.items()},
             'timestamp': pd.Timestamp.now().isoformat()
         }
-        
+
         # Save results
         self.save_optimization_results(results)
-        
+
         logger.info("🎉 FULL OPTIMIZATION COMPLETED!")
         logger.info("=" * 60)
         logger.info(f"📊 LightGBM: {len(lgb_params)} parameters optimized")
         logger.info(f"📊 CatBoost: {len(cat_params)} parameters optimized")
         logger.info(f"📊 Ensemble: {len(ensemble_weights)} weights optimized")
-        
+        logger.info(f"⏱️ Elapsed: {results['elapsed_seconds']:.0f}s")
+
         return results
-    
+
     def save_optimization_results(self, results: Dict[str, Any]):
         """Optimizasyon sonuçlarını kaydet"""
         try:
             os.makedirs('models', exist_ok=True)
-            
+
             # Save parameters
             joblib.dump(results, 'models/optimized_hyperparameters.pkl')
-            
-            # Save individual studies
-            for model_name, study in self.study_results.items():
-                joblib.dump(study, f'models/{model_name}_study.pkl')
-            
+
+            # Save individual studies (persistent storage'dakiler zaten kayıtlı)
+            if self.storage is None:
+                for model_name, study in self.study_results.items():
+                    joblib.dump(study, f'models/{model_name}_study.pkl')
+
             logger.info("✅ Optimization results saved to models/")
-            
+
         except Exception as e:
             logger.error(f"❌ Save error: {e}")
-    
+
     def load_optimized_parameters(self) -> Dict[str, Any]:
         """Kaydedilmiş optimize edilmiş parametreleri yükle"""
         try:
@@ -343,19 +553,19 @@ class HyperparameterOptimizer:
 def test_hyperparameter_optimizer():
     """Test function"""
     optimizer = HyperparameterOptimizer()
-    
+
     print("🚀 Hyperparameter Optimization Test başlıyor...")
     print("=" * 50)
-    
+
     # Quick optimization (fewer trials for testing)
     results = optimizer.run_full_optimization()
-    
+
     print("\n🎯 OPTIMIZATION RESULTS:")
     print("=" * 50)
     for model, params in results.items():
-        if model != 'optimization_completed' and model != 'timestamp':
+        if model in ('lightgbm', 'catboost', 'ensemble_weights'):
             print(f"📊 {model.upper()}: {len(params)} parameters")
-    
+
     print(f"\n✅ Optimization completed: {results['optimization_completed']}")
     print(f"⏰ Timestamp: {results['timestamp']}")
 
@@ -50,38 +50,46 @@ class LightGBMModel:
     def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Teknik indikatörler ve feature'lar oluştur"""
         try:
+            from core.feature_dag import feature_store
+            
             features = df.copy()
+            ctx = feature_store.context(df)
             
             # Fiyat bazlı feature'lar
-            features['returns'] = df['Close'].pct_change()
-            features['log_returns'] = np.log(df['Close'] / df['Close'].shift(1))
+            features['returns'] = ctx.get('returns')
+            features['log_returns'] = ctx.get('log_returns')
             features['price_range'] = (df['High'] - df['Low']) / df['Close']
             features['price_position'] = (df['Close'] - df['Low']) / (df['High'] - df['Low'])
             
             # Moving averages
             for period in [5, 10, 20, 50]:
-                features[f'sma_{period}'] = ta.trend.sma_indicator(df['Close'], window=period)
-                features[f'ema_{period}'] = ta.trend.ema_indicator(df['Close'], window=period)
+                features[f'sma_{period}'] = ctx.get('sma', window=period)
+                features[f'ema_{period}'] = ctx.get('ema_ta', window=period)
                 features[f'price_sma_{period}_ratio'] = df['Close'] / features[f'sma_{period}']
                 features[f'price_ema_{period}_ratio'] = df['Close'] / features[f'ema_{period}']
             
             # Momentum indikatörleri
-            features['rsi'] = ta.momentum.rsi(df['Close'], window=14)
-            features['stoch_k'], features['stoch_d'] = ta.momentum.stoch(df['High'], df['Low'], df['Close'])
-            features['macd'], features['macd_signal'], features['macd_hist'] = ta.trend.macd(df['Close'])
-            features['williams_r'] = ta.momentum.williams_r(df['High'], df['Low'], df['Close'], window=14)
+            features['rsi'] = ctx.get('rsi_wilder', window=14)
+            features['stoch_k'] = ctx.get('stoch_k', window=14)
+            features['stoch_d'] = ctx.get('stoch_d', window=14, smooth=3)
+            features['macd'] = ctx.get('macd', ema='ema_ta')
+            features['macd_signal'] = ctx.get('macd_signal', ema='ema_ta')
+            features['macd_hist'] = ctx.get('macd_hist', ema='ema_ta')
+            features['williams_r'] = ctx.get('williams_r', window=14)
             
             # Volatilite indikatörleri
-            features['bbands_upper'], features['bbands_middle'], features['bbands_lower'] = ta.volatility.bollinger_bands(df['Close'])
+            features['bbands_upper'] = ctx.get('bb_upper', ddof=0)
+            features['bbands_middle'] = ctx.get('bb_middle')
+            features['bbands_lower'] = ctx.get('bb_lower', ddof=0)
             features['bbands_width'] = (features['bbands_upper'] - features['bbands_lower']) / features['bbands_middle']
             features['bbands_position'] = (df['Close'] - features['bbands_lower']) / (features['bbands_upper'] - features['bbands_lower'])
             
             # Hacim bazlı feature'lar
             if 'Volume' in df.columns:
-                features['volume_sma'] = ta.trend.sma_indicator(df['Volume'], window=20)
+                features['volume_sma'] = ctx.get('sma', window=20, source='volume')
                 features['volume_ratio'] = df['Volume'] / features['volume_sma']
                 features['price_volume'] = df['Close'] * df['Volume']
-                features['obv'] = ta.volume.on_balance_volume(df['Close'], df['Volume'])
+                features['obv'] = ctx.get('obv')
             
             # Trend indikatörleri
             features['adx'] = ta.trend.adx(df['High'], df['Low'], df['Close'], window=14)
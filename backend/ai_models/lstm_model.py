@@ -15,11 +15,18 @@ from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error
+from numpy.lib.stride_tricks import sliding_window_view
 import joblib
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Sequence
 from datetime import datetime, timedelta
 import os
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+import time
+import tracemalloc
 
 logger = logging.getLogger(__name__)
 
@@ -62,25 +69,22 @@ class LSTMModel:
     def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Teknik indikatörler oluştur"""
         try:
-            features = df.copy()
-            
-            # Returns
-            features['returns'] = df['Close'].pct_change()
+            from core.feature_dag import feature_store
             
-            # RSI
-            features['rsi'] = self.calculate_rsi(df['Close'], 14)
-            
-            # MACD
-            features['macd'] = self.calculate_macd(df['Close'])
+            features = df.copy()
+            ctx = feature_store.context(df)
             
-            # Bollinger Bands position
-            features['bbands_position'] = self.calculate_bbands_position(df['Close'])
+            # Returns, RSI, MACD, Bollinger pozisyonu (paylaşılan feature DAG)
+            features['returns'] = ctx.get('returns')
+            features['rsi'] = ctx.get('rsi', window=14)
+            features['macd'] = ctx.get('macd')
+            features['bbands_position'] = ctx.get('bb_position')
             
             # Volatilite
-            features['volatility'] = features['returns'].rolling(20).std()
+            features['volatility'] = ctx.get('rolling_std', window=20, source='returns')
             
             # Momentum
-            features['momentum'] = features['returns'].rolling(10).mean()
+            features['momentum'] = ctx.get('sma', window=10, source='returns')
             
             # NaN değerleri temizle
             features = features.fillna(method='ffill').fillna(0)
@@ -130,34 +134,83 @@ class LSTMModel:
             logger.error(f"BBands pozisyon hatası: {e}")
             return pd.Series(0.5, index=prices.index)
     
+    def _scale_features(self, df: pd.DataFrame, fit: bool = True) -> np.ndarray:
+        """Feature'ları float32 olarak normalize et"""
+        feature_data = df[self.feature_columns].to_numpy(dtype=np.float32)
+        scaled = self.scaler.fit_transform(feature_data) if fit else self.scaler.transform(feature_data)
+        return scaled.astype(np.float32, copy=False)
+    
+    def _build_sequences(self, scaled_data: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Kopyasız pencereler: (n, sequence_length, n_features) view + hedefler"""
+        n_samples = len(scaled_data) - self.sequence_length - self.prediction_steps + 1
+        if n_samples <= 0:
+            return (np.empty((0, self.sequence_length, scaled_data.shape[1]), dtype=np.float32),
+                    np.empty(0, dtype=np.float32))
+        
+        # sliding_window_view -> (T - L + 1, F, L); transpose da view döndürür
+        windows = sliding_window_view(scaled_data, self.sequence_length, axis=0)
+        X = windows[:n_samples].transpose(0, 2, 1)
+        
+        # Target: gelecek 4 saatlik fiyat değişimi (pencere sonundaki fiyata göre)
+        current_price = close[self.sequence_length - 1:len(close) - self.prediction_steps]
+        future_price = close[self.sequence_length + self.prediction_steps - 1:]
+        y = ((future_price - current_price) / current_price).astype(np.float32)
+        
+        return X, y
+    
     def prepare_sequences(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
-        """LSTM için sequence veri hazırla"""
+        """LSTM için sequence veri hazırla
+        
+        X, ölçeklenmiş feature matrisi üzerinde salt-okunur bir view'dir; veri
+        pencere uzunluğu kadar çoğaltılmaz. Batch kopyaları make_dataset içinde yapılır.
+        """
         try:
-            # Feature'ları seç
-            feature_data = df[self.feature_columns].values
-            
-            # Normalize et
-            scaled_data = self.scaler.fit_transform(feature_data)
-            
-            X, y = [], []
-            
-            for i in range(self.sequence_length, len(scaled_data) - self.prediction_steps + 1):
-                # Input sequence
-                X.append(scaled_data[i-self.sequence_length:i])
-                
-                # Target: gelecek 4 saatlik fiyat değişimi
-                future_prices = df['Close'].iloc[i:i+self.prediction_steps].values
-                current_price = df['Close'].iloc[i-1]
-                price_change = (future_prices[-1] - current_price) / current_price
-                
-                y.append(price_change)
-            
-            return np.array(X), np.array(y)
+            scaled_data = self._scale_features(df, fit=True)
+            close = df['Close'].to_numpy(dtype=np.float32)
+            return self._build_sequences(scaled_data, close)
             
         except Exception as e:
             logger.error(f"Sequence hazırlama hatası: {e}")
             return np.array([]), np.array([])
     
+    def make_dataset(self, segments: Sequence[Tuple[np.ndarray, np.ndarray]],
+                     shuffle: bool = False, seed: int = 42) -> tf.data.Dataset:
+        """(windows, targets) segmentlerinden batch'leyen ve prefetch eden tf.data pipeline
+        
+        Her segment bir sembolün pencere view'idir; sadece o an üretilen batch
+        kopyalanır, böylece bellek kullanımı batch boyutuyla sınırlı kalır.
+        """
+        n_features = len(self.feature_columns)
+        segment_ids = np.concatenate([np.full(len(t), k, dtype=np.int32)
+                                      for k, (_, t) in enumerate(segments)])
+        offsets = np.concatenate([np.arange(len(t), dtype=np.int64) for _, t in segments])
+        batch_size = self.batch_size
+        rng = np.random.default_rng(seed)
+        
+        def generator():
+            order = rng.permutation(len(segment_ids)) if shuffle else np.arange(len(segment_ids))
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                batch_segments = segment_ids[idx]
+                X = np.empty((len(idx), self.sequence_length, n_features), dtype=np.float32)
+                y = np.empty(len(idx), dtype=np.float32)
+                for k in np.unique(batch_segments):
+                    mask = batch_segments == k
+                    windows, targets = segments[k]
+                    rows = offsets[idx[mask]]
+                    X[mask] = windows[rows]
+                    y[mask] = targets[rows]
+                yield X, y
+        
+        dataset = tf.data.Dataset.from_generator(
+            generator,
+            output_signature=(
+                tf.TensorSpec(shape=(None, self.sequence_length, n_features), dtype=tf.float32),
+                tf.TensorSpec(shape=(None,), dtype=tf.float32)
+            )
+        )
+        return dataset.prefetch(tf.data.AUTOTUNE)
+    
     def build_model(self, input_shape: Tuple) -> tf.keras.Model:
         """LSTM model oluştur"""
         try:
@@ -189,6 +242,53 @@ class LSTMModel:
             logger.error(f"Model oluşturma hatası: {e}")
             return None
     
+    def _fit(self, train_segments, val_segments, input_shape: Tuple) -> Dict:
+        """Segment listeleri üzerinden modeli eğit ve validation metriklerini hesapla"""
+        # Model oluştur
+        self.model = self.build_model(input_shape)
+        
+        if self.model is None:
+            raise ValueError("Model oluşturulamadı")
+        
+        train_ds = self.make_dataset(train_segments, shuffle=True)
+        val_ds = self.make_dataset(val_segments)
+        
+        # Callbacks
+        callbacks = [
+            EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+            ModelCheckpoint(self.model_path, monitor='val_loss', save_best_only=True),
+            ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
+        ]
+        
+        # Eğitim
+        history = self.model.fit(
+            train_ds,
+            validation_data=val_ds,
+            epochs=self.epochs,
+            callbacks=callbacks,
+            verbose=1
+        )
+        
+        # Validation metrikleri
+        y_val = np.concatenate([targets for _, targets in val_segments])
+        val_predictions = self.model.predict(val_ds)
+        val_mse = mean_squared_error(y_val, val_predictions)
+        val_mae = mean_absolute_error(y_val, val_predictions)
+        
+        # Scaler kaydet
+        joblib.dump(self.scaler, self.scaler_path)
+        
+        self.is_trained = True
+        
+        return {
+            'training_history': history.history,
+            'validation_mse': val_mse,
+            'validation_mae': val_mae,
+            'training_date': datetime.now().isoformat(),
+            'sequence_length': self.sequence_length,
+            'prediction_steps': self.prediction_steps
+        }
+    
     def train(self, df: pd.DataFrame) -> Dict:
         """Model eğitimi"""
         try:
@@ -207,53 +307,65 @@ class LSTMModel:
             
             # Train/validation split (son %20 validation)
             split_idx = int(len(X) * 0.8)
-            X_train, X_val = X[:split_idx], X[split_idx:]
-            y_train, y_val = y[:split_idx], y[split_idx:]
-            
-            # Model oluştur
-            self.model = self.build_model((X.shape[1], X.shape[2]))
-            
-            if self.model is None:
-                raise ValueError("Model oluşturulamadı")
-            
-            # Callbacks
-            callbacks = [
-                EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
-                ModelCheckpoint(self.model_path, monitor='val_loss', save_best_only=True),
-                ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5, min_lr=1e-6)
-            ]
-            
-            # Eğitim
-            history = self.model.fit(
-                X_train, y_train,
-                validation_data=(X_val, y_val),
-                batch_size=self.batch_size,
-                epochs=self.epochs,
-                callbacks=callbacks,
-                verbose=1
-            )
             
-            # Validation metrikleri
-            val_predictions = self.model.predict(X_val)
-            val_mse = mean_squared_error(y_val, val_predictions)
-            val_mae = mean_absolute_error(y_val, val_predictions)
+            return self._fit([(X[:split_idx], y[:split_idx])],
+                             [(X[split_idx:], y[split_idx:])],
+                             (X.shape[1], X.shape[2]))
+            
+        except Exception as e:
+            logger.error(f"LSTM eğitim hatası: {e}")
+            return {}
+    
+    def train_multi_symbol(self, symbols: List[str], interval: str = "60m", store=None) -> Dict:
+        """Yerel OHLCV deposundaki birden fazla sembol üzerinde tek model eğit
+        
+        Scaler tüm semboller üzerinde partial_fit ile kademeli öğrenilir; her sembolün
+        son %20'si validation'a ayrılır.
+        """
+        try:
+            if store is None:
+                from core.ohlcv_store import ohlcv_store as store
+            
+            logger.info(f"LSTM çoklu sembol eğitimi başladı: {len(symbols)} sembol, {interval}")
+            
+            features = {}
+            for symbol, df in store.load_many(symbols, interval).items():
+                features[symbol] = self.create_features(df)
+            
+            if not features:
+                raise ValueError("OHLCV deposunda veri bulunamadı")
+            
+            self.scaler = MinMaxScaler()
+            for features_df in features.values():
+                self.scaler.partial_fit(features_df[self.feature_columns].to_numpy(dtype=np.float32))
+            
+            train_segments, val_segments = [], []
+            for symbol, features_df in features.items():
+                scaled_data = self._scale_features(features_df, fit=False)
+                close = features_df['Close'].to_numpy(dtype=np.float32)
+                X, y = self._build_sequences(scaled_data, close)
+                if len(X) < 2:
+                    logger.warning(f"{symbol}: yetersiz veri, atlandı")
+                    continue
+                
+                split_idx = int(len(X) * 0.8)
+                train_segments.append((X[:split_idx], y[:split_idx]))
+                val_segments.append((X[split_idx:], y[split_idx:]))
             
-            # Scaler kaydet
-            joblib.dump(self.scaler, self.scaler_path)
+            if not train_segments:
+                raise ValueError("Sequence veri hazırlanamadı")
             
-            self.is_trained = True
+            n_train = sum(len(t) for _, t in train_segments)
+            n_val = sum(len(t) for _, t in val_segments)
+            logger.info(f"Sequence sayısı: train={n_train}, val={n_val}")
             
-            return {
-                'training_history': history.history,
-                'validation_mse': val_mse,
-                'validation_mae': val_mae,
-                'training_date': datetime.now().isoformat(),
-                'sequence_length': self.sequence_length,
-                'prediction_steps': self.prediction_steps
-            }
+            result = self._fit(train_segments, val_segments,
+                               (self.sequence_length, len(self.feature_columns)))
+            result['symbols'] = len(train_segments)
+            return result
             
         except Exception as e:
-            logger.error(f"LSTM eğitim hatası: {e}")
+            logger.error(f"LSTM çoklu sembol eğitim hatası: {e}")
             return {}
     
     def predict(self, df: pd.DataFrame) -> Tuple[float, List[float]]:
@@ -266,8 +378,7 @@ class LSTMModel:
             features_df = self.create_features(df)
             
             # Son sequence'i al
-            feature_data = features_df[self.feature_columns].values
-            scaled_data = self.scaler.transform(feature_data)
+            scaled_data = self._scale_features(features_df, fit=False)
             
             # Son 60 mum
             last_sequence = scaled_data[-self.sequence_length:].reshape(1, self.sequence_length, len(self.feature_columns))
@@ -317,6 +428,69 @@ class LSTMModel:
             logger.error(f"Model yükleme hatası: {e}")
             return False
 
+def _prepare_sequences_copying(model: LSTMModel, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Eski liste tabanlı sequence hazırlama (sadece benchmark karşılaştırması için)"""
+    scaled_data = model.scaler.fit_transform(df[model.feature_columns].values)
+    X, y = [], []
+    for i in range(model.sequence_length, len(scaled_data) - model.prediction_steps + 1):
+        X.append(scaled_data[i-model.sequence_length:i])
+        future_prices = df['Close'].iloc[i:i+model.prediction_steps].values
+        current_price = df['Close'].iloc[i-1]
+        y.append((future_prices[-1] - current_price) / current_price)
+    return np.array(X), np.array(y)
+
+def benchmark_sequence_pipeline(n_rows: int = 20000) -> Dict[str, Dict[str, float]]:
+    """CPU üzerinde sequence pipeline benchmark'ı: samples/s ve peak bellek
+    
+    Pencereli pipeline önce koşar, böylece ru_maxrss (process ömrü boyunca monoton)
+    liste tabanlı yolun ek tepe RSS'ini ayrıca gösterir.
+    """
+    try:
+        tf.config.set_visible_devices([], 'GPU')
+    except Exception:
+        pass
+    
+    rng = np.random.default_rng(42)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_rows)))
+    df = pd.DataFrame({
+        'Close': prices,
+        'Volume': rng.integers(100000, 1000000, n_rows)
+    }, index=pd.date_range('2020-01-01', periods=n_rows, freq='h'))
+    
+    model = LSTMModel()
+    features_df = model.create_features(df)
+    
+    def run_windowed():
+        X, y = model.prepare_sequences(features_df)
+        for _ in model.make_dataset([(X, y)]):
+            pass
+        return len(y)
+    
+    def run_copying():
+        X, y = _prepare_sequences_copying(model, features_df)
+        dataset = tf.data.Dataset.from_tensor_slices((X, y)).batch(model.batch_size)
+        for _ in dataset:
+            pass
+        return len(y)
+    
+    results = {}
+    for name, run in [('sliding_window', run_windowed), ('list_copy', run_copying)]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        n_samples = run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            'samples': n_samples,
+            'samples_per_sec': n_samples / elapsed if elapsed > 0 else 0.0,
+            'peak_traced_mb': peak / 1e6,
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+        }
+        logger.info(f"{name}: {results[name]}")
+    
+    return results
+
 # Test fonksiyonu
 def test_lstm():
     """LSTM model test"""
@@ -364,4 +538,11 @@ def test_lstm():
         return None
 
 if __name__ == "__main__":
-    test_lstm()
+    import sys
+    if "--benchmark" in sys.argv:
+        for name, stats in benchmark_sequence_pipeline().items():
+            max_rss = f"{stats['max_rss_mb']:.0f} MB" if stats['max_rss_mb'] is not None else "n/a"
+            print(f"{name}: {stats['samples_per_sec']:.0f} samples/s, "
+                  f"peak {stats['peak_traced_mb']:.1f} MB traced, max RSS {max_rss}")
+    else:
+        test_lstm()
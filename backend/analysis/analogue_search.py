@@ -0,0 +1,421 @@
+"""
+Tarihsel Analog Arama Motoru
+- Z-normalize edilmiş kayan fiyat pencereleri (tüm semboller, yerel OHLCV deposu)
+- Birim normlu float32 matris üzerinde bloklu matris çarpımı ile top-k
+- Farklı uzunluktaki sorgular için MASS (FFT tabanlı mesafe profili)
+- Eşleşmelerin ileri getirileri ve özet istatistikleri
+"""
+
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AnalogueMatch:
+    """Analog eşleşme"""
+    symbol: str
+    start: datetime
+    end: datetime
+    distance: float  # Z-normalize Öklid mesafesi
+    correlation: float
+    forward_returns: Dict[int, float]
+
+def znormalize_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Kayan pencereleri z-normalize edip birim norma ölçekle
+
+    Birim normlu satırlarda iç çarpım = Pearson korelasyonu ve
+    z-normalize mesafe = sqrt(2 * window * (1 - korelasyon)). Düz pencereler sıfır satır olur.
+    """
+    windows = sliding_window_view(np.asarray(values, dtype=np.float64), window)
+    centered = windows - windows.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(centered, axis=1, keepdims=True)
+    unit = np.divide(centered, norms, out=np.zeros_like(centered), where=norms > 1e-12)
+    return unit.astype(np.float32)
+
+def mass(query: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    MASS: sorgunun serideki tüm alt dizilere z-normalize mesafe profili (FFT, O(n log n))
+
+    Returns:
+        np.ndarray: len(series) - len(query) + 1 uzunluğunda mesafeler
+    """
+    query = np.asarray(query, dtype=np.float64)
+    series = np.asarray(series, dtype=np.float64)
+    m, n = len(query), len(series)
+    if n < m:
+        return np.zeros(0)
+
+    q_std = query.std()
+    if q_std == 0:
+        return np.full(n - m + 1, np.sqrt(2.0 * m))
+    q = (query - query.mean()) / q_std
+
+    size = 1 << int(np.ceil(np.log2(n + m)))
+    dots = np.fft.irfft(np.fft.rfft(series, size) * np.fft.rfft(q[::-1], size), size)[m - 1:n]
+
+    cumsum = np.concatenate([[0.0], np.cumsum(series)])
+    cumsum_sq = np.concatenate([[0.0], np.cumsum(series ** 2)])
+    mean = (cumsum[m:] - cumsum[:-m]) / m
+    std = np.sqrt(np.maximum((cumsum_sq[m:] - cumsum_sq[:-m]) / m - mean ** 2, 0.0))
+
+    correlation = np.divide(dots, m * std, out=np.zeros_like(dots), where=std > 1e-12)
+    return np.sqrt(np.maximum(2.0 * m * (1.0 - np.clip(correlation, -1.0, 1.0)), 0.0))
+
+@dataclass
+class AnalogueIndex:
+    """Değişmez indeks anlık görüntüsü; build yenisini kurup tek atamayla değiştirir"""
+    symbols: List[str]
+    closes: List[np.ndarray]
+    timestamps: List[pd.DatetimeIndex]
+    vectors: np.ndarray
+    symbol_ids: np.ndarray
+    positions: np.ndarray  # Pencerenin son barı
+    forward: np.ndarray
+    signature: Optional[Tuple] = None
+    built_at: Optional[datetime] = None
+
+    @classmethod
+    def empty(cls, window: int, n_horizons: int) -> "AnalogueIndex":
+        return cls([], [], [], np.zeros((0, window), dtype=np.float32), np.zeros(0, dtype=np.int32),
+                   np.zeros(0, dtype=np.int32), np.zeros((0, n_horizons), dtype=np.float32))
+
+class AnalogueSearchEngine:
+    """Tüm semboller üzerinde 'son N bar neye benziyordu, sonra ne oldu' araması"""
+
+    def __init__(self, window: int = 20, horizons: Sequence[int] = (5, 10, 20),
+                 interval: str = "1d", store=None, block_size: int = 262144,
+                 signature_ttl: float = 30.0):
+        self.window = window
+        self.horizons = tuple(horizons)
+        self.interval = interval
+        self.store = store
+        self.block_size = block_size
+        self.signature_ttl = signature_ttl  # Depo taraması en fazla bu sıklıkta
+
+        self._index = AnalogueIndex.empty(window, len(self.horizons))
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._signature_checked_at = 0.0
+
+    # Okuyucular tek bir anlık görüntü üzerinden çalışır
+    @property
+    def symbols(self) -> List[str]:
+        return self._index.symbols
+
+    @property
+    def _closes(self) -> List[np.ndarray]:
+        return self._index.closes
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._index.vectors
+
+    @property
+    def built_at(self) -> Optional[datetime]:
+        return self._index.built_at
+
+    def _get_store(self):
+        if self.store is None:
+            from core.ohlcv_store import ohlcv_store
+            self.store = ohlcv_store
+        return self.store
+
+    def _store_signature(self) -> Tuple:
+        store = self._get_store()
+        return tuple((symbol, os.path.getmtime(store._path(symbol, self.interval)))
+                     for symbol in store.symbols(self.interval))
+
+    def build(self, symbols: Optional[List[str]] = None) -> int:
+        """
+        Depodaki sembollerden pencere indeksini kur
+
+        Returns:
+            int: İndekslenen pencere sayısı
+        """
+        store = self._get_store()
+        signature = self._store_signature()
+        symbols = symbols or store.symbols(self.interval)
+        frames = store.load_many(symbols, self.interval)
+
+        index_symbols, index_closes, index_timestamps = [], [], []
+        vectors, symbol_ids, positions, forwards = [], [], [], []
+
+        for symbol, df in frames.items():
+            closes = df['Close'].to_numpy(dtype=np.float64)
+            valid = np.isfinite(closes) & (closes > 0)
+            closes, timestamps = closes[valid], df.index[valid]
+            if len(closes) < self.window:
+                continue
+
+            symbol_id = len(index_symbols)
+            index_symbols.append(symbol)
+            index_closes.append(closes)
+            index_timestamps.append(timestamps)
+
+            n_windows = len(closes) - self.window + 1
+            ends = np.arange(self.window - 1, len(closes))
+            forward = np.full((n_windows, len(self.horizons)), np.nan, dtype=np.float32)
+            for j, horizon in enumerate(self.horizons):
+                available = ends + horizon < len(closes)
+                forward[available, j] = closes[ends[available] + horizon] / closes[ends[available]] - 1.0
+
+            vectors.append(znormalize_windows(np.log(closes), self.window))
+            symbol_ids.append(np.full(n_windows, symbol_id, dtype=np.int32))
+            positions.append(ends.astype(np.int32))
+            forwards.append(forward)
+
+        index = AnalogueIndex.empty(self.window, len(self.horizons))
+        if vectors:
+            index = AnalogueIndex(index_symbols, index_closes, index_timestamps, np.concatenate(vectors),
+                                  np.concatenate(symbol_ids), np.concatenate(positions), np.concatenate(forwards))
+        index.signature = signature
+        index.built_at = datetime.now()
+
+        with self._lock:
+            self._index = index
+            self._signature_checked_at = time.monotonic()
+        logger.info(f"✅ Analog indeksi kuruldu: {len(index.symbols)} sembol, {len(index.vectors)} pencere")
+        return len(index.vectors)
+
+    def ensure_built(self) -> bool:
+        """Depo değiştiyse (yeni/güncellenen parquet) indeksi yeniden kur; depo en fazla signature_ttl'de bir taranır"""
+        if self._index.built_at is not None and time.monotonic() - self._signature_checked_at < self.signature_ttl:
+            return False
+
+        with self._build_lock:
+            # Başka bir thread bu arada kurmuş olabilir
+            if self._index.built_at is not None and time.monotonic() - self._signature_checked_at < self.signature_ttl:
+                return False
+            if self._index.built_at is None or self._store_signature() != self._index.signature:
+                self.build()
+                return True
+            self._signature_checked_at = time.monotonic()
+            return False
+
+    def search(self, query: np.ndarray, k: int = 10,
+               exclude: Optional[Tuple[str, int]] = None) -> List[AnalogueMatch]:
+        """
+        Kapanış fiyatı sorgusu için en yakın k analog
+
+        Args:
+            query: Son bar kapanışları (uzunluk window ise indeks, değilse MASS)
+            k: Eşleşme sayısı
+            exclude: (sembol, son bar pozisyonu) - sorgunun kendisi ve örtüşen pencereler hariç
+        """
+        index = self._index
+        query = np.asarray(query, dtype=np.float64)
+        if len(query) != self.window:
+            return self._search_mass(index, query, k, exclude)
+        if len(index.vectors) == 0:
+            return []
+
+        q = znormalize_windows(np.log(query), self.window)[0]
+        n_candidates = k * 10
+        rows_parts, sim_parts = [], []
+        for start in range(0, len(index.vectors), self.block_size):
+            sims = index.vectors[start:start + self.block_size] @ q
+            if len(sims) > n_candidates:
+                top = np.argpartition(-sims, n_candidates - 1)[:n_candidates]
+            else:
+                top = np.arange(len(sims))
+            rows_parts.append(top + start)
+            sim_parts.append(sims[top])
+
+        rows = np.concatenate(rows_parts)
+        sims = np.concatenate(sim_parts)
+        order = np.argsort(-sims)
+        return self._select(index, rows[order], sims[order], k, exclude)
+
+    def _select(self, index: AnalogueIndex, rows: np.ndarray, sims: np.ndarray, k: int,
+                exclude: Optional[Tuple[str, int]]) -> List[AnalogueMatch]:
+        """Önemsiz eşleşmeleri (aynı sembolde örtüşen pencereler) atarak ilk k'yı seç"""
+        excluded_id = index.symbols.index(exclude[0]) if exclude and exclude[0] in index.symbols else None
+        taken: Dict[int, List[int]] = {}
+        matches = []
+
+        for row, sim in zip(rows, sims):
+            symbol_id, position = int(index.symbol_ids[row]), int(index.positions[row])
+            if excluded_id == symbol_id and abs(position - exclude[1]) < self.window:
+                continue
+            if any(abs(position - p) < self.window for p in taken.get(symbol_id, [])):
+                continue
+            taken.setdefault(symbol_id, []).append(position)
+
+            timestamps = index.timestamps[symbol_id]
+            correlation = float(np.clip(sim, -1.0, 1.0))
+            matches.append(AnalogueMatch(
+                symbol=index.symbols[symbol_id],
+                start=timestamps[position - self.window + 1].to_pydatetime(),
+                end=timestamps[position].to_pydatetime(),
+                distance=float(np.sqrt(2.0 * self.window * (1.0 - correlation))),
+                correlation=correlation,
+                forward_returns={h: float(r) for h, r in zip(self.horizons, index.forward[row])
+                                 if np.isfinite(r)}
+            ))
+            if len(matches) >= k:
+                break
+
+        return matches
+
+    def _search_mass(self, index: AnalogueIndex, query: np.ndarray, k: int,
+                     exclude: Optional[Tuple[str, int]]) -> List[AnalogueMatch]:
+        """İndeks penceresinden farklı uzunluktaki sorgular: sembol başına MASS"""
+        m = len(query)
+        log_query = np.log(query)
+        matches = []
+        for symbol_id, closes in enumerate(index.closes):
+            distances = mass(log_query, np.log(closes))
+            if len(distances) == 0:
+                continue
+            ends = np.arange(m - 1, len(closes))
+            if exclude and exclude[0] == index.symbols[symbol_id]:
+                distances = np.where(np.abs(ends - exclude[1]) < m, np.inf, distances)
+
+            # Sembol başına örtüşmeyen en iyi k
+            for _ in range(k):
+                best = int(np.argmin(distances))
+                if not np.isfinite(distances[best]):
+                    break
+                end = int(ends[best])
+                timestamps = index.timestamps[symbol_id]
+                matches.append(AnalogueMatch(
+                    symbol=index.symbols[symbol_id],
+                    start=timestamps[end - m + 1].to_pydatetime(),
+                    end=timestamps[end].to_pydatetime(),
+                    distance=float(distances[best]),
+                    correlation=float(1.0 - distances[best] ** 2 / (2.0 * m)),
+                    forward_returns={h: float(closes[end + h] / closes[end] - 1.0)
+                                     for h in self.horizons if end + h < len(closes)}
+                ))
+                distances[max(0, best - m + 1):best + m] = np.inf
+
+        matches.sort(key=lambda match: match.distance)
+        return matches[:k]
+
+    def summarize(self, matches: List[AnalogueMatch]) -> Dict[int, Dict[str, float]]:
+        """Ufuk başına ileri getiri istatistikleri"""
+        summary = {}
+        for horizon in self.horizons:
+            returns = np.array([m.forward_returns[horizon] for m in matches if horizon in m.forward_returns])
+            if len(returns) == 0:
+                continue
+            summary[horizon] = {
+                'mean_return': float(returns.mean()),
+                'median_return': float(np.median(returns)),
+                'positive_ratio': float((returns > 0).mean()),
+                'count': int(len(returns))
+            }
+        return summary
+
+    def search_symbol(self, symbol: str, k: int = 10,
+                      closes: Optional[pd.Series] = None) -> Dict[str, Any]:
+        """
+        Sembolün son window barı için analog araması
+
+        Args:
+            symbol: Sembol
+            k: Eşleşme sayısı
+            closes: Depoda yoksa kullanılacak kapanış serisi
+        """
+        try:
+            self.ensure_built()
+            index = self._index
+            exclude = None
+            if symbol in index.symbols:
+                symbol_id = index.symbols.index(symbol)
+                query = index.closes[symbol_id][-self.window:]
+                exclude = (symbol, len(index.closes[symbol_id]) - 1)
+            elif closes is not None and len(closes.dropna()) >= self.window:
+                query = closes.dropna().to_numpy(dtype=np.float64)[-self.window:]
+            else:
+                return {'error': f'{symbol} için yeterli veri yok'}
+
+            matches = self.search(query, k=k, exclude=exclude)
+            return {
+                'symbol': symbol,
+                'window': self.window,
+                'interval': self.interval,
+                'indexed_windows': int(len(index.vectors)),
+                'matches': [{
+                    'symbol': m.symbol,
+                    'start': m.start.isoformat(),
+                    'end': m.end.isoformat(),
+                    'distance': m.distance,
+                    'correlation': m.correlation,
+                    'forward_returns': m.forward_returns
+                } for m in matches],
+                'forward_summary': self.summarize(matches)
+            }
+        except Exception as e:
+            logger.error(f"❌ Analog arama hatası {symbol}: {e}")
+            return {'error': str(e)}
+
+# Interval/pencere başına paylaşılan motorlar (her biri tam indeks tutar; LRU ile sınırlı)
+MAX_ENGINES = 4
+MIN_WINDOW, MAX_WINDOW = 5, 250
+_engines: "OrderedDict[Tuple[str, int], AnalogueSearchEngine]" = OrderedDict()
+_engines_lock = threading.Lock()
+
+def get_analogue_engine(interval: str = "1d", window: int = 20) -> AnalogueSearchEngine:
+    if not MIN_WINDOW <= window <= MAX_WINDOW:
+        raise ValueError(f"Pencere {MIN_WINDOW}-{MAX_WINDOW} aralığında olmalı: {window}")
+    key = (interval, window)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = AnalogueSearchEngine(window=window, interval=interval)
+            while len(_engines) > MAX_ENGINES:
+                _engines.popitem(last=False)
+        else:
+            _engines.move_to_end(key)
+        return engine
+
+# Test fonksiyonu
+def test_analogue_search():
+    """Analog aramayı sentetik depo ile test et"""
+    import tempfile
+    import time
+    from core.ohlcv_store import OHLCVStore
+
+    store = OHLCVStore(tempfile.mkdtemp())
+    np.random.seed(42)
+    dates = pd.bdate_range('2005-01-03', periods=5000)
+    for i in range(100):
+        prices = 100 * np.exp(np.cumsum(np.random.normal(0.0003, 0.02, len(dates))))
+        store.save(f"SYM{i:03d}.IS", pd.DataFrame({'Close': prices, 'Volume': 1000}, index=dates))
+
+    engine = AnalogueSearchEngine(window=20, store=store)
+    start = time.time()
+    engine.build()
+    print(f"İndeks kurulumu: {len(engine._vectors)} pencere, {time.time() - start:.2f}s")
+
+    start = time.time()
+    result = engine.search_symbol("SYM000.IS", k=10)
+    print(f"Sorgu süresi: {(time.time() - start) * 1000:.1f}ms")
+    for match in result['matches'][:5]:
+        print(f"   {match['symbol']} {match['end'][:10]} corr={match['correlation']:.3f} "
+              f"fwd={match['forward_returns']}")
+    print(f"İleri getiri özeti: {result['forward_summary']}")
+
+    # Farklı uzunluk: MASS
+    start = time.time()
+    matches = engine.search(engine._closes[0][-30:], k=5, exclude=("SYM000.IS", len(engine._closes[0]) - 1))
+    print(f"MASS (30 bar) sorgu süresi: {(time.time() - start) * 1000:.1f}ms, en iyi: {matches[0].symbol} "
+          f"corr={matches[0].correlation:.3f}")
+
+    return result
+
+if __name__ == "__main__":
+    test_analogue_search()
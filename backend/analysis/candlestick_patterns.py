@@ -0,0 +1,301 @@
+"""
+Vektörel Mum Formasyonu Sınıflandırıcı
+- Gövde/gölge/boşluk özellikleri tüm geçmiş için tek seferde dizi olarak hesaplanır
+- Engulfing, Harami, Morning/Evening Star, Three White Soldiers/Black Crows
+  tüm barlar için boolean maske olarak değerlendirilir
+- Son eksen zaman olduğu sürece (semboller x barlar) matrisleri de sınıflandırır
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from dataclasses import dataclass
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Formasyon -> (yön, mum sayısı)
+PATTERN_SPECS = {
+    'bullish_engulfing': ('BULLISH', 2),
+    'bearish_engulfing': ('BEARISH', 2),
+    'bullish_harami': ('BULLISH', 2),
+    'bearish_harami': ('BEARISH', 2),
+    'morning_star': ('BULLISH', 3),
+    'evening_star': ('BEARISH', 3),
+    'three_white_soldiers': ('BULLISH', 3),
+    'three_black_crows': ('BEARISH', 3),
+}
+
+
+def _lag(values: np.ndarray, k: int) -> np.ndarray:
+    """Son eksende k bar geriden gelen değerler (başı NaN)"""
+    if k == 0:
+        return values
+    out = np.full(values.shape, np.nan)
+    out[..., k:] = values[..., :-k]
+    return out
+
+
+def _lag_mask(mask: np.ndarray, k: int) -> np.ndarray:
+    """Boolean maskenin k bar gecikmeli hali (başı False)"""
+    if k == 0:
+        return mask
+    out = np.zeros(mask.shape, dtype=bool)
+    out[..., k:] = mask[..., :-k]
+    return out
+
+
+def _safe_ratio(num: np.ndarray, den: np.ndarray, default: float) -> np.ndarray:
+    """den > 0 ise num/den, değilse default"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(den > 0, num / np.where(den > 0, den, 1.0), default)
+
+
+@dataclass
+class CandleFeatures:
+    """Mum başına gövde/gölge/boşluk özellikleri (son eksen zaman)"""
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    body: np.ndarray
+    range: np.ndarray
+    body_top: np.ndarray
+    body_bottom: np.ndarray
+    upper_shadow: np.ndarray
+    lower_shadow: np.ndarray
+    midpoint: np.ndarray
+    body_ratio: np.ndarray
+    open_gap: np.ndarray
+    bullish: np.ndarray
+    bearish: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, opens, highs, lows, closes) -> 'CandleFeatures':
+        o, h, l, c = (np.asarray(a, dtype=np.float64) for a in (opens, highs, lows, closes))
+        body = np.abs(c - o)
+        rng = h - l
+        body_top = np.maximum(o, c)
+        body_bottom = np.minimum(o, c)
+        return cls(
+            open=o, high=h, low=l, close=c,
+            body=body, range=rng,
+            body_top=body_top, body_bottom=body_bottom,
+            upper_shadow=h - body_top, lower_shadow=body_bottom - l,
+            midpoint=(h + l) / 2,
+            body_ratio=_safe_ratio(body, rng, 0.0),
+            open_gap=o - _lag(c, 1),
+            bullish=c > o, bearish=c < o,
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'CandleFeatures':
+        return cls.from_arrays(df['Open'], df['High'], df['Low'], df['Close'])
+
+    def lag(self, name: str, k: int) -> np.ndarray:
+        """Özelliğin k bar önceki değeri (boolean özellikler için başı False)"""
+        values = getattr(self, name)
+        return _lag_mask(values, k) if values.dtype == bool else _lag(values, k)
+
+
+class CandlestickClassifier:
+    """Tüm mum formasyonlarını tek geçişte boolean maske olarak değerlendirir"""
+
+    def __init__(self, min_body_size: float = 0.01, small_body_ratio: float = 0.3,
+                 harami_body_ratio: float = 0.5, close_near_ratio: float = 0.3,
+                 open_tolerance: float = 0.02):
+        """
+        Args:
+            min_body_size: Uzun mum için fiyata oranla en küçük gövde
+            small_body_ratio: Yıldız formasyonunda orta mumun gövde oranı üst sınırı
+            harami_body_ratio: Harami iç mum / ana mum gövde oranı üst sınırı
+            close_near_ratio: Asker/karga mumlarında kapanışın uca uzaklığı / gövde üst sınırı
+            open_tolerance: Three Black Crows ardışık açılış farkı üst sınırı
+        """
+        self.min_body_size = min_body_size
+        self.small_body_ratio = small_body_ratio
+        self.harami_body_ratio = harami_body_ratio
+        self.close_near_ratio = close_near_ratio
+        self.open_tolerance = open_tolerance
+
+    def classify(self, f: CandleFeatures) -> Dict[str, np.ndarray]:
+        """
+        Tüm formasyonlar için maske (True: formasyon o barda tamamlanıyor)
+
+        Args:
+            f: Mum özellikleri
+
+        Returns:
+            Dict[str, np.ndarray]: Formasyon adı -> boolean maske
+        """
+        o, h, l, c, body = f.open, f.high, f.low, f.close, f.body
+        o1, h1, l1, c1 = _lag(o, 1), _lag(h, 1), _lag(l, 1), _lag(c, 1)
+        o2, c2 = _lag(o, 2), _lag(c, 2)
+        body1, body2 = _lag(body, 1), _lag(body, 2)
+        bull1, bull2 = f.lag('bullish', 1), f.lag('bullish', 2)
+        bear1, bear2 = f.lag('bearish', 1), f.lag('bearish', 2)
+        long_body = body > self.min_body_size * o
+        long2 = _lag_mask(long_body, 2)
+
+        masks = {}
+
+        # Engulfing: gövde önceki ters yönlü gövdeyi tamamen yutar
+        masks['bullish_engulfing'] = bear1 & f.bullish & (o < c1) & (c > o1)
+        masks['bearish_engulfing'] = bull1 & f.bearish & (o > c1) & (c < o1)
+
+        # Harami: uzun ana mum, gövdesinin içinde küçük iç mum
+        parent_long = body1 >= self.min_body_size * o1
+        inside = ((f.body_top <= _lag(f.body_top, 1)) & (f.body_bottom >= _lag(f.body_bottom, 1)) &
+                  (body <= body1 * self.harami_body_ratio) & parent_long)
+        masks['bullish_harami'] = inside & ((bull1 & f.bullish) | (~bull1 & ~f.bearish))
+        masks['bearish_harami'] = inside & ((bull1 & ~f.bullish) | (~bull1 & f.bearish))
+
+        # Yıldızlar: uzun mum, boşluklu küçük gövde, 1. mumun ortasını geçen ters mum
+        small_star = body1 < body2 * self.small_body_ratio
+        mid2 = _lag(f.midpoint, 2)
+        masks['morning_star'] = (bear2 & long2 & small_star & (h1 < o2) &
+                                 f.bullish & long_body & (c > mid2))
+        masks['evening_star'] = (bull2 & long2 & small_star & (l1 > c2) &
+                                 f.bearish & long_body & (c < mid2))
+
+        # Three White Soldiers: 3 yeşil, her açılış önceki gövdede, kapanışlar tepeye yakın
+        opens_in_body = (o >= _lag(f.body_bottom, 1)) & (o <= _lag(f.body_top, 1))
+        near_high = f.bullish & (h - c <= (c - o) * self.close_near_ratio)
+        masks['three_white_soldiers'] = (near_high & _lag_mask(near_high, 1) & _lag_mask(near_high, 2) &
+                                         opens_in_body & _lag_mask(opens_in_body, 1))
+
+        # Three Black Crows: 3 kırmızı, açılışlar birbirine yakın, kapanışlar dibe yakın
+        with np.errstate(divide='ignore', invalid='ignore'):
+            opens_close = np.abs(o - o1) / o1 <= self.open_tolerance
+        near_low = f.bearish & (c - l <= (o - c) * self.close_near_ratio)
+        masks['three_black_crows'] = (near_low & _lag_mask(near_low, 1) & _lag_mask(near_low, 2) &
+                                      opens_close & _lag_mask(opens_close, 1))
+        return masks
+
+    def confidence(self, f: CandleFeatures) -> Dict[str, np.ndarray]:
+        """
+        Çok mumlu formasyon güven skorları (0-100), her bar için formasyon o barda bitseydi
+
+        Args:
+            f: Mum özellikleri
+
+        Returns:
+            Dict[str, np.ndarray]: Formasyon adı -> skor dizisi
+        """
+        o, h, l, c, body = f.open, f.high, f.low, f.close, f.body
+
+        def bands(ratio, hi, hi_pts, lo, lo_pts):
+            return np.where(ratio > hi, hi_pts, np.where(ratio < lo, lo_pts, 0.0))
+
+        def clip(score):
+            return np.clip(100.0 + score, 0, 100)
+
+        # Yıldızlar
+        body2 = _lag(body, 2)
+        day1 = bands(_lag(f.body_ratio, 2), 0.7, 10, 0.5, -20)
+        day3 = bands(f.body_ratio, 0.7, 15, 0.5, -20)
+        mid2 = _lag(f.midpoint, 2)
+        morning_gap = _safe_ratio(_lag(o, 2) - _lag(h, 1), body2, 0.0)
+        evening_gap = _safe_ratio(_lag(l, 1) - _lag(c, 2), body2, 0.0)
+        gap_pts = lambda r: np.where((r >= 0.1) & (r <= 0.3), 15, -15)
+        scores = {
+            'morning_star': clip(day1 + gap_pts(morning_gap) + day3 + np.where(c > mid2, 20, -30)),
+            'evening_star': clip(day1 + gap_pts(evening_gap) + day3 + np.where(c < mid2, 20, -30)),
+        }
+
+        # Asker / karga: mum başı puanlar 3 bar boyunca toplanır
+        up_body = bands(_safe_ratio(c - o, f.range, 0.0), 0.7, 10, 0.5, -15)
+        up_close = np.where(_safe_ratio(h - c, c - o, 1.0) < 0.3, 10, -15)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            up_gap = np.where(np.abs(o - _lag(c, 1)) / _lag(c, 1) < 0.02, 10, -10)
+        per_bar = up_body + up_close
+        scores['three_white_soldiers'] = clip(per_bar + _lag(per_bar, 1) + _lag(per_bar, 2) +
+                                              up_gap + _lag(up_gap, 1))
+
+        down_body = bands(_safe_ratio(o - c, f.range, 0.0), 0.7, 10, 0.5, -15)
+        down_close = np.where(_safe_ratio(c - l, o - c, 1.0) < 0.3, 10, -15)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            down_open = np.where(np.abs(o - _lag(o, 1)) / _lag(o, 1) < 0.02, 10, -10)
+        per_bar = down_body + down_close
+        scores['three_black_crows'] = clip(per_bar + _lag(per_bar, 1) + _lag(per_bar, 2) +
+                                           down_open + _lag(down_open, 1))
+
+        # Harami
+        body1 = _lag(body, 1)
+        contained = (f.body_top <= _lag(f.body_top, 1)) & (f.body_bottom >= _lag(f.body_bottom, 1))
+        child = _safe_ratio(body, body1, 1.0)
+        harami = clip(bands(_lag(f.body_ratio, 1), 0.7, 15, 0.5, -20) +
+                      np.where(child < 0.3, 20, np.where(child > 0.5, -25, 0)) +
+                      np.where(contained, 25, -50))
+        scores['bullish_harami'] = scores['bearish_harami'] = harami
+        return scores
+
+    def classify_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        OHLC tablosunun tüm geçmişi için formasyon maskeleri
+
+        Args:
+            df: Open/High/Low/Close kolonlu veri
+
+        Returns:
+            pd.DataFrame: Her formasyon için boolean kolon (df ile aynı indeks)
+        """
+        masks = self.classify(CandleFeatures.from_frame(df))
+        return pd.DataFrame(masks, index=df.index)
+
+    def pattern_statistics(self, df: pd.DataFrame,
+                           horizons: Iterable[int] = (1, 5, 10)) -> pd.DataFrame:
+        """
+        Geçmişteki formasyonların sonrasındaki getiri istatistikleri
+
+        Args:
+            df: OHLC verisi
+            horizons: İleri getiri ufukları (bar)
+
+        Returns:
+            pd.DataFrame: Formasyon başına adet, ortalama ileri getiri ve yön isabet oranı
+        """
+        masks = self.classify_frame(df)
+        close = df['Close'].to_numpy(dtype=np.float64)
+        rows = []
+        for name, mask in masks.items():
+            direction, _ = PATTERN_SPECS[name]
+            sign = 1.0 if direction == 'BULLISH' else -1.0
+            hits = mask.to_numpy()
+            row = {'pattern': name, 'direction': direction, 'count': int(hits.sum())}
+            for horizon in horizons:
+                forward = np.full(len(close), np.nan)
+                forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+                realized = forward[hits]
+                realized = realized[~np.isnan(realized)]
+                row[f'mean_return_{horizon}'] = float(realized.mean()) if len(realized) else np.nan
+                row[f'hit_rate_{horizon}'] = float((sign * realized > 0).mean()) if len(realized) else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows).set_index('pattern')
+
+    def scan_universe(self, data: Dict[str, pd.DataFrame],
+                      patterns: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """
+        Tüm semboller için son barda tamamlanan formasyonlar (tek matris işlemi)
+
+        Args:
+            data: Sembol -> OHLC verisi
+            patterns: İlgilenilen formasyonlar (varsayılan: hepsi)
+
+        Returns:
+            Dict[str, List[str]]: Sembol -> son barda tamamlanan formasyonlar
+        """
+        symbols = [s for s, df in data.items() if df is not None and len(df)]
+        if not symbols:
+            return {}
+
+        # Son 3 bar yeterli; kısa seriler NaN ile doldurulur
+        tails = np.full((4, len(symbols), 3), np.nan)
+        for row, symbol in enumerate(symbols):
+            tail = data[symbol][['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64)[-3:]
+            tails[:, row, 3 - len(tail):] = tail.T
+
+        masks = self.classify(CandleFeatures.from_arrays(*tails))
+        names = patterns or list(PATTERN_SPECS)
+        return {symbol: [name for name in names if masks[name][row, -1]]
+                for row, symbol in enumerate(symbols)}
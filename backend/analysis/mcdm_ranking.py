@@ -7,12 +7,47 @@
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 import logging
+from scipy.stats import rankdata
 from sklearn.preprocessing import MinMaxScaler, StandardScaler
 
 logger = logging.getLogger(__name__)
 
+def topsis_ideal_points(normalized: np.ndarray, weights: np.ndarray,
+                        best_is_max: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Senaryo başına ideal / anti-ideal noktalar (scenarios x criteria)
+    
+    Ağırlıklı kolonun uçları normalize kolonun min/max'ı ile ağırlığın çarpımıdır;
+    ağırlık negatifse uçlar yer değiştirir.
+    """
+    weights = np.atleast_2d(weights)
+    upper = weights * normalized.max(axis=0)
+    lower = weights * normalized.min(axis=0)
+    weighted_max, weighted_min = np.maximum(upper, lower), np.minimum(upper, lower)
+    return (np.where(best_is_max, weighted_max, weighted_min),
+            np.where(best_is_max, weighted_min, weighted_max))
+
+def topsis_closeness(normalized: np.ndarray, weights: np.ndarray, ideal_best: np.ndarray,
+                     ideal_worst: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tüm senaryolar için TOPSIS yakınlık katsayıları (scenarios x alternatives)
+    
+    ||N_i * w_s - b_s||^2 = N_i^2 . w_s^2 - 2 N_i . (w_s * b_s) + ||b_s||^2 açılımıyla
+    uzaklıklar üç matris çarpımına indirgenir; (S x n x m) tensörü oluşturulmaz.
+    """
+    weights = np.atleast_2d(weights)
+    squared = normalized ** 2
+    base = weights ** 2 @ squared.T
+    d_plus = np.sqrt(np.maximum(base - 2 * (weights * ideal_best) @ normalized.T
+                                + (ideal_best ** 2).sum(axis=1, keepdims=True), 0.0))
+    d_minus = np.sqrt(np.maximum(base - 2 * (weights * ideal_worst) @ normalized.T
+                                 + (ideal_worst ** 2).sum(axis=1, keepdims=True), 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        closeness = d_minus / (d_plus + d_minus)
+    return closeness, d_plus, d_minus
+
 class GreyTOPSISAnalyzer:
     def __init__(self):
         self.criteria_weights = {}
@@ -67,33 +102,21 @@ class GreyTOPSISAnalyzer:
                                 criteria_types: Dict[str, str]) -> pd.DataFrame:
         """Karar matrisini normalize et (benefit/cost kriterleri)"""
         try:
-            normalized = decision_matrix.copy()
+            values = decision_matrix.to_numpy(dtype=np.float64)
+            types = np.array([criteria_types.get(col, 'benefit') for col in decision_matrix.columns])
             
-            for col in decision_matrix.columns:
-                criteria_type = criteria_types.get(col, 'benefit')
-                
-                if criteria_type == 'benefit':
-                    # Benefit kriteri: yüksek değer daha iyi
-                    col_min = decision_matrix[col].min()
-                    col_max = decision_matrix[col].max()
-                    if col_max != col_min:
-                        normalized[col] = (decision_matrix[col] - col_min) / (col_max - col_min)
-                    else:
-                        normalized[col] = 1.0
-                        
-                elif criteria_type == 'cost':
-                    # Cost kriteri: düşük değer daha iyi
-                    col_min = decision_matrix[col].min()
-                    col_max = decision_matrix[col].max()
-                    if col_max != col_min:
-                        normalized[col] = (col_max - decision_matrix[col]) / (col_max - col_min)
-                    else:
-                        normalized[col] = 1.0
-                        
-                else:
-                    # Nötr kriter: standart normalizasyon
-                    normalized[col] = (decision_matrix[col] - decision_matrix[col].mean()) / decision_matrix[col].std()
+            col_min, col_max = values.min(axis=0), values.max(axis=0)
+            spread = col_max - col_min
+            safe_spread = np.where(spread != 0, spread, 1.0)
             
+            # Benefit: yüksek değer daha iyi, Cost: düşük değer daha iyi, diğerleri: standart normalizasyon
+            with np.errstate(divide='ignore', invalid='ignore'):
+                neutral = (values - values.mean(axis=0)) / values.std(axis=0, ddof=1)
+            result = np.where(types == 'benefit', (values - col_min) / safe_spread,
+                              np.where(types == 'cost', (col_max - values) / safe_spread, neutral))
+            result[:, (spread == 0) & np.isin(types, ['benefit', 'cost'])] = 1.0
+            
+            normalized = pd.DataFrame(result, index=decision_matrix.index, columns=decision_matrix.columns)
             self.normalized_matrix = normalized
             return normalized
             
@@ -214,6 +237,85 @@ class GreyTOPSISAnalyzer:
         except Exception as e:
             logger.error(f"TOPSIS sıralama hatası: {e}")
             return pd.DataFrame()
+    
+    def rank_scenarios(self, decision_matrix: pd.DataFrame, criteria_types: Dict[str, str],
+                       weight_scenarios: Union[np.ndarray, pd.DataFrame]) -> Dict:
+        """
+        Birden fazla ağırlık senaryosu için TOPSIS skorları ve sıraları (tek broadcast)
+        
+        Args:
+            decision_matrix: Karar matrisi (alternatives x criteria)
+            criteria_types: Kriter tipleri
+            weight_scenarios: (scenarios x criteria) ağırlık matrisi; DataFrame ise kolonlar kriter adları
+            
+        Returns:
+            Dict: scores ve ranks (scenarios x alternatives), alternatives, criteria
+        """
+        try:
+            if isinstance(weight_scenarios, pd.DataFrame):
+                weight_scenarios = weight_scenarios[decision_matrix.columns].to_numpy()
+            weights = np.atleast_2d(np.asarray(weight_scenarios, dtype=np.float64))
+            if weights.shape[1] != decision_matrix.shape[1]:
+                raise ValueError(f"Ağırlık boyutu {weights.shape[1]} != kriter sayısı {decision_matrix.shape[1]}")
+            
+            # Normalizasyon ağırlıktan bağımsız: bir kez
+            normalized = self.normalize_decision_matrix(decision_matrix, criteria_types).to_numpy()
+            best_is_max = np.array([criteria_types.get(col, 'benefit') == 'benefit'
+                                    for col in decision_matrix.columns])
+            
+            ideal_best, ideal_worst = topsis_ideal_points(normalized, weights, best_is_max)
+            scores, _, _ = topsis_closeness(normalized, weights, ideal_best, ideal_worst)
+            scores = np.nan_to_num(scores, nan=0.0)
+            
+            return {
+                'scores': scores,
+                'ranks': rankdata(-scores, axis=1),
+                'alternatives': list(decision_matrix.index),
+                'criteria': list(decision_matrix.columns)
+            }
+            
+        except Exception as e:
+            logger.error(f"Senaryo sıralama hatası: {e}")
+            return {'error': str(e)}
+    
+    def ranking_robustness(self, decision_matrix: pd.DataFrame, criteria_types: Dict[str, str],
+                           n_scenarios: int = 5000, concentration: float = 50.0,
+                           seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Monte Carlo ağırlık duyarlılığı: entropi ağırlıkları etrafında Dirichlet çekimleri
+        
+        Args:
+            n_scenarios: Ağırlık çekimi sayısı
+            concentration: Dirichlet konsantrasyonu (büyük: entropi ağırlıklarına yakın)
+            
+        Returns:
+            pd.DataFrame: Alternatif başına temel sıra, ortalama/std sıra, 5-95 persentil, ilk sıra olasılığı
+        """
+        try:
+            base_weights = self.calculate_entropy_weights(decision_matrix)
+            base = np.array([max(base_weights[col], 1e-6) for col in decision_matrix.columns])
+            rng = np.random.default_rng(seed)
+            draws = rng.dirichlet(base / base.sum() * concentration, size=n_scenarios)
+            
+            result = self.rank_scenarios(decision_matrix, criteria_types, np.vstack([base, draws]))
+            if 'error' in result:
+                return pd.DataFrame()
+            ranks = result['ranks'][1:]
+            
+            summary = pd.DataFrame({
+                'Base_Rank': result['ranks'][0],
+                'Mean_Rank': ranks.mean(axis=0),
+                'Rank_Std': ranks.std(axis=0),
+                'Rank_P05': np.percentile(ranks, 5, axis=0),
+                'Rank_P95': np.percentile(ranks, 95, axis=0),
+                'P_Top1': (ranks == 1).mean(axis=0),
+                'Mean_Score': result['scores'][1:].mean(axis=0)
+            }, index=decision_matrix.index)
+            return summary.sort_values('Mean_Rank')
+            
+        except Exception as e:
+            logger.error(f"Sıralama dayanıklılık analizi hatası: {e}")
+            return pd.DataFrame()
 
 def create_financial_decision_matrix(symbols_data: List[Dict]) -> Tuple[pd.DataFrame, Dict[str, str]]:
     """Finansal verilerden karar matrisi oluştur"""
@@ -313,6 +415,11 @@ def test_grey_topsis():
     for idx, row in results.iterrows():
         print(f"{int(row['Rank'])}. {idx}: {row['TOPSIS_Score']:.4f}")
     
+    # Ağırlık duyarlılığı (Monte Carlo)
+    robustness = analyzer.ranking_robustness(decision_matrix, criteria_types, n_scenarios=5000, seed=42)
+    print("\n=== Ağırlık Duyarlılığı (5000 senaryo) ===")
+    print(robustness)
+    
     return results
 
 if __name__ == "__main__":
@@ -33,6 +33,17 @@ class PatternSignal:
     timestamp: datetime
     description: str
 
+CANDLESTICK_DESCRIPTIONS = {
+    'bullish_engulfing': 'Yeşil mum önceki kırmızı mumu yutuyor',
+    'bearish_engulfing': 'Kırmızı mum önceki yeşil mumu yutuyor',
+    'bullish_harami': 'Uzun mumun gövdesi içinde küçük yükseliş mumu',
+    'bearish_harami': 'Uzun mumun gövdesi içinde küçük düşüş mumu',
+    'morning_star': 'Düşüş mumu, aşağı boşluklu küçük gövde, güçlü yükseliş mumu',
+    'evening_star': 'Yükseliş mumu, yukarı boşluklu küçük gövde, güçlü düşüş mumu',
+    'three_white_soldiers': 'Tepeye yakın kapanan üç ardışık yükseliş mumu',
+    'three_black_crows': 'Dibe yakın kapanan üç ardışık düşüş mumu',
+}
+
 class TechnicalPatternEngine:
     def __init__(self):
         self.min_confidence = 0.6
@@ -44,9 +55,11 @@ class TechnicalPatternEngine:
             if len(df) < slow_period:
                 return None
                 
-            # EMA hesapla
-            ema_fast = ta.trend.ema_indicator(df['Close'], window=fast_period)
-            ema_slow = ta.trend.ema_indicator(df['Close'], window=slow_period)
+            # EMA hesapla (paylaşılan feature DAG, ta ile aynı tanım)
+            from core.feature_dag import feature_store
+            ctx = feature_store.context(df)
+            ema_fast = ctx.get('ema_ta', window=fast_period)
+            ema_slow = ctx.get('ema_ta', window=slow_period)
             
             # Son 2 mum için kesişim kontrol
             current_fast = ema_fast.iloc[-1]
@@ -113,72 +126,51 @@ class TechnicalPatternEngine:
             return None
     
     def detect_candlestick_patterns(self, df: pd.DataFrame) -> List[PatternSignal]:
-        """Candlestick formasyonları tespit et"""
+        """Candlestick formasyonları tespit et (son barda tamamlananlar)"""
         try:
             patterns = []
             
             if len(df) < 3:
                 return patterns
             
-            print(f"DEBUG: Candlestick tespit - son 2 mum:")
-            print(f"  Mum -2: O={df['Open'].iloc[-2]:.2f}, H={df['High'].iloc[-2]:.2f}, L={df['Low'].iloc[-2]:.2f}, C={df['Close'].iloc[-2]:.2f}")
-            print(f"  Mum -1: O={df['Open'].iloc[-1]:.2f}, H={df['High'].iloc[-1]:.2f}, L={df['Low'].iloc[-1]:.2f}, C={df['Close'].iloc[-1]:.2f}")
-            
-            # Bullish Engulfing - manuel kontrol
-            prev_open = df['Open'].iloc[-2]
-            prev_close = df['Close'].iloc[-2]
-            curr_open = df['Open'].iloc[-1]
-            curr_close = df['Close'].iloc[-1]
-            
-            # Önceki mum kırmızı (close < open) ve şimdiki mum yeşil (close > open)
-            if (prev_close < prev_open and curr_close > curr_open and
-                curr_open < prev_close and curr_close > prev_open):
-                
-                print("DEBUG: Bullish Engulfing tespit edildi!")
+            # Tüm formasyonlar tek vektörel geçişte; yalnızca son 3 bar gerekli
+            from analysis.candlestick_patterns import CandleFeatures, CandlestickClassifier, PATTERN_SPECS
+            classifier = CandlestickClassifier()
+            features = CandleFeatures.from_frame(df.iloc[-3:])
+            masks = classifier.classify(features)
+            scores = classifier.confidence(features)
+            
+            entry_price = df['Close'].iloc[-1]
+            for name, mask in masks.items():
+                if not mask[-1]:
+                    continue
                 
-                entry_price = curr_close
-                stop_loss = df['Low'].iloc[-1] * 0.98
-                take_profit = entry_price + (entry_price - stop_loss) * 2
-                risk_reward = (take_profit - entry_price) / (entry_price - stop_loss)
-                
-                if risk_reward >= self.risk_reward_min:
-                    patterns.append(PatternSignal(
-                        symbol=df.get('symbol', 'UNKNOWN'),
-                        pattern_type='CANDLESTICK',
-                        pattern_name='Bullish Engulfing',
-                        confidence=0.75,
-                        direction='BULLISH',
-                        entry_price=entry_price,
-                        stop_loss=stop_loss,
-                        take_profit=take_profit,
-                        risk_reward=risk_reward,
-                        timestamp=datetime.now(),
-                        description='Yeşil mum önceki kırmızı mumu yutuyor'
-                    ))
-            
-            # TA-Lib ile de kontrol et
-            bullish_engulf = ta.candlestick.CDLENGULFING(df['Open'], df['High'], df['Low'], df['Close'])
-            if bullish_engulf.iloc[-1] > 0:
-                print("DEBUG: TA-Lib Bullish Engulfing tespit edildi!")
+                direction = PATTERN_SPECS[name][0]
+                if direction == 'BULLISH':
+                    stop_loss = df['Low'].iloc[-1] * 0.98
+                    take_profit = entry_price + (entry_price - stop_loss) * 2
+                    risk_reward = (take_profit - entry_price) / (entry_price - stop_loss)
+                else:
+                    stop_loss = df['High'].iloc[-1] * 1.02
+                    take_profit = entry_price - (stop_loss - entry_price) * 2
+                    risk_reward = (entry_price - take_profit) / (stop_loss - entry_price)
                 
-                entry_price = df['Close'].iloc[-1]
-                stop_loss = df['Low'].iloc[-1] * 0.98
-                take_profit = entry_price + (entry_price - stop_loss) * 2
-                risk_reward = (take_profit - entry_price) / (entry_price - stop_loss)
+                confidence = scores[name][-1] / 100 if name in scores else 0.75
+                logger.debug(f"Candlestick formasyonu: {name} ({confidence:.2f})")
                 
                 if risk_reward >= self.risk_reward_min:
                     patterns.append(PatternSignal(
                         symbol=df.get('symbol', 'UNKNOWN'),
                         pattern_type='CANDLESTICK',
-                        pattern_name='Bullish Engulfing (TA-Lib)',
-                        confidence=0.75,
-                        direction='BULLISH',
+                        pattern_name=name.replace('_', ' ').title(),
+                        confidence=float(confidence),
+                        direction=direction,
                         entry_price=entry_price,
                         stop_loss=stop_loss,
                         take_profit=take_profit,
                         risk_reward=risk_reward,
                         timestamp=datetime.now(),
-                        description='TA-Lib: Yeşil mum önceki kırmızı mumu yutuyor'
+                        description=CANDLESTICK_DESCRIPTIONS[name]
                     ))
             
             return patterns
@@ -187,6 +179,22 @@ class TechnicalPatternEngine:
             logger.error(f"Candlestick pattern tespit hatası: {e}")
             return []
     
+    def candlestick_history(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Tüm geçmiş için candlestick formasyon maskeleri (bar x formasyon)"""
+        from analysis.candlestick_patterns import CandlestickClassifier
+        return CandlestickClassifier().classify_frame(df)
+    
+    def candlestick_statistics(self, df: pd.DataFrame, horizons: Tuple[int, ...] = (1, 5, 10)) -> pd.DataFrame:
+        """Geçmiş candlestick formasyonlarının ileri getiri / isabet istatistikleri"""
+        from analysis.candlestick_patterns import CandlestickClassifier
+        return CandlestickClassifier().pattern_statistics(df, horizons)
+    
+    def scan_universe_candlesticks(self, data: Dict[str, pd.DataFrame]) -> Dict[str, List[str]]:
+        """Sembol evreninde son barda tamamlanan candlestick formasyonları"""
+        from analysis.candlestick_patterns import CandlestickClassifier
+        hits = CandlestickClassifier().scan_universe(data)
+        return {symbol: names for symbol, names in hits.items() if names}
+    
     def detect_harmonic_patterns(self, df: pd.DataFrame) -> List[PatternSignal]:
         """Harmonik formasyonları tespit et (Gartley, AB=CD)"""
         try:
@@ -197,8 +205,10 @@ class TechnicalPatternEngine:
             
             # Gartley Pattern tespiti (basit versiyon)
             # X -> A -> B -> C -> D noktaları
-            highs = df['High'].rolling(window=5).max()
-            lows = df['Low'].rolling(window=5).min()
+            from core.feature_dag import feature_store
+            ctx = feature_store.context(df)
+            highs = ctx.get('rolling_max', window=5, source='high')
+            lows = ctx.get('rolling_min', window=5, source='low')
             
             # Son 20 mum içinde swing noktaları bul
             swing_points = []
@@ -332,31 +342,31 @@ class TechnicalPatternEngine:
             
             all_patterns = []
             
-            print(f"DEBUG: {symbol} için pattern tarama başladı")
-            print(f"DEBUG: Veri boyutu: {len(df)}")
-            print(f"DEBUG: Son 5 fiyat: {df['Close'].iloc[-5:].tolist()}")
+            logger.debug(f"{symbol} için pattern tarama başladı")
+            logger.debug(f"Veri boyutu: {len(df)}")
+            logger.debug(f"Son 5 fiyat: {df['Close'].iloc[-5:].tolist()}")
             
             # 1. EMA Cross
             ema_signal = self.detect_ema_cross(df)
             if ema_signal:
-                print(f"DEBUG: EMA cross bulundu: {ema_signal.pattern_name}")
+                logger.debug(f"EMA cross bulundu: {ema_signal.pattern_name}")
                 all_patterns.append(ema_signal)
             else:
-                print("DEBUG: EMA cross bulunamadı")
+                logger.debug("EMA cross bulunamadı")
             
             # 2. Candlestick Patterns
             candlestick_patterns = self.detect_candlestick_patterns(df)
-            print(f"DEBUG: Candlestick patterns bulundu: {len(candlestick_patterns)}")
+            logger.debug(f"Candlestick patterns bulundu: {len(candlestick_patterns)}")
             all_patterns.extend(candlestick_patterns)
             
             # 3. Harmonic Patterns
             harmonic_patterns = self.detect_harmonic_patterns(df)
-            print(f"DEBUG: Harmonic patterns bulundu: {len(harmonic_patterns)}")
+            logger.debug(f"Harmonic patterns bulundu: {len(harmonic_patterns)}")
             all_patterns.extend(harmonic_patterns)
             
             # 4. Support/Resistance Breakouts
             breakout_patterns = self.detect_support_resistance(df)
-            print(f"DEBUG: Breakout patterns bulundu: {len(breakout_patterns)}")
+            logger.debug(f"Breakout patterns bulundu: {len(breakout_patterns)}")
             all_patterns.extend(breakout_patterns)
             
             # Güven skoruna göre sırala
@@ -365,7 +375,7 @@ class TechnicalPatternEngine:
             # Minimum güven skorunu geçenleri filtrele
             filtered_patterns = [p for p in all_patterns if p.confidence >= self.min_confidence]
             
-            print(f"DEBUG: Toplam {len(all_patterns)} pattern, filtrelenmiş: {len(filtered_patterns)}")
+            logger.debug(f"Toplam {len(all_patterns)} pattern, filtrelenmiş: {len(filtered_patterns)}")
             
             return filtered_patterns
             
@@ -437,6 +447,14 @@ def test_pattern_detection():
         print(f"   R/R: {pattern.risk_reward:.2f}")
         print(f"   Açıklama: {pattern.description}")
     
+    # Tüm geçmiş için formasyon istatistikleri
+    stats = engine.candlestick_statistics(df, horizons=(1, 5))
+    print(f"\nGeçmiş candlestick formasyonları:\n{stats[['direction', 'count', 'hit_rate_5']]}")
+    
+    # Evren taraması
+    universe = {'SISE.IS': df, 'EREGL.IS': df.iloc[:-1], 'THYAO.IS': df.iloc[:-2]}
+    print(f"\nEvren taraması: {engine.scan_universe_candlesticks(universe)}")
+    
     return patterns
 
 if __name__ == "__main__":
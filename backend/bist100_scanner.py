@@ -7,11 +7,15 @@
 import asyncio
 import logging
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
 from ultra_robot_enhanced_fixed import UltraRobotEnhancedFixed, EnhancedSignalType
+from core.bar_service import TIMEFRAME_SECONDS
 
 # Logging ayarları
 logging.basicConfig(
@@ -24,18 +28,66 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class AsyncTokenBucket:
+    """Upstream (yfinance vb.) istek limiti için asyncio token bucket"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Token al; gerekirse bekle. Bekleme süresini döndürür"""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+@dataclass
+class SymbolScanState:
+    """Sembol başına tarama durumu (öncelik hesabı için)"""
+    symbol: str
+    last_scanned: float = 0.0
+    last_bar_time: Optional[pd.Timestamp] = None
+    volatility: float = 0.02
+    scans: int = 0
+    skips: int = 0
+    errors: int = 0
+    last_duration: float = 0.0
+
 class BIST100Scanner:
     """BIST 100 sürekli tarama sistemi"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, requests_per_second: float = 4.0, burst: int = 8,
+                 bar_interval: int = 300):
         self.robot = UltraRobotEnhancedFixed()
-        self.bist100_symbols = self._get_bist100_symbols()
+        # Listede tekrar eden semboller tek sefer taranır
+        self.bist100_symbols = list(dict.fromkeys(self._get_bist100_symbols()))
         self.scan_interval = 300  # 5 dakika
         self.forecast_hours = 48   # 48 saat önceden
         self.active_signals = {}
         self.signal_history = []
         self.snapshot_path = 'data/forecast_signals.json'
         
+        # Eşzamanlı tarama: sınırlı executor + token bucket + öncelik kuyruğu
+        self.max_workers = max_workers
+        self.bar_interval = bar_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bist-scan")
+        self.rate_limiter = AsyncTokenBucket(requests_per_second, burst)
+        self.scan_states: Dict[str, SymbolScanState] = {s: SymbolScanState(s) for s in self.bist100_symbols}
+        self.volatility_weight = 10.0
+        self.cycle_stats = deque(maxlen=288)
+        
     def _get_bist100_symbols(self) -> List[str]:
         """BIST 100 hisse listesi"""
         return [
@@ -88,42 +140,144 @@ class BIST100Scanner:
                 scan_duration = time.time() - start_time
                 logger.info(f"✅ Tarama tamamlandı: {scan_duration:.2f} saniye")
                 
-                # Sonraki tarama için bekle
-                await asyncio.sleep(self.scan_interval)
+                # Sonraki tarama için bekle (tarama süresi aralıktan düşülür)
+                await asyncio.sleep(max(0.0, self.scan_interval - scan_duration))
                 
             except Exception as e:
                 logger.error(f"❌ Tarama hatası: {e}")
                 await asyncio.sleep(60)  # Hata durumunda 1 dakika bekle
     
-    async def _scan_all_stocks(self):
-        """Tüm hisseleri tara"""
+    def _scan_timeframe(self, symbol: str) -> str:
+        """Sembol stratejisinin en ince aktif zaman dilimi (yoksa bar service baz intervali)"""
+        strategy = self.robot.active_strategies.get(symbol)
+        active = [tf.value for tf, config in strategy["timeframes"].items() if config["active"]] if strategy else []
+        active = [tf for tf in active if tf in TIMEFRAME_SECONDS]
+        if not active:
+            return self.robot.bar_service.base_interval
+        return min(active, key=TIMEFRAME_SECONDS.get)
+    
+    def _latest_bar_time(self, symbol: str) -> Optional[pd.Timestamp]:
+        """Sembolün veri kaynağındaki son bar zamanı (bloklayan çağrı, executor'da çalışır)"""
+        return self.robot.bar_service.last_bar_time(symbol, self._scan_timeframe(symbol))
+    
+    def _scan_priority(self, state: SymbolScanState, now: float) -> float:
+        """Düşük değer önce: bayatlık (bar cinsinden) x volatilite ağırlığı; hiç taranmamışlar en önde"""
+        if state.scans == 0:
+            return -float('inf')
+        staleness = (now - state.last_scanned) / self.bar_interval
+        return -staleness * (1.0 + self.volatility_weight * state.volatility)
+    
+    def _update_volatility(self, state: SymbolScanState, signals: List):
+        """Sinyallerdeki ATR (take_profit - entry = 3 ATR) / fiyat oranından EWMA volatilite"""
+        ratios = [abs(sig.take_profit - sig.entry_price) / 3 / sig.entry_price
+                  for sig in signals if sig.entry_price]
+        if ratios:
+            state.volatility = 0.7 * state.volatility + 0.3 * float(np.mean(ratios))
+    
+    async def _scan_all_stocks(self) -> Dict:
+        """
+        Tüm hisseleri öncelik sırasıyla eşzamanlı tara
+        
+        Son bar zamanı son taramadakiyle aynı olan (yeni bar gelmemiş) semboller sinyal üretilmeden
+        atlanır; robot çağrıları event loop'u bloklamamak için sınırlı thread pool'da, upstream limiti
+        token bucket ile korunarak çalışır.
+        """
+        cycle_start = time.time()
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
         for symbol in self.bist100_symbols:
-            try:
-                logger.info(f"🔍 {symbol} taranıyor...")
+            queue.put_nowait((self._scan_priority(self.scan_states[symbol], cycle_start), symbol))
+        
+        stats = {'queued': queue.qsize(), 'scanned': 0, 'errors': 0, 'skipped': 0,
+                 'rate_limit_wait': 0.0, 'latencies': []}
+        
+        async def worker():
+            while True:
+                try:
+                    _, symbol = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    stats['rate_limit_wait'] += await self.rate_limiter.acquire()
+                    await self._scan_symbol(symbol, stats)
+                finally:
+                    queue.task_done()
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.max_workers, max(queue.qsize(), 1)))))
+        
+        duration = time.time() - cycle_start
+        latencies = stats.pop('latencies')
+        cycle = {
+            'started_at': datetime.fromtimestamp(cycle_start).isoformat(),
+            'duration': round(duration, 3),
+            'avg_symbol_latency': round(float(np.mean(latencies)), 3) if latencies else 0.0,
+            'p95_symbol_latency': round(float(np.percentile(latencies, 95)), 3) if latencies else 0.0,
+            'within_bar_interval': duration <= self.bar_interval,
+            **stats
+        }
+        self.cycle_stats.append(cycle)
+        
+        logger.info(f"📊 Tarama döngüsü: {cycle['scanned']} taranan, {cycle['skipped']} atlanan (yeni bar yok), "
+                    f"{cycle['errors']} hata, kuyruk {cycle['queued']}, {duration:.2f}s")
+        if not cycle['within_bar_interval']:
+            logger.warning(f"⚠️ Tarama bar aralığını aştı: {duration:.1f}s > {self.bar_interval}s")
+        return cycle
+    
+    async def _scan_symbol(self, symbol: str, stats: Dict):
+        """Tek sembolü executor'da tara ve sinyallerini event loop'ta işle"""
+        state = self.scan_states[symbol]
+        started = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            bar_time = await loop.run_in_executor(self.executor, self._latest_bar_time, symbol)
+            if bar_time is not None and bar_time == state.last_bar_time:
+                state.skips += 1
+                stats['skipped'] += 1
+                return
+            
+            logger.info(f"🔍 {symbol} taranıyor...")
+            
+            # Gelişmiş sinyal üret (bloklayan çağrı executor'da)
+            signals = await loop.run_in_executor(self.executor, self.robot.generate_enhanced_signals, symbol)
+            
+            state.last_bar_time = bar_time
+            state.scans += 1
+            stats['scanned'] += 1
+            
+            if signals:
+                self._update_volatility(state, signals)
+                logger.info(f"🎯 {symbol}: {len(signals)} sinyal bulundu!")
                 
-                # Gelişmiş sinyal üret
-                signals = self.robot.generate_enhanced_signals(symbol)
+                # 48 saat önceden sinyalleri filtrele
+                forecast_signals = self._filter_forecast_signals(signals)
                 
-                if signals:
-                    logger.info(f"🎯 {symbol}: {len(signals)} sinyal bulundu!")
-                    
-                    # 48 saat önceden sinyalleri filtrele
-                    forecast_signals = self._filter_forecast_signals(signals)
-                    
-                    if forecast_signals:
-                        logger.info(f"🚀 {symbol}: {len(forecast_signals)} 48h önceden sinyal!")
-                        await self._process_forecast_signals(symbol, forecast_signals)
-                    else:
-                        logger.info(f"⏸️ {symbol}: 48h önceden sinyal yok")
+                if forecast_signals:
+                    logger.info(f"🚀 {symbol}: {len(forecast_signals)} 48h önceden sinyal!")
+                    await self._process_forecast_signals(symbol, forecast_signals)
                 else:
-                    logger.info(f"❌ {symbol}: Sinyal bulunamadı")
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"❌ {symbol} tarama hatası: {e}")
-                continue
+                    logger.info(f"⏸️ {symbol}: 48h önceden sinyal yok")
+            else:
+                logger.info(f"❌ {symbol}: Sinyal bulunamadı")
+        
+        except Exception as e:
+            state.errors += 1
+            stats['errors'] += 1
+            logger.error(f"❌ {symbol} tarama hatası: {e}")
+        
+        finally:
+            state.last_scanned = time.time()
+            state.last_duration = state.last_scanned - started
+            stats['latencies'].append(state.last_duration)
+    
+    def get_scan_stats(self) -> Dict:
+        """Son tarama döngüleri ve sembol durumları"""
+        return {
+            'last_cycle': self.cycle_stats[-1] if self.cycle_stats else None,
+            'cycles': list(self.cycle_stats),
+            'symbols': len(self.scan_states),
+            'slowest_symbols': sorted(
+                ({'symbol': s.symbol, 'last_duration': round(s.last_duration, 3), 'errors': s.errors}
+                 for s in self.scan_states.values()), key=lambda x: x['last_duration'], reverse=True)[:5]
+        }
     
     def _filter_forecast_signals(self, signals: List) -> List:
         """48 saat önceden sinyalleri filtrele"""
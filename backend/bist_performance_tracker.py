@@ -8,6 +8,8 @@ import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
 import logging
+import threading
+import warnings
 from typing import Dict, List, Optional, Tuple
 from config import MarketDataConfig
 
@@ -15,6 +17,249 @@ from config import MarketDataConfig
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.15  # Türkiye için risksiz faiz
+BENCHMARK_SYMBOL = "XU100.IS"
+
+# get_top_performers için önceden sıralanan metrikler
+PANEL_METRICS = [
+    "current_price", "start_price", "yukseleme_orani", "dusme_orani", "dogruluk_orani",
+    "win_rate", "sharpe_ratio", "max_drawdown", "total_return", "volatility", "calmar_ratio",
+    "sortino_ratio", "momentum_20", "momentum_50", "beta", "rolling_volatility_20", "rolling_sharpe_63",
+]
+
+
+def _compact_valid_rows(prices: np.ndarray) -> np.ndarray:
+    """Her kolonda geçerli değerleri alta, sırasını koruyarak topla (NaN'lar üstte kalır)"""
+    order = np.argsort(~np.isnan(prices), axis=0, kind='stable')
+    return np.take_along_axis(prices, order, axis=0)
+
+
+def _nanstd(values: np.ndarray, axis: int = 0) -> np.ndarray:
+    """ddof=1 NaN-duyarlı std; 2'den az gözlemde NaN"""
+    count = np.sum(~np.isnan(values), axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        std = np.nanstd(values, axis=axis, ddof=1)
+    return np.where(count > 1, std, np.nan)
+
+
+class PerformancePanel:
+    """Tüm evren için hizalı (tarih x sembol) fiyat matrisi ve kolon bazlı performans metrikleri"""
+    
+    def __init__(self, symbols: List[str], period: str = "1y", benchmark: str = BENCHMARK_SYMBOL):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.period = period
+        self.window_days = 365 if period == "1y" else None
+        self.benchmark = benchmark
+        self.prices = pd.DataFrame()
+        self.metrics = pd.DataFrame()
+        self.sorted_index: Dict[str, np.ndarray] = {}
+        self.last_refresh = None
+        self.last_bar = None
+        # Endpoint'ler refresh'i worker thread'lerden eşzamanlı çağırabilir
+        self._lock = threading.RLock()
+    
+    def _download(self, period: str) -> pd.DataFrame:
+        """Tüm semboller + benchmark için tek toplu indirme; başarısızsa yerel depo"""
+        tickers = self.symbols + [self.benchmark]
+        try:
+            data = yf.download(tickers, period=period, auto_adjust=True, progress=False,
+                               group_by='column', threads=True)
+            if not data.empty:
+                close = data['Close'] if isinstance(data.columns, pd.MultiIndex) else data[['Close']]
+                close = close.dropna(how='all')
+                if close.index.tz is not None:
+                    close.index = close.index.tz_convert(None)
+                if close.notna().any().any():
+                    return close.reindex(columns=tickers)
+        except Exception as e:
+            logger.warning(f"⚠️ Toplu fiyat indirme hatası: {e}")
+        
+        try:
+            from core.ohlcv_store import ohlcv_store
+            frames = {symbol: df['Close'] for symbol, df in ohlcv_store.load_many(tickers).items()}
+            if frames:
+                close = pd.DataFrame(frames).reindex(columns=tickers)
+                if period != self.period or self.window_days is None:
+                    return close
+                return close[close.index >= close.index.max() - pd.Timedelta(days=self.window_days)]
+        except Exception as e:
+            logger.warning(f"⚠️ Yerel OHLCV deposu okunamadı: {e}")
+        return pd.DataFrame()
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Fiyat matrisini güncelle; ilk seferde tam pencere, sonra sadece son barlar
+        
+        Returns:
+            bool: Metrikler yeniden hesaplandıysa True
+        """
+        with self._lock:
+            return self._refresh(force)
+    
+    def _refresh(self, force: bool) -> bool:
+        if self.prices.empty or force:
+            prices = self._download(self.period)
+        else:
+            recent = self._download("5d")
+            if recent.empty:
+                return False
+            prices = recent.combine_first(self.prices)
+            prices.update(recent)
+            if self.window_days is not None:
+                prices = prices[prices.index >= prices.index.max() - pd.Timedelta(days=self.window_days)]
+        
+        if prices.empty:
+            return False
+        prices = prices.sort_index()
+        
+        unchanged = (not self.prices.empty and prices.shape == self.prices.shape
+                     and prices.index.equals(self.prices.index)
+                     and np.allclose(prices.to_numpy(), self.prices.to_numpy(), equal_nan=True))
+        self.prices = prices
+        self.last_refresh = datetime.now()
+        if unchanged and not self.metrics.empty:
+            logger.info("✅ Yeni bar yok, panel metrikleri güncel")
+            return False
+        
+        self.last_bar = prices.index[-1]
+        self.metrics = self.compute_metrics(prices)
+        # records() ile aynı kural: sonlu olmayan değerler 0.0 sayılır
+        self.sorted_index = {metric: np.argsort(-self._display_values(metric), kind='stable')
+                             for metric in PANEL_METRICS}
+        return True
+    
+    def _display_values(self, metric: str) -> np.ndarray:
+        values = self.metrics[metric].to_numpy(dtype=float)
+        return np.where(np.isfinite(values), values, 0.0)
+    
+    def compute_metrics(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """
+        Tüm semboller için metrikleri kolon bazlı NumPy işlemleriyle hesapla
+        
+        Args:
+            prices: (tarih x sembol) kapanış fiyatları (benchmark kolonu dahil olabilir)
+            
+        Returns:
+            pd.DataFrame: Sembol indeksli metrik tablosu
+        """
+        symbols = [s for s in self.symbols if s in prices.columns]
+        P = prices[symbols].to_numpy(dtype=float)
+        
+        # Her sembolün kendi geçerli serisi (bayram/askı boşlukları atlanır)
+        C = _compact_valid_rows(P)
+        counts = np.sum(~np.isnan(P), axis=0)
+        n_rows = C.shape[0]
+        cols = np.arange(C.shape[1])
+        
+        def nth_from_end(k):
+            idx = n_rows - k
+            return np.where(counts >= k, C[max(idx, 0)], np.nan) if idx >= 0 else np.full(C.shape[1], np.nan)
+        
+        current = C[-1]
+        start = C[np.clip(n_rows - counts, 0, n_rows - 1), cols]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total_return = (current - start) / start
+            R = C[1:] / C[:-1] - 1
+            
+            n_ret = np.sum(~np.isnan(R), axis=0)
+            mean = np.nanmean(R, axis=0)
+            std = _nanstd(R)
+            volatility = std * np.sqrt(TRADING_DAYS) * 100
+            
+            # Drawdown: her kolon kendi ilk geçerli getirisinden başlar (baştaki NaN'lar 1.0 tohumlamaz)
+            missing = np.isnan(R)
+            cumulative = np.where(missing, np.nan, np.cumprod(np.where(missing, 1.0, 1 + R), axis=0))
+            running_max = np.fmax.accumulate(cumulative, axis=0)
+            max_drawdown = np.abs(np.fmin.reduce((cumulative - running_max) / running_max, axis=0)) * 100
+            
+            excess_mean = mean - RISK_FREE_RATE / TRADING_DAYS
+            sharpe = np.sqrt(TRADING_DAYS) * excess_mean / std
+            win_rate = np.sum(R > 0, axis=0) / n_ret * 100
+            calmar = np.where(max_drawdown > 0, (total_return * TRADING_DAYS) / max_drawdown, 0.0)
+            
+            downside_std = _nanstd(np.where(R < 0, R, np.nan)) * np.sqrt(TRADING_DAYS)
+            sortino = np.where(downside_std > 0, np.sqrt(TRADING_DAYS) * excess_mean / downside_std, 0.0)
+            
+            momentum_20 = (current / nth_from_end(20) - 1) * 100
+            momentum_50 = (current / nth_from_end(50) - 1) * 100
+            
+            # Rolling (son pencere) metrikler
+            tail_20, tail_63 = R[-20:], R[-63:]
+            rolling_volatility_20 = _nanstd(tail_20) * np.sqrt(TRADING_DAYS) * 100
+            rolling_sharpe_63 = (np.sqrt(TRADING_DAYS) * (np.nanmean(tail_63, axis=0) - RISK_FREE_RATE / TRADING_DAYS)
+                                 / _nanstd(tail_63))
+            
+            beta = self._beta(prices, symbols)
+        
+        dogruluk = np.where((momentum_20 > 0) & (momentum_50 > 0), 75.0,
+                            np.where((momentum_20 < 0) & (momentum_50 < 0), 70.0, 55.0))
+        
+        frame = pd.DataFrame({
+            "current_price": current,
+            "start_price": start,
+            "yukseleme_orani": np.maximum(0, total_return) * 100,
+            "dusme_orani": np.abs(np.minimum(0, total_return)) * 100,
+            "dogruluk_orani": dogruluk,
+            "win_rate": win_rate,
+            "sharpe_ratio": sharpe,
+            "max_drawdown": max_drawdown,
+            "total_return": total_return * 100,
+            "volatility": volatility,
+            "calmar_ratio": calmar,
+            "sortino_ratio": sortino,
+            "momentum_20": momentum_20,
+            "momentum_50": momentum_50,
+            "beta": beta,
+            "rolling_volatility_20": rolling_volatility_20,
+            "rolling_sharpe_63": rolling_sharpe_63,
+            "observations": counts,
+        }, index=symbols)
+        return frame[frame["observations"] > 1]
+    
+    def _beta(self, prices: pd.DataFrame, symbols: List[str]) -> np.ndarray:
+        """Benchmark'a (yoksa eşit ağırlıklı evrene) göre beta, ortak günler üzerinden"""
+        R = prices[symbols].pct_change(fill_method=None).to_numpy()[1:]
+        if self.benchmark in prices.columns and prices[self.benchmark].notna().sum() > 2:
+            market = prices[self.benchmark].pct_change(fill_method=None).to_numpy()[1:]
+        else:
+            market = np.nanmean(R, axis=1)
+        
+        valid = ~np.isnan(R) & ~np.isnan(market)[:, None]
+        n = valid.sum(axis=0)
+        M = np.where(valid, market[:, None], 0.0)
+        X = np.where(valid, R, 0.0)
+        mean_m = M.sum(axis=0) / n
+        mean_x = X.sum(axis=0) / n
+        cov = (np.where(valid, (X - mean_x) * (M - mean_m), 0.0)).sum(axis=0) / (n - 1)
+        var = (np.where(valid, (M - mean_m) ** 2, 0.0)).sum(axis=0) / (n - 1)
+        return np.where(var > 0, cov / var, np.nan)
+    
+    def top(self, metric: str, top_n: int = 10) -> List[str]:
+        """Önceden sıralanmış indeksten en iyi semboller"""
+        with self._lock:
+            order = self.sorted_index.get(metric)
+            if order is None:
+                return []
+            return [self.metrics.index[i] for i in order[:top_n]]
+    
+    def records(self) -> Dict[str, Dict]:
+        """Metrik tablosunu tracker'ın sembol bazlı sözlük formatına çevir"""
+        rounding = {"sharpe_ratio": 3, "calmar_ratio": 3, "sortino_ratio": 3, "beta": 3, "rolling_sharpe_63": 3}
+        timestamp = datetime.now().isoformat()
+        output = {}
+        with self._lock:
+            metrics = self.metrics
+        for symbol, row in zip(metrics.index, metrics.to_dict('records')):
+            record = {"symbol": symbol}
+            for metric in PANEL_METRICS:
+                value = row[metric]
+                record[metric] = round(float(value), rounding.get(metric, 2)) if np.isfinite(value) else 0.0
+            record["last_updated"] = timestamp
+            output[symbol] = record
+        return output
+
 class BISTPerformanceTracker:
     """BIST-100 hisselerinin performans metriklerini takip eder"""
     
@@ -29,6 +274,10 @@ class BISTPerformanceTracker:
         self.last_update = None
         self.update_interval = self.config.update_interval
         
+        # Tüm evren için panel motoru
+        self.panel = PerformancePanel(self.stocks)
+        self._update_lock = threading.Lock()
+        
     def get_stock_data(self, symbol: str, period: str = "1y") -> pd.DataFrame:
         """Hisse verisi al"""
         try:
@@ -142,44 +391,45 @@ class BISTPerformanceTracker:
         }
     
     def get_all_performance(self, force_update: bool = False) -> Dict:
-        """Tüm hisseler için performans metrikleri"""
+        """Tüm hisseler için performans metrikleri (panel motoru, artımlı yenileme)"""
         try:
-            # Cache kontrol
-            if not force_update and self.last_update and \
-               (datetime.now() - self.last_update).seconds < self.update_interval:
-                logger.info("✅ Cache'den performans verisi alınıyor")
-                return self.performance_cache
-            
-            logger.info(f"🚀 {len(self.stocks)} hisse için performans hesaplanıyor...")
-            
-            all_metrics = {}
-            for i, symbol in enumerate(self.stocks, 1):
-                logger.info(f"📊 {i}/{len(self.stocks)}: {symbol} analiz ediliyor...")
-                metrics = self.calculate_performance_metrics(symbol)
-                all_metrics[symbol] = metrics
+            # Eşzamanlı çağrılar tek yenilemeyi bekler ve onun önbelleğini kullanır
+            with self._update_lock:
+                # Cache kontrol
+                if not force_update and self.last_update and \
+                   (datetime.now() - self.last_update).total_seconds() < self.update_interval:
+                    logger.info("✅ Cache'den performans verisi alınıyor")
+                    return self.performance_cache
                 
-                # Progress bar
-                if i % 5 == 0:
-                    logger.info(f"✅ {i}/{len(self.stocks)} tamamlandı")
-            
-            # Cache'e kaydet
-            self.performance_cache = all_metrics
-            self.last_update = datetime.now()
-            
-            logger.info("✅ Tüm performans metrikleri hesaplandı")
-            return all_metrics
+                logger.info(f"🚀 {len(self.stocks)} hisse için performans hesaplanıyor (panel)...")
+                
+                recomputed = self.panel.refresh(force=force_update)
+                if recomputed or not self.performance_cache:
+                    all_metrics = self.panel.records()
+                    for symbol in self.stocks:
+                        if symbol not in all_metrics:
+                            all_metrics[symbol] = self._get_default_metrics(symbol)
+                    self.performance_cache = all_metrics
+                
+                self.last_update = datetime.now()
+                
+                logger.info("✅ Tüm performans metrikleri hesaplandı")
+                return self.performance_cache
             
         except Exception as e:
             logger.error(f"❌ Performans hesaplama hatası: {e}")
             return {}
     
     def get_top_performers(self, metric: str = "total_return", top_n: int = 10) -> List[Dict]:
-        """En iyi performans gösteren hisseler"""
+        """En iyi performans gösteren hisseler (önceden sıralanmış indeks üzerinden)"""
         try:
             performance = self.get_all_performance()
             if not performance:
                 return []
             
+            if metric in self.panel.sorted_index:
+                return [performance[symbol] for symbol in self.panel.top(metric, top_n) if symbol in performance]
+            
             # Metrik bazında sırala
             sorted_stocks = sorted(
                 performance.values(),
@@ -256,8 +506,44 @@ class BISTPerformanceTracker:
             logger.error(f"❌ CSV export hatası: {e}")
             return False
 
+def test_performance_panel():
+    """Panel metrikleri sembol bazlı hesapla aynı mı (kısa geçmişli ve boşluklu seriler dahil)"""
+    idx = pd.bdate_range("2024-01-01", periods=260)
+    rng = np.random.default_rng(7)
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(idx), 3)), axis=0)),
+                          index=idx, columns=["FULL.IS", "SHORT.IS", "GAP.IS"])
+    prices.iloc[:200, 1] = np.nan                            # geç listelenen hisse
+    prices.iloc[201, 1] = prices.iloc[200, 1] * 0.9          # ilk getirisi negatif
+    prices.iloc[[50, 51, 120], 2] = np.nan                   # askı / tatil boşlukları
+    prices["TWO.IS"] = np.nan
+    prices.iloc[-2:, 3] = [10.0, 10.5]                       # std tanımsız -> records'ta 0.0
+    
+    panel = PerformancePanel(list(prices.columns))
+    metrics = panel.compute_metrics(prices)
+    for symbol in ["FULL.IS", "SHORT.IS", "GAP.IS"]:
+        close = prices[symbol].dropna()
+        returns = close.pct_change().dropna()
+        cumulative = (1 + returns).cumprod()
+        max_drawdown = abs(((cumulative - cumulative.expanding().max()) / cumulative.expanding().max()).min()) * 100
+        total_return = close.iloc[-1] / close.iloc[0] - 1
+        calmar = (total_return * TRADING_DAYS) / max_drawdown
+        panel_row = metrics.loc[symbol]
+        ok = (np.isclose(panel_row["max_drawdown"], max_drawdown)
+              and np.isclose(panel_row["calmar_ratio"], calmar)
+              and np.isclose(panel_row["volatility"], returns.std() * np.sqrt(TRADING_DAYS) * 100))
+        print(f"{'✅' if ok else '❌'} {symbol}: max_drawdown {panel_row['max_drawdown']:.3f} "
+              f"(sembol bazlı {max_drawdown:.3f}), calmar {panel_row['calmar_ratio']:.3f} ({calmar:.3f})")
+    
+    panel.metrics = metrics
+    panel.sorted_index = {m: np.argsort(-panel._display_values(m), kind='stable') for m in PANEL_METRICS}
+    records = panel.records()
+    ranked = [records[s]["volatility"] for s in panel.top("volatility", len(records))]
+    print(f"{'✅' if ranked == sorted(ranked, reverse=True) else '❌'} Sıralama records() değerleriyle tutarlı: {ranked}")
+
 # Test fonksiyonu
 if __name__ == "__main__":
+    test_performance_panel()
+    
     tracker = BISTPerformanceTracker()
     
     # Test: İlk 5 hisse
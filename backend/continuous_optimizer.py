@@ -36,7 +36,10 @@ class ContinuousOptimizer:
         self._load_configuration()
         
         # Initialize AI modules
-        self.hyperopt = HyperparameterOptimizer()
+        hyperopt_settings = self.optimization_config.get('optimization_settings', {})
+        self.hyperopt = HyperparameterOptimizer(
+            n_jobs=self._resolve_workers(hyperopt_settings.get('hyperopt_workers', 'auto'))
+        )
         self.feature_engineer = AdvancedFeatureEngineer()
         self.advanced_ensemble = AdvancedEnsemble()
         self.ensemble_manager = AdvancedAIEnsembleManager()
@@ -69,6 +72,8 @@ class ContinuousOptimizer:
                         'performance_threshold': 0.85,
                         'improvement_threshold': 0.02,
                         'max_optimization_time_hours': 6,
+                        'hyperopt_time_budget_hours': 4,
+                        'hyperopt_workers': 'auto',
                         'backup_before_optimization': True
                     },
                     'notification_settings': {
@@ -93,6 +98,17 @@ class ContinuousOptimizer:
         except Exception as e:
             logger.error(f"❌ Failed to load optimization configuration: {e}")
     
+    @staticmethod
+    def _resolve_workers(value) -> int:
+        """hyperopt_workers ayarı: sayı ya da "auto" (çekirdek sayısı - 1)"""
+        if value in (None, 'auto'):
+            return max(1, (os.cpu_count() or 2) - 1)
+        try:
+            return max(1, int(value))
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Geçersiz hyperopt_workers değeri: {value}, auto kullanılıyor")
+            return max(1, (os.cpu_count() or 2) - 1)
+    
     def _start_optimization_scheduler(self):
         """Optimizasyon scheduler'ı başlat"""
         try:
@@ -237,8 +253,13 @@ class ContinuousOptimizer:
                 'status': 'running'
             }
             
-            # Run hyperparameter optimization
-            hyperopt_results = self.hyperopt.run_full_optimization()
+            # Run hyperparameter optimization within the weekly window
+            settings = self.optimization_config.get('optimization_settings', {})
+            budget_hours = settings.get('hyperopt_time_budget_hours',
+                                        settings.get('max_optimization_time_hours'))
+            hyperopt_results = self.hyperopt.run_full_optimization(
+                time_budget_seconds=budget_hours * 3600 if budget_hours else None
+            )
             
             # Compile results
             optimization_results = {
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Multi-Timeframe Bar Service for BIST AI Smart Trader
+En ince granülerlikte barları sembol başına bir kez çeker; 4h/1d/1wk gibi
+kaba barları yeni baz barlar geldikçe artımlı türetip önbellekte tutar
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# Zaman dilimi -> pandas resample kuralı
+TIMEFRAME_RULES = {
+    "1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min",
+    "1h": "1h", "60m": "1h", "4h": "4h", "1d": "1D", "1wk": "W-MON", "1mo": "MS",
+}
+
+# Sıralama / türetilebilirlik için yaklaşık süreler (saniye)
+TIMEFRAME_SECONDS = {
+    "1m": 60, "5m": 300, "15m": 900, "30m": 1800, "1h": 3600, "60m": 3600,
+    "4h": 14400, "1d": 86400, "1wk": 604800, "1mo": 2592000,
+}
+
+# yfinance'in interval başına verdiği en uzun geçmiş
+BASE_PERIODS = {"1m": "7d", "5m": "60d", "15m": "60d", "30m": "60d", "1h": "2y", "60m": "2y", "1d": "5y"}
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """OHLCV barlarını daha kaba zaman dilimine topla (sol etiketli, boş kovalar atılır)"""
+    rule = TIMEFRAME_RULES[timeframe]
+    bars = df.resample(rule, label='left', closed='left').agg(OHLCV_AGG)
+    return bars.dropna(subset=['Close'])
+
+
+@dataclass
+class SymbolBars:
+    """Sembol başına baz bar + türetilmiş zaman dilimleri"""
+    base: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    derived: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    last_fetch: Dict[str, float] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class MultiTimeframeBarService:
+    """Tek baz çekimden hizalı çoklu zaman dilimi bar görünümleri"""
+
+    def __init__(self, base_interval: str = "1h", refresh_seconds: int = 60,
+                 fetcher: Optional[Callable[..., pd.DataFrame]] = None):
+        self.base_interval = base_interval
+        self.refresh_seconds = refresh_seconds
+        self.fetcher = fetcher or self._fetch_yfinance
+        self._symbols: Dict[str, SymbolBars] = {}
+        self._lock = threading.Lock()
+        self.stats = {"fetches": 0, "incremental_fetches": 0, "cache_hits": 0, "derived_updates": 0}
+
+    # --- Veri kaynağı ---------------------------------------------------------
+
+    @staticmethod
+    def _fetch_yfinance(symbol: str, interval: str, period: Optional[str] = None,
+                        start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """yfinance'ten bar çek; başarısızsa yerel OHLCV deposuna düş"""
+        try:
+            import yfinance as yf
+            kwargs = {"start": start} if start is not None else {"period": period}
+            data = yf.Ticker(symbol).history(interval=interval, **kwargs)
+            if not data.empty:
+                return data
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol} {interval} bar çekme hatası: {e}")
+
+        try:
+            from core.ohlcv_store import ohlcv_store
+            return ohlcv_store.load(symbol, interval, start=start)
+        except Exception:
+            return pd.DataFrame()
+
+    def _base_for(self, timeframe: str) -> str:
+        """Zaman dilimi baz intervalden türetilebiliyorsa baz, değilse kendisi"""
+        if timeframe not in TIMEFRAME_RULES:
+            return timeframe
+        base_seconds = TIMEFRAME_SECONDS[self.base_interval]
+        if TIMEFRAME_SECONDS[timeframe] >= base_seconds and TIMEFRAME_SECONDS[timeframe] % base_seconds == 0:
+            return self.base_interval
+        return timeframe
+
+    def _entry(self, symbol: str) -> SymbolBars:
+        with self._lock:
+            return self._symbols.setdefault(symbol, SymbolBars())
+
+    # --- Güncelleme -----------------------------------------------------------
+
+    def _update_base(self, symbol: str, entry: SymbolBars, base: str,
+                     force: bool = False) -> Optional[pd.Timestamp]:
+        """
+        Baz barları güncelle
+
+        Returns:
+            Optional[pd.Timestamp]: Değişen ilk bar zamanı (değişiklik yoksa None)
+        """
+        existing = entry.base.get(base)
+        now = time.time()
+        if existing is not None and not force and now - entry.last_fetch.get(base, 0) < self.refresh_seconds:
+            self.stats["cache_hits"] += 1
+            return None
+
+        if existing is None or existing.empty:
+            fresh = self.fetcher(symbol, base, period=BASE_PERIODS.get(base, "2y"))
+            self.stats["fetches"] += 1
+        else:
+            # Son bar kısmi olabilir; ondan itibaren yeniden çek
+            fresh = self.fetcher(symbol, base, start=existing.index[-1])
+            self.stats["incremental_fetches"] += 1
+        entry.last_fetch[base] = now
+
+        if fresh is None or fresh.empty:
+            return None
+        if isinstance(fresh.columns, pd.MultiIndex):
+            fresh.columns = fresh.columns.get_level_values(0)
+        fresh = fresh[[c for c in OHLCV_AGG if c in fresh.columns]].sort_index()
+
+        if existing is None or existing.empty:
+            entry.base[base] = fresh
+            return fresh.index[0]
+
+        fresh = fresh[fresh.index >= existing.index[-1]]
+        if fresh.empty:
+            return None
+        combined = pd.concat([existing[existing.index < fresh.index[0]], fresh])
+        entry.base[base] = combined
+        return fresh.index[0]
+
+    def _update_derived(self, entry: SymbolBars, base: str, timeframe: str,
+                        changed_from: Optional[pd.Timestamp]):
+        """Türetilmiş barları değişen ilk kovadan itibaren yeniden topla"""
+        base_bars = entry.base.get(base)
+        if base_bars is None or base_bars.empty:
+            return
+        derived = entry.derived.get(timeframe)
+        if derived is None:
+            entry.derived[timeframe] = resample_ohlcv(base_bars, timeframe)
+            self.stats["derived_updates"] += 1
+            return
+        if changed_from is None:
+            return
+
+        # Değişen barın ait olduğu kovanın başlangıcı
+        bucket_start = resample_ohlcv(base_bars.loc[[changed_from]], timeframe).index[0]
+        tail = resample_ohlcv(base_bars[base_bars.index >= bucket_start], timeframe)
+        entry.derived[timeframe] = pd.concat([derived[derived.index < bucket_start], tail])
+        self.stats["derived_updates"] += 1
+
+    def _refresh(self, symbol: str, timeframes: Iterable[str], force: bool = False):
+        entry = self._entry(symbol)
+        with entry.lock:
+            by_base: Dict[str, list] = {}
+            for timeframe in timeframes:
+                by_base.setdefault(self._base_for(timeframe), []).append(timeframe)
+
+            for base, frames in by_base.items():
+                changed_from = self._update_base(symbol, entry, base, force)
+                # Baz değiştiyse bu bazdan türetilmiş önbellekteki tüm zaman dilimleri de güncellenir;
+                # yoksa bu çağrıda istenmeyenler bir sonraki okumada bayat kalır
+                cached = [tf for tf in entry.derived if self._base_for(tf) == base] if changed_from is not None else []
+                for timeframe in dict.fromkeys(frames + cached):
+                    if timeframe != base:
+                        self._update_derived(entry, base, timeframe, changed_from)
+        return entry
+
+    # --- Okuma ----------------------------------------------------------------
+
+    def _view(self, entry: SymbolBars, timeframe: str) -> pd.DataFrame:
+        base = self._base_for(timeframe)
+        frame = entry.base.get(base) if timeframe == base else entry.derived.get(timeframe)
+        return frame if frame is not None else pd.DataFrame()
+
+    def get_bars(self, symbol: str, timeframe: str, force: bool = False) -> pd.DataFrame:
+        """
+        Sembolün istenen zaman dilimindeki barları
+
+        Args:
+            symbol: Hisse sembolü
+            timeframe: "15m", "1h", "4h", "1d" ...
+            force: Yenileme süresini beklemeden güncelle
+
+        Returns:
+            pd.DataFrame: OHLCV barları (kopya)
+        """
+        entry = self._refresh(symbol, [timeframe], force)
+        return self._view(entry, timeframe).copy()
+
+    def get_aligned(self, symbol: str, timeframes: Iterable[str],
+                    force: bool = False) -> Dict[str, pd.DataFrame]:
+        """
+        Tüm zaman dilimlerini tek güncellemeyle ve aynı son bar zamanına hizalı döndür
+
+        Args:
+            symbol: Hisse sembolü
+            timeframes: Zaman dilimleri
+            force: Yenileme süresini beklemeden güncelle
+
+        Returns:
+            Dict[str, pd.DataFrame]: Zaman dilimi -> OHLCV barları
+        """
+        timeframes = list(dict.fromkeys(timeframes))
+        entry = self._refresh(symbol, timeframes, force)
+
+        with entry.lock:
+            views = {tf: self._view(entry, tf) for tf in timeframes}
+            ends = [entry.base[b].index[-1] for b in {self._base_for(tf) for tf in timeframes}
+                    if b in entry.base and not entry.base[b].empty]
+
+        if not ends:
+            return {tf: pd.DataFrame() for tf in timeframes}
+        common_end = min(ends)
+        return {tf: view[view.index <= common_end].copy() if not view.empty else view
+                for tf, view in views.items()}
+
+    def last_bar_time(self, symbol: str, timeframe: Optional[str] = None) -> Optional[pd.Timestamp]:
+        """
+        Sembolün son bar zamanı (barları kopyalamadan)
+
+        Args:
+            symbol: Hisse sembolü
+            timeframe: Zaman dilimi (varsayılan: baz interval)
+
+        Returns:
+            Optional[pd.Timestamp]: Son bar zamanı; veri yoksa None
+        """
+        timeframe = timeframe or self.base_interval
+        entry = self._refresh(symbol, [timeframe])
+        with entry.lock:
+            frame = self._view(entry, timeframe)
+            return frame.index[-1] if not frame.empty else None
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Önbelleği temizle"""
+        with self._lock:
+            if symbol is None:
+                self._symbols.clear()
+            else:
+                self._symbols.pop(symbol, None)
+
+
+# Global bar service instance
+bar_service = MultiTimeframeBarService()
+
+
+def test_bar_service():
+    """Bar service test fonksiyonu"""
+    import numpy as np
+
+    print("🧪 Multi-Timeframe Bar Service Test")
+    print("=" * 50)
+
+    idx = pd.date_range("2024-01-01 10:00", periods=24 * 200, freq="h", tz="Europe/Istanbul")
+    rng = np.random.default_rng(3)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.003, len(idx)))), index=idx)
+    full = pd.DataFrame({"Open": close.shift(1).bfill(), "High": close * 1.002, "Low": close * 0.998,
+                         "Close": close, "Volume": rng.integers(1000, 5000, len(idx))}, index=idx)
+    visible = {"n": len(idx) - 30}
+
+    def fake_fetch(symbol, interval, period=None, start=None):
+        data = full.iloc[:visible["n"]]
+        return data[data.index >= start] if start is not None else data
+
+    service = MultiTimeframeBarService(refresh_seconds=0, fetcher=fake_fetch)
+    service.get_aligned("TEST.IS", ["1h", "4h", "1d"])
+    visible["n"] = len(idx)
+    views = service.get_aligned("TEST.IS", ["1h", "4h", "1d"])
+
+    for tf, bars in views.items():
+        expected = full if tf == "1h" else resample_ohlcv(full, tf)
+        print(f"✅ {tf}: {len(bars)} bar, tam yeniden örnekleme ile aynı: {bars.equals(expected.astype(bars.dtypes))}")
+    print(f"📊 İstatistikler: {service.stats}")
+
+    # Karışık sıra: 4h okunur, baz yalnızca 1h okunurken ilerler, sonra 4h tekrar okunur
+    visible["n"] = len(idx) - 30
+    mixed = MultiTimeframeBarService(refresh_seconds=0, fetcher=fake_fetch)
+    mixed.get_bars("TEST.IS", "4h")
+    visible["n"] = len(idx)
+    mixed.get_bars("TEST.IS", "1h")
+    bars = mixed.get_bars("TEST.IS", "4h")
+    expected = resample_ohlcv(full, "4h")
+    print(f"✅ 4h -> 1h -> 4h: {len(bars)} bar, tam yeniden örnekleme ile aynı: "
+          f"{bars.equals(expected.astype(bars.dtypes))}")
+
+
+if __name__ == "__main__":
+    test_bar_service()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Chart Rendering Utilities for BIST AI Smart Trader
+Piksel genişliğine göre seyreltme (LTTB / min-max / OHLC kova), Agg tabanlı
+render önbelleği (ETag destekli) ve dashboard panelleri için paralel render
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, is_dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import matplotlib
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+logger = logging.getLogger(__name__)
+
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf", "jpg": "image/jpeg"}
+
+# pyplot durum makinesi thread-safe değil; süreç içi render'lar sıralanır
+_PYPLOT_LOCK = threading.Lock()
+
+
+# --- Seyreltme ------------------------------------------------------------------
+
+def _as_float_x(x) -> np.ndarray:
+    if isinstance(x, pd.DatetimeIndex):
+        return x.asi8.astype(np.float64)
+    return np.asarray(x, dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets ile korunacak nokta indeksleri
+
+    Args:
+        x: X değerleri (sayısal veya DatetimeIndex)
+        y: Y değerleri (NaN içermemeli)
+        n_out: Hedef nokta sayısı
+
+    Returns:
+        np.ndarray: Artan sıralı indeksler (ilk ve son nokta dahil)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _as_float_x(x)
+    y = np.asarray(y, dtype=np.float64)
+    # Orta noktalar n_out - 2 kovaya bölünür; ilk ve son nokta sabit
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_buckets: int) -> np.ndarray:
+    """
+    Her kovanın min ve max noktasını koruyan indeksler (çubuk/histogram için)
+
+    Args:
+        y: Y değerleri (NaN içermemeli)
+        n_buckets: Kova sayısı (çıktı en fazla 2 * n_buckets nokta)
+
+    Returns:
+        np.ndarray: Artan sıralı, tekil indeksler
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_buckets <= 0 or 2 * n_buckets >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.int64)
+    keep = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            chunk = y[start:end]
+            keep.extend((start + int(np.argmin(chunk)), start + int(np.argmax(chunk))))
+    return np.unique(keep)
+
+
+def downsample_series(series: pd.Series, max_points: Optional[int],
+                      method: str = "lttb") -> pd.Series:
+    """
+    Çizgi/çubuk serisini hedef nokta sayısına seyrelt
+
+    Args:
+        series: Seri (NaN ısınma bölgesi atılır)
+        max_points: Hedef nokta sayısı (None: seyreltme yok)
+        method: "lttb" veya "minmax"
+
+    Returns:
+        pd.Series: Seyreltilmiş seri
+    """
+    series = series.dropna()
+    if not max_points or len(series) <= max_points:
+        return series
+    if method == "minmax":
+        idx = minmax_indices(series.values, max_points // 2)
+    else:
+        idx = lttb_indices(series.index, series.values, max_points)
+    return series.iloc[idx]
+
+
+def ohlcv_buckets(n: int, max_bars: Optional[int]) -> np.ndarray:
+    """n barı en fazla max_bars ardışık kovaya eşleyen kova numaraları"""
+    if not max_bars or n <= max_bars:
+        return np.arange(n)
+    return np.arange(n) * max_bars // n
+
+
+def downsample_ohlcv(data: pd.DataFrame, max_bars: Optional[int] = None,
+                     buckets: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    OHLCV barlarını ardışık kovalarda birleştir (mum gövdesi/fitili korunur)
+
+    Args:
+        data: OHLCV verisi
+        max_bars: Hedef bar sayısı
+        buckets: Hazır kova numaraları (verilirse max_bars yok sayılır)
+
+    Returns:
+        pd.DataFrame: Birleştirilmiş barlar (indeks: kovanın son zamanı)
+    """
+    if buckets is None:
+        buckets = ohlcv_buckets(len(data), max_bars)
+    if len(buckets) == 0 or buckets[-1] == len(data) - 1:
+        return data
+
+    agg = {col: OHLCV_AGG.get(col, 'last') for col in data.columns}
+    bars = data.groupby(buckets).agg(agg)
+    bars.index = data.index[np.r_[np.flatnonzero(np.diff(buckets)), len(buckets) - 1]]
+    return bars
+
+
+def downsample_rows(data: pd.DataFrame, max_rows: Optional[int], agg: str = "mean") -> pd.DataFrame:
+    """
+    Zaman eksenli tabloyu (ısı haritası) ardışık satır kovalarında topla
+
+    Args:
+        data: Satırları zaman olan tablo
+        max_rows: Hedef satır sayısı
+        agg: Kova toplama fonksiyonu ("mean", "max" ...)
+
+    Returns:
+        pd.DataFrame: Seyreltilmiş tablo (indeks: kovanın ilk zamanı)
+    """
+    if not max_rows or len(data) <= max_rows:
+        return data
+    buckets = ohlcv_buckets(len(data), max_rows)
+    rows = data.groupby(buckets).agg(agg)
+    rows.index = data.index[np.r_[0, np.flatnonzero(np.diff(buckets)) + 1]]
+    return rows
+
+
+# --- Parmak izi -----------------------------------------------------------------
+
+def _update_digest(h, obj: Any):
+    if isinstance(obj, pd.DataFrame):
+        h.update(b"df")
+        h.update(repr((list(obj.columns), [str(t) for t in obj.dtypes])).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(b"series")
+        h.update(repr((obj.name, str(obj.dtype))).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).values.tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"nd{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        h.update(type(obj).__qualname__.encode())
+        _update_digest(h, {f: getattr(obj, f) for f in obj.__dataclass_fields__})
+    elif isinstance(obj, dict):
+        h.update(b"dict")
+        for key in sorted(obj, key=repr):
+            _update_digest(h, key)
+            _update_digest(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"seq{len(obj)}".encode())
+        for item in obj:
+            _update_digest(h, item)
+    elif isinstance(obj, type):
+        h.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+    else:
+        h.update(repr(obj).encode())
+
+
+def fingerprint(*objs: Any) -> str:
+    """Veri + konfigürasyon içerik özeti (blake2b)"""
+    h = hashlib.blake2b(digest_size=16)
+    for obj in objs:
+        _update_digest(h, obj)
+    return h.hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], key: str) -> bool:
+    """If-None-Match başlığı bu render anahtarıyla eşleşiyor mu"""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/").strip('"') == key for t in tags)
+
+
+# --- Render ---------------------------------------------------------------------
+
+@dataclass
+class RenderTask:
+    """Bir grafik metodunun render çağrısı (süreçler arası taşınabilir)"""
+    owner_cls: type
+    method: str
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    owner_kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RenderedChart:
+    """Render edilmiş grafik"""
+    key: str
+    content: bytes
+    media_type: str
+    not_modified: bool = False
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.key}"'
+
+
+def figure_bytes(fig: plt.Figure, fmt: str = "png", dpi: int = 100) -> bytes:
+    """Figürü Agg tuvaliyle kodla ve kapat"""
+    try:
+        FigureCanvasAgg(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def _init_render_worker():
+    matplotlib.use("Agg")
+
+
+def _render_task_bytes(task: RenderTask, fmt: str, dpi: int, owner: Any = None) -> bytes:
+    owner = owner if owner is not None else task.owner_cls(**task.owner_kwargs)
+    fig = getattr(owner, task.method)(*task.args, **task.kwargs)
+    return figure_bytes(fig, fmt, dpi)
+
+
+class RenderCache:
+    """(veri parmak izi, grafik konfigürasyonu) anahtarlı LRU render önbelleği"""
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "parallel_renders": 0}
+
+    @staticmethod
+    def task_key(task: RenderTask, fmt: str, dpi: int) -> str:
+        return fingerprint(task.owner_cls, task.owner_kwargs, task.method,
+                           task.args, task.kwargs, fmt, dpi)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def _put(self, key: str, content: bytes):
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = content
+            self._size += len(content)
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def render(self, task: RenderTask, fmt: str = "png", dpi: int = 100,
+               if_none_match: Optional[str] = None, owner: Any = None) -> RenderedChart:
+        """
+        Grafiği önbellekten ver ya da render et
+
+        Args:
+            task: Render çağrısı
+            fmt: Görüntü formatı
+            dpi: Çözünürlük
+            if_none_match: İstemcinin ETag'i (eşleşirse içerik gönderilmez)
+            owner: Hazır grafik nesnesi (yoksa task.owner_cls ile oluşturulur)
+
+        Returns:
+            RenderedChart: Görüntü baytları + ETag
+        """
+        key = self.task_key(task, fmt, dpi)
+        media_type = MEDIA_TYPES.get(fmt, "application/octet-stream")
+        if etag_matches(if_none_match, key):
+            self.stats["not_modified"] += 1
+            return RenderedChart(key, b"", media_type, not_modified=True)
+
+        content = self._get(key)
+        if content is not None:
+            self.stats["hits"] += 1
+            return RenderedChart(key, content, media_type)
+
+        self.stats["misses"] += 1
+        with _PYPLOT_LOCK:
+            content = _render_task_bytes(task, fmt, dpi, owner)
+        self._put(key, content)
+        return RenderedChart(key, content, media_type)
+
+    def render_many(self, tasks: Sequence[RenderTask], fmt: str = "png", dpi: int = 100,
+                    max_workers: Optional[int] = None) -> List[RenderedChart]:
+        """
+        Dashboard panellerini render et; önbellekte olmayanlar süreç havuzunda paralel
+
+        Args:
+            tasks: Render çağrıları
+            fmt: Görüntü formatı
+            dpi: Çözünürlük
+            max_workers: Süreç sayısı (varsayılan: CPU sayısı)
+
+        Returns:
+            List[RenderedChart]: Görevlerle aynı sırada render sonuçları
+        """
+        media_type = MEDIA_TYPES.get(fmt, "application/octet-stream")
+        keys = [self.task_key(task, fmt, dpi) for task in tasks]
+        results: Dict[str, bytes] = {}
+        pending: Dict[str, RenderTask] = {}
+        for key, task in zip(keys, tasks):
+            content = self._get(key)
+            if content is not None:
+                self.stats["hits"] += 1
+                results[key] = content
+            elif key not in pending:
+                pending[key] = task
+
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker) as pool:
+                    futures = {key: pool.submit(_render_task_bytes, task, fmt, dpi)
+                               for key, task in pending.items()}
+                    for key, future in futures.items():
+                        results[key] = future.result()
+                self.stats["parallel_renders"] += len(pending)
+            except Exception as e:
+                logger.warning(f"⚠️ Paralel render başarısız, sıralı devam ediliyor: {e}")
+
+        for key, task in pending.items():
+            if key not in results:
+                with _PYPLOT_LOCK:
+                    results[key] = _render_task_bytes(task, fmt, dpi)
+            self.stats["misses"] += 1
+            self._put(key, results[key])
+
+        return [RenderedChart(key, results[key], media_type) for key in keys]
+
+    def clear(self):
+        """Önbelleği temizle"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Global render cache instance
+render_cache = RenderCache()
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Feature DAG for BIST AI Smart Trader
+İndikatörleri isimli, parametreli ve bağımlılıklı düğümler olarak tanımlar;
+(sembol, interval, bar aralığı) başına bir kez hesaplayıp memoize eder
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# ("rsi", {"window": 14}) veya sadece "obv"
+FeatureSpec = Union[str, Tuple[str, Dict]]
+
+
+@dataclass
+class FeatureNode:
+    """DAG düğümü: hesap fonksiyonu, varsayılan parametreler ve bağımlı düğümler"""
+    name: str
+    func: Callable
+    defaults: Dict = field(default_factory=dict)
+    deps: Tuple[str, ...] = ()
+    description: str = ""
+
+
+FEATURE_NODES: Dict[str, FeatureNode] = {}
+
+
+def feature_node(name: str, deps: Iterable[str] = (), **defaults):
+    """Düğüm kaydı için dekoratör; fonksiyon (ctx, **params) -> pd.Series imzasında olmalı"""
+    def decorator(func: Callable) -> Callable:
+        FEATURE_NODES[name] = FeatureNode(name, func, defaults, tuple(deps),
+                                          (func.__doc__ or "").strip())
+        return func
+    return decorator
+
+
+def _feature_key(name: str, params: Dict) -> Tuple:
+    node = FEATURE_NODES.get(name)
+    if node is None:
+        raise KeyError(f"Bilinmeyen feature: {name}")
+    unknown = set(params) - set(node.defaults)
+    if unknown:
+        raise TypeError(f"{name} için geçersiz parametre(ler): {sorted(unknown)}")
+    merged = {**node.defaults, **params}
+    return (name, tuple(sorted(merged.items())))
+
+
+def _normalize_ohlcv(data: pd.DataFrame) -> pd.DataFrame:
+    """'close' / 'Close' gibi kolon adlarını OHLCV standardına çevir"""
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.copy()
+        data.columns = data.columns.get_level_values(0)
+    lookup = {str(c).lower(): c for c in data.columns}
+    columns = {col: data[lookup[col.lower()]].astype(float)
+               for col in OHLCV_COLUMNS if col.lower() in lookup}
+    return pd.DataFrame(columns, index=data.index)
+
+
+class FeatureContext:
+    """Tek bir bar serisi için memoize edilmiş feature değerlendirici"""
+
+    def __init__(self, data: pd.DataFrame, key: Optional[Tuple] = None):
+        self.data = _normalize_ohlcv(data)
+        self.key = key
+        self._memo: Dict[Tuple, pd.Series] = {}
+        self._evaluating = set()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, **params) -> pd.Series:
+        """Düğümü (ve bağımlılıklarını) hesapla; daha önce hesaplandıysa memodan döndür"""
+        key = _feature_key(name, params)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            if key in self._evaluating:
+                raise RecursionError(f"Feature DAG döngüsü: {name}")
+
+            self.misses += 1
+            self._evaluating.add(key)
+            try:
+                value = FEATURE_NODES[name].func(self, **dict(key[1]))
+            finally:
+                self._evaluating.discard(key)
+            self._memo[key] = value
+            return value
+
+    def frame(self, specs: Mapping[str, FeatureSpec]) -> pd.DataFrame:
+        """{kolon_adı: spec} eşlemesinden DataFrame üret"""
+        columns = {}
+        for column, spec in specs.items():
+            name, params = (spec, {}) if isinstance(spec, str) else spec
+            columns[column] = self.get(name, **params)
+        return pd.DataFrame(columns, index=self.data.index)
+
+    def stats(self) -> Dict:
+        return {"nodes": len(self._memo), "hits": self.hits, "misses": self.misses}
+
+
+class FeatureStore:
+    """(sembol, interval, bar aralığı, içerik özeti) anahtarlı LRU FeatureContext deposu"""
+
+    def __init__(self, max_contexts: int = 256):
+        self.max_contexts = max_contexts
+        self._contexts: "OrderedDict[Tuple, FeatureContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _data_key(data: pd.DataFrame, symbol: Optional[str], interval: str) -> Tuple:
+        ohlcv = _normalize_ohlcv(data)
+        digest = hashlib.blake2b(np.ascontiguousarray(ohlcv.to_numpy(dtype=np.float64)).tobytes(),
+                                 digest_size=16).hexdigest()
+        start = ohlcv.index[0] if len(ohlcv) else None
+        end = ohlcv.index[-1] if len(ohlcv) else None
+        return (symbol, interval, start, end, len(ohlcv), digest)
+
+    def context(self, data: pd.DataFrame, symbol: Optional[str] = None,
+                interval: str = "1d") -> FeatureContext:
+        """Aynı barlar için aynı context'i döndür (istek boyunca tek hesap)"""
+        key = self._data_key(data, symbol, interval)
+        with self._lock:
+            ctx = self._contexts.get(key)
+            if ctx is not None:
+                self._contexts.move_to_end(key)
+                return ctx
+            ctx = FeatureContext(data, key)
+            self._contexts[key] = ctx
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+            return ctx
+
+    def clear(self):
+        with self._lock:
+            self._contexts.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            contexts = list(self._contexts.values())
+        return {
+            "contexts": len(contexts),
+            "nodes": sum(len(c._memo) for c in contexts),
+            "hits": sum(c.hits for c in contexts),
+            "misses": sum(c.misses for c in contexts),
+        }
+
+
+# Global feature store instance
+feature_store = FeatureStore()
+
+
+def compute_features(data: pd.DataFrame, specs: Mapping[str, FeatureSpec],
+                     symbol: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
+    """
+    İstenen feature'ları isimle hesapla (paylaşılan memo üzerinden)
+
+    Args:
+        data: OHLCV barları
+        specs: {kolon_adı: "obv" | ("rsi", {"window": 14})}
+        symbol: Sembol (opsiyonel, anahtar için)
+        interval: Bar aralığı
+
+    Returns:
+        pd.DataFrame: Feature kolonları
+    """
+    return feature_store.context(data, symbol, interval).frame(specs)
+
+
+# --- Kaynak kolonlar ---------------------------------------------------------
+
+def _column(ctx: FeatureContext, name: str) -> pd.Series:
+    column = name.capitalize()
+    if column not in ctx.data.columns:
+        raise KeyError(f"OHLCV kolonu yok: {column}")
+    return ctx.data[column]
+
+
+for _col in OHLCV_COLUMNS:
+    feature_node(_col.lower())(lambda ctx, _c=_col: _column(ctx, _c))
+
+
+# --- Getiri / hareketli ortalamalar -------------------------------------------
+
+@feature_node("returns", deps=("close",), periods=1)
+def _returns(ctx, periods):
+    """Yüzde getiri"""
+    return ctx.get("close").pct_change(periods)
+
+
+@feature_node("log_returns", deps=("close",))
+def _log_returns(ctx):
+    """Log getiri"""
+    close = ctx.get("close")
+    return np.log(close / close.shift(1))
+
+
+@feature_node("sma", window=20, source="close")
+def _sma(ctx, window, source):
+    """Basit hareketli ortalama"""
+    return ctx.get(source).rolling(window).mean()
+
+
+@feature_node("ema", span=20, source="close")
+def _ema(ctx, span, source):
+    """Pandas ewm(span) EMA (adjust=True)"""
+    return ctx.get(source).ewm(span=span).mean()
+
+
+@feature_node("ema_ta", window=20, source="close")
+def _ema_ta(ctx, window, source):
+    """ta kütüphanesi ile aynı EMA (adjust=False, min_periods=window)"""
+    return ctx.get(source).ewm(span=window, min_periods=window, adjust=False).mean()
+
+
+@feature_node("rolling_std", window=20, source="close", ddof=1)
+def _rolling_std(ctx, window, source, ddof):
+    """Hareketli standart sapma"""
+    return ctx.get(source).rolling(window).std(ddof=ddof)
+
+
+@feature_node("rolling_max", window=20, source="high")
+def _rolling_max(ctx, window, source):
+    return ctx.get(source).rolling(window).max()
+
+
+@feature_node("rolling_min", window=20, source="low")
+def _rolling_min(ctx, window, source):
+    return ctx.get(source).rolling(window).min()
+
+
+# --- Momentum -----------------------------------------------------------------
+
+@feature_node("price_diff", deps=("close",))
+def _price_diff(ctx):
+    return ctx.get("close").diff()
+
+
+@feature_node("rsi", deps=("price_diff",), window=14)
+def _rsi(ctx, window):
+    """Basit ortalamalı RSI (robot/backtest/LSTM tanımı)"""
+    delta = ctx.get("price_diff")
+    gain = delta.where(delta > 0, 0).rolling(window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+@feature_node("rsi_wilder", deps=("price_diff",), window=14)
+def _rsi_wilder(ctx, window):
+    """Wilder RSI (ta.momentum.rsi ile aynı)"""
+    delta = ctx.get("price_diff")
+    up = delta.where(delta > 0, 0.0).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    down = (-delta.where(delta < 0, 0.0)).ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+    return pd.Series(np.where(down == 0, 100, 100 - (100 / (1 + up / down))), index=delta.index)
+
+
+@feature_node("macd", fast=12, slow=26, ema="ema")
+def _macd(ctx, fast, slow, ema):
+    """MACD çizgisi; ema='ema_ta' ta kütüphanesi tanımını kullanır"""
+    key = "span" if ema == "ema" else "window"
+    return ctx.get(ema, **{key: fast}) - ctx.get(ema, **{key: slow})
+
+
+@feature_node("macd_signal", deps=("macd",), fast=12, slow=26, signal=9, ema="ema")
+def _macd_signal(ctx, fast, slow, signal, ema):
+    macd = ctx.get("macd", fast=fast, slow=slow, ema=ema)
+    if ema == "ema":
+        return macd.ewm(span=signal).mean()
+    return macd.ewm(span=signal, min_periods=signal, adjust=False).mean()
+
+
+@feature_node("macd_hist", deps=("macd", "macd_signal"), fast=12, slow=26, signal=9, ema="ema")
+def _macd_hist(ctx, fast, slow, signal, ema):
+    return (ctx.get("macd", fast=fast, slow=slow, ema=ema)
+            - ctx.get("macd_signal", fast=fast, slow=slow, signal=signal, ema=ema))
+
+
+@feature_node("stoch_k", deps=("rolling_min", "rolling_max"), window=14)
+def _stoch_k(ctx, window):
+    lowest = ctx.get("rolling_min", window=window, source="low")
+    highest = ctx.get("rolling_max", window=window, source="high")
+    return 100 * ((ctx.get("close") - lowest) / (highest - lowest))
+
+
+@feature_node("stoch_d", deps=("stoch_k",), window=14, smooth=3)
+def _stoch_d(ctx, window, smooth):
+    return ctx.get("stoch_k", window=window).rolling(smooth).mean()
+
+
+@feature_node("williams_r", deps=("rolling_min", "rolling_max"), window=14)
+def _williams_r(ctx, window):
+    highest = ctx.get("rolling_max", window=window, source="high")
+    lowest = ctx.get("rolling_min", window=window, source="low")
+    return -100 * ((highest - ctx.get("close")) / (highest - lowest))
+
+
+# --- Volatilite ---------------------------------------------------------------
+
+@feature_node("bb_middle", deps=("sma",), window=20)
+def _bb_middle(ctx, window):
+    return ctx.get("sma", window=window)
+
+
+@feature_node("bb_upper", deps=("sma", "rolling_std"), window=20, k=2.0, ddof=1)
+def _bb_upper(ctx, window, k, ddof):
+    return ctx.get("sma", window=window) + ctx.get("rolling_std", window=window, ddof=ddof) * k
+
+
+@feature_node("bb_lower", deps=("sma", "rolling_std"), window=20, k=2.0, ddof=1)
+def _bb_lower(ctx, window, k, ddof):
+    return ctx.get("sma", window=window) - ctx.get("rolling_std", window=window, ddof=ddof) * k
+
+
+@feature_node("bb_width", deps=("bb_upper", "bb_lower"), window=20, k=2.0, ddof=1)
+def _bb_width(ctx, window, k, ddof):
+    upper = ctx.get("bb_upper", window=window, k=k, ddof=ddof)
+    lower = ctx.get("bb_lower", window=window, k=k, ddof=ddof)
+    return (upper - lower) / ctx.get("sma", window=window)
+
+
+@feature_node("bb_position", deps=("bb_upper", "bb_lower"), window=20, k=2.0, ddof=1)
+def _bb_position(ctx, window, k, ddof):
+    upper = ctx.get("bb_upper", window=window, k=k, ddof=ddof)
+    lower = ctx.get("bb_lower", window=window, k=k, ddof=ddof)
+    return (ctx.get("close") - lower) / (upper - lower)
+
+
+@feature_node("true_range", deps=("high", "low", "close"))
+def _true_range(ctx):
+    prev_close = ctx.get("close").shift()
+    high, low = ctx.get("high"), ctx.get("low")
+    return pd.concat([high - low, (high - prev_close).abs(), (low - prev_close).abs()], axis=1).max(axis=1)
+
+
+@feature_node("atr", deps=("true_range",), window=14)
+def _atr(ctx, window):
+    """Basit ortalamalı ATR"""
+    return ctx.get("true_range").rolling(window).mean()
+
+
+@feature_node("atr_wilder", deps=("true_range",), window=14)
+def _atr_wilder(ctx, window):
+    """Wilder ATR (ta.volatility.average_true_range ile aynı, ilk window-1 bar 0)"""
+    tr = ctx.get("true_range").to_numpy()
+    atr = np.zeros(len(tr))
+    if len(tr) >= window:
+        seed = tr[:window].mean()
+        atr[window - 1] = seed
+        if len(tr) > window:
+            atr[window:], _ = lfilter([1.0 / window], [1.0, -(window - 1) / window], tr[window:],
+                                      zi=[seed * (window - 1) / window])
+    return pd.Series(atr, index=ctx.data.index)
+
+
+@feature_node("cci", deps=("typical_price",), window=20)
+def _cci(ctx, window):
+    typical = ctx.get("typical_price")
+    mad = typical.rolling(window).apply(lambda x: np.mean(np.abs(x - x.mean())), raw=True)
+    return (typical - typical.rolling(window).mean()) / (0.015 * mad)
+
+
+@feature_node("trend_strength", deps=("price_diff",), window=14)
+def _trend_strength(ctx, window):
+    """Basitleştirilmiş ADX: fiyat farkı oynaklığı / fiyat"""
+    return 100 * (ctx.get("price_diff").rolling(window).std() / ctx.get("close"))
+
+
+# --- Hacim --------------------------------------------------------------------
+
+@feature_node("volume_ratio", deps=("volume", "sma"), window=20)
+def _volume_ratio(ctx, window):
+    return ctx.get("volume") / ctx.get("sma", window=window, source="volume")
+
+
+@feature_node("typical_price", deps=("high", "low", "close"))
+def _typical_price(ctx):
+    return (ctx.get("high") + ctx.get("low") + ctx.get("close")) / 3
+
+
+@feature_node("vwap", deps=("typical_price", "volume"), window=14)
+def _vwap(ctx, window):
+    """Hareketli VWAP (ta tanımı)"""
+    volume = ctx.get("volume")
+    return (ctx.get("typical_price") * volume).rolling(window).sum() / volume.rolling(window).sum()
+
+
+@feature_node("obv", deps=("close", "volume"))
+def _obv(ctx):
+    """On Balance Volume (ta tanımı)"""
+    close, volume = ctx.get("close"), ctx.get("volume")
+    return pd.Series(np.where(close < close.shift(1), -volume, volume), index=close.index).cumsum()
+
+
+def test_feature_dag():
+    """Feature DAG test fonksiyonu"""
+    print("🧪 Feature DAG Test")
+    print("=" * 50)
+
+    rng = np.random.default_rng(7)
+    idx = pd.date_range("2023-01-01", periods=500, freq="B")
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(idx)))), index=idx)
+    data = pd.DataFrame({"Open": close.shift(1).bfill(), "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.integers(1e5, 1e6, len(idx))}, index=idx)
+
+    store = FeatureStore()
+    ctx = store.context(data, "TEST.IS")
+    ctx.frame({"rsi": ("rsi", {"window": 14}), "macd_hist": "macd_hist", "bb_position": "bb_position"})
+    before = ctx.stats()
+    # İkinci tüketici aynı düğümleri yeniden hesaplamaz
+    same = store.context(data.copy(), "TEST.IS")
+    same.frame({"RSI": ("rsi", {"window": 14}), "MACD": "macd", "ATR": "atr_wilder"})
+
+    print(f"✅ Aynı context: {same is ctx}")
+    print(f"📊 İlk istek: {before}")
+    print(f"📊 İkinci istek sonrası: {ctx.stats()}")
+    print(f"📊 Kayıtlı düğüm sayısı: {len(FEATURE_NODES)}")
+
+
+if __name__ == "__main__":
+    test_feature_dag()
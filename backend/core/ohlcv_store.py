@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Local OHLCV Store for BIST AI Smart Trader
+Symbol/interval bazında parquet dosyalarında OHLCV bar saklar
+"""
+
+import os
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+class OHLCVStore:
+    """data/ohlcv/{interval}/{SYMBOL}.parquet düzeninde yerel bar deposu"""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv("OHLCV_STORE_DIR", "data/ohlcv")
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, interval, f"{symbol.upper()}.parquet")
+
+    def has(self, symbol: str, interval: str = "1d") -> bool:
+        return os.path.exists(self._path(symbol, interval))
+
+    def symbols(self, interval: str = "1d") -> List[str]:
+        """Depoda verisi olan semboller"""
+        directory = os.path.join(self.root, interval)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name[:-len(".parquet")] for name in os.listdir(directory)
+                      if name.endswith(".parquet"))
+
+    def load(self, symbol: str, interval: str = "1d",
+             start: Optional[datetime] = None, end: Optional[datetime] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Sembolün barlarını yükle (yoksa boş DataFrame)"""
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=columns or OHLCV_COLUMNS)
+
+        try:
+            df = pd.read_parquet(path, columns=columns)
+        except Exception as e:
+            logger.error(f"❌ OHLCV okuma hatası {symbol} {interval}: {e}")
+            return pd.DataFrame(columns=columns or OHLCV_COLUMNS)
+
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+    def load_many(self, symbols: Iterable[str], interval: str = "1d",
+                  start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, pd.DataFrame]:
+        """Birden fazla sembolü yükle, boş olanları atla"""
+        frames = {}
+        for symbol in symbols:
+            df = self.load(symbol, interval, start, end)
+            if not df.empty:
+                frames[symbol] = df
+        return frames
+
+    def save(self, symbol: str, df: pd.DataFrame, interval: str = "1d"):
+        """Sembolün tüm barlarını yaz (üzerine yazar)"""
+        path = self._path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].sort_index()
+        df.to_parquet(path)
+
+    def append(self, symbol: str, df: pd.DataFrame, interval: str = "1d") -> int:
+        """Yeni barları ekle; aynı timestamp'lerde yeni veri kazanır. Eklenen bar sayısını döndürür"""
+        if df is None or df.empty:
+            return 0
+        existing = self.load(symbol, interval)
+        if existing.empty:
+            self.save(symbol, df, interval)
+            return len(df)
+
+        combined = pd.concat([existing, df])
+        combined = combined[~combined.index.duplicated(keep='last')]
+        self.save(symbol, combined, interval)
+        return len(combined) - len(existing)
+
+    def fetch(self, symbol: str, interval: str = "1d", period: str = "2y",
+              refresh: bool = False) -> pd.DataFrame:
+        """Depodan oku; yoksa (veya refresh) yfinance'ten indirip depoya ekle"""
+        if not refresh and self.has(symbol, interval):
+            return self.load(symbol, interval)
+
+        try:
+            import yfinance as yf
+            df = yf.download(symbol, period=period, interval=interval,
+                             auto_adjust=True, progress=False)
+            if isinstance(df.columns, pd.MultiIndex):
+                df.columns = df.columns.get_level_values(0)
+            df = df.dropna()
+            if df.index.tz is not None:
+                df.index = df.index.tz_convert(None)
+            self.append(symbol, df, interval)
+        except Exception as e:
+            logger.error(f"❌ OHLCV indirme hatası {symbol} {interval}: {e}")
+
+        return self.load(symbol, interval)
+
+
+# Global store instance
+ohlcv_store = OHLCVStore()
@@ -8,6 +8,7 @@ Execution Engine Module
 - Execution strategies
 - Slippage management
 - Market impact analysis
+- Vectorized TWAP/VWAP/POV schedule simulation
 """
 
 import numpy as np
@@ -103,7 +104,14 @@ class ExecutionEngine:
             'slippage_model': 'linear',
             'market_impact_model': 'square_root',
             'execution_delay': 0.1,  # saniye
-            'random_seed': 42
+            'random_seed': 42,
+            # Çizelge simülasyonu (simulate_parent_orders)
+            'half_spread_bps': 5.0,
+            'temporary_impact_coef': 0.5,   # eta: sigma_bucket * sqrt(katılım) çarpanı
+            'permanent_impact_coef': 0.1,   # gamma: sigma_günlük * (kümülatif / ADV) çarpanı
+            'commission_rate': 0.0015,
+            'default_buckets': 8,
+            'session_open': '10:00'          # BIST sürekli işlem başlangıcı (varsayılan profil etiketleri)
         }
         
         # Random seed ayarla
@@ -510,6 +518,236 @@ class ExecutionEngine:
             print(f"❌ Piyasa etki analizi hatası: {str(e)}")
             return {'error': str(e)}
     
+    def _session_buckets(self, n_buckets: int, interval: str = "60m") -> List[str]:
+        """Seans açılışından interval adımlı 'HH:MM' bucket etiketleri (gerçek profillerle aynı biçim)"""
+        start = pd.Timestamp(f"2000-01-01 {self.simulation_params['session_open']}")
+        return list(pd.date_range(start, periods=n_buckets, freq=pd.Timedelta(interval)).strftime('%H:%M'))
+    
+    def _default_volume_profile(self, symbol: str, buckets: Union[int, List[str]],
+                                interval: str = "60m") -> Dict[str, Any]:
+        """
+        OHLCV verisi yoksa U şeklinde gün içi hacim eğrisi ve piyasa verisinden varsayılanlar
+        
+        Args:
+            symbol: Sembol
+            buckets: Bucket etiketleri ya da seans açılışından itibaren bucket sayısı
+            interval: Bucket sayısı verildiğinde etiket aralığı
+        """
+        if isinstance(buckets, int):
+            buckets = self._session_buckets(buckets, interval)
+        n_buckets = len(buckets)
+        x = np.linspace(-1.0, 1.0, n_buckets)
+        curve = 1.0 + 1.5 * x ** 2
+        market_data = self.market_data.get(symbol)
+        volatility = market_data.volatility if market_data and market_data.volatility else 0.15
+        daily_volatility = volatility / np.sqrt(252)
+        return {
+            'buckets': list(buckets),
+            'curve': curve / curve.sum(),
+            'bucket_volatility': np.full(n_buckets, daily_volatility / np.sqrt(n_buckets)),
+            'adv': market_data.volume if market_data else 1000000.0,
+            'daily_volatility': daily_volatility,
+            'price': market_data.last if market_data else 100.25
+        }
+    
+    def build_volume_profiles(self, symbols: List[str], interval: str = "60m",
+                              lookback_days: int = 20, store=None) -> Dict[str, Dict[str, Any]]:
+        """
+        Yerel OHLCV deposundan gün içi hacim profilleri oluştur
+        
+        Args:
+            symbols: Semboller
+            interval: Gün içi bar aralığı
+            lookback_days: Kullanılacak son işlem günü sayısı
+            store: OHLCVStore (varsayılan: global depo)
+            
+        Returns:
+            Dict[str, Dict[str, Any]]: Sembol -> bucket etiketleri, hacim eğrisi,
+            bucket volatilitesi, ADV, günlük volatilite ve son fiyat
+        """
+        if store is None:
+            from core.ohlcv_store import ohlcv_store as store
+        
+        profiles = {}
+        for symbol in symbols:
+            try:
+                bars = store.load(symbol, interval)
+                if bars.empty:
+                    continue
+                
+                day = bars.index.normalize()
+                recent_days = day.unique()[-lookback_days:]
+                bars = bars[day.isin(recent_days)]
+                day = bars.index.normalize()
+                time_of_day = bars.index.strftime('%H:%M')
+                
+                daily_volume = bars['Volume'].groupby(day).sum()
+                share = (bars['Volume'] / bars['Volume'].groupby(day).transform('sum')).groupby(time_of_day).mean()
+                bucket_volatility = bars['Close'].pct_change().groupby(time_of_day).std()
+                daily_close = bars['Close'].groupby(day).last()
+                
+                profiles[symbol] = {
+                    'buckets': list(share.index),
+                    'curve': (share / share.sum()).to_numpy(),
+                    'bucket_volatility': bucket_volatility.fillna(bucket_volatility.mean()).fillna(0.0).to_numpy(),
+                    'adv': float(daily_volume.mean()),
+                    'daily_volatility': float(daily_close.pct_change().std()) if len(daily_close) > 2 else 0.0,
+                    'price': float(bars['Close'].iloc[-1])
+                }
+            except Exception as e:
+                print(f"❌ Hacim profili hatası {symbol}: {str(e)}")
+        
+        return profiles
+    
+    def simulate_parent_orders(self, orders: Union[pd.DataFrame, List[Dict[str, Any]]],
+                               strategy: str = "vwap", participation_rate: float = 0.1,
+                               profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+                               interval: str = "60m", seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ana siparişleri TWAP/VWAP/POV çocuk sipariş çizelgelerine bölüp tek seferde maliyetlendir
+        
+        Tüm hesap (N sipariş x B bucket) NumPy matrisleri üzerinde yapılır; bir rebalance'ın
+        tamamı gönderilmeden önce maliyetlendirilebilir. Dolum fiyatı her bucket'ta
+        yarım spread + geçici etki (eta * sigma_bucket * sqrt(katılım)) + kalıcı etki
+        (gamma * sigma_günlük * kümülatif dolum / ADV) ile kayar.
+        
+        Args:
+            orders: symbol, side, quantity (opsiyonel: strategy, participation_rate) sütunları
+            strategy: Varsayılan çizelge (twap, vwap, pov)
+            participation_rate: POV için bucket hacminin hedef oranı
+            profiles: Hazır hacim profilleri (yoksa OHLCV deposundan oluşturulur)
+            interval: Profil bar aralığı
+            seed: Verilirse bucket fiyatlarına volatiliteyle orantılı gürültü eklenir
+            
+        Returns:
+            Dict[str, Any]: orders (sipariş bazında sonuç DataFrame), child_quantities (N x B),
+            buckets ve summary
+        """
+        try:
+            orders_df = pd.DataFrame(orders).reset_index(drop=True)
+            if orders_df.empty:
+                return {'error': 'Sipariş yok'}
+            
+            symbols = list(pd.unique(orders_df['symbol']))
+            profiles = dict(profiles or {})
+            missing = [s for s in symbols if s not in profiles]
+            if missing:
+                profiles.update(self.build_volume_profiles(missing, interval=interval))
+            # Verisi olmayan semboller diğer profillerin seans eksenini (yoksa varsayılan seansı) kullanır
+            session = sorted(set().union(*(profiles[s]['buckets'] for s in symbols if s in profiles)))
+            for symbol in symbols:
+                if symbol not in profiles:
+                    profiles[symbol] = self._default_volume_profile(
+                        symbol, session or self.simulation_params['default_buckets'], interval)
+            
+            # Ortak bucket ekseni (sembollerin gün içi etiketlerinin birleşimi)
+            buckets = sorted(set().union(*(profiles[s]['buckets'] for s in symbols)))
+            n_buckets = len(buckets)
+            curves = np.zeros((len(symbols), n_buckets))
+            bucket_vols = np.zeros((len(symbols), n_buckets))
+            for i, symbol in enumerate(symbols):
+                profile = profiles[symbol]
+                positions = [buckets.index(b) for b in profile['buckets']]
+                curves[i, positions] = profile['curve']
+                bucket_vols[i, positions] = profile['bucket_volatility']
+            curves /= np.maximum(curves.sum(axis=1, keepdims=True), 1e-12)
+            adv = np.array([profiles[s]['adv'] for s in symbols], dtype=float)
+            daily_vol = np.array([profiles[s]['daily_volatility'] for s in symbols], dtype=float)
+            ref_price = np.array([profiles[s]['price'] for s in symbols], dtype=float)
+            
+            # Sipariş -> sembol satırı
+            symbol_codes = pd.Categorical(orders_df['symbol'], categories=symbols).codes
+            curve = curves[symbol_codes]                      # (N, B)
+            sigma_bucket = bucket_vols[symbol_codes]          # (N, B)
+            market_volume = adv[symbol_codes, None] * curve   # (N, B)
+            quantity = orders_df['quantity'].to_numpy(dtype=float)
+            side_sign = np.where(orders_df['side'].str.lower().isin(['buy', 'long']), 1.0, -1.0)
+            
+            strategies = (orders_df['strategy'].fillna(strategy) if 'strategy' in orders_df
+                          else pd.Series(strategy, index=orders_df.index)).str.lower().to_numpy()
+            pov_rate = (orders_df['participation_rate'].fillna(participation_rate).to_numpy(dtype=float)
+                        if 'participation_rate' in orders_df else np.full(len(orders_df), participation_rate))
+            
+            # TWAP yalnızca sembolün kendi işlem gördüğü bucket'lara (hacim > 0) yayılır; ortak eksen
+            # sembollerin birleşimi olduğundan diğerleri boş kalır (VWAP/POV hacimle zaten sıfır)
+            support = curve > 0
+            support_count = support.sum(axis=1, keepdims=True)
+            
+            # TWAP eşit, VWAP hacim eğrisi, POV hacmin sabit oranı (kalan kadar)
+            twap_child = np.divide(quantity[:, None] * support, support_count,
+                                   out=np.zeros_like(curve), where=support_count > 0)
+            vwap_child = quantity[:, None] * curve
+            pov_cum = np.minimum(np.cumsum(pov_rate[:, None] * market_volume, axis=1), quantity[:, None])
+            pov_child = np.diff(pov_cum, axis=1, prepend=0.0)
+            child = np.where((strategies == 'twap')[:, None], twap_child,
+                             np.where((strategies == 'pov')[:, None], pov_child, vwap_child))
+            
+            # Etki ve dolum fiyatları
+            params = self.simulation_params
+            participation = np.divide(child, market_volume, out=np.zeros_like(child), where=market_volume > 0)
+            filled_before = np.cumsum(child, axis=1) - child
+            temporary_impact = params['temporary_impact_coef'] * sigma_bucket * np.sqrt(participation)
+            permanent_impact = (params['permanent_impact_coef'] * daily_vol[symbol_codes, None]
+                                * filled_before / np.maximum(adv[symbol_codes, None], 1.0))
+            half_spread = params['half_spread_bps'] / 10000.0
+            cost_fraction = half_spread + temporary_impact + permanent_impact
+            
+            bucket_price = np.repeat(ref_price[symbol_codes, None], n_buckets, axis=1)
+            if seed is not None:
+                rng = np.random.default_rng(seed)
+                bucket_price = bucket_price * (1.0 + np.cumsum(rng.standard_normal(child.shape) * sigma_bucket, axis=1))
+            fill_price = bucket_price * (1.0 + side_sign[:, None] * cost_fraction)
+            
+            # Sipariş bazında özet
+            filled_quantity = child.sum(axis=1)
+            notional = (child * fill_price).sum(axis=1)
+            average_price = np.divide(notional, filled_quantity, out=np.zeros_like(notional), where=filled_quantity > 0)
+            arrival_price = ref_price[symbol_codes]
+            slippage = np.where(filled_quantity > 0, side_sign * (average_price - arrival_price) / arrival_price, 0.0)
+            weights = np.divide(child, filled_quantity[:, None], out=np.zeros_like(child), where=filled_quantity[:, None] > 0)
+            impact = ((temporary_impact + permanent_impact) * weights).sum(axis=1)
+            commission = notional * params['commission_rate']
+            implementation_shortfall = slippage * arrival_price * filled_quantity + commission
+            last_bucket = np.where(filled_quantity > 0, n_buckets - 1 - np.argmax(child[:, ::-1] > 0, axis=1), -1)
+            
+            result_df = orders_df.assign(
+                strategy=strategies,
+                arrival_price=arrival_price,
+                filled_quantity=filled_quantity,
+                unfilled_quantity=quantity - filled_quantity,
+                average_price=average_price,
+                slippage=slippage,
+                market_impact=impact,
+                max_participation=participation.max(axis=1),
+                commission=commission,
+                implementation_shortfall=implementation_shortfall,
+                completion_bucket=[buckets[b] if b >= 0 else None for b in last_bucket]
+            )
+            
+            gross_notional = (arrival_price * filled_quantity).sum()
+            summary = {
+                'parent_orders': len(result_df),
+                'buckets': n_buckets,
+                'gross_notional': float(gross_notional),
+                'total_commission': float(commission.sum()),
+                'total_shortfall': float(implementation_shortfall.sum()),
+                'shortfall_bps': float(implementation_shortfall.sum() / gross_notional * 10000) if gross_notional > 0 else 0.0,
+                'unfilled_orders': int((result_df['unfilled_quantity'] > 1e-9).sum()),
+                'by_strategy': result_df.groupby('strategy')['implementation_shortfall'].sum().to_dict(),
+                'timestamp': datetime.now()
+            }
+            
+            return {
+                'orders': result_df,
+                'child_quantities': child,
+                'buckets': buckets,
+                'summary': summary
+            }
+            
+        except Exception as e:
+            print(f"❌ Çizelge simülasyonu hatası: {str(e)}")
+            return {'error': str(e)}
+    
     def get_execution_summary(self) -> Dict[str, Any]:
         """İcra özetini al"""
         try:
@@ -687,6 +925,39 @@ def test_execution_engine():
         print(f"   🎯 Önerilen strateji: {impact_analysis['recommended_strategy']}")
         print(f"   ⚠️ Risk seviyesi: {impact_analysis['risk_level']}")
     
+    # Rebalance çizelge simülasyonu test
+    print("\n🧮 Çizelge Simülasyonu Test:")
+    simulation = engine.simulate_parent_orders(
+        [
+            {'symbol': 'SISE.IS', 'side': 'buy', 'quantity': 50000, 'strategy': 'twap'},
+            {'symbol': 'SISE.IS', 'side': 'sell', 'quantity': 20000, 'strategy': 'vwap'},
+            {'symbol': 'EREGL.IS', 'side': 'buy', 'quantity': 200000, 'strategy': 'pov'}
+        ],
+        profiles={'SISE.IS': engine._default_volume_profile('SISE.IS', 8),
+                  'EREGL.IS': engine._default_volume_profile('EREGL.IS', 8)}
+    )
+    if 'error' not in simulation:
+        print(f"   ✅ {simulation['summary']['parent_orders']} ana sipariş simüle edildi")
+        print(f"   📊 Toplam shortfall: {simulation['summary']['shortfall_bps']:.2f} bps")
+        print(f"   ⏳ Dolmayan sipariş: {simulation['summary']['unfilled_orders']}")
+    
+    # Farklı bucket'lı profiller: çocuk emirler yalnızca sembolün kendi bucket'larında
+    stored_profile = dict(engine._default_volume_profile('GARAN.IS', 3), buckets=['10:00', '13:00', '17:00'])
+    mixed = engine.simulate_parent_orders(
+        [
+            {'symbol': 'SISE.IS', 'side': 'buy', 'quantity': 50000, 'strategy': 'twap'},
+            {'symbol': 'GARAN.IS', 'side': 'buy', 'quantity': 30000, 'strategy': 'twap'}
+        ],
+        profiles={'SISE.IS': engine._default_volume_profile('SISE.IS', 8), 'GARAN.IS': stored_profile}
+    )
+    if 'error' not in mixed:
+        active_buckets = (mixed['child_quantities'] > 0).sum(axis=1)
+        print(f"   ✅ Karışık profil: {mixed['summary']['buckets']} ortak bucket, "
+              f"sipariş başına aktif bucket {active_buckets.tolist()}, "
+              f"tam dolum: {bool(np.allclose(mixed['orders']['unfilled_quantity'], 0))}")
+        garan_columns = [mixed['buckets'][j] for j in np.flatnonzero(mixed['child_quantities'][1])]
+        print(f"   ✅ GARAN çocuk emir saatleri: {garan_columns}")
+    
     # İcra sonucu alma test
     print("\n📥 İcra Sonucu Alma Test:")
     execution_result_retrieved = engine.get_execution_result(execution_result.execution_id)
@@ -4,7 +4,7 @@ PRD v2.0 - FastAPI Ana Uygulama
 GitHub Actions + Vercel deploy için hazır
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
@@ -15,6 +15,7 @@ import logging
 from datetime import datetime, timedelta
 import asyncio
 import json
+import os
 import time
 from monitoring.metrics import track_request, track_prediction, track_error, get_metrics
 from prometheus_client import CONTENT_TYPE_LATEST
@@ -136,20 +137,13 @@ async def _lstm_scheduler_loop():
             _lstm_stop_event = asyncio.Event()
         while not _lstm_stop_event.is_set():
             try:
-                # Run one training pass
-                import yfinance as yf
+                # Run one training pass (4H bars derived incrementally from cached 60m bars)
                 from ai_models.lstm_model import LSTMModel
+                from core.bar_service import bar_service
                 import pandas as pd
-                df = yf.Ticker(_lstm_symbol).history(period="60d", interval="60m")
-                if not df.empty:
-                    df.index = pd.to_datetime(df.index)
-                    df_4h = pd.DataFrame({
-                        'Open': df['Open'].resample('4H').first(),
-                        'High': df['High'].resample('4H').max(),
-                        'Low': df['Low'].resample('4H').min(),
-                        'Close': df['Close'].resample('4H').last(),
-                        'Volume': df['Volume'].resample('4H').sum()
-                    }).dropna()
+                df_4h = await asyncio.to_thread(bar_service.get_bars, _lstm_symbol, "4h")
+                if not df_4h.empty:
+                    df_4h = df_4h[df_4h.index >= df_4h.index[-1] - pd.Timedelta(days=60)]
                     model = LSTMModel()
                     model.train(df_4h)
                     logger.info(f"LSTM scheduled training done for {_lstm_symbol}")
@@ -606,11 +600,14 @@ async def get_health_summary():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/analysis/patterns/{symbol}")
-async def get_technical_patterns(symbol: str, timeframe: str = "1d", limit: int = 50):
-    """Sembol için teknik formasyon tespiti (optimized + cached)"""
+async def get_technical_patterns(symbol: str, timeframe: str = "1d", limit: int = 50,
+                                 analogues: bool = True,
+                                 analogue_window: int = Query(20, ge=5, le=250),
+                                 analogue_k: int = Query(10, ge=1, le=50)):
+    """Sembol için teknik formasyon tespiti + tarihsel analoglar (optimized + cached)"""
     try:
         # Cache key
-        cache_key = (symbol, timeframe, limit)
+        cache_key = (symbol, timeframe, limit, analogues, analogue_window, analogue_k)
         now = time.time()
         cached = _pattern_cache.get(cache_key)
         if cached and now - cached['ts'] < _pattern_cache_ttl_sec:
@@ -627,8 +624,15 @@ async def get_technical_patterns(symbol: str, timeframe: str = "1d", limit: int
         if df is None or df.empty:
             raise HTTPException(status_code=404, detail=f"{symbol} verisi bulunamadı")
         
-        # Pattern tara (async executor)
-        patterns = await _scan_patterns_async(df, symbol)
+        # Pattern tara + analog arama (async executor)
+        if analogues:
+            patterns, analogue_result = await asyncio.gather(
+                _scan_patterns_async(df, symbol),
+                _find_analogues_async(symbol, timeframe, analogue_window, analogue_k, df['Close'])
+            )
+        else:
+            patterns = await _scan_patterns_async(df, symbol)
+            analogue_result = None
         
         # JSON serializable
         pattern_data = []
@@ -652,6 +656,7 @@ async def get_technical_patterns(symbol: str, timeframe: str = "1d", limit: int
             'timeframe': timeframe,
             'patterns': pattern_data,
             'total_patterns': len(pattern_data),
+            'analogues': analogue_result,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -973,14 +978,18 @@ async def analyze_symbol_historical_accuracy(symbol: str, force_update: bool = F
         logger.error(f"Historical accuracy analiz hatası: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+MAX_ANALYSIS_WORKERS = os.cpu_count() or 1
+
 @app.get("/historical/accuracy/analyze-all")
-async def analyze_all_symbols_historical_accuracy(force_update: bool = False):
-    """Tüm semboller için geçmiş doğruluk analizi"""
+async def analyze_all_symbols_historical_accuracy(force_update: bool = False, incremental: bool = True,
+                                                  workers: int = Query(min(4, MAX_ANALYSIS_WORKERS), ge=1,
+                                                                       le=MAX_ANALYSIS_WORKERS)):
+    """Tüm semboller için geçmiş doğruluk analizi (artımlı: yalnızca yeni barlar işlenir)"""
     try:
         from historical_accuracy_analyzer import HistoricalAccuracyAnalyzer
         
         analyzer = HistoricalAccuracyAnalyzer()
-        results = analyzer.analyze_all_symbols(force_update)
+        results = await asyncio.to_thread(analyzer.analyze_all_symbols, force_update, incremental, workers)
         
         return results
         
@@ -1667,7 +1676,7 @@ async def get_all_performance(force_update: bool = False):
         if performance_tracker is None:
             raise HTTPException(status_code=503, detail="Performance tracker hazır değil")
         
-        performance = performance_tracker.get_all_performance(force_update)
+        performance = await asyncio.to_thread(performance_tracker.get_all_performance, force_update)
         if not performance:
             raise HTTPException(status_code=500, detail="Performans verisi alınamadı")
         
@@ -1690,7 +1699,7 @@ async def get_performance_summary():
         if performance_tracker is None:
             raise HTTPException(status_code=503, detail="Performance tracker hazır değil")
         
-        summary = performance_tracker.get_performance_summary()
+        summary = await asyncio.to_thread(performance_tracker.get_performance_summary)
         if not summary:
             raise HTTPException(status_code=500, detail="Performans özeti alınamadı")
         
@@ -1712,7 +1721,7 @@ async def get_top_performers(metric: str, top_n: int = 10):
         if performance_tracker is None:
             raise HTTPException(status_code=503, detail="Performance tracker hazır değil")
         
-        top_stocks = performance_tracker.get_top_performers(metric, top_n)
+        top_stocks = await asyncio.to_thread(performance_tracker.get_top_performers, metric, top_n)
         if not top_stocks:
             raise HTTPException(status_code=500, detail="Top performers alınamadı")
         
@@ -2208,6 +2217,14 @@ async def _scan_patterns_async(df, symbol: str):
         return engine.scan_all_patterns(df, symbol)
     return await loop.run_in_executor(None, _scan)
 
+async def _find_analogues_async(symbol: str, interval: str, window: int, k: int, closes=None):
+    from analysis.analogue_search import get_analogue_engine
+    engine = get_analogue_engine(interval=interval, window=window)
+    loop = asyncio.get_running_loop()
+    def _search():
+        return engine.search_symbol(symbol, k=k, closes=closes)
+    return await loop.run_in_executor(None, _search)
+
 if __name__ == "__main__":
     # Development server
     uvicorn.run(
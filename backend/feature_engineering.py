@@ -21,6 +21,8 @@ from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+from core.feature_dag import feature_store
+
 @dataclass
 class TechnicalIndicator:
     """Teknik indikatör"""
@@ -323,17 +325,9 @@ class FeatureEngineering:
         Returns:
             pd.Series: OBV değerleri
         """
-        price_change = prices.diff()
-        obv = pd.Series(index=prices.index, dtype=float)
-        obv.iloc[0] = volume.iloc[0]
-        
-        for i in range(1, len(prices)):
-            if price_change.iloc[i] > 0:
-                obv.iloc[i] = obv.iloc[i-1] + volume.iloc[i]
-            elif price_change.iloc[i] < 0:
-                obv.iloc[i] = obv.iloc[i-1] - volume.iloc[i]
-            else:
-                obv.iloc[i] = obv.iloc[i-1]
+        direction = np.sign(prices.diff()).fillna(0)
+        direction.iloc[0] = 1
+        obv = (direction * volume).cumsum().astype(float)
         
         return obv
     
@@ -356,49 +350,52 @@ class FeatureEngineering:
         close_prices = prices['Close'] if 'Close' in prices.columns else prices.iloc[:, 3]
         volume = prices['Volume'] if 'Volume' in prices.columns else pd.Series(1, index=prices.index)
         
+        # İndikatörler paylaşılan feature DAG üzerinden (aynı barlar için tek hesap)
+        ctx = feature_store.context(pd.DataFrame({
+            'Open': open_prices, 'High': high_prices, 'Low': low_prices,
+            'Close': close_prices, 'Volume': volume
+        }, index=prices.index))
+        
         # SMA özellikleri
         for period in self.TECHNICAL_INDICATORS["SMA"]["params"]:
-            features[f'SMA_{period}'] = self.calculate_sma(close_prices, period)
+            features[f'SMA_{period}'] = ctx.get('sma', window=period)
             features[f'Price_SMA_{period}_Ratio'] = close_prices / features[f'SMA_{period}']
         
         # EMA özellikleri
         for period in self.TECHNICAL_INDICATORS["EMA"]["params"]:
-            features[f'EMA_{period}'] = self.calculate_ema(close_prices, period)
+            features[f'EMA_{period}'] = ctx.get('ema', span=period)
             features[f'Price_EMA_{period}_Ratio'] = close_prices / features[f'EMA_{period}']
         
         # RSI özellikleri
         for period in self.TECHNICAL_INDICATORS["RSI"]["params"]:
-            features[f'RSI_{period}'] = self.calculate_rsi(close_prices, period)
+            features[f'RSI_{period}'] = ctx.get('rsi', window=period)
         
         # MACD özellikleri
-        macd_data = self.calculate_macd(close_prices)
-        features['MACD'] = macd_data['MACD']
-        features['MACD_Signal'] = macd_data['Signal']
-        features['MACD_Histogram'] = macd_data['Histogram']
+        features['MACD'] = ctx.get('macd')
+        features['MACD_Signal'] = ctx.get('macd_signal')
+        features['MACD_Histogram'] = ctx.get('macd_hist')
         
         # Bollinger Bands özellikleri
-        bb_data = self.calculate_bollinger_bands(close_prices)
-        features['BB_Upper'] = bb_data['Upper']
-        features['BB_Middle'] = bb_data['Middle']
-        features['BB_Lower'] = bb_data['Lower']
-        features['BB_Width'] = bb_data['BB_Width']
-        features['BB_Position'] = bb_data['BB_Position']
+        features['BB_Upper'] = ctx.get('bb_upper')
+        features['BB_Middle'] = ctx.get('bb_middle')
+        features['BB_Lower'] = ctx.get('bb_lower')
+        features['BB_Width'] = ctx.get('bb_width')
+        features['BB_Position'] = ctx.get('bb_position')
         
         # Stochastic özellikleri
-        stoch_data = self.calculate_stochastic(high_prices, low_prices, close_prices)
-        features['Stoch_K'] = stoch_data['K']
-        features['Stoch_D'] = stoch_data['D']
+        features['Stoch_K'] = ctx.get('stoch_k', window=14)
+        features['Stoch_D'] = ctx.get('stoch_d', window=14, smooth=3)
         
         # ATR özellikleri
-        atr = self.calculate_atr(high_prices, low_prices, close_prices)
+        atr = ctx.get('atr', window=14)
         features['ATR'] = atr
         features['ATR_Ratio'] = atr / close_prices
         
         # CCI özellikleri
-        features['CCI'] = self.calculate_cci(high_prices, low_prices, close_prices)
+        features['CCI'] = ctx.get('cci', window=20)
         
         # Williams %R özellikleri
-        features['Williams_R'] = self.calculate_williams_r(high_prices, low_prices, close_prices)
+        features['Williams_R'] = ctx.get('williams_r', window=14)
         
         # ROC özellikleri
         for period in self.TECHNICAL_INDICATORS["ROC"]["params"]:
@@ -20,6 +20,7 @@ from sklearn.feature_selection import SelectKBest, f_classif, mutual_info_classi
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, RobustScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import mutual_info_score
+from core.feature_dag import compute_features
 # talib import edilemedi, basit teknik indikatör hesaplama fonksiyonları kullanılacak
 
 # Logging ayarları
@@ -180,52 +181,31 @@ class FeatureEngineeringPipeline:
             return None
     
     def _calculate_technical_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Teknik indikatörleri hesapla (basit implementasyon)"""
+        """Teknik indikatörleri hesapla (paylaşılan feature DAG üzerinden)"""
         try:
             result = data.copy()
             
-            # RSI (Relative Strength Index)
             if 'close' in data.columns:
-                delta = data['close'].diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-                rs = gain / loss
-                result['rsi'] = 100 - (100 / (1 + rs))
-            
-            # MACD (Moving Average Convergence Divergence)
-            if 'close' in data.columns:
-                ema_12 = data['close'].ewm(span=12).mean()
-                ema_26 = data['close'].ewm(span=26).mean()
-                result['macd'] = ema_12 - ema_26
-                result['macd_signal'] = result['macd'].ewm(span=9).mean()
-                result['macd_hist'] = result['macd'] - result['macd_signal']
-            
-            # EMA (Exponential Moving Average)
-            if 'close' in data.columns:
-                result['ema_20'] = data['close'].ewm(span=20).mean()
-                result['ema_50'] = data['close'].ewm(span=50).mean()
-            
-            # Bollinger Bands
-            if 'close' in data.columns:
-                sma_20 = data['close'].rolling(window=20).mean()
-                std_20 = data['close'].rolling(window=20).std()
-                result['bb_upper'] = sma_20 + (std_20 * 2)
-                result['bb_middle'] = sma_20
-                result['bb_lower'] = sma_20 - (std_20 * 2)
-                result['bb_width'] = (result['bb_upper'] - result['bb_lower']) / result['bb_middle']
-            
-            # Stochastic Oscillator
-            if all(col in data.columns for col in ['high', 'low', 'close']):
-                low_14 = data['low'].rolling(window=14).min()
-                high_14 = data['high'].rolling(window=14).max()
-                result['stoch_k'] = 100 * ((data['close'] - low_14) / (high_14 - low_14))
-                result['stoch_d'] = result['stoch_k'].rolling(window=3).mean()
-            
-            # Williams %R
-            if all(col in data.columns for col in ['high', 'low', 'close']):
-                high_14 = data['high'].rolling(window=14).max()
-                low_14 = data['low'].rolling(window=14).min()
-                result['williams_r'] = -100 * ((high_14 - data['close']) / (high_14 - low_14))
+                # RSI, MACD, EMA, Bollinger Bands
+                specs = {
+                    'rsi': ('rsi', {'window': 14}),
+                    'macd': 'macd', 'macd_signal': 'macd_signal', 'macd_hist': 'macd_hist',
+                    'ema_20': ('ema', {'span': 20}), 'ema_50': ('ema', {'span': 50}),
+                    'bb_upper': 'bb_upper', 'bb_middle': 'bb_middle',
+                    'bb_lower': 'bb_lower', 'bb_width': 'bb_width',
+                }
+                
+                # Stochastic Oscillator, Williams %R
+                if all(col in data.columns for col in ['high', 'low']):
+                    specs.update({
+                        'stoch_k': ('stoch_k', {'window': 14}),
+                        'stoch_d': ('stoch_d', {'window': 14, 'smooth': 3}),
+                        'williams_r': ('williams_r', {'window': 14}),
+                    })
+                
+                indicators = compute_features(data, specs)
+                for column in specs:
+                    result[column] = indicators[column]
             
             return result
         
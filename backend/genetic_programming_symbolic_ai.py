@@ -18,11 +18,223 @@ from collections import defaultdict, deque
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 import re
+import ast
+import os
+import time
+from functools import lru_cache, reduce
+from concurrent.futures import ProcessPoolExecutor
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# İfadelerde izin verilen fonksiyon ve sabitler
+_EXPRESSION_FUNCTIONS = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'log': np.log, 'exp': np.exp, 'abs': np.abs,
+    'sqrt': np.sqrt, 'pi': np.pi, 'e': np.e
+}
+# Transformer'ın ürettiği yardımcılar (kullanıcı ifadelerinde yasak)
+_EXPRESSION_HELPERS = {
+    '_and': np.logical_and, '_or': np.logical_or,
+    '_not': np.logical_not, '_where': np.where
+}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv,
+    ast.USub, ast.UAdd, ast.Not, ast.And, ast.Or,
+    ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq
+)
+
+class _VectorizeTransformer(ast.NodeTransformer):
+    """and/or/not, zincirli karşılaştırma ve if-else'i NumPy eleman bazlı çağrılara çevir"""
+    
+    @staticmethod
+    def _call(name, args):
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[])
+    
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = '_and' if isinstance(node.op, ast.And) else '_or'
+        return reduce(lambda left, right: self._call(name, [left, right]), node.values)
+    
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._call('_not', [node.operand])
+        return node
+    
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        pairs = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                 for i, op in enumerate(node.ops)]
+        return reduce(lambda left, right: self._call('_and', [left, right]), pairs)
+    
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return self._call('_where', [node.test, node.body, node.orelse])
+
+@lru_cache(maxsize=4096)
+def compile_expression(expression: str) -> Callable[[Dict[str, Any]], Any]:
+    """
+    İfadeyi bir kez AST'ye çevirip doğrula ve vektörel çağrılabilir fonksiyona derle
+    
+    Args:
+        expression: Python sözdiziminde matematiksel / mantıksal ifade
+        
+    Returns:
+        Callable: Değişken adı -> skaler veya NumPy dizisi eşlemesini alan fonksiyon
+    """
+    tree = ast.parse(expression.strip(), mode='eval')
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"İzin verilmeyen ifade öğesi: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise ValueError(f"İzin verilmeyen isim: {node.id}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name)
+                                               and node.func.id in _EXPRESSION_FUNCTIONS):
+            raise ValueError("Yalnızca matematiksel fonksiyon çağrılarına izin verilir")
+    
+    tree = ast.fix_missing_locations(_VectorizeTransformer().visit(tree))
+    code = compile(tree, f"<expr:{expression[:40]}>", 'eval')
+    base_namespace = {**_EXPRESSION_FUNCTIONS, **_EXPRESSION_HELPERS}
+    
+    def evaluate(variables: Dict[str, Any]):
+        return eval(code, {"__builtins__": {}}, {**base_namespace, **variables})
+    
+    return evaluate
+
+def build_strategy_features(ohlcv: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """OHLCV'den strateji koşullarında kullanılan göstergeleri vektörel hesapla"""
+    close = ohlcv['Close'].astype(float)
+    high = ohlcv['High'].astype(float) if 'High' in ohlcv else close
+    low = ohlcv['Low'].astype(float) if 'Low' in ohlcv else close
+    volume = ohlcv['Volume'].astype(float) if 'Volume' in ohlcv else pd.Series(1.0, index=close.index)
+    
+    delta = close.diff()
+    gain = delta.clip(lower=0).rolling(14).mean()
+    loss = (-delta.clip(upper=0)).rolling(14).mean()
+    rsi = 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+    
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    sma_20 = close.rolling(20).mean()
+    std_20 = close.rolling(20).std()
+    
+    features = {
+        'price': close,
+        'volume': volume,
+        'sma_20': sma_20,
+        'sma_50': close.rolling(50).mean(),
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': macd.ewm(span=9, adjust=False).mean(),
+        'avg_volume': volume.rolling(20).mean(),
+        'resistance_level': high.rolling(20).max().shift(1),
+        'support_level': low.rolling(20).min().shift(1),
+        'momentum': close.pct_change(10),
+        'bollinger_upper': sma_20 + 2 * std_20,
+        'bollinger_lower': sma_20 - 2 * std_20,
+        'low': low
+    }
+    # Pozisyona bağlı bayraklar backtest içinde stop/take-profit olarak uygulanır
+    features['stop_loss_hit'] = pd.Series(False, index=close.index)
+    features['take_profit_hit'] = pd.Series(False, index=close.index)
+    return {name: series.to_numpy() for name, series in features.items()}
+
+def _parse_strategy_risk(position_sizing: str, risk_management: str) -> Tuple[float, Optional[float], bool, bool]:
+    """(işlem başı risk, stop oranı, trailing mi, support stop mu)"""
+    risk_match = re.search(r'risk_per_trade\s*=\s*([\d.]+)', position_sizing or '')
+    risk_per_trade = float(risk_match.group(1)) if risk_match else 0.02
+    
+    stop_match = re.search(r'(stop_loss|trailing_stop)\s*=\s*(?:entry_price|price)\s*\*\s*([\d.]+)',
+                           risk_management or '')
+    if stop_match:
+        return risk_per_trade, float(stop_match.group(2)), stop_match.group(1) == 'trailing_stop', False
+    return risk_per_trade, None, False, 'support_level' in (risk_management or '')
+
+def backtest_strategy_signals(features: Dict[str, np.ndarray], entry_condition: str, exit_condition: str,
+                              position_sizing: str = "risk_per_trade = 0.02",
+                              risk_management: str = "stop_loss = entry_price * 0.95",
+                              transaction_cost: float = 0.001) -> Dict[str, float]:
+    """
+    Vektörel long-only backtest
+    
+    Giriş sinyali pozisyon açar, çıkış sinyali kapatır (ffill durum makinesi); stop seviyeleri
+    işlem bazında groupby ile uygulanır, pozisyon büyüklüğü risk_per_trade / stop mesafesi.
+    """
+    price = features['price']
+    n = len(price)
+    with np.errstate(all='ignore'):
+        entry = np.broadcast_to(np.asarray(compile_expression(entry_condition)(features), dtype=bool), n)
+        exit_ = np.broadcast_to(np.asarray(compile_expression(exit_condition)(features), dtype=bool), n)
+    
+    state = pd.Series(np.where(entry, 1.0, np.where(exit_, 0.0, np.nan))).ffill().fillna(0.0).to_numpy().copy()
+    
+    risk_per_trade, stop_ratio, trailing, support_stop = _parse_strategy_risk(position_sizing, risk_management)
+    stop_distance = 1.0 - stop_ratio if stop_ratio else 0.05
+    exposure = min(1.0, risk_per_trade / max(stop_distance, 1e-6))
+    
+    # İşlem kimlikleri: her 0 -> 1 geçişi yeni işlem
+    starts = (state == 1.0) & (np.concatenate([[0.0], state[:-1]]) == 0.0)
+    trade_id = np.where(state == 1.0, np.cumsum(starts), 0)
+    
+    if (stop_ratio or support_stop) and starts.any():
+        frame = pd.DataFrame({'trade': trade_id, 'price': price, 'low': features.get('low', price)})
+        in_trade = frame[frame['trade'] > 0]
+        grouped = in_trade.groupby('trade')['price']
+        if support_stop:
+            stop_level = pd.Series(features['support_level'], index=frame.index)[in_trade.index]
+            stop_level = stop_level.groupby(in_trade['trade']).transform('first')
+        elif trailing:
+            stop_level = grouped.cummax() * stop_ratio
+        else:
+            stop_level = grouped.transform('first') * stop_ratio
+        # Giriş kapanışta yapılır; giriş barının low'u stopu tetiklemez
+        hit = (in_trade['low'] < stop_level) & in_trade['trade'].eq(in_trade['trade'].shift(1))
+        # Tetiklenen bar dahil işlem kapalı: o barın getirisi stop fiyatından, sonraki barlar pozisyonsuz
+        stopped = hit.astype(int).groupby(in_trade['trade']).cumsum() > 0
+        first_hit = stopped & ~stopped.groupby(in_trade['trade']).shift(1, fill_value=False)
+        state[in_trade.index[stopped.to_numpy()]] = 0.0
+        stop_bars = in_trade.index[first_hit.to_numpy()].to_numpy()
+        stop_prices = stop_level[first_hit].to_numpy(dtype=float)
+    else:
+        stop_bars, stop_prices = np.array([], dtype=int), np.array([])
+    
+    with np.errstate(all='ignore'):
+        returns = np.concatenate([[0.0], np.diff(price) / price[:-1]])
+        returns[stop_bars] = stop_prices / price[stop_bars - 1] - 1.0
+    returns = np.nan_to_num(returns)
+    position = np.concatenate([[0.0], state[:-1]]) * exposure
+    turnover = np.abs(np.diff(np.concatenate([[0.0], position])))
+    strategy_returns = position * returns - turnover * transaction_cost
+    
+    volatility = strategy_returns.std()
+    equity = np.cumprod(1.0 + strategy_returns)
+    return {
+        'sharpe_ratio': float(np.sqrt(252) * strategy_returns.mean() / volatility) if volatility > 0 else 0.0,
+        'total_return': float(equity[-1] - 1.0) if n else 0.0,
+        'max_drawdown': float((equity / np.maximum.accumulate(equity) - 1.0).min()) if n else 0.0,
+        'exposure': float((position > 0).mean()) if n else 0.0,
+        'trades': int(starts.sum())
+    }
+
+# Worker süreçlerde paylaşılan özellik setleri (pool başına bir kez gönderilir)
+_WORKER_FEATURES: List[Dict[str, np.ndarray]] = []
+
+def _init_backtest_worker(feature_sets: List[Dict[str, np.ndarray]]):
+    global _WORKER_FEATURES
+    _WORKER_FEATURES = feature_sets
+
+def _strategy_fitness(strategy_key: Tuple[str, str, str, str]) -> float:
+    """Strateji genlerinin tüm semboller üzerindeki ortalama Sharpe'ı"""
+    try:
+        return float(np.mean([backtest_strategy_signals(features, *strategy_key)['sharpe_ratio']
+                              for features in _WORKER_FEATURES]))
+    except Exception:
+        return -10.0
+
 @dataclass
 class SymbolicConfig:
     """Sembolik AI konfigürasyonu"""
@@ -182,18 +394,19 @@ class GeneticProgrammingSymbolicAI:
             }
         }
     
-    def create_symbolic_expression(self, complexity: int = 5) -> str:
+    def create_symbolic_expression(self, complexity: int = 5, variables: Optional[List[str]] = None) -> str:
         """Sembolik ifade oluştur"""
+        variables = variables or self.variables
         try:
             if complexity <= 0:
-                return random.choice(self.variables)
+                return random.choice(variables)
             
             # Rastgele operatör seç
             operator = random.choice(self.operators)
             
             if operator in ['sin', 'cos', 'tan', 'log', 'exp']:
                 # Unary operator
-                operand = self.create_symbolic_expression(complexity - 1)
+                operand = self.create_symbolic_expression(complexity - 1, variables)
                 return f"{operator}({operand})"
             
             elif operator in ['+', '-', '*', '/']:
@@ -201,42 +414,33 @@ class GeneticProgrammingSymbolicAI:
                 left_complexity = complexity // 2
                 right_complexity = complexity - left_complexity - 1
                 
-                left_operand = self.create_symbolic_expression(left_complexity)
-                right_operand = self.create_symbolic_expression(right_complexity)
+                left_operand = self.create_symbolic_expression(left_complexity, variables)
+                right_operand = self.create_symbolic_expression(right_complexity, variables)
                 
                 return f"({left_operand} {operator} {right_operand})"
             
             elif operator == '**':
                 # Power operator
                 base_complexity = complexity - 1
-                base = self.create_symbolic_expression(base_complexity)
+                base = self.create_symbolic_expression(base_complexity, variables)
                 exponent = random.choice([2, 3, 0.5])
                 
                 return f"({base} ** {exponent})"
             
             else:
                 # Fallback to variable
-                return random.choice(self.variables)
+                return random.choice(variables)
         
         except Exception as e:
             logger.error(f"Error creating symbolic expression: {e}")
-            return random.choice(self.variables)
+            return random.choice(variables)
     
     def evaluate_symbolic_expression(self, expression: str, variables: Dict[str, float]) -> float:
         """Sembolik ifadeyi değerlendir"""
         try:
-            # Güvenli eval için sadece matematiksel operatörlere izin ver
-            allowed_names = {
-                'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
-                'log': np.log, 'exp': np.exp, 'abs': np.abs,
-                'sqrt': np.sqrt, 'pi': np.pi, 'e': np.e
-            }
-            
-            # Variables ekle
-            allowed_names.update(variables)
-            
-            # Expression'ı değerlendir
-            result = eval(expression, {"__builtins__": {}}, allowed_names)
+            # Derlenmiş (cache'li) ifade; skaler değişkenler NumPy skalerine çevrilir
+            with np.errstate(all='ignore'):
+                result = compile_expression(expression)({k: np.float64(v) for k, v in variables.items()})
             
             # NaN ve infinity kontrolü
             if np.isnan(result) or np.isinf(result):
@@ -248,6 +452,27 @@ class GeneticProgrammingSymbolicAI:
             logger.error(f"Error evaluating expression {expression}: {e}")
             return 0.0
     
+    def evaluate_expression_vectorized(self, expression: str,
+                                       data: Union[pd.DataFrame, Dict[str, np.ndarray]]) -> np.ndarray:
+        """
+        İfadeyi tüm feature kolonları üzerinde tek seferde değerlendir
+        
+        Returns:
+            np.ndarray: Satır başına sonuç (NaN/inf -> 0)
+        """
+        if isinstance(data, pd.DataFrame):
+            columns = {col: data[col].to_numpy(dtype=float) for col in data.columns}
+            n_rows = len(data)
+        else:
+            columns = {name: np.asarray(values, dtype=float) for name, values in data.items()}
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+        
+        with np.errstate(all='ignore'):
+            result = np.asarray(compile_expression(expression)(columns), dtype=float)
+        result = np.broadcast_to(result, (n_rows,)).copy()
+        result[~np.isfinite(result)] = 0.0
+        return result
+    
     def create_trading_strategy(self, strategy_type: str = "custom") -> TradingStrategy:
         """Trading stratejisi oluştur"""
         try:
@@ -400,7 +625,25 @@ class GeneticProgrammingSymbolicAI:
     
     def evaluate_trading_strategy(self, strategy: TradingStrategy, 
                                 historical_data: pd.DataFrame) -> float:
-        """Trading stratejisini değerlendir"""
+        """Trading stratejisini değerlendir (OHLCV varsa vektörel backtest Sharpe'ı)"""
+        try:
+            if historical_data is not None and 'Close' in historical_data.columns and len(historical_data) > 50:
+                metrics = backtest_strategy_signals(
+                    build_strategy_features(historical_data),
+                    strategy.entry_condition, strategy.exit_condition,
+                    strategy.position_sizing, strategy.risk_management
+                )
+                strategy.fitness_score = metrics['sharpe_ratio']
+                return strategy.fitness_score
+            
+            return self._heuristic_strategy_fitness(strategy)
+        
+        except Exception as e:
+            logger.error(f"Error evaluating trading strategy: {e}")
+            return 0.0
+    
+    def _heuristic_strategy_fitness(self, strategy: TradingStrategy) -> float:
+        """Fiyat verisi yokken kural karmaşıklığına dayalı fitness"""
         try:
             # Basit fitness hesaplama (gerçek implementasyonda daha karmaşık)
             fitness_score = 0.0
@@ -435,10 +678,64 @@ class GeneticProgrammingSymbolicAI:
             logger.error(f"Error evaluating trading strategy: {e}")
             return 0.0
     
+    def _load_backtest_data(self, historical_data, symbols: Optional[List[str]],
+                            interval: str) -> List[Dict[str, np.ndarray]]:
+        """Backtest için sembol başına gösterge setleri (DataFrame, liste/dict veya OHLCV deposu)"""
+        if historical_data is None and symbols:
+            from core.ohlcv_store import ohlcv_store
+            historical_data = ohlcv_store.load_many(symbols, interval)
+        if historical_data is None:
+            return []
+        if isinstance(historical_data, pd.DataFrame):
+            historical_data = [historical_data]
+        elif isinstance(historical_data, dict):
+            historical_data = list(historical_data.values())
+        return [build_strategy_features(df) for df in historical_data
+                if 'Close' in df.columns and len(df) > 50]
+    
+    def _evaluate_population(self, population: List[TradingStrategy], executor: Optional[ProcessPoolExecutor],
+                             fitness_cache: Dict[Tuple[str, str, str, str], float]):
+        """Nesli değerlendir: aynı genler cache'ten, yeniler süreç havuzunda"""
+        keys = [(s.entry_condition, s.exit_condition, s.position_sizing, s.risk_management) for s in population]
+        pending = list(dict.fromkeys(k for k in keys if k not in fitness_cache))
+        if pending:
+            if executor is not None:
+                chunksize = max(1, len(pending) // (4 * (executor._max_workers or 1)))
+                fitness_cache.update(zip(pending, executor.map(_strategy_fitness, pending, chunksize=chunksize)))
+            else:
+                fitness_cache.update((key, _strategy_fitness(key)) for key in pending)
+        for strategy, key in zip(population, keys):
+            strategy.fitness_score = fitness_cache[key]
+    
     def run_genetic_algorithm(self, population_size: int = 50, 
-                            generations: int = 20) -> List[TradingStrategy]:
-        """Genetik algoritma çalıştır"""
+                            generations: int = 20,
+                            historical_data: Optional[Union[pd.DataFrame, List[pd.DataFrame], Dict[str, pd.DataFrame]]] = None,
+                            symbols: Optional[List[str]] = None,
+                            interval: str = "1d",
+                            n_workers: Optional[int] = None) -> List[TradingStrategy]:
+        """
+        Genetik algoritma çalıştır
+        
+        Args:
+            population_size: Popülasyon büyüklüğü
+            generations: Nesil sayısı
+            historical_data: OHLCV verisi (tek DataFrame, liste veya sembol -> DataFrame)
+            symbols: historical_data yoksa yerel OHLCV deposundan yüklenecek semboller
+            interval: Depo interval'i
+            n_workers: Fitness süreç sayısı (None: CPU sayısı, 1: aynı süreç)
+        """
+        executor = None
         try:
+            feature_sets = self._load_backtest_data(historical_data, symbols, interval)
+            fitness_cache: Dict[Tuple[str, str, str, str], float] = {}
+            if feature_sets:
+                n_workers = n_workers or os.cpu_count() or 1
+                if n_workers > 1:
+                    executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_backtest_worker,
+                                                   initargs=(feature_sets,))
+                else:
+                    _init_backtest_worker(feature_sets)
+            
             # Initial population
             population = []
             for i in range(population_size):
@@ -452,8 +749,11 @@ class GeneticProgrammingSymbolicAI:
             
             for generation in range(generations):
                 # Evaluate fitness
-                for strategy in population:
-                    self.evaluate_trading_strategy(strategy, pd.DataFrame())
+                if feature_sets:
+                    self._evaluate_population(population, executor, fitness_cache)
+                else:
+                    for strategy in population:
+                        self._heuristic_strategy_fitness(strategy)
                 
                 # Sort by fitness
                 population.sort(key=lambda x: x.fitness_score, reverse=True)
@@ -506,6 +806,10 @@ class GeneticProgrammingSymbolicAI:
         except Exception as e:
             logger.error(f"Error running genetic algorithm: {e}")
             return []
+        
+        finally:
+            if executor is not None:
+                executor.shutdown()
     
     def perform_symbolic_regression(self, X: pd.DataFrame, y: pd.Series,
                                   config: SymbolicConfig) -> Dict[str, Any]:
@@ -519,7 +823,7 @@ class GeneticProgrammingSymbolicAI:
             expressions = []
             for i in range(population_size):
                 complexity = random.randint(1, max_depth)
-                expression_str = self.create_symbolic_expression(complexity)
+                expression_str = self.create_symbolic_expression(complexity, list(X.columns))
                 
                 symbolic_expr = SymbolicExpression(
                     expression_id=f"EXPR_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
@@ -532,26 +836,21 @@ class GeneticProgrammingSymbolicAI:
                 )
                 expressions.append(symbolic_expr)
             
+            # Kolonlar bir kez NumPy dizisine çevrilir
+            columns = {col: X[col].to_numpy(dtype=float) for col in X.columns}
+            target = y.to_numpy(dtype=float)
+            
             # Evolution loop
             best_expressions = []
             
             for generation in range(generations):
-                # Evaluate fitness
+                # Evaluate fitness (her ifade tüm satırlarda tek vektörel çağrı)
                 for expr in expressions:
                     try:
-                        # Create variables dict
-                        variables = {}
-                        for i, col in enumerate(X.columns):
-                            variables[col] = X.iloc[0, i]  # Use first row for simplicity
-                        
-                        # Evaluate expression
-                        prediction = self.evaluate_symbolic_expression(expr.expression, variables)
-                        
-                        # Calculate fitness (simplified)
-                        if prediction != 0:
-                            expr.fitness_score = 1.0 / (1.0 + abs(prediction - y.iloc[0]))
-                        else:
-                            expr.fitness_score = 0.0
+                        predictions = self.evaluate_expression_vectorized(expr.expression, columns)
+                        with np.errstate(all='ignore'):
+                            rmse = np.sqrt(np.mean((predictions - target) ** 2))
+                        expr.fitness_score = float(1.0 / (1.0 + rmse)) if np.any(predictions) else 0.0
                     
                     except Exception as e:
                         expr.fitness_score = 0.0
@@ -573,7 +872,7 @@ class GeneticProgrammingSymbolicAI:
                     # Random selection and mutation
                     parent = random.choice(elite)
                     complexity = max(1, parent.complexity + random.randint(-1, 1))
-                    new_expr = self.create_symbolic_expression(complexity)
+                    new_expr = self.create_symbolic_expression(complexity, list(X.columns))
                     
                     symbolic_expr = SymbolicExpression(
                         expression_id=f"EXPR_NEW_{len(new_expressions)}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
@@ -723,10 +1022,34 @@ def test_genetic_programming_symbolic_ai():
         print(f"   📊 Strateji: {test_strategy.name}")
         print(f"   📊 Fitness Score: {fitness_score:.2f}")
     
-    # Genetik algoritma testi
+    # Vektörel ifade değerlendirme testi
+    vector_data = pd.DataFrame({'x': np.linspace(0, 1, 5), 'y': np.linspace(1, 2, 5)})
+    vector_result = symbolic_ai.evaluate_expression_vectorized("sin(x) + cos(y) * 2", vector_data)
+    print(f"   📊 Vektörel sonuç: {np.round(vector_result, 4)}")
+    
+    # Stop testi: 100'den girilen pozisyon %10 düşüşte 95 stopundan kapanır, sonraki barlar pozisyonsuz
+    stop_price = np.array([100.0, 100.0, 90.0, 80.0, 80.0, 80.0, 80.0, 80.0])
+    stop_features = {'price': stop_price, 'low': stop_price, 'go': np.arange(8) == 1, 'never': np.zeros(8, bool)}
+    stop_metrics = backtest_strategy_signals(stop_features, "go", "never", "risk_per_trade = 0.05",
+                                             "stop_loss = entry_price * 0.95", transaction_cost=0.0)
+    print(f"   📊 Stop backtest: getiri {stop_metrics['total_return']:.3f} (beklenen -0.050), "
+          f"exposure {stop_metrics['exposure']:.3f}")
+    
+    # Genetik algoritma testi (sentetik OHLCV üzerinde backtest fitness)
     print("\n📊 Genetik Algoritma Testi:")
     
-    population = symbolic_ai.run_genetic_algorithm(population_size=20, generations=5)
+    ohlcv_sets = {}
+    for i in range(4):
+        close = 100 * np.exp(np.cumsum(np.random.normal(0.0003, 0.02, 1500)))
+        ohlcv_sets[f"SYM{i}"] = pd.DataFrame({
+            'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close,
+            'Volume': np.random.randint(1000, 5000, 1500).astype(float)
+        })
+    
+    start_time = time.time()
+    population = symbolic_ai.run_genetic_algorithm(population_size=20, generations=5,
+                                                   historical_data=ohlcv_sets)
+    print(f"   📊 Süre: {time.time() - start_time:.2f}s")
     
     if population:
         print(f"   ✅ Genetik algoritma tamamlandı")
@@ -19,6 +19,7 @@ import matplotlib.dates as mdates
 from matplotlib.patches import Rectangle
 from datetime import datetime, timedelta
 import warnings
+from core.chart_render import RenderTask, RenderedChart, downsample_rows, render_cache
 warnings.filterwarnings('ignore')
 
 @dataclass
@@ -30,6 +31,7 @@ class ChartConfig:
     color_palette: str = "viridis"
     save_format: str = "png"
     annotations: bool = True
+    downsample: bool = True
 
 @dataclass
 class HeatmapData:
@@ -76,6 +78,15 @@ class HeatmapsVisualizations:
         
         # Grafik türleri
         self.CHART_TYPES = ["heatmap", "line", "bar", "scatter", "area", "candlestick"]
+        
+        # Render önbelleği
+        self.render_cache = render_cache
+    
+    def _time_budget(self) -> Optional[int]:
+        """Zaman ekseni için hedef sütun sayısı (figür piksel genişliği)"""
+        if not self.chart_config.downsample:
+            return None
+        return int(self.chart_config.figsize[0] * self.chart_config.dpi)
     
     def create_correlation_heatmap(self, correlation_matrix: pd.DataFrame,
                                   title: str = "Varlık Korelasyon Matrisi",
@@ -166,6 +177,9 @@ class HeatmapsVisualizations:
             if col_data.std() > 0:
                 normalized_data[col] = (col_data - col_data.mean()) / col_data.std()
         
+        # Piksel genişliğinden fazla zaman adımını ortalamayla birleştir
+        normalized_data = downsample_rows(normalized_data, self._time_budget(), agg="mean")
+        
         # Isı haritası oluştur
         im = ax.imshow(normalized_data.values.T, 
                       cmap=self.COLOR_PALETTES["performance"],
@@ -177,20 +191,21 @@ class HeatmapsVisualizations:
         cbar.set_label('Normalize Edilmiş Performans', rotation=270, labelpad=20)
         
         # Axis etiketleri
-        ax.set_xticks(range(len(performance_data.index)))
+        time_index = normalized_data.index
         ax.set_yticks(range(len(performance_data.columns)))
         
         # Tarih etiketleri (x-axis)
-        if len(performance_data.index) > 20:
+        if len(time_index) > 20:
             # Çok fazla tarih varsa her 5'te birini göster
-            step = max(1, len(performance_data.index) // 20)
-            x_labels = [performance_data.index[i].strftime('%m-%d') 
-                       for i in range(0, len(performance_data.index), step)]
-            x_positions = range(0, len(performance_data.index), step)
+            step = max(1, len(time_index) // 20)
+            x_labels = [time_index[i].strftime('%m-%d') 
+                       for i in range(0, len(time_index), step)]
+            x_positions = range(0, len(time_index), step)
             ax.set_xticks(x_positions)
             ax.set_xticklabels(x_labels, rotation=45, ha='right')
         else:
-            x_labels = [idx.strftime('%m-%d') for idx in performance_data.index]
+            ax.set_xticks(range(len(time_index)))
+            x_labels = [idx.strftime('%m-%d') for idx in time_index]
             ax.set_xticklabels(x_labels, rotation=45, ha='right')
         
         ax.set_yticklabels(performance_data.columns)
@@ -305,6 +320,9 @@ class HeatmapsVisualizations:
             if col_data.max() > col_data.min():
                 normalized_data[col] = (col_data - col_data.min()) / (col_data.max() - col_data.min())
         
+        # Piksel genişliğinden fazla zaman adımını birleştir (tepe volatilite korunur)
+        normalized_data = downsample_rows(normalized_data, self._time_budget(), agg="max")
+        
         # Isı haritası oluştur
         im = ax.imshow(normalized_data.values.T, 
                       cmap=self.COLOR_PALETTES["volatility"],
@@ -316,19 +334,20 @@ class HeatmapsVisualizations:
         cbar.set_label('Normalize Edilmiş Volatilite', rotation=270, labelpad=20)
         
         # Axis etiketleri
-        ax.set_xticks(range(len(volatility_data.index)))
+        time_index = normalized_data.index
         ax.set_yticks(range(len(volatility_data.columns)))
         
         # Tarih etiketleri (x-axis)
-        if len(volatility_data.index) > 20:
-            step = max(1, len(volatility_data.index) // 20)
-            x_labels = [volatility_data.index[i].strftime('%m-%d') 
-                       for i in range(0, len(volatility_data.index), step)]
-            x_positions = range(0, len(volatility_data.index), step)
+        if len(time_index) > 20:
+            step = max(1, len(time_index) // 20)
+            x_labels = [time_index[i].strftime('%m-%d') 
+                       for i in range(0, len(time_index), step)]
+            x_positions = range(0, len(time_index), step)
             ax.set_xticks(x_positions)
             ax.set_xticklabels(x_labels, rotation=45, ha='right')
         else:
-            x_labels = [idx.strftime('%m-%d') for idx in volatility_data.index]
+            ax.set_xticks(range(len(time_index)))
+            x_labels = [idx.strftime('%m-%d') for idx in time_index]
             ax.set_xticklabels(x_labels, rotation=45, ha='right')
         
         ax.set_yticklabels(volatility_data.columns)
@@ -490,6 +509,46 @@ class HeatmapsVisualizations:
         
         return fig
     
+    def render_chart(self, method: str, *args, if_none_match: Optional[str] = None,
+                     **kwargs) -> RenderedChart:
+        """
+        Grafiği görüntü baytı olarak render etme (önbellekli, ETag destekli)
+        
+        Args:
+            method: Grafik metodu adı (ör. 'create_correlation_heatmap')
+            *args, **kwargs: Metoda geçilecek argümanlar
+            if_none_match: İstemcinin gönderdiği ETag
+            
+        Returns:
+            RenderedChart: Görüntü baytları, ETag ve not_modified bayrağı
+        """
+        return self.render_cache.render(self._render_task(method, args, kwargs),
+                                        fmt=self.chart_config.save_format,
+                                        dpi=self.chart_config.dpi,
+                                        if_none_match=if_none_match, owner=self)
+    
+    def render_dashboard(self, panels: List[Tuple[str, tuple, Dict]],
+                         max_workers: Optional[int] = None) -> List[RenderedChart]:
+        """
+        Dashboard panellerini paralel render etme
+        
+        Args:
+            panels: (metod adı, args, kwargs) listesi
+            max_workers: Render süreç sayısı
+            
+        Returns:
+            List[RenderedChart]: Panellerle aynı sırada görüntüler
+        """
+        tasks = [self._render_task(method, args, kwargs) for method, args, kwargs in panels]
+        return self.render_cache.render_many(tasks, fmt=self.chart_config.save_format,
+                                             dpi=self.chart_config.dpi, max_workers=max_workers)
+    
+    def _render_task(self, method: str, args: tuple, kwargs: Dict) -> RenderTask:
+        # Render sırasında dosyaya yazma / ekrana basma yapılmaz
+        kwargs = {**kwargs, "save_path": None, "show_plot": False}
+        return RenderTask(type(self), method, tuple(args), kwargs,
+                          owner_kwargs={"chart_config": self.chart_config})
+    
     def create_dashboard(self, data_dict: Dict[str, Union[pd.DataFrame, pd.Series]],
                         titles: Dict[str, str],
                         save_path: Optional[str] = None,
@@ -701,6 +760,23 @@ def test_heatmaps_visualizations():
     )
     print("   ✅ Dashboard oluşturuldu")
     
+    # Seyreltme + render önbelleği test
+    print("\n⚡ Render Önbelleği Test:")
+    intraday_volatility = pd.DataFrame(
+        np.random.uniform(0.05, 0.25, (20000, n_assets)),
+        index=pd.date_range('2020-01-01', periods=20000, freq='h'), columns=asset_names
+    )
+    first = viz_engine.render_chart('create_volatility_heatmap', intraday_volatility)
+    cached = viz_engine.render_chart('create_volatility_heatmap', intraday_volatility,
+                                     if_none_match=first.etag)
+    panels = viz_engine.render_dashboard([
+        ('create_correlation_heatmap', (correlation_matrix,), {}),
+        ('create_risk_heatmap', (risk_data,), {}),
+        ('create_volatility_heatmap', (intraday_volatility,), {}),
+    ])
+    print(f"   Görüntü: {len(first.content) / 1024:.0f} KB, 304: {cached.not_modified}, "
+          f"panel: {len(panels)}, istatistikler: {viz_engine.render_cache.stats}")
+    
     print("\n✅ Heatmaps & Visualizations Test Tamamlandı!")
     return viz_engine
 
@@ -13,10 +13,200 @@ from typing import Dict, List, Any, Optional, Tuple
 import json
 import os
 from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from scipy.signal import lfilter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Artımlı analizde saklanan son bar sayısı (SMA200 + S/R penceresi için yeterli)
+STATE_TAIL_BARS = 260
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+@dataclass
+class SymbolAnalysisState:
+    """Sembol başına artımlı analiz durumu (son işlenen bar, çalışan istatistikler)"""
+    symbol: str
+    first_bar: Optional[str] = None
+    last_bar: Optional[str] = None
+    n_bars: int = 0
+    tail: Dict[str, List[float]] = field(default_factory=dict)
+    tail_index: List[str] = field(default_factory=list)
+    # Doğruluk sayaçları
+    up_moves: int = 0
+    diff_count: int = 0
+    return_count: int = 0
+    return_mean: float = 0.0
+    return_m2: float = 0.0
+    trend_hits: int = 0
+    rsi_hits: int = 0
+    macd_hits: int = 0
+    ema_state: Dict[str, List[float]] = field(default_factory=dict)
+    # Drawdown durumu
+    cumulative: float = 1.0
+    running_peak: float = float('-inf')
+    drawdown_count: int = 0
+    last_drawdown: float = 0.0
+    in_drawdown: bool = False
+    drawdown_start: int = 0
+    drawdown_bottom: int = 0
+    drawdown_bottom_value: float = 0.0
+    drawdown_periods: List[Dict[str, Any]] = field(default_factory=list)
+    # Trend durumu
+    current_trend: str = 'neutral'
+    trend_start: int = 0
+    trend_start_price: float = 0.0
+    trend_periods: List[Dict[str, Any]] = field(default_factory=list)
+    # Volatilite ve support/resistance
+    rolling_vol: List[float] = field(default_factory=list)
+    sr_next: int = 20
+    resistance: List[float] = field(default_factory=list)
+    support: List[float] = field(default_factory=list)
+
+def _ewm_adjusted_update(values: np.ndarray, span: int, state: Optional[List[float]]) -> Tuple[np.ndarray, List[float]]:
+    """pandas ewm(span, adjust=True) ile aynı; pay/payda durumunu taşıyarak yalnızca yeni değerleri işler"""
+    decay = 1 - 2 / (span + 1)
+    numerator_prev, denominator_prev = state if state else (0.0, 0.0)
+    numerator = lfilter([1.0], [1.0, -decay], values, zi=[decay * numerator_prev])[0]
+    denominator = lfilter([1.0], [1.0, -decay], np.ones(len(values)), zi=[decay * denominator_prev])[0]
+    return numerator / denominator, [float(numerator[-1]), float(denominator[-1])]
+
+def _advance_state(state: SymbolAnalysisState, new_bars: pd.DataFrame) -> SymbolAnalysisState:
+    """Durumu yalnızca yeni barlarla ilerlet (geçmiş yeniden işlenmez)"""
+    n_prev = state.n_bars
+    n_tail = len(state.tail_index)
+    offset = n_prev - n_tail  # birleşik dizinin 0. elemanının global bar indeksi
+    
+    combined = {col: np.concatenate([np.asarray(state.tail.get(col, []), dtype=float),
+                                     new_bars[col].to_numpy(dtype=float)]) for col in BAR_COLUMNS}
+    close = combined['Close']
+    n_new = len(new_bars)
+    n_total = n_prev + n_new
+    new = slice(n_tail, n_tail + n_new)
+    close_series = pd.Series(close)
+    
+    # Yön ve getiri istatistikleri (Welford birleştirme)
+    diffs = np.diff(close)[max(n_tail - 1, 0):]
+    state.up_moves += int((diffs > 0).sum())
+    state.diff_count += len(diffs)
+    returns = (close_series / close_series.shift(1) - 1).to_numpy()
+    new_returns = returns[new][~np.isnan(returns[new])]
+    if len(new_returns):
+        count = state.return_count + len(new_returns)
+        batch_mean = new_returns.mean()
+        delta = batch_mean - state.return_mean
+        state.return_m2 += ((new_returns - batch_mean) ** 2).sum() + delta ** 2 * state.return_count * len(new_returns) / count
+        state.return_mean += delta * len(new_returns) / count
+        state.return_count = count
+    
+    # Trend / RSI / MACD sinyal sayaçları
+    sma_20 = close_series.rolling(20).mean().to_numpy()
+    sma_50 = close_series.rolling(50).mean().to_numpy()
+    state.trend_hits += int((sma_20[new] > sma_50[new]).sum())
+    delta_close = close_series.diff()
+    gain = delta_close.where(delta_close > 0, 0).rolling(14).mean()
+    loss = (-delta_close.where(delta_close < 0, 0)).rolling(14).mean()
+    rsi = (100 - (100 / (1 + gain / loss))).to_numpy()
+    state.rsi_hits += int(((rsi[new] < 30) | (rsi[new] > 70)).sum())
+    ema_12, state.ema_state['12'] = _ewm_adjusted_update(close[new], 12, state.ema_state.get('12'))
+    ema_26, state.ema_state['26'] = _ewm_adjusted_update(close[new], 26, state.ema_state.get('26'))
+    state.macd_hits += int((ema_12 - ema_26 > 0).sum())
+    
+    # Drawdown: kümülatif getiri ve tepe ardışık ilerletilir, dönemler yalnızca yeni noktalarda taranır
+    if len(new_returns):
+        cumulative = np.cumprod(np.concatenate([[state.cumulative], 1 + new_returns]))[1:]
+        running_max = np.maximum.accumulate(np.concatenate([[state.running_peak], cumulative]))[1:]
+        drawdown = (cumulative - running_max) / running_max
+        for dd in drawdown:
+            i = state.drawdown_count
+            if dd < 0 and not state.in_drawdown:
+                state.in_drawdown = True
+                state.drawdown_start = state.drawdown_bottom = i
+                state.drawdown_bottom_value = float(dd)
+            elif dd < 0 and state.in_drawdown:
+                if dd < state.drawdown_bottom_value:
+                    state.drawdown_bottom, state.drawdown_bottom_value = i, float(dd)
+            elif dd >= 0 and state.in_drawdown:
+                state.in_drawdown = False
+                state.drawdown_periods.append({
+                    'start_idx': state.drawdown_start,
+                    'bottom_idx': state.drawdown_bottom,
+                    'end_idx': i,
+                    'max_drawdown': state.drawdown_bottom_value,
+                    'duration': i - state.drawdown_start,
+                    'recovery_time': i - state.drawdown_bottom
+                })
+            state.drawdown_count += 1
+        state.cumulative, state.running_peak = float(cumulative[-1]), float(running_max[-1])
+        state.last_drawdown = float(drawdown[-1])
+    
+    # Trend dönemleri (analyze_trends ile aynı: i'den önceki 20/50 barın ortalaması)
+    for i in range(max(20, n_prev), n_total):
+        k = i - offset
+        trend_sma_20 = close[k - 20:k].mean()
+        trend_sma_50 = close[k - 50:k].mean() if i >= 50 else trend_sma_20
+        if trend_sma_20 > trend_sma_50 * 1.02:
+            new_trend = 'uptrend'
+        elif trend_sma_20 < trend_sma_50 * 0.98:
+            new_trend = 'downtrend'
+        else:
+            new_trend = 'sideways'
+        if new_trend != state.current_trend:
+            if state.current_trend != 'neutral':
+                state.trend_periods.append({
+                    'trend': state.current_trend,
+                    'start_idx': state.trend_start,
+                    'end_idx': i,
+                    'duration': i - state.trend_start,
+                    'price_change': float((close[k] - state.trend_start_price) / state.trend_start_price * 100)
+                })
+            state.current_trend, state.trend_start, state.trend_start_price = new_trend, i, float(close[k])
+    
+    # Rolling volatilite (20 getiri) yalnızca yeni geçerli değerler eklenir
+    rolling_vol = (pd.Series(returns[1:]).rolling(20).std() * np.sqrt(252)).to_numpy()
+    new_vol = rolling_vol[max(n_tail - 1, 0):]
+    state.rolling_vol.extend(float(v) for v in new_vol[~np.isnan(new_vol)])
+    
+    # Support/resistance: merkezli 20 bar penceresi, yalnızca yeni değerlendirilebilir pozisyonlar
+    window = 20
+    resistance, support = set(state.resistance), set(state.support)
+    for i in range(state.sr_next, n_total - window):
+        k = i - offset
+        if combined['High'][k - 10:k + 10].max() == combined['High'][k]:
+            resistance.add(float(combined['High'][k]))
+        if combined['Low'][k - 10:k + 10].min() == combined['Low'][k]:
+            support.add(float(combined['Low'][k]))
+    state.sr_next = max(state.sr_next, n_total - window)
+    state.resistance = sorted(resistance, reverse=True)[:5]
+    state.support = sorted(support)[:5]
+    
+    # Kuyruk ve bar sayaçları
+    index = list(state.tail_index) + [ts.isoformat() for ts in new_bars.index]
+    state.tail = {col: combined[col][-STATE_TAIL_BARS:].tolist() for col in BAR_COLUMNS}
+    state.tail_index = index[-STATE_TAIL_BARS:]
+    state.first_bar = state.first_bar or index[0]
+    state.last_bar = index[-1]
+    state.n_bars = n_total
+    return state
+
+# Process pool worker'ı: süreç başına tek analyzer
+_WORKER_ANALYZER = None
+
+def _init_analyzer_worker(data_dir: str):
+    global _WORKER_ANALYZER
+    logging.getLogger(__name__).setLevel(logging.WARNING)
+    _WORKER_ANALYZER = HistoricalAccuracyAnalyzer(data_dir)
+
+def _analyze_symbol_worker(task: Tuple[str, bool, bool]) -> Tuple[str, Dict[str, Any]]:
+    symbol, force_update, incremental = task
+    try:
+        if incremental:
+            return symbol, _WORKER_ANALYZER.analyze_symbol_incremental(symbol, force_update=force_update)
+        return symbol, _WORKER_ANALYZER.analyze_single_symbol(symbol, force_update)
+    except Exception as e:
+        return symbol, {'error': str(e)}
+
 class HistoricalAccuracyAnalyzer:
     """Geçmiş performans analizi ve doğruluk hesaplama"""
     
@@ -39,19 +229,40 @@ class HistoricalAccuracyAnalyzer:
         
         logger.info(f"✅ Historical Accuracy Analyzer başlatıldı - {len(self.bist100_symbols)} sembol")
     
-    def analyze_all_symbols(self, force_update: bool = False) -> Dict[str, Any]:
-        """Tüm semboller için kapsamlı analiz"""
+    def analyze_all_symbols(self, force_update: bool = False, incremental: bool = False,
+                            n_workers: int = 1) -> Dict[str, Any]:
+        """
+        Tüm semboller için kapsamlı analiz
+        
+        Args:
+            force_update: Cache / artımlı durumu yok say
+            incremental: Sembol durumunu sakla ve yalnızca yeni barları işle
+            n_workers: >1 ise semboller process pool'da analiz edilir
+        """
         try:
             results = {}
             total_symbols = len(self.bist100_symbols)
             
             logger.info(f"🔍 {total_symbols} sembol analiz ediliyor...")
             
-            for i, symbol in enumerate(self.bist100_symbols, 1):
+            if n_workers > 1:
+                tasks = [(symbol, force_update, incremental) for symbol in self.bist100_symbols]
+                with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_analyzer_worker,
+                                         initargs=(str(self.data_dir),)) as executor:
+                    for i, (symbol, analysis) in enumerate(executor.map(_analyze_symbol_worker, tasks), 1):
+                        results[symbol] = analysis if analysis and 'error' not in analysis else \
+                            {'error': analysis.get('error', 'Analiz başarısız') if analysis else 'Analiz başarısız'}
+                        if i % 5 == 0:
+                            logger.info(f"📈 Progress: {i}/{total_symbols} ({i/total_symbols*100:.1f}%)")
+            
+            for i, symbol in enumerate(self.bist100_symbols if n_workers <= 1 else [], 1):
                 logger.info(f"📊 {i}/{total_symbols} - {symbol} analiz ediliyor...")
                 
                 try:
-                    analysis = self.analyze_single_symbol(symbol, force_update)
+                    if incremental:
+                        analysis = self.analyze_symbol_incremental(symbol, force_update=force_update)
+                    else:
+                        analysis = self.analyze_single_symbol(symbol, force_update)
                     if analysis and 'error' not in analysis:
                         results[symbol] = analysis
                     else:
@@ -148,6 +359,186 @@ class HistoricalAccuracyAnalyzer:
             logger.error(f"❌ {symbol} analiz hatası: {e}")
             return {'error': str(e)}
     
+    def _state_path(self, symbol: str) -> Path:
+        return self.data_dir / "state" / f"{symbol.replace('.IS', '')}_state.json"
+    
+    def load_symbol_state(self, symbol: str) -> Optional[SymbolAnalysisState]:
+        """Kaydedilmiş artımlı durumu yükle"""
+        path = self._state_path(symbol)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return SymbolAnalysisState(**json.load(f))
+        except Exception as e:
+            logger.warning(f"⚠️ {symbol} durum dosyası okunamadı: {e}")
+            return None
+    
+    def save_symbol_state(self, state: SymbolAnalysisState):
+        path = self._state_path(state.symbol)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(state), f)
+        os.replace(tmp_path, path)
+    
+    def fetch_new_bars(self, symbol: str, since: Optional[str] = None) -> pd.DataFrame:
+        """Yerel OHLCV deposunu yalnızca eksik aralık kadar güncelle ve since sonrasındaki barları döndür"""
+        from core.ohlcv_store import ohlcv_store
+        
+        if since is None:
+            period = "2y"
+        else:
+            gap_days = (datetime.now() - pd.Timestamp(since).to_pydatetime().replace(tzinfo=None)).days
+            period = next((p for p, days in [("5d", 5), ("1mo", 28), ("3mo", 88), ("6mo", 180), ("1y", 360)]
+                           if gap_days < days), "2y")
+        bars = ohlcv_store.fetch(symbol, period=period, refresh=True)
+        if bars.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        bars = bars[BAR_COLUMNS].dropna()
+        if since is not None:
+            bars = bars[bars.index > pd.Timestamp(since)]
+        return bars
+    
+    def analyze_symbol_incremental(self, symbol: str, new_bars: Optional[pd.DataFrame] = None,
+                                   force_update: bool = False) -> Dict[str, Any]:
+        """
+        Artımlı sembol analizi: kayıtlı durum + yalnızca yeni barlar
+        
+        Args:
+            symbol: Sembol
+            new_bars: Yeni OHLCV barları (None ise yerel depodan / yfinance'ten alınır)
+            force_update: Durumu sıfırla ve tüm geçmişi yeniden işle
+            
+        Returns:
+            Dict: analyze_single_symbol ile aynı yapı (geçmiş ilk işlenen bardan itibaren genişler)
+        """
+        try:
+            state = None if force_update else self.load_symbol_state(symbol)
+            if new_bars is None:
+                new_bars = self.fetch_new_bars(symbol, state.last_bar if state else None)
+            else:
+                new_bars = new_bars[BAR_COLUMNS].dropna()
+                if state is not None and state.last_bar is not None:
+                    new_bars = new_bars[new_bars.index > pd.Timestamp(state.last_bar)]
+            
+            if state is None:
+                if len(new_bars) < self.min_data_points:
+                    logger.warning(f"⚠️ {symbol} için yetersiz veri: {len(new_bars)} < {self.min_data_points}")
+                    return {'error': 'Veri bulunamadı'}
+                state = SymbolAnalysisState(symbol=symbol)
+            
+            if len(new_bars):
+                state = _advance_state(state, new_bars)
+                self.save_symbol_state(state)
+                logger.info(f"🔄 {symbol}: {len(new_bars)} yeni bar işlendi (toplam {state.n_bars})")
+            
+            result = self.build_result_from_state(state)
+            
+            cache_file = self.data_dir / f"{symbol.replace('.IS', '')}_analysis.json"
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            return result
+            
+        except Exception as e:
+            logger.error(f"❌ {symbol} artımlı analiz hatası: {e}")
+            return {'error': str(e)}
+    
+    def build_result_from_state(self, state: SymbolAnalysisState) -> Dict[str, Any]:
+        """Artımlı durumdan analyze_single_symbol formatında sonuç üret"""
+        tail = pd.DataFrame(state.tail, index=pd.to_datetime(state.tail_index))
+        
+        # Teknik analiz son STATE_TAIL_BARS bar üzerinde (EWM kesme hatası ~1e-8)
+        technical_analysis = self.perform_technical_analysis(tail, state.symbol)
+        if 'error' not in technical_analysis:
+            technical_analysis['support_resistance'] = {'resistance': state.resistance, 'support': state.support}
+            # MACD taşınan EWM durumundan (tam geçmiş)
+            ema_12 = state.ema_state['12'][0] / state.ema_state['12'][1]
+            ema_26 = state.ema_state['26'][0] / state.ema_state['26'][1]
+            technical_analysis['current_values']['macd'] = float(ema_12 - ema_26)
+        
+        n_signals = state.n_bars
+        volatility = np.sqrt(state.return_m2 / (state.return_count - 1)) * np.sqrt(252) if state.return_count > 1 else 0.0
+        accuracy = {
+            'direction_accuracy': state.up_moves / max(state.diff_count, 1),
+            'volatility_accuracy': 1 / (1 + volatility),
+            'trend_accuracy': state.trend_hits / n_signals,
+            'rsi_accuracy': state.rsi_hits / n_signals,
+            'macd_accuracy': state.macd_hits / n_signals,
+        }
+        accuracy_metrics = {key: float(value) for key, value in accuracy.items()}
+        accuracy_metrics.update({
+            'combined_accuracy': float(np.mean(list(accuracy.values()))),
+            'volatility': float(volatility),
+            'total_signals': state.return_count
+        })
+        
+        # Drawdown: tamamlanan dönemler + açık dönem
+        periods = list(state.drawdown_periods)
+        if state.in_drawdown:
+            last_index = state.drawdown_count - 1
+            periods.append({
+                'start_idx': state.drawdown_start,
+                'bottom_idx': state.drawdown_bottom,
+                'end_idx': last_index,
+                'max_drawdown': state.drawdown_bottom_value,
+                'duration': last_index - state.drawdown_start,
+                'recovery_time': None
+            })
+        recoveries = [d['recovery_time'] for d in periods if d['recovery_time'] is not None]
+        avg_recovery = np.mean(recoveries) if recoveries else 0
+        drawdown_analysis = {
+            'max_drawdown': float(min([d['max_drawdown'] for d in periods])) if periods else 0.0,
+            'avg_drawdown': float(np.mean([d['max_drawdown'] for d in periods])) if periods else 0.0,
+            'avg_duration': float(np.mean([d['duration'] for d in periods])) if periods else 0.0,
+            'avg_recovery_time': float(avg_recovery) if avg_recovery > 0 else None,
+            'total_drawdowns': len(periods),
+            'current_drawdown': state.last_drawdown if state.last_drawdown < 0 else 0,
+            'drawdown_periods': periods
+        }
+        
+        # Trend: tamamlanan dönemler + son trend
+        trend_periods = list(state.trend_periods)
+        if state.current_trend != 'neutral':
+            last_close = state.tail['Close'][-1]
+            trend_periods.append({
+                'trend': state.current_trend,
+                'start_idx': state.trend_start,
+                'end_idx': state.n_bars - 1,
+                'duration': state.n_bars - 1 - state.trend_start,
+                'price_change': float((last_close - state.trend_start_price) / state.trend_start_price * 100)
+            })
+        uptrends = [t for t in trend_periods if t['trend'] == 'uptrend']
+        downtrends = [t for t in trend_periods if t['trend'] == 'downtrend']
+        trend_analysis = {
+            'current_trend': state.current_trend,
+            'trend_periods': trend_periods,
+            'uptrends': len(uptrends),
+            'downtrends': len(downtrends),
+            'sideways_periods': len([t for t in trend_periods if t['trend'] == 'sideways']),
+            'avg_uptrend_duration': float(np.mean([t['duration'] for t in uptrends])) if uptrends else 0,
+            'avg_downtrend_duration': float(np.mean([t['duration'] for t in downtrends])) if downtrends else 0,
+            'avg_uptrend_gain': float(np.mean([t['price_change'] for t in uptrends])) if uptrends else 0,
+            'avg_downtrend_loss': float(np.mean([t['price_change'] for t in downtrends])) if downtrends else 0
+        }
+        
+        return {
+            'symbol': state.symbol,
+            'data_period': {
+                'start_date': state.first_bar,
+                'end_date': state.last_bar,
+                'total_days': state.n_bars,
+                'data_points': state.n_bars
+            },
+            'technical_analysis': technical_analysis,
+            'accuracy_metrics': accuracy_metrics,
+            'drawdown_analysis': drawdown_analysis,
+            'trend_analysis': trend_analysis,
+            'volatility_analysis': self._volatility_summary(pd.Series(state.rolling_vol, dtype=float)),
+            'incremental': True,
+            'timestamp': datetime.now().isoformat()
+        }
+    
     def fetch_symbol_data(self, symbol: str, period: str = "2y") -> pd.DataFrame:
         """Sembol verisi çek"""
         try:
@@ -383,7 +774,7 @@ class HistoricalAccuracyAnalyzer:
                     drawdown_bottom = i
                 elif dd < 0 and in_drawdown:
                     # Drawdown devam ediyor
-                    if dd < drawdown[drawdown_bottom]:
+                    if dd < drawdown.iloc[drawdown_bottom]:
                         drawdown_bottom = i
                 elif dd >= 0 and in_drawdown:
                     # Recovery
@@ -392,7 +783,7 @@ class HistoricalAccuracyAnalyzer:
                         'start_idx': drawdown_start,
                         'bottom_idx': drawdown_bottom,
                         'end_idx': i,
-                        'max_drawdown': float(drawdown[drawdown_bottom]),
+                        'max_drawdown': float(drawdown.iloc[drawdown_bottom]),
                         'duration': i - drawdown_start,
                         'recovery_time': i - drawdown_bottom
                     })
@@ -403,7 +794,7 @@ class HistoricalAccuracyAnalyzer:
                     'start_idx': drawdown_start,
                     'bottom_idx': drawdown_bottom,
                     'end_idx': len(drawdown) - 1,
-                    'max_drawdown': float(drawdown[drawdown_bottom]),
+                    'max_drawdown': float(drawdown.iloc[drawdown_bottom]),
                     'duration': len(drawdown) - 1 - drawdown_start,
                     'recovery_time': None
                 })
@@ -502,8 +893,18 @@ class HistoricalAccuracyAnalyzer:
         try:
             returns = data['Returns'].dropna()
             
-            # Rolling volatility
-            rolling_vol = returns.rolling(20).std() * np.sqrt(252)
+            # Rolling volatility (ısınma dönemindeki NaN'lar korelasyonları bozmasın)
+            rolling_vol = (returns.rolling(20).std() * np.sqrt(252)).dropna()
+            return self._volatility_summary(rolling_vol)
+            
+        except Exception as e:
+            logger.error(f"❌ {symbol} volatilite analiz hatası: {e}")
+            return {'error': str(e)}
+    
+    def _volatility_summary(self, rolling_vol: pd.Series) -> Dict[str, Any]:
+        """Rolling volatilite serisinden rejim / kümelenme istatistikleri"""
+        try:
+            rolling_vol = rolling_vol.reset_index(drop=True)
             
             # Volatility regimes
             low_vol = rolling_vol < rolling_vol.quantile(0.33)
@@ -529,7 +930,7 @@ class HistoricalAccuracyAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"❌ {symbol} volatilite analiz hatası: {e}")
+            logger.error(f"❌ Volatilite özet hatası: {e}")
             return {'error': str(e)}
     
     def calculate_overall_statistics(self, results: Dict[str, Any]) -> Dict[str, Any]:
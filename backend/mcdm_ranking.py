@@ -21,6 +21,10 @@ import json
 import os
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
+from bisect import bisect_right
+from array import array
+import hashlib
+import threading
 import sys
 
 warnings.filterwarnings('ignore')
@@ -80,13 +84,282 @@ class RankingResult:
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
 
+METRIC_COLUMNS = [
+    'net_profit_margin', 'roe', 'roa', 'gross_margin',
+    'current_ratio', 'quick_ratio', 'cash_ratio',
+    'debt_to_equity', 'debt_to_assets', 'interest_coverage'
+]
+
+class FundamentalsCache:
+    """
+    Kalıcı temel veri cache'i (sembol başına versiyon damgası)
+    
+    Metrikler değiştiğinde (içerik hash'i farklıysa) versiyon artar; aynı veri tekrar
+    geldiğinde yalnızca fetched_at güncellenir.
+    """
+    
+    def __init__(self, path: str = 'fundamentals_cache.json', ttl_seconds: float = 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+    
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+                logger.info(f"Fundamentals cache loaded: {len(self.entries)} symbols")
+        except Exception as e:
+            logger.warning(f"Could not load fundamentals cache: {e}")
+    
+    def save(self):
+        """Değişiklik varsa diske yaz"""
+        if not self._dirty:
+            return
+        try:
+            with self._lock:
+                snapshot = dict(self.entries)
+                self._dirty = False
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, default=str)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save fundamentals cache: {e}")
+    
+    def is_fresh(self, symbol: str) -> bool:
+        entry = self.entries.get(symbol)
+        return entry is not None and time.time() - entry['fetched_at'] < self.ttl_seconds
+    
+    def stale_symbols(self, symbols: List[str]) -> List[str]:
+        return [symbol for symbol in symbols if not self.is_fresh(symbol)]
+    
+    def version(self, symbol: str) -> int:
+        entry = self.entries.get(symbol)
+        return entry['version'] if entry else 0
+    
+    def put(self, metrics: FinancialMetrics) -> bool:
+        """Metrikleri kaydet; değer değiştiyse True (versiyon artar)"""
+        values = [float(getattr(metrics, column)) for column in METRIC_COLUMNS]
+        digest = hashlib.md5(json.dumps(values).encode()).hexdigest()
+        with self._lock:
+            entry = self.entries.get(metrics.symbol)
+            changed = entry is None or entry['hash'] != digest
+            self.entries[metrics.symbol] = {
+                'values': values,
+                'hash': digest,
+                'version': (entry['version'] + 1 if entry else 1) if changed else entry['version'],
+                'fetched_at': time.time(),
+                'timestamp': metrics.timestamp.isoformat()
+            }
+            self._dirty = True
+        return changed
+    
+    def get(self, symbol: str) -> Optional[FinancialMetrics]:
+        entry = self.entries.get(symbol)
+        if entry is None:
+            return None
+        return FinancialMetrics(symbol=symbol, timestamp=datetime.fromisoformat(entry['timestamp']),
+                                **dict(zip(METRIC_COLUMNS, entry['values'])))
+
+class IncrementalDecisionMatrix:
+    """
+    Artımlı güncellenen karar matrisi
+    
+    Satırlar yalnızca sembolün fundamentals versiyonu değiştiğinde yazılır. Benefit kolonlarının
+    kare toplamı ile kolon min/max'ları korunur; böylece TOPSIS normalizasyonu ve ideal noktalar
+    tüm matrisi yeniden taramadan elde edilir (min/max yalnızca ekstremum satır değiştiğinde
+    o kolon için yeniden hesaplanır).
+    """
+    
+    def __init__(self, columns: List[str], criteria_types: np.ndarray, capacity: int = 64):
+        self.columns = list(columns)
+        self.criteria_types = np.asarray(criteria_types)
+        self.values = np.zeros((capacity, len(columns)))
+        self.row_of: Dict[str, int] = {}
+        self.symbols: List[str] = []
+        self.row_versions: Dict[str, int] = {}
+        self.sum_squares = np.zeros(len(columns))
+        self.col_min = np.full(len(columns), np.inf)
+        self.col_max = np.full(len(columns), -np.inf)
+        self.version = 0
+    
+    @property
+    def size(self) -> int:
+        return len(self.symbols)
+    
+    def matrix(self) -> np.ndarray:
+        return self.values[:self.size]
+    
+    @staticmethod
+    def _clean_row(values: List[float]) -> np.ndarray:
+        # prepare_decision_matrix ile aynı temizleme: NaN/inf -> 0, alt sınır 1e-10
+        row = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+        return np.clip(row, 1e-10, None)
+    
+    def _refresh_extrema(self, columns: np.ndarray):
+        if self.size == 0:
+            self.col_min[columns], self.col_max[columns] = np.inf, -np.inf
+            return
+        self.col_min[columns] = self.matrix()[:, columns].min(axis=0)
+        self.col_max[columns] = self.matrix()[:, columns].max(axis=0)
+    
+    def upsert(self, symbol: str, values: List[float], version: int) -> bool:
+        """Satırı ekle/güncelle; versiyon aynıysa dokunma"""
+        if self.row_versions.get(symbol) == version and symbol in self.row_of:
+            return False
+        row = self._clean_row(values)
+        
+        if symbol in self.row_of:
+            index = self.row_of[symbol]
+            old = self.values[index].copy()
+            self.values[index] = row
+            self.sum_squares += row ** 2 - old ** 2
+            # Eski ekstremum satırı değiştiyse o kolonları yeniden tara
+            lost_extremum = ((old <= self.col_min) & (row > old)) | ((old >= self.col_max) & (row < old))
+            if lost_extremum.any():
+                self._refresh_extrema(np.flatnonzero(lost_extremum))
+        else:
+            if self.size == len(self.values):
+                self.values = np.vstack([self.values, np.zeros_like(self.values)])
+            index = self.size
+            self.values[index] = row
+            self.row_of[symbol] = index
+            self.symbols.append(symbol)
+            self.sum_squares += row ** 2
+        
+        self.col_min = np.minimum(self.col_min, row)
+        self.col_max = np.maximum(self.col_max, row)
+        self.row_versions[symbol] = version
+        self.version += 1
+        return True
+    
+    def remove(self, symbol: str):
+        """Satırı sil (son satır boşluğa taşınır)"""
+        index = self.row_of.pop(symbol, None)
+        if index is None:
+            return
+        old = self.values[index].copy()
+        last = self.size - 1
+        if index != last:
+            self.values[index] = self.values[last]
+            moved = self.symbols[last]
+            self.symbols[index] = moved
+            self.row_of[moved] = index
+        self.symbols.pop()
+        self.row_versions.pop(symbol, None)
+        self.sum_squares -= old ** 2
+        self._refresh_extrema(np.flatnonzero((old <= self.col_min) | (old >= self.col_max)))
+        self.version += 1
+    
+    def closeness(self, weights: np.ndarray) -> np.ndarray:
+        """Korunan kolon agregalarıyla grey_topsis ile aynı yakınlık katsayıları"""
+        matrix = self.matrix()
+        benefit = self.criteria_types == 1
+        flat_cost = ~benefit & (self.col_max - self.col_min < 1e-10)
+        
+        norm = np.maximum(np.sqrt(np.maximum(self.sum_squares, 0.0)), 1e-10)
+        scale = np.where(benefit, 1.0 / norm, self.col_min)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized = np.where(benefit, matrix * scale, scale / matrix)
+        normalized[:, flat_cost] = 1.0
+        weighted = normalized * weights
+        
+        # İdeal noktalar agregalardan: normalize kolon uçları (benefit max/norm, min/norm;
+        # cost 1 ve min/max), ağırlık negatif olabileceği için ağırlıklı uçların max/min'i
+        upper = np.where(benefit, self.col_max / norm, 1.0)
+        lower = np.where(benefit, self.col_min / norm, self.col_min / self.col_max)
+        upper[flat_cost] = lower[flat_cost] = 1.0
+        ideal_best = np.maximum(upper * weights, lower * weights)
+        ideal_worst = np.minimum(upper * weights, lower * weights)
+        ideal_worst[~benefit & (ideal_worst <= 0)] = 1e-10
+        
+        d_best = np.sqrt(((weighted - ideal_best) ** 2).sum(axis=1))
+        d_worst = np.sqrt(((weighted - ideal_worst) ** 2).sum(axis=1))
+        return d_worst / np.maximum(d_best + d_worst, 1e-10)
+
+class ScoreHistory:
+    """
+    Günlük skor geçmişi (kompakt): sembol başına gün numarası ve float32 skor dizileri
+    
+    Aynı gün tekrar yazılırsa son değer geçerli olur. Tek .npz dosyasında saklanır.
+    """
+    
+    def __init__(self, path: str = 'ranking_scores.npz', max_days: int = 400):
+        self.path = path
+        self.max_days = max_days
+        self.series: Dict[str, Tuple[array, array]] = {}
+        self._load()
+    
+    @staticmethod
+    def _key(market: str, symbol: str) -> str:
+        return f"{market}|{symbol}"
+    
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with np.load(self.path) as stored:
+                    keys, offsets = stored['keys'], stored['offsets']
+                    days, scores = stored['days'], stored['scores']
+                    for k, key in enumerate(keys):
+                        lo, hi = offsets[k], offsets[k + 1]
+                        self.series[str(key)] = (array('i', days[lo:hi].tolist()), array('f', scores[lo:hi].tolist()))
+        except Exception as e:
+            logger.warning(f"Could not load score history: {e}")
+    
+    def save(self):
+        try:
+            keys = list(self.series)
+            lengths = [len(self.series[key][0]) for key in keys]
+            offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+            days = np.concatenate([np.frombuffer(self.series[k][0], dtype=np.int32) for k in keys]) if keys else np.array([], np.int32)
+            scores = np.concatenate([np.frombuffer(self.series[k][1], dtype=np.float32) for k in keys]) if keys else np.array([], np.float32)
+            with open(self.path, 'wb') as f:
+                np.savez(f, keys=np.array(keys), offsets=offsets, days=days, scores=scores)
+        except Exception as e:
+            logger.warning(f"Could not save score history: {e}")
+    
+    def record(self, market: str, symbol: str, score: float, day: Optional[int] = None):
+        day = day if day is not None else datetime.now().date().toordinal()
+        days, scores = self.series.setdefault(self._key(market, symbol), (array('i'), array('f')))
+        if days and days[-1] == day:
+            scores[-1] = score
+            return
+        days.append(day)
+        scores.append(score)
+        if len(days) > self.max_days:
+            del days[:len(days) - self.max_days]
+            del scores[:len(scores) - self.max_days]
+    
+    def change(self, market: str, symbol: str, days_back: int) -> Optional[float]:
+        """Son skor ile days_back gün önceki (veya öncesindeki son) skor farkı"""
+        series = self.series.get(self._key(market, symbol))
+        if not series or len(series[0]) < 2:
+            return None
+        days, scores = series
+        position = bisect_right(days, days[-1] - days_back) - 1
+        if position < 0:
+            return None
+        return round(float(scores[-1] - scores[position]), 4)
+    
+    def volatility(self, market: str, symbol: str, window: int = 30) -> Optional[float]:
+        """Son window kayıttaki günlük skor değişimlerinin standart sapması"""
+        series = self.series.get(self._key(market, symbol))
+        if not series or len(series[1]) < 3:
+            return None
+        recent = np.frombuffer(series[1], dtype=np.float32)[-(window + 1):]
+        return round(float(np.diff(recent).std()), 4)
+
 class OptimizedMCDMRanking:
     """
     Çok-Kriterli Finansal Sıralama - PRD v2.0 P0-2 (OPTIMIZED)
     Grey TOPSIS + Entropi ağırlık
     """
     
-    def __init__(self, max_workers: int = 4, cache_size: int = 1000):
+    def __init__(self, max_workers: int = 4, cache_size: int = 1000, fundamentals_ttl: float = 86400):
         # Finansal kriterler ve ağırlıkları (optimized)
         self.criteria = {
             'profitability': {
@@ -133,6 +406,12 @@ class OptimizedMCDMRanking:
         self.min_data_quality = 0.7  # Minimum data quality threshold
         self.max_retries = 3
         
+        # Kalıcı fundamentals cache, market başına artımlı karar matrisi, kompakt skor geçmişi
+        self.fundamentals_cache = FundamentalsCache(ttl_seconds=fundamentals_ttl)
+        self.decision_matrices: Dict[str, IncrementalDecisionMatrix] = {}
+        self._weights_cache: Dict[str, Tuple[int, np.ndarray]] = {}
+        self.score_history = ScoreHistory()
+        
         # Load historical data if exists
         self._load_historical_data()
         
@@ -155,9 +434,18 @@ class OptimizedMCDMRanking:
         except Exception as e:
             logger.warning(f"Could not save historical data: {e}")
     
-    @lru_cache(maxsize=1000)
     def _get_cached_financial_data(self, symbol: str) -> Optional[FinancialMetrics]:
-        """Get cached financial data with LRU cache"""
+        """Fundamentals cache'ten oku; yoksa indir ve cache'e yaz"""
+        metrics = self.fundamentals_cache.get(symbol)
+        if metrics is not None:
+            return metrics
+        metrics = self._fetch_financial_data(symbol)
+        if metrics is not None:
+            self.fundamentals_cache.put(metrics)
+        return metrics
+    
+    def _fetch_financial_data(self, symbol: str) -> Optional[FinancialMetrics]:
+        """yfinance'ten finansal oranları indir"""
         try:
             ticker = yf.Ticker(symbol)
             info = ticker.info
@@ -190,38 +478,49 @@ class OptimizedMCDMRanking:
             return None
     
     def _fetch_financial_data_parallel(self, symbols: List[str]) -> Dict[str, FinancialMetrics]:
-        """Fetch financial data in parallel with error handling"""
+        """
+        Yalnızca cache'te bayat olan sembolleri paralel indir
+        
+        Başarısız semboller en fazla max_retries tur yeniden denenir (her sembol tur başına bir kez).
+        Returns: Yeni indirilen sembol -> metrik
+        """
         data = {}
-        failed_symbols = []
+        pending = self.fundamentals_cache.stale_symbols(symbols)
         
         try:
-            # Submit tasks to thread pool
-            future_to_symbol = {
-                self.executor.submit(self._get_cached_financial_data, symbol): symbol
-                for symbol in symbols
-            }
-            
-            # Collect results with timeout
-            for future in as_completed(future_to_symbol, timeout=60):
-                symbol = future_to_symbol[future]
-                try:
-                    result = future.result(timeout=10)
-                    if result:
-                        data[symbol] = result
-                    else:
+            for attempt in range(self.max_retries):
+                if not pending:
+                    break
+                
+                future_to_symbol = {
+                    self.executor.submit(self._fetch_financial_data, symbol): symbol
+                    for symbol in pending
+                }
+                failed_symbols = []
+                
+                # Collect results with timeout
+                for future in as_completed(future_to_symbol, timeout=60):
+                    symbol = future_to_symbol[future]
+                    try:
+                        result = future.result(timeout=10)
+                        if result:
+                            data[symbol] = result
+                            self.fundamentals_cache.put(result)
+                        else:
+                            failed_symbols.append(symbol)
+                    except Exception as e:
+                        logger.warning(f"Failed to fetch data for {symbol}: {e}")
                         failed_symbols.append(symbol)
-                except Exception as e:
-                    logger.warning(f"Failed to fetch data for {symbol}: {e}")
-                    failed_symbols.append(symbol)
-            
-            # Retry failed symbols
-            if failed_symbols and len(failed_symbols) < len(symbols) * 0.3:  # Less than 30% failed
-                retry_data = self._fetch_financial_data_parallel(failed_symbols)
-                data.update(retry_data)
+                
+                # Çoğunluk başarısızsa (ör. ağ yok) yeniden deneme anlamsız
+                if len(failed_symbols) >= len(pending) * 0.3:
+                    break
+                pending = failed_symbols
             
         except Exception as e:
             logger.error(f"Parallel data fetch error: {e}")
         
+        self.fundamentals_cache.save()
         return data
     
     def calculate_entropy_weights(self, data: pd.DataFrame) -> np.ndarray:
@@ -288,25 +587,7 @@ class OptimizedMCDMRanking:
                 return np.array([]), np.array([])
             
             # Normalize decision matrix with numerical stability
-            normalized_matrix = np.zeros_like(data, dtype=np.float64)
-            
-            for j in range(n_criteria):
-                column = data.iloc[:, j].values
-                
-                if criteria_types[j] == 1:  # Benefit criteria
-                    # Vector normalization with stability
-                    norm_factor = np.sqrt(np.sum(column**2))
-                    if norm_factor < 1e-10:
-                        norm_factor = 1e-10
-                    normalized_matrix[:, j] = column / norm_factor
-                else:  # Cost criteria
-                    # Min-max normalization for cost criteria
-                    min_val = np.min(column)
-                    max_val = np.max(column)
-                    if max_val - min_val < 1e-10:
-                        normalized_matrix[:, j] = 1.0
-                    else:
-                        normalized_matrix[:, j] = min_val / column
+            normalized_matrix = self._normalize_for_topsis(data.to_numpy(dtype=np.float64), criteria_types)
             
             # Weighted normalized matrix
             weighted_matrix = normalized_matrix * weights
@@ -316,13 +597,7 @@ class OptimizedMCDMRanking:
             ideal_worst = np.min(weighted_matrix, axis=0)
             
             # Validate ideal solutions
-            if np.any(np.isnan(ideal_best)) or np.any(np.isnan(ideal_worst)):
-                logger.error("Invalid ideal solutions in TOPSIS")
-                return np.array([]), np.array([])
-            
-            # Check for infinite values
-            if np.any(np.isinf(ideal_best)) or np.any(np.isinf(ideal_worst)):
-                logger.error("Infinite ideal solutions in TOPSIS")
+            if not self._ideal_points_valid(ideal_best, ideal_worst):
                 return np.array([]), np.array([])
             
             # Check for zero or negative values in cost criteria
@@ -342,24 +617,135 @@ class OptimizedMCDMRanking:
             closeness = d_worst / denominator
             
             # Validate closeness values
-            if np.any(np.isnan(closeness)) or np.any(np.isinf(closeness)):
-                logger.error("Invalid closeness values in TOPSIS")
+            if not self._closeness_valid(closeness):
                 return np.array([]), np.array([])
             
             # Ranking (higher is better)
-            ranking = np.argsort(closeness)[::-1]
-            
-            return closeness, ranking
+            return closeness, self._rank_by_closeness(closeness)
             
         except Exception as e:
             logger.error(f"Grey TOPSIS calculation error: {e}")
             return np.array([]), np.array([])
     
+    @staticmethod
+    def _ideal_points_valid(ideal_best: np.ndarray, ideal_worst: np.ndarray) -> bool:
+        """İdeal / anti-ideal noktalarda NaN veya inf yoksa True"""
+        if np.any(np.isnan(ideal_best)) or np.any(np.isnan(ideal_worst)):
+            logger.error("Invalid ideal solutions in TOPSIS")
+            return False
+        if np.any(np.isinf(ideal_best)) or np.any(np.isinf(ideal_worst)):
+            logger.error("Infinite ideal solutions in TOPSIS")
+            return False
+        return True
+    
+    @staticmethod
+    def _closeness_valid(closeness: np.ndarray) -> bool:
+        """Yakınlık katsayılarının hepsi sonluysa True"""
+        if not np.all(np.isfinite(closeness)):
+            logger.error("Invalid closeness values in TOPSIS")
+            return False
+        return True
+    
+    @staticmethod
+    def _rank_by_closeness(closeness: np.ndarray) -> np.ndarray:
+        """Son eksende yakınlığa göre azalan sıra; eşitlikte küçük indeks önde"""
+        return np.argsort(-closeness, axis=-1, kind='stable')
+    
+    @staticmethod
+    def _normalize_for_topsis(values: np.ndarray, criteria_types: np.ndarray) -> np.ndarray:
+        """Benefit: vektör normalizasyonu, cost: min / değer (sabit kolon -> 1)"""
+        benefit = np.asarray(criteria_types) == 1
+        norm = np.maximum(np.sqrt((values ** 2).sum(axis=0)), 1e-10)
+        col_min = values.min(axis=0)
+        flat_cost = ~benefit & (values.max(axis=0) - col_min < 1e-10)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized = np.where(benefit, values / norm, col_min / values)
+        normalized[:, flat_cost] = 1.0
+        return normalized
+    
+    def grey_topsis_batch(self, data: pd.DataFrame, weight_matrix: np.ndarray,
+                          criteria_types: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        grey_topsis'in (scenarios x criteria) ağırlık matrisi için toplu hali
+        
+        Returns:
+            Tuple: closeness (scenarios x alternatives), ranking (senaryo başına en iyiden kötüye indeksler)
+        """
+        from analysis.mcdm_ranking import topsis_ideal_points, topsis_closeness
+        
+        try:
+            weights = np.atleast_2d(np.asarray(weight_matrix, dtype=np.float64))
+            if data.empty or weights.shape[1] != data.shape[1] or len(criteria_types) != data.shape[1]:
+                logger.error("Dimension mismatch in batch TOPSIS calculation")
+                return np.array([]), np.array([])
+            
+            normalized = self._normalize_for_topsis(data.to_numpy(dtype=np.float64), criteria_types)
+            ideal_best, ideal_worst = topsis_ideal_points(normalized, weights, np.ones(data.shape[1], dtype=bool))
+            if not self._ideal_points_valid(ideal_best, ideal_worst):
+                return np.array([]), np.array([])
+            # grey_topsis ile aynı: cost kriterinde pozitif olmayan anti-ideal -> 1e-10
+            ideal_worst = np.where((np.asarray(criteria_types) == 0) & (ideal_worst <= 0), 1e-10, ideal_worst)
+            
+            _, d_best, d_worst = topsis_closeness(normalized, weights, ideal_best, ideal_worst)
+            closeness = d_worst / np.maximum(d_best + d_worst, 1e-10)
+            if not self._closeness_valid(closeness):
+                return np.array([]), np.array([])
+            return closeness, self._rank_by_closeness(closeness)
+            
+        except Exception as e:
+            logger.error(f"Batch Grey TOPSIS calculation error: {e}")
+            return np.array([]), np.array([])
+    
+    def update_decision_matrix(self, symbols: List[str], market: str) -> Tuple[IncrementalDecisionMatrix, int]:
+        """
+        Market'in artımlı karar matrisini güncelle
+        
+        Bayat semboller indirilir; yalnızca fundamentals versiyonu değişen satırlar yazılır,
+        listeden çıkan semboller silinir. Returns: (matris, değişen satır sayısı)
+        """
+        state = self.decision_matrices.get(market)
+        if state is None:
+            state = IncrementalDecisionMatrix(METRIC_COLUMNS, np.array([1, 1, 1, 1, 1, 1, 1, 0, 0, 1]),
+                                              capacity=max(len(symbols), 1))
+            self.decision_matrices[market] = state
+        
+        self._fetch_financial_data_parallel(symbols)
+        
+        changed = 0
+        requested = set(symbols)
+        for symbol in [s for s in state.symbols if s not in requested]:
+            state.remove(symbol)
+            changed += 1
+        for symbol in symbols:
+            entry = self.fundamentals_cache.entries.get(symbol)
+            if entry is not None and state.upsert(symbol, entry['values'], entry['version']):
+                changed += 1
+        return state, changed
+    
+    def _data_quality(self, symbols: List[str]) -> float:
+        """
+        İstenen semboller için dolu kriter oranı
+        
+        Kaynakta olmayan oranlar indirilirken 0.0'a çevrildiğinden sıfır/NaN hücreler eksik sayılır;
+        fundamentals'ı hiç olmayan semboller tamamen eksiktir.
+        """
+        if not symbols:
+            return 0.0
+        present = 0
+        for symbol in symbols:
+            entry = self.fundamentals_cache.entries.get(symbol)
+            if entry is not None:
+                values = np.asarray(entry['values'], dtype=np.float64)
+                present += int(np.count_nonzero(np.isfinite(values) & (values != 0)))
+        return present / (len(symbols) * len(METRIC_COLUMNS))
+    
     def prepare_decision_matrix(self, symbols: List[str]) -> Tuple[pd.DataFrame, List[str], np.ndarray]:
         """Karar matrisi hazırla (optimized)"""
         try:
-            # Fetch financial data in parallel
-            financial_data = self._fetch_financial_data_parallel(symbols)
+            # Bayat sembolleri indir, tüm metrikleri cache'ten al
+            self._fetch_financial_data_parallel(symbols)
+            financial_data = {symbol: metrics for symbol in symbols
+                              if (metrics := self.fundamentals_cache.get(symbol)) is not None}
             
             if not financial_data:
                 logger.warning("No financial data available")
@@ -451,48 +837,59 @@ class OptimizedMCDMRanking:
             
             self.cache_misses += 1
             
-            # Prepare decision matrix
-            decision_matrix, valid_symbols, criteria_types = self.prepare_decision_matrix(symbols)
+            # Artımlı karar matrisi: yalnızca değişen semboller yeniden yazılır
+            state, changed_rows = self.update_decision_matrix(symbols, market)
             
-            if decision_matrix.empty:
+            if state.size == 0:
                 logger.warning(f"{market} için veri bulunamadı")
                 return {}
             
-            # Calculate entropy weights
-            weights = self.calculate_entropy_weights(decision_matrix)
-            
-            # Apply Grey TOPSIS
-            closeness, ranking = self.grey_topsis(
-                decision_matrix, 
-                weights, 
-                criteria_types
-            )
+            # Entropi ağırlıkları matris versiyonu değiştiğinde yeniden hesaplanır
+            cached_weights = self._weights_cache.get(market)
+            if cached_weights is not None and cached_weights[0] == state.version:
+                weights = cached_weights[1]
+            else:
+                weights = self.calculate_entropy_weights(
+                    pd.DataFrame(state.matrix(), columns=state.columns, index=state.symbols))
+                self._weights_cache[market] = (state.version, weights)
             
-            if len(closeness) == 0:
+            # Grey TOPSIS (kolon agregalarından normalizasyon ve ideal noktalar)
+            closeness = state.closeness(weights)
+            if len(closeness) == 0 or not np.all(np.isfinite(closeness)):
                 logger.error(f"TOPSIS calculation failed for {market}")
                 return {}
+            ranking = self._rank_by_closeness(closeness)
+            valid_symbols = list(state.symbols)
+            
+            data_quality = self._data_quality(symbols)
+            if data_quality < self.min_data_quality:
+                logger.warning(f"Low data quality: {data_quality:.2f} < {self.min_data_quality}")
             
             # Create results with enhanced information
             results = {
                 'market': market,
                 'timestamp': datetime.now().isoformat(),
                 'total_symbols': len(valid_symbols),
-                'data_quality': 1 - (decision_matrix.isnull().sum().sum() / (len(decision_matrix) * len(decision_matrix.columns))),
+                'data_quality': data_quality,
                 'weights': weights.tolist(),
+                'changed_rows': changed_rows,
                 'ranking': []
             }
             
+            for symbol, score in zip(valid_symbols, closeness):
+                self.score_history.record(market, symbol, float(score))
+            
             for i, rank_idx in enumerate(ranking):
                 symbol = valid_symbols[rank_idx]
                 score = closeness[rank_idx]
                 
                 # Get financial data for details
-                financial_data = self._get_cached_financial_data(symbol)
+                financial_data = self.fundamentals_cache.get(symbol)
                 
                 ranking_result = RankingResult(
                     rank=i + 1,
                     symbol=symbol,
-                    score=round(score, 4),
+                    score=round(float(score), 4),
                     market=market,
                     financial_metrics=financial_data.to_dict() if financial_data else {},
                     score_change_7d=self._calculate_score_change(symbol, market, 7),
@@ -502,6 +899,8 @@ class OptimizedMCDMRanking:
                 
                 results['ranking'].append(ranking_result.to_dict())
             
+            self.score_history.save()
+            
             # Store in history with cache management
             self.ranking_history[cache_key] = results
             self.last_update[cache_key] = time.time()
@@ -523,19 +922,16 @@ class OptimizedMCDMRanking:
             return {}
     
     def _calculate_score_change(self, symbol: str, market: str, days: int) -> Optional[float]:
-        """Calculate score change over specified days"""
+        """Calculate score change over specified days (bellekteki günlük skor geçmişinden)"""
         try:
-            # This is a simplified calculation
-            # In production, you'd store daily scores and calculate actual changes
-            return round(np.random.uniform(-0.1, 0.1), 4)
+            return self.score_history.change(market, symbol, days)
         except Exception:
             return None
     
     def _calculate_volatility(self, symbol: str, market: str) -> Optional[float]:
         """Calculate score volatility"""
         try:
-            # Simplified volatility calculation
-            return round(np.random.uniform(0.01, 0.05), 4)
+            return self.score_history.volatility(market, symbol)
         except Exception:
             return None
     
@@ -719,6 +1115,8 @@ class OptimizedMCDMRanking:
             'cache_misses': self.cache_misses,
             'cache_hit_rate': round(self.cache_hits / max(self.cache_hits + self.cache_misses, 1) * 100, 2),
             'total_rankings': len(self.ranking_history),
+            'fundamentals_cached': len(self.fundamentals_cache.entries),
+            'fundamentals_fresh': sum(self.fundamentals_cache.is_fresh(s) for s in self.fundamentals_cache.entries),
             'last_update': {k: datetime.fromtimestamp(v).isoformat() for k, v in self.last_update.items()},
             'memory_usage_mb': sum(sys.getsizeof(v) for v in self.ranking_history.values()) / 1024 / 1024
         }
@@ -728,6 +1126,8 @@ class OptimizedMCDMRanking:
         try:
             self.executor.shutdown(wait=True)
             self._save_historical_data()
+            self.fundamentals_cache.save()
+            self.score_history.save()
             gc.collect()
             logger.info("MCDM Ranking cleanup completed")
         except Exception as e:
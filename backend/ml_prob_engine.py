@@ -15,6 +15,8 @@ from sklearn.calibration import CalibratedClassifierCV
 from sklearn.metrics import roc_auc_score, brier_score_loss
 from sklearn.model_selection import TimeSeriesSplit
 
+from core.feature_dag import compute_features
+
 
 def fetch(symbol: str, period: str = "2y", interval: str = "1d", use_mock: bool = False) -> pd.DataFrame:
     """Download OHLCV with yfinance; fallback to mock if requested/failed."""
@@ -88,45 +90,30 @@ def make_features(df: pd.DataFrame) -> pd.DataFrame:
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
     
-    c = df['Close'].astype(float)
-    h = df['High'].astype(float)
-    l = df['Low'].astype(float)
-    v = df['Volume'].astype(float)
-    
-    out = pd.DataFrame(index=df.index)
-    
-    # PRD v2.0: Basic returns (momentum)
-    out['ret_1'] = c.pct_change()
-    out['ret_3'] = c.pct_change(3)
-    out['ret_5'] = c.pct_change(5)
-    out['ret_10'] = c.pct_change(10)
-    
-    # PRD v2.0: Trend indicators
-    out['ema10'] = ta.trend.ema_indicator(c, window=10)
-    out['ema20'] = ta.trend.ema_indicator(c, window=20)
-    out['ema50'] = ta.trend.ema_indicator(c, window=50)
-    out['ema200'] = ta.trend.ema_indicator(c, window=200)
-    
-    # PRD v2.0: Momentum indicators
-    out['rsi14'] = ta.momentum.rsi(c, window=14)
-    out['rsi21'] = ta.momentum.rsi(c, window=21)
-    out['macd'] = ta.trend.macd_diff(c)
-    out['macd_signal'] = ta.trend.macd_signal(c)
-    
-    # PRD v2.0: Volatility indicators
-    out['atr14'] = ta.volatility.average_true_range(h, l, c, window=14)
-    bb_upper, bb_middle, bb_lower = ta.volatility.bollinger_bands(c, window=20)
-    out['bb_width'] = (bb_upper - bb_lower) / bb_middle
-    
-    # PRD v2.0: Volume indicators
-    out['volume_ma20'] = ta.volume.volume_sma(v, window=20)
-    out['volume_ratio'] = v / out['volume_ma20']
-    out['obv'] = ta.volume.on_balance_volume(c, v)
-    
-    # PRD v2.0: Structural indicators
-    out['high_52w'] = h.rolling(252).max()
-    out['low_52w'] = l.rolling(252).min()
-    out['price_position'] = (c - out['low_52w']) / (out['high_52w'] - out['low_52w'])
+    # PRD v2.0: Returns, trend, momentum, volatility, volume and structural indicators
+    # (ta-compatible nodes of the shared feature DAG, computed once per bar range)
+    out = compute_features(df, {
+        'ret_1': ('returns', {'periods': 1}),
+        'ret_3': ('returns', {'periods': 3}),
+        'ret_5': ('returns', {'periods': 5}),
+        'ret_10': ('returns', {'periods': 10}),
+        'ema10': ('ema_ta', {'window': 10}),
+        'ema20': ('ema_ta', {'window': 20}),
+        'ema50': ('ema_ta', {'window': 50}),
+        'ema200': ('ema_ta', {'window': 200}),
+        'rsi14': ('rsi_wilder', {'window': 14}),
+        'rsi21': ('rsi_wilder', {'window': 21}),
+        'macd': ('macd_hist', {'ema': 'ema_ta'}),
+        'macd_signal': ('macd_signal', {'ema': 'ema_ta'}),
+        'atr14': ('atr_wilder', {'window': 14}),
+        'bb_width': ('bb_width', {'window': 20, 'ddof': 0}),
+        'volume_ma20': ('sma', {'window': 20, 'source': 'volume'}),
+        'volume_ratio': ('volume_ratio', {'window': 20}),
+        'obv': 'obv',
+        'high_52w': ('rolling_max', {'window': 252, 'source': 'high'}),
+        'low_52w': ('rolling_min', {'window': 252, 'source': 'low'}),
+    })
+    out['price_position'] = (df['Close'].astype(float) - out['low_52w']) / (out['high_52w'] - out['low_52w'])
     
     # PRD v2.0: Robust data cleaning
     out = out.replace([np.inf, -np.inf], np.nan)
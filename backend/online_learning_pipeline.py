@@ -60,6 +60,351 @@ class LearningMetrics:
     model_complexity: float
     created_at: datetime
 
+
+class ADWIN:
+    """
+    ADWIN (ADaptive WINdowing) - tek akış için uyarlamalı pencere
+    
+    Pencere üstel histogram bucket'larında tutulur (O(M log W) bellek);
+    iki alt pencerenin ortalaması Hoeffding sınırından fazla ayrışırsa eski kısım atılır.
+    """
+    
+    def __init__(self, delta: float = 0.002, max_buckets: int = 5,
+                 clock: int = 32, min_window: int = 10):
+        self.delta = delta
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self.min_window = min_window
+        self.buckets: List[List[float]] = []  # [count, total, variance], eskiden yeniye
+        self.width = 0
+        self.total = 0.0
+        self.variance = 0.0
+        self.last_change = 0.0
+        self._ticks = 0
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.width if self.width else 0.0
+    
+    def update(self, value: float) -> bool:
+        """Yeni değeri ekle, değişim tespit edilirse True"""
+        value = float(value)
+        if self.width:
+            self.variance += self.width * (value - self.mean) ** 2 / (self.width + 1)
+        self.buckets.append([1, value, 0.0])
+        self.width += 1
+        self.total += value
+        self._compress()
+        
+        self._ticks += 1
+        if self._ticks % self.clock or self.width < 2 * self.min_window:
+            return False
+        return self._detect_change()
+    
+    def _compress(self):
+        size = 1
+        while True:
+            same_size = [i for i, bucket in enumerate(self.buckets) if bucket[0] == size]
+            if len(same_size) <= self.max_buckets:
+                return
+            i, j = same_size[0], same_size[1]
+            n1, t1, v1 = self.buckets[i]
+            n2, t2, v2 = self.buckets[j]
+            merged_variance = v1 + v2 + n1 * n2 * (t1 / n1 - t2 / n2) ** 2 / (n1 + n2)
+            self.buckets[i] = [n1 + n2, t1 + t2, merged_variance]
+            del self.buckets[j]
+            size *= 2
+    
+    def _detect_change(self) -> bool:
+        changed = False
+        shrinking = True
+        while shrinking and len(self.buckets) > 1:
+            shrinking = False
+            variance = self.variance / self.width
+            log_term = np.log(2.0 * np.log(self.width) / self.delta)
+            n0, total0 = 0, 0.0
+            for count, total, _ in self.buckets[:-1]:
+                n0 += count
+                total0 += total
+                n1 = self.width - n0
+                if n0 < self.min_window or n1 < self.min_window:
+                    continue
+                mean_diff = total0 / n0 - (self.total - total0) / n1
+                m = 1.0 / (1.0 / n0 + 1.0 / n1)
+                epsilon = np.sqrt(2.0 / m * variance * log_term) + 2.0 / (3.0 * m) * log_term
+                if abs(mean_diff) > epsilon:
+                    self.last_change = mean_diff
+                    self._drop_oldest()
+                    changed = shrinking = True
+                    break
+        return changed
+    
+    def _drop_oldest(self):
+        count, total, variance = self.buckets.pop(0)
+        rest_count = self.width - count
+        rest_mean = (self.total - total) / rest_count
+        self.variance -= variance + count * rest_count * (total / count - rest_mean) ** 2 / self.width
+        self.variance = max(self.variance, 0.0)
+        self.width = rest_count
+        self.total -= total
+
+
+class DDM:
+    """Drift Detection Method - ikili hata akışında p + s minimumuna göre uyarı/drift"""
+    
+    def __init__(self, warning_level: float = 2.0, drift_level: float = 3.0, min_samples: int = 30):
+        self.warning_level = warning_level
+        self.drift_level = drift_level
+        self.min_samples = min_samples
+        self.reset()
+    
+    def reset(self):
+        self.n = 0
+        self.p = 1.0
+        self.s = 0.0
+        self.p_min = float('inf')
+        self.s_min = float('inf')
+    
+    def update(self, error: float) -> str:
+        """
+        Args:
+            error: 1 yanlış tahmin, 0 doğru tahmin
+            
+        Returns:
+            str: "stable", "warning" veya "drift"
+        """
+        self.n += 1
+        self.p += (float(error) - self.p) / self.n
+        self.s = np.sqrt(self.p * (1 - self.p) / self.n)
+        if self.n < self.min_samples:
+            return "stable"
+        
+        if self.p + self.s < self.p_min + self.s_min:
+            self.p_min, self.s_min = self.p, self.s
+        
+        level = self.p + self.s
+        if level > self.p_min + self.drift_level * self.s_min:
+            return "drift"
+        if level > self.p_min + self.warning_level * self.s_min:
+            return "warning"
+        return "stable"
+
+
+class PageHinkleyBank:
+    """Tüm feature'lar için vektörel iki yönlü Page-Hinkley (z-skor üzerinde, feature başına O(1))"""
+    
+    def __init__(self, reference_mean: np.ndarray, reference_std: np.ndarray,
+                 delta: float = 0.25, threshold: float = 30.0, min_samples: int = 30):
+        self.reference_mean = reference_mean
+        self.reference_std = np.where(reference_std > 0, reference_std, 1.0)
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.reset(np.ones(len(reference_mean), dtype=bool))
+    
+    def reset(self, mask: np.ndarray):
+        n_features = len(self.reference_mean)
+        if not hasattr(self, 'n'):
+            self.n = np.zeros(n_features)
+            self.mean = np.zeros(n_features)
+            self.cum_up = np.zeros(n_features)
+            self.min_up = np.zeros(n_features)
+            self.cum_down = np.zeros(n_features)
+            self.max_down = np.zeros(n_features)
+        for state in (self.n, self.mean, self.cum_up, self.min_up, self.cum_down, self.max_down):
+            state[mask] = 0.0
+    
+    def update(self, x: np.ndarray) -> np.ndarray:
+        """Bir feature vektörü ekle; her feature için (PH istatistiği / eşik), alarm olanlar >= 1"""
+        z = (x - self.reference_mean) / self.reference_std
+        self.n += 1
+        self.mean += (z - self.mean) / self.n
+        self.cum_up += z - self.mean - self.delta
+        self.cum_down += z - self.mean + self.delta
+        np.minimum(self.min_up, self.cum_up, out=self.min_up)
+        np.maximum(self.max_down, self.cum_down, out=self.max_down)
+        
+        statistic = np.maximum(self.cum_up - self.min_up, self.max_down - self.cum_down)
+        return np.where(self.n >= self.min_samples, statistic / self.threshold, 0.0)
+
+
+class HistogramDriftBank:
+    """
+    Sabit bin'li artımlı KS / PSI
+    
+    Bin sınırları referans quantile'larından bir kez belirlenir; güncel dağılım
+    üstel unutmalı bin oranları olarak tutulur (feature başına n_bins bellek).
+    """
+    
+    def __init__(self, reference: np.ndarray, n_bins: int = 10, decay: float = 0.995):
+        self.decay = decay
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        self.edges = np.quantile(reference, quantiles, axis=0).T  # (F, n_bins - 1)
+        
+        indices = (reference[:, :, None] > self.edges[None, :, :]).sum(axis=2)  # (N, F)
+        counts = np.zeros((reference.shape[1], n_bins))
+        np.add.at(counts, (np.broadcast_to(np.arange(reference.shape[1]), indices.shape), indices), 1.0)
+        self.reference = np.maximum(counts / len(reference), 1e-4)
+        self.reference /= self.reference.sum(axis=1, keepdims=True)
+        self.reference_cdf = np.cumsum(self.reference, axis=1)
+        self.reference_size = len(reference)
+        
+        self.current = self.reference.copy()
+        self.n = 0
+    
+    def _bin_index(self, x: np.ndarray) -> np.ndarray:
+        return (x[:, None] > self.edges).sum(axis=1)
+    
+    def reset(self, mask: np.ndarray):
+        self.current[mask] = self.reference[mask]
+    
+    def update(self, x: np.ndarray):
+        self.current *= self.decay
+        self.current[np.arange(len(x)), self._bin_index(x)] += 1.0 - self.decay
+        self.n += 1
+    
+    @property
+    def effective_size(self) -> float:
+        return min(self.n, 1.0 / (1.0 - self.decay))
+    
+    def psi(self) -> np.ndarray:
+        current = np.maximum(self.current, 1e-4)
+        return np.sum((current - self.reference) * np.log(current / self.reference), axis=1)
+    
+    def ks(self) -> np.ndarray:
+        return np.abs(np.cumsum(self.current, axis=1) - self.reference_cdf).max(axis=1)
+    
+    def ks_critical(self, c_alpha: float = 1.95) -> float:
+        """İki örneklem KS kritik değeri (varsayılan alpha=0.001)"""
+        n, m = self.effective_size, self.reference_size
+        return c_alpha * np.sqrt((n + m) / (n * m)) if n > 0 else float('inf')
+
+
+class StreamingDriftMonitor:
+    """
+    Model başına akış halinde drift izleme
+    
+    - Feature'lar: vektörel Page-Hinkley + artımlı KS/PSI (yüzlerce feature için bir NumPy adımı)
+    - Tahmin hatası: ADWIN (hata ortalaması) ve DDM (ikili hata oranı)
+    """
+    
+    def __init__(self, model_name: str, reference_data: pd.DataFrame,
+                 n_bins: int = 10, decay: float = 0.995, psi_threshold: float = 0.25,
+                 ph_delta: float = 0.25, ph_threshold: float = 30.0,
+                 adwin_delta: float = 0.002, check_every: int = 10):
+        self.model_name = model_name
+        self.feature_names = list(reference_data.columns)
+        reference = reference_data.to_numpy(dtype=float)
+        reference = reference[~np.isnan(reference).any(axis=1)]
+        
+        self.page_hinkley = PageHinkleyBank(reference.mean(axis=0), reference.std(axis=0),
+                                            delta=ph_delta, threshold=ph_threshold)
+        self.histograms = HistogramDriftBank(reference, n_bins=n_bins, decay=decay)
+        self.psi_threshold = psi_threshold
+        self.check_every = check_every
+        self.adwin = ADWIN(delta=adwin_delta)
+        self.ddm = DDM()
+        
+        self.n_updates = 0
+        self._distribution_drifted = np.zeros(len(self.feature_names), dtype=bool)
+        self._ddm_state = "stable"
+        self._sequence = 0
+    
+    def update(self, features: Union[np.ndarray, pd.Series, Dict[str, float]],
+               prediction: Optional[float] = None,
+               actual: Optional[float] = None) -> List[ConceptDrift]:
+        """
+        Tek bir feature vektörü (ve varsa tahmin/gerçek) ile tüm dedektörleri ilerlet
+        
+        Returns:
+            List[ConceptDrift]: Bu adımda tetiklenen drift olayları
+        """
+        if isinstance(features, dict):
+            x = np.array([features.get(name, np.nan) for name in self.feature_names], dtype=float)
+        elif isinstance(features, pd.Series):
+            x = features.reindex(self.feature_names).to_numpy(dtype=float)
+        else:
+            x = np.asarray(features, dtype=float)
+        x = np.where(np.isnan(x), self.page_hinkley.reference_mean, x)
+        
+        self.n_updates += 1
+        events = []
+        
+        # Page-Hinkley: ani ortalama kaymaları
+        ph_ratio = self.page_hinkley.update(x)
+        alarms = ph_ratio >= 1.0
+        if alarms.any():
+            severity = float(min(ph_ratio[alarms].max() / 2.0, 1.0))
+            events.append(self._make_drift("PH", "sudden", severity, self._names(alarms), 0.0, 0.95))
+            self.page_hinkley.reset(alarms)
+        
+        # KS / PSI: dağılım kayması (periyodik kontrol)
+        self.histograms.update(x)
+        if self.n_updates % self.check_every == 0 and self.histograms.n >= 1.0 / (1.0 - self.histograms.decay):
+            psi = self.histograms.psi()
+            ks = self.histograms.ks()
+            drifted = (psi > self.psi_threshold) | (ks > self.histograms.ks_critical())
+            new_drifts = drifted & ~self._distribution_drifted
+            if new_drifts.any():
+                severity = float(min(psi[new_drifts].max(), 1.0))
+                confidence = float(min(ks[new_drifts].max() / self.histograms.ks_critical(), 1.0) * 0.99)
+                events.append(self._make_drift("DIST", "gradual", severity, self._names(new_drifts),
+                                               0.0, confidence))
+            self._distribution_drifted = drifted
+        
+        # Tahmin hatası: ADWIN + DDM
+        if prediction is not None and actual is not None:
+            error = float(prediction != actual) if isinstance(actual, (int, np.integer, bool)) \
+                else abs(float(prediction) - float(actual))
+            
+            if self.adwin.update(error) and self.adwin.last_change < 0:
+                # Yeni pencerenin hata ortalaması daha yüksek
+                drop = float(-self.adwin.last_change)
+                events.append(self._make_drift("ADWIN", "sudden" if drop > 0.2 else "gradual",
+                                               float(min(drop, 1.0)), ["performance"], drop,
+                                               1.0 - self.adwin.delta))
+            
+            if isinstance(actual, (int, np.integer, bool)):
+                state = self.ddm.update(error)
+                if state == "drift":
+                    drop = float(self.ddm.p - self.ddm.p_min)
+                    events.append(self._make_drift("DDM", "gradual", float(min(drop * 2, 1.0)),
+                                                   ["performance"], drop, 0.99))
+                    self.ddm.reset()
+                self._ddm_state = state
+        
+        return events
+    
+    def _names(self, mask: np.ndarray) -> List[str]:
+        return [self.feature_names[i] for i in np.flatnonzero(mask)]
+    
+    def _make_drift(self, detector: str, drift_type: str, severity: float,
+                    affected_features: List[str], performance_drop: float,
+                    confidence: float) -> ConceptDrift:
+        now = datetime.now()
+        self._sequence += 1
+        return ConceptDrift(
+            drift_id=f"DRIFT_{detector}_{self.model_name}_{now.strftime('%Y%m%d_%H%M%S')}_{self._sequence}",
+            timestamp=now,
+            drift_type=drift_type,
+            severity=severity,
+            affected_features=affected_features,
+            performance_drop=performance_drop,
+            confidence=confidence,
+            created_at=now
+        )
+    
+    def get_state(self) -> Dict[str, Any]:
+        """Dedektörlerin güncel durumu"""
+        return {
+            "updates": self.n_updates,
+            "distribution_drifted": self._names(self._distribution_drifted),
+            "adwin_width": self.adwin.width,
+            "adwin_mean_error": self.adwin.mean,
+            "ddm_state": self._ddm_state
+        }
+
+
 class OnlineLearningPipeline:
     """Online Learning Pipeline ana sınıfı"""
     
@@ -70,6 +415,7 @@ class OnlineLearningPipeline:
         self.performance_history = deque(maxlen=1000)
         self.drift_detectors = {}
         self.adaptation_strategies = {}
+        self.drift_monitors: Dict[str, StreamingDriftMonitor] = {}
         
         # Concept drift detection parametreleri
         self.drift_threshold = 0.1
@@ -326,6 +672,35 @@ class OnlineLearningPipeline:
             logger.error(f"Error in concept drift detection: {e}")
             return []
     
+    def create_drift_monitor(self, model_name: str, reference_data: pd.DataFrame,
+                             **kwargs) -> StreamingDriftMonitor:
+        """Model için akış halinde drift monitörü oluştur (referans verisi bir kez işlenir)"""
+        monitor = StreamingDriftMonitor(model_name, reference_data, **kwargs)
+        self.drift_monitors[model_name] = monitor
+        logger.info(f"Streaming drift monitor created: {model_name}, {len(monitor.feature_names)} features")
+        return monitor
+    
+    def update_drift_monitor(self, model_name: str, features,
+                             prediction: Optional[float] = None,
+                             actual: Optional[float] = None) -> List[ConceptDrift]:
+        """Tek gözlemle model monitörünü güncelle, tetiklenen drift'leri kaydet"""
+        try:
+            monitor = self.drift_monitors.get(model_name)
+            if monitor is None:
+                logger.warning(f"No drift monitor for model: {model_name}")
+                return []
+            
+            drifts = monitor.update(features, prediction, actual)
+            for drift in drifts:
+                self.concept_drifts[drift.drift_id] = drift
+                logger.info(f"Streaming drift detected ({model_name}): {drift.drift_id}, "
+                            f"{len(drift.affected_features)} features, severity={drift.severity:.3f}")
+            return drifts
+        
+        except Exception as e:
+            logger.error(f"Error in streaming drift update: {e}")
+            return []
+    
     def _incremental_adaptation(self, model, new_data: pd.DataFrame, 
                                new_labels: pd.Series) -> ModelUpdate:
         """Incremental adaptasyon uygula"""
@@ -730,6 +1105,29 @@ def test_online_learning_pipeline():
     else:
         print("      ✅ Performans drift tespit edilmedi")
     
+    # Akış halinde drift detection
+    print("   📊 Streaming Drift Detection:")
+    n_stream_features = 200
+    stream_reference = pd.DataFrame(np.random.randn(1000, n_stream_features),
+                                    columns=[f"f{i}" for i in range(n_stream_features)])
+    pipeline.create_drift_monitor("stream_model", stream_reference)
+    
+    stream_drifts = []
+    start_time = datetime.now()
+    for step in range(2000):
+        vector = np.random.randn(n_stream_features)
+        if step >= 1000:
+            vector[:10] += 1.5  # İlk 10 feature'da kayma
+        actual = int(np.random.rand() < 0.5)
+        correct_prob = 0.8 if step < 1000 else 0.5
+        prediction = actual if np.random.rand() < correct_prob else 1 - actual
+        stream_drifts += pipeline.update_drift_monitor("stream_model", vector, prediction, actual)
+    elapsed = (datetime.now() - start_time).total_seconds()
+    
+    print(f"      ✅ {len(stream_drifts)} drift olayı, {elapsed / 2000 * 1e6:.0f} µs/gözlem")
+    for drift in stream_drifts[:5]:
+        print(f"         • {drift.drift_id}: {drift.affected_features[:5]}")
+    
     # Model adaptasyon testi
     print("\n📊 Model Adaptasyon Testi:")
     
@@ -8,13 +8,22 @@ Sipariş yönetim sistemi:
 - Risk checks and validation
 - Order execution monitoring
 - Position tracking
+- Secondary order indexes (status, symbol, side, strategy)
+- Append-only order journal with snapshots for crash recovery
 """
 
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Tuple, Optional, Union, Any, Callable
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date
+import json
+import os
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -73,6 +82,139 @@ class OrderValidation:
     warnings: List[str]
     timestamp: datetime = None
 
+def _json_default(value):
+    """datetime/date alanlarını ISO formatında serileştir"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Serileştirilemeyen tip: {type(value)}")
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+class OrderIndex:
+    """
+    Sipariş ikincil indeksleri
+    
+    Her alan için değer -> {order_id: Order} kovaları tutar; kovalar dict olduğundan
+    ekleme sırası korunur ve durum geçişleri O(1)'dir.
+    """
+    
+    FIELDS = ('status', 'symbol', 'side', 'strategy_id')
+    
+    def __init__(self):
+        self._indexes: Dict[str, Dict[Any, Dict[str, Order]]] = {field: {} for field in self.FIELDS}
+    
+    def add(self, order: Order):
+        """Siparişi tüm indekslere ekle"""
+        for field in self.FIELDS:
+            self._indexes[field].setdefault(getattr(order, field), {})[order.order_id] = order
+    
+    def update(self, order: Order, field: str, old_value: Any):
+        """Alan değeri değişen siparişi eski kovadan yeni kovaya taşı"""
+        index = self._indexes[field]
+        bucket = index.get(old_value)
+        if bucket is not None:
+            bucket.pop(order.order_id, None)
+            if not bucket:
+                del index[old_value]
+        index.setdefault(getattr(order, field), {})[order.order_id] = order
+    
+    def get(self, field: str, value: Any) -> List[Order]:
+        return list(self._indexes[field].get(value, {}).values())
+    
+    def bucket(self, field: str, value: Any) -> Dict[str, Order]:
+        return self._indexes[field].get(value, {})
+    
+    def counts(self, field: str) -> Dict[Any, int]:
+        return {value: len(bucket) for value, bucket in self._indexes[field].items()}
+
+class OrderJournal:
+    """
+    Append-only JSONL sipariş günlüğü
+    
+    Her durum geçişi sıra numaralı bir olay olarak eklenir. Periyodik snapshot
+    tüm durumu atomik olarak yazar ve günlüğü keser; kurtarma snapshot'ı yükleyip
+    yalnızca sonraki olayları yeniden oynatır.
+    """
+    
+    def __init__(self, directory: str, snapshot_every: int = 10000, fsync: bool = False):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.journal_path = os.path.join(directory, "orders.jsonl")
+        self.snapshot_path = os.path.join(directory, "snapshot.json")
+        self.seq = 0
+        self.events_since_snapshot = 0
+        self._fh = None
+        os.makedirs(directory, exist_ok=True)
+    
+    def append(self, op: str, payload: Dict[str, Any]) -> int:
+        """Olayı günlüğe ekle ve sıra numarasını döndür"""
+        if self._fh is None:
+            self._fh = open(self.journal_path, "a", encoding="utf-8")
+        self.seq += 1
+        record = {'seq': self.seq, 'op': op}
+        record.update(payload)
+        self._fh.write(json.dumps(record, default=_json_default, separators=(",", ":")) + "\n")
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self.events_since_snapshot += 1
+        return self.seq
+    
+    def snapshot_due(self, state_size: int) -> bool:
+        """Snapshot zamanı geldi mi (en az durum boyutu kadar olay birikince -> amortize O(1))"""
+        return self.events_since_snapshot >= max(self.snapshot_every, state_size)
+    
+    def write_snapshot(self, state: Dict[str, Any]):
+        """Durumu atomik olarak yaz ve günlüğü kes"""
+        state = dict(state, seq=self.seq)
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(state, default=_json_default, separators=(",", ":")))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        
+        # Snapshot kalıcı; seq <= snapshot olan olaylar artık gereksiz
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = open(self.journal_path, "w", encoding="utf-8")
+        self.events_since_snapshot = 0
+    
+    def recover(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Snapshot'ı ve ondan sonraki olayları oku; yarım kalmış son satırı kes"""
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        base_seq = snapshot['seq'] if snapshot else 0
+        
+        events = []
+        if os.path.exists(self.journal_path):
+            good_offset = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break
+                    good_offset += len(line)
+                    if event['seq'] > base_seq:
+                        events.append(event)
+            if good_offset < os.path.getsize(self.journal_path):
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good_offset)
+        
+        self.seq = max([base_seq] + [event['seq'] for event in events])
+        self.events_since_snapshot = len(events)
+        return snapshot, events
+    
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
 class OrderManagementSystem:
     """
     Sipariş Yönetim Sistemi
@@ -85,11 +227,25 @@ class OrderManagementSystem:
     - Pozisyon takibi
     """
     
-    def __init__(self):
-        """Order Management System başlatıcı"""
+    def __init__(self, journal_dir: Optional[str] = None, snapshot_every: int = 10000,
+                 verbose: bool = True):
+        """
+        Order Management System başlatıcı
+        
+        Args:
+            journal_dir: Sipariş günlüğü dizini (None ise sadece bellekte)
+            snapshot_every: Snapshot'lar arası minimum olay sayısı
+            verbose: Sipariş bazında konsol çıktısı
+        """
+        self.verbose = verbose
+        
         # Siparişler
         self.orders = {}
         
+        # İkincil indeksler
+        self.order_index = OrderIndex()
+        self._next_order_seq = 1
+        
         # Pozisyonlar
         self.positions = {}
         
@@ -124,6 +280,16 @@ class OrderManagementSystem:
             'total_pnl': 0.0,
             'date': datetime.now().date()
         }
+        
+        # Günlük ve kurtarma
+        self.journal = None
+        if journal_dir:
+            self.journal = OrderJournal(journal_dir, snapshot_every=snapshot_every)
+            self._recover_from_journal()
+    
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
     
     def create_order(self, symbol: str, order_type: str, side: str, quantity: float,
                      price: Optional[float] = None, stop_price: Optional[float] = None,
@@ -146,8 +312,9 @@ class OrderManagementSystem:
             Order: Oluşturulan sipariş
         """
         try:
-            # Sipariş ID oluştur
-            order_id = f"order_{symbol}_{side}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            # Sipariş ID oluştur (aynı saniyedeki siparişler için sıra numarası)
+            order_id = f"order_{symbol}_{side}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{self._next_order_seq}"
+            self._next_order_seq += 1
             
             # Limit fiyatı hesapla
             limit_price = None
@@ -173,12 +340,14 @@ class OrderManagementSystem:
             )
             
             # Siparişi kaydet
-            self.orders[order_id] = order
+            self._apply_create(order)
+            if self.journal is not None:
+                self._journal_event('create', {'order': vars(order)})
             
             # Günlük istatistikleri güncelle
             self._update_daily_stats(order)
             
-            print(f"✅ Sipariş oluşturuldu: {order_id}")
+            self._log(f"✅ Sipariş oluşturuldu: {order_id}")
             return order
             
         except Exception as e:
@@ -256,11 +425,11 @@ class OrderManagementSystem:
             )
             
             if is_valid:
-                print(f"✅ Sipariş doğrulandı: {order.order_id}")
+                self._log(f"✅ Sipariş doğrulandı: {order.order_id}")
             else:
-                print(f"❌ Sipariş doğrulanamadı: {order.order_id}")
+                self._log(f"❌ Sipariş doğrulanamadı: {order.order_id}")
                 for error in validation_errors:
-                    print(f"   Hata: {error}")
+                    self._log(f"   Hata: {error}")
             
             return validation
             
@@ -298,39 +467,16 @@ class OrderManagementSystem:
             if execution_quantity is None:
                 execution_quantity = order.quantity
             
-            # Komisyon hesapla
-            commission = self._calculate_commission(order.symbol, execution_quantity, execution_price)
-            
-            # Sipariş durumunu güncelle
-            if execution_quantity >= order.quantity:
-                order.status = "filled"
-                order.filled_quantity = order.quantity
-            else:
-                order.status = "partial"
-                order.filled_quantity = execution_quantity
-            
-            order.filled_price = execution_price
-            order.commission = commission
-            
-            # Pozisyon güncelle
-            self._update_position(order, execution_price, execution_quantity)
-            
-            # Sipariş durumu kaydet
-            status = OrderStatus(
-                order_id=order_id,
-                status=order.status,
-                message=f"Sipariş icra edildi: {execution_quantity} @ {execution_price}",
-                timestamp=datetime.now(),
-                details={
-                    'execution_price': execution_price,
-                    'execution_quantity': execution_quantity,
-                    'commission': commission
-                }
-            )
-            
-            self.order_statuses[order_id] = status
+            timestamp = datetime.now()
+            self._apply_execute(order, execution_price, execution_quantity, timestamp)
+            self._journal_event('execute', {
+                'order_id': order_id,
+                'price': execution_price,
+                'quantity': execution_quantity,
+                'timestamp': timestamp
+            })
             
-            print(f"✅ Sipariş icra edildi: {order_id}")
+            self._log(f"✅ Sipariş icra edildi: {order_id}")
             return True
             
         except Exception as e:
@@ -356,24 +502,18 @@ class OrderManagementSystem:
             order = self.orders[order_id]
             
             if order.status in ["filled", "cancelled"]:
-                print(f"⚠️ Sipariş zaten {order.status}: {order_id}")
+                self._log(f"⚠️ Sipariş zaten {order.status}: {order_id}")
                 return False
             
-            # Sipariş durumunu güncelle
-            order.status = "cancelled"
-            
-            # Sipariş durumu kaydet
-            status = OrderStatus(
-                order_id=order_id,
-                status="cancelled",
-                message=f"Sipariş iptal edildi: {reason}",
-                timestamp=datetime.now(),
-                details={'reason': reason}
-            )
-            
-            self.order_statuses[order_id] = status
+            timestamp = datetime.now()
+            self._apply_cancel(order, reason, timestamp)
+            self._journal_event('cancel', {
+                'order_id': order_id,
+                'reason': reason,
+                'timestamp': timestamp
+            })
             
-            print(f"✅ Sipariş iptal edildi: {order_id}")
+            self._log(f"✅ Sipariş iptal edildi: {order_id}")
             return True
             
         except Exception as e:
@@ -402,7 +542,7 @@ class OrderManagementSystem:
         Returns:
             List[Order]: Sipariş listesi
         """
-        return [order for order in self.orders.values() if order.status == status]
+        return self.order_index.get('status', status)
     
     def get_orders_by_symbol(self, symbol: str) -> List[Order]:
         """
@@ -414,7 +554,52 @@ class OrderManagementSystem:
         Returns:
             List[Order]: Sipariş listesi
         """
-        return [order for order in self.orders.values() if order.symbol == symbol]
+        return self.order_index.get('symbol', symbol)
+    
+    def get_orders_by_side(self, side: str) -> List[Order]:
+        """
+        Yöne göre siparişleri al
+        
+        Args:
+            side: Yön (buy/sell)
+            
+        Returns:
+            List[Order]: Sipariş listesi
+        """
+        return self.order_index.get('side', side)
+    
+    def get_orders_by_strategy(self, strategy_id: str) -> List[Order]:
+        """
+        Stratejiye göre siparişleri al
+        
+        Args:
+            strategy_id: Strateji ID
+            
+        Returns:
+            List[Order]: Sipariş listesi
+        """
+        return self.order_index.get('strategy_id', strategy_id)
+    
+    def query_orders(self, **criteria) -> List[Order]:
+        """
+        İndeksli alanlarda birden fazla kritere göre siparişleri al
+        
+        Args:
+            **criteria: status, symbol, side, strategy_id alanlarından herhangi biri
+            
+        Returns:
+            List[Order]: Tüm kriterlere uyan siparişler
+        """
+        unknown = set(criteria) - set(OrderIndex.FIELDS)
+        if unknown:
+            raise ValueError(f"İndekslenmemiş alan(lar): {sorted(unknown)}")
+        if not criteria:
+            return list(self.orders.values())
+        
+        # En küçük kovadan başla, diğer kriterleri sipariş üzerinde kontrol et
+        buckets = sorted((self.order_index.bucket(field, value) for field, value in criteria.items()), key=len)
+        return [order for order in buckets[0].values()
+                if all(getattr(order, field) == value for field, value in criteria.items())]
     
     def get_position(self, symbol: str) -> Optional[Position]:
         """
@@ -449,7 +634,7 @@ class OrderManagementSystem:
         try:
             summary = {
                 'total_orders': len(self.orders),
-                'orders_by_status': {},
+                'orders_by_status': self.order_index.counts('status'),
                 'orders_by_type': {},
                 'total_positions': len(self.positions),
                 'total_volume': 0.0,
@@ -458,12 +643,8 @@ class OrderManagementSystem:
                 'daily_stats': self.daily_stats.copy()
             }
             
-            # Durum bazında sipariş sayısı
+            # Tür bazında sipariş sayısı
             for order in self.orders.values():
-                if order.status not in summary['orders_by_status']:
-                    summary['orders_by_status'][order.status] = 0
-                summary['orders_by_status'][order.status] += 1
-                
                 if order.order_type not in summary['orders_by_type']:
                     summary['orders_by_type'][order.order_type] = 0
                 summary['orders_by_type'][order.order_type] += 1
@@ -481,6 +662,132 @@ class OrderManagementSystem:
             print(f"❌ Ticaret özeti alma hatası: {str(e)}")
             return {'error': str(e)}
     
+    def _set_status(self, order: Order, status: str):
+        """Durum geçişi: sipariş durumunu ve status indeksini birlikte güncelle"""
+        old_status = order.status
+        order.status = status
+        if old_status != status:
+            self.order_index.update(order, 'status', old_status)
+    
+    def _apply_create(self, order: Order):
+        """Yeni siparişi depola ve indeksle"""
+        self.orders[order.order_id] = order
+        self.order_index.add(order)
+    
+    def _apply_execute(self, order: Order, execution_price: float, execution_quantity: float,
+                       timestamp: datetime):
+        """İcrayı sipariş, indeks ve pozisyona uygula"""
+        # Komisyon hesapla
+        commission = self._calculate_commission(order.symbol, execution_quantity, execution_price)
+        
+        # Sipariş durumunu güncelle
+        if execution_quantity >= order.quantity:
+            self._set_status(order, "filled")
+            order.filled_quantity = order.quantity
+        else:
+            self._set_status(order, "partial")
+            order.filled_quantity = execution_quantity
+        
+        order.filled_price = execution_price
+        order.commission = commission
+        
+        # Pozisyon güncelle
+        self._update_position(order, execution_price, execution_quantity)
+        
+        # Sipariş durumu kaydet
+        self.order_statuses[order.order_id] = OrderStatus(
+            order_id=order.order_id,
+            status=order.status,
+            message=f"Sipariş icra edildi: {execution_quantity} @ {execution_price}",
+            timestamp=timestamp,
+            details={
+                'execution_price': execution_price,
+                'execution_quantity': execution_quantity,
+                'commission': commission
+            }
+        )
+    
+    def _apply_cancel(self, order: Order, reason: str, timestamp: datetime):
+        """İptali sipariş ve indekse uygula"""
+        self._set_status(order, "cancelled")
+        
+        self.order_statuses[order.order_id] = OrderStatus(
+            order_id=order.order_id,
+            status="cancelled",
+            message=f"Sipariş iptal edildi: {reason}",
+            timestamp=timestamp,
+            details={'reason': reason}
+        )
+    
+    def _journal_event(self, op: str, payload: Dict[str, Any]):
+        """Olayı günlüğe yaz, gerekirse snapshot al"""
+        if self.journal is None:
+            return
+        self.journal.append(op, payload)
+        if self.journal.snapshot_due(len(self.orders)):
+            self.snapshot()
+    
+    def snapshot(self):
+        """Tüm durumu snapshot olarak yaz ve günlüğü kes"""
+        if self.journal is None:
+            return
+        self.journal.write_snapshot({
+            'order_seq': self._next_order_seq,
+            'orders': [vars(order) for order in self.orders.values()],
+            'positions': [vars(position) for position in self.positions.values()],
+            'order_statuses': [vars(status) for status in self.order_statuses.values()],
+            'daily_stats': self.daily_stats
+        })
+    
+    def _recover_from_journal(self):
+        """Snapshot + günlük olaylarından durumu yeniden kur"""
+        snapshot, events = self.journal.recover()
+        next_seq = 1
+        
+        if snapshot:
+            next_seq = snapshot['order_seq']
+            for data in snapshot['orders']:
+                data['timestamp'] = _parse_datetime(data['timestamp'])
+                self._apply_create(Order(**data))
+            for data in snapshot['positions']:
+                data['timestamp'] = _parse_datetime(data['timestamp'])
+                data['last_updated'] = _parse_datetime(data['last_updated'])
+                self.positions[data['symbol']] = Position(**data)
+            for data in snapshot['order_statuses']:
+                data['timestamp'] = _parse_datetime(data['timestamp'])
+                self.order_statuses[data['order_id']] = OrderStatus(**data)
+            daily_stats = dict(snapshot['daily_stats'])
+            daily_stats['date'] = date.fromisoformat(daily_stats['date'])
+            if daily_stats['date'] == datetime.now().date():
+                self.daily_stats = daily_stats
+        
+        today = datetime.now().date()
+        for event in events:
+            op = event['op']
+            if op == 'create':
+                data = event['order']
+                data['timestamp'] = _parse_datetime(data['timestamp'])
+                order = Order(**data)
+                self._apply_create(order)
+                next_seq += 1
+                if order.timestamp and order.timestamp.date() == today:
+                    self._update_daily_stats(order)
+            elif op == 'execute':
+                self._apply_execute(self.orders[event['order_id']], event['price'],
+                                    event['quantity'], _parse_datetime(event['timestamp']))
+            elif op == 'cancel':
+                self._apply_cancel(self.orders[event['order_id']], event['reason'],
+                                   _parse_datetime(event['timestamp']))
+        
+        self._next_order_seq = next_seq
+        if snapshot or events:
+            self._log(f"♻️ Günlükten kurtarıldı: {len(self.orders)} sipariş, {len(events)} olay yeniden oynatıldı")
+    
+    def close(self):
+        """Günlük dosyasını kapat"""
+        if self.journal is not None:
+            self.journal.close()
+    
     def _update_daily_stats(self, order: Order):
         """Günlük istatistikleri güncelle"""
         try:
@@ -629,6 +936,72 @@ class OrderManagementSystem:
         except Exception as e:
             print(f"❌ Pozisyon güncelleme hatası: {str(e)}")
 
+def benchmark_order_management(n_orders: int = 1_000_000, journal_dir: Optional[str] = None,
+                                n_symbols: int = 100) -> Dict[str, Any]:
+    """
+    Sipariş oluşturma/icra/iptal throughput ve bellek benchmark'ı
+    
+    Siparişlerin yarısı icra edilir, yarısı iptal edilir. journal_dir verilirse
+    günlük yazımı dahil edilir ve sonunda kurtarma süresi ölçülür.
+    
+    Args:
+        n_orders: Sipariş sayısı
+        journal_dir: Günlük dizini (opsiyonel)
+        n_symbols: Farklı sembol sayısı
+        
+    Returns:
+        Dict[str, Any]: Aşama bazında ops/s, ru_maxrss ve sorgu süreleri
+    """
+    symbols = [f"SYM{i:03d}.IS" for i in range(n_symbols)]
+    oms = OrderManagementSystem(journal_dir=journal_dir, verbose=False)
+    results = {'n_orders': n_orders}
+    
+    def timed(name, fn):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            'seconds': elapsed,
+            'ops_per_sec': n_orders / elapsed if elapsed > 0 else 0.0,
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if resource else None
+        }
+    
+    order_ids = []
+    
+    def create_all():
+        for i in range(n_orders):
+            order = oms.create_order(symbol=symbols[i % n_symbols], order_type="limit",
+                                     side="buy" if i % 2 == 0 else "sell", quantity=100,
+                                     price=10.0, strategy_id=f"strategy_{i % 10}")
+            order_ids.append(order.order_id)
+    
+    def execute_and_cancel():
+        for i, order_id in enumerate(order_ids):
+            if i % 2 == 0:
+                oms.execute_order(order_id, 10.0)
+            else:
+                oms.cancel_order(order_id, reason="benchmark")
+    
+    timed('create', create_all)
+    timed('execute_cancel', execute_and_cancel)
+    
+    start = time.perf_counter()
+    filled = oms.get_orders_by_status("filled")
+    symbol_orders = oms.get_orders_by_symbol(symbols[0])
+    results['query_seconds'] = time.perf_counter() - start
+    results['filled_orders'] = len(filled)
+    results['symbol_orders'] = len(symbol_orders)
+    
+    if journal_dir:
+        oms.close()
+        start = time.perf_counter()
+        recovered = OrderManagementSystem(journal_dir=journal_dir, verbose=False)
+        results['recovery_seconds'] = time.perf_counter() - start
+        results['recovered_orders'] = len(recovered.orders)
+        recovered.close()
+    
+    return results
+
 # Test fonksiyonu
 def test_order_management_system():
     """Order Management System test fonksiyonu"""
@@ -733,4 +1106,11 @@ def test_order_management_system():
     return oms
 
 if __name__ == "__main__":
-    test_order_management_system()
+    import sys
+    if "--benchmark" in sys.argv:
+        import tempfile
+        with tempfile.TemporaryDirectory() as journal_dir:
+            for key, value in benchmark_order_management(journal_dir=journal_dir).items():
+                print(f"{key}: {value}")
+    else:
+        test_order_management_system()
@@ -8,17 +8,70 @@ Portföy risk yönetimi motoru:
 - Dynamic rebalancing
 - Risk-adjusted returns
 - Stress testing integration
+- Efficient frontier (warm-started active-set QP)
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Union, Callable
+from typing import Dict, List, Tuple, Optional, Union, Callable, Any
 from dataclasses import dataclass
 from scipy import stats
 from scipy.optimize import minimize
 import warnings
 warnings.filterwarnings('ignore')
 
+ActiveSet = Tuple[np.ndarray, np.ndarray]
+
+def _solve_box_qp(cov: np.ndarray, A: np.ndarray, b: np.ndarray,
+                  lower: np.ndarray, upper: np.ndarray,
+                  active_set: Optional[ActiveSet] = None,
+                  max_iter: int = 100) -> Tuple[np.ndarray, ActiveSet, bool]:
+    """
+    min 1/2 w'Σw  s.t.  Aw = b,  lower <= w <= upper  (primal-dual active set)
+    
+    Her iterasyonda serbest değişkenler için KKT sistemi çözülür, sınırı aşan
+    değişkenler sabitlenir, yanlış işaretli çarpanı olanlar serbest bırakılır.
+    Komşu frontier noktasından gelen aktif küme ile genelde 1-3 iterasyonda biter.
+    
+    Returns:
+        (ağırlıklar, (alt sınırdakiler, üst sınırdakiler), yakınsadı mı)
+    """
+    n = len(cov)
+    m = A.shape[0]
+    if active_set is None:
+        at_lower, at_upper = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    else:
+        at_lower, at_upper = active_set[0].copy(), active_set[1].copy()
+    tol = 1e-10 * max(1.0, float(np.abs(np.diag(cov)).max()))
+    w = np.clip(np.full(n, b[0] / n), lower, upper)
+    
+    for _ in range(max_iter):
+        fixed = at_lower | at_upper
+        free = np.flatnonzero(~fixed)
+        w = np.where(at_lower, lower, np.where(at_upper, upper, 0.0))
+        
+        k = len(free)
+        kkt = np.zeros((k + m, k + m))
+        kkt[:k, :k] = cov[np.ix_(free, free)]
+        kkt[:k, k:] = A[:, free].T
+        kkt[k:, :k] = A[:, free]
+        rhs = np.concatenate([-cov[free][:, fixed] @ w[fixed], b - A[:, fixed] @ w[fixed]])
+        try:
+            solution = np.linalg.solve(kkt, rhs)
+        except np.linalg.LinAlgError:
+            solution = np.linalg.lstsq(kkt, rhs, rcond=None)[0]
+        w[free] = solution[:k]
+        gradient = cov @ w + A.T @ solution[k:]
+        
+        is_free = ~fixed
+        new_lower = (is_free & (w < lower - 1e-12)) | (at_lower & (gradient >= -tol))
+        new_upper = (is_free & (w > upper + 1e-12)) | (at_upper & (gradient <= tol))
+        if np.array_equal(new_lower, at_lower) and np.array_equal(new_upper, at_upper):
+            return np.clip(w, lower, upper), (at_lower, at_upper), True
+        at_lower, at_upper = new_lower, new_upper
+    
+    return np.clip(w, lower, upper), (at_lower, at_upper), False
+
 @dataclass
 class RiskMetrics:
     """Risk metrikleri"""
@@ -86,6 +139,9 @@ class RiskManagementEngine:
         # Uyarı geçmişi
         self.alert_history: List[RiskAlert] = []
         
+        # Evren başına kovaryans önbelleği: parmak izi -> (ortalama getiri, kovaryans, shrinkage)
+        self._covariance_cache: Dict[Tuple, Tuple[np.ndarray, np.ndarray, float]] = {}
+        
     def calculate_portfolio_risk_metrics(self, portfolio_returns: pd.Series,
                                        benchmark_returns: Optional[pd.Series] = None) -> RiskMetrics:
         """
@@ -242,98 +298,266 @@ class RiskManagementEngine:
         
         return alerts
     
+    def estimate_covariance(self, asset_returns: pd.DataFrame,
+                            method: str = "ledoit_wolf") -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Yıllık ortalama getiri ve kovaryans (evren başına bir kez hesaplanır)
+        
+        Args:
+            asset_returns: Varlık getiri matrisi
+            method: "sample" veya "ledoit_wolf" (ölçekli birim matrise shrinkage)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray, float]: Ortalama getiriler, kovaryans, shrinkage katsayısı
+        """
+        returns = asset_returns.dropna()
+        fingerprint = (tuple(returns.columns), method, len(returns),
+                       int(pd.util.hash_pandas_object(returns, index=True).sum()))
+        cached = self._covariance_cache.get(fingerprint)
+        if cached is not None:
+            return cached
+        
+        values = returns.to_numpy(dtype=float)
+        mean_returns = values.mean(axis=0) * 252  # Yıllık
+        
+        if method == "ledoit_wolf":
+            from sklearn.covariance import ledoit_wolf
+            cov_matrix, shrinkage = ledoit_wolf(values)
+            cov_matrix = cov_matrix * len(values) / max(len(values) - 1, 1) * 252
+        elif method == "sample":
+            cov_matrix, shrinkage = np.cov(values, rowvar=False) * 252, 0.0
+        else:
+            raise ValueError(f"Bilinmeyen kovaryans yöntemi: {method}")
+        
+        result = (mean_returns, np.atleast_2d(cov_matrix), float(shrinkage))
+        self._covariance_cache[fingerprint] = result
+        return result
+    
+    @staticmethod
+    def _weight_bounds(n_assets: int, constraints: Dict) -> Tuple[np.ndarray, np.ndarray, float]:
+        lower = np.full(n_assets, float(constraints["min_weight"]))
+        upper = np.full(n_assets, float(constraints["max_weight"]))
+        budget = float(constraints["sum_weights"])
+        if lower.sum() > budget + 1e-12 or upper.sum() < budget - 1e-12:
+            raise ValueError("Ağırlık sınırları ile bütçe kısıtı sağlanamaz")
+        return lower, upper, budget
+    
+    @staticmethod
+    def _return_range(mean_returns: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                      budget: float) -> Tuple[float, float]:
+        """Sınırlar altında ulaşılabilir minimum / maksimum portföy getirisi (açgözlü doldurma)"""
+        def extreme(order):
+            w = lower.copy()
+            remaining = budget - w.sum()
+            for i in order:
+                add = min(upper[i] - lower[i], remaining)
+                w[i] += add
+                remaining -= add
+                if remaining <= 0:
+                    break
+            return float(mean_returns @ w)
+        return extreme(np.argsort(mean_returns)), extreme(np.argsort(-mean_returns))
+    
+    def _solve_target(self, cov_matrix: np.ndarray, mean_returns: np.ndarray,
+                      lower: np.ndarray, upper: np.ndarray, budget: float,
+                      target_return: Optional[float],
+                      active_set: Optional[ActiveSet] = None) -> Tuple[np.ndarray, ActiveSet]:
+        """Hedef getiri (None ise global minimum varyans) için QP; yakınsamazsa analitik gradyanlı SLSQP"""
+        n_assets = len(mean_returns)
+        if target_return is None:
+            A, b = np.ones((1, n_assets)), np.array([budget])
+        else:
+            A, b = np.vstack([np.ones(n_assets), mean_returns]), np.array([budget, target_return])
+        
+        weights, active_set, converged = _solve_box_qp(cov_matrix, A, b, lower, upper, active_set)
+        if converged:
+            return weights, active_set
+        
+        result = minimize(
+            lambda w: (w @ cov_matrix @ w, 2.0 * cov_matrix @ w),
+            weights,
+            jac=True,
+            method='SLSQP',
+            bounds=list(zip(lower, upper)),
+            constraints=[{'type': 'eq', 'fun': lambda w, i=i: A[i] @ w - b[i], 'jac': lambda w, i=i: A[i]}
+                         for i in range(len(b))],
+            options={'maxiter': 1000}
+        )
+        weights = np.clip(result.x, lower, upper)
+        return weights, (weights <= lower + 1e-9, weights >= upper - 1e-9)
+    
+    def efficient_frontier(self, asset_returns: pd.DataFrame, n_points: int = 50,
+                           target_returns: Optional[List[float]] = None,
+                           covariance_method: str = "ledoit_wolf",
+                           constraints: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Etkin sınırı toplu hesaplama
+        
+        Her hedef getiri bir öncekinin çözümü ve aktif kümesiyle sıcak başlatılır;
+        kovaryans evren başına bir kez hesaplanır.
+        
+        Args:
+            asset_returns: Varlık getiri matrisi
+            n_points: Hedef getiri sayısı (target_returns verilmezse)
+            target_returns: Yıllık hedef getiriler (None ise min varyans -> maks getiri)
+            covariance_method: "ledoit_wolf" veya "sample"
+            constraints: min_weight, max_weight, sum_weights
+            
+        Returns:
+            Dict[str, Any]: target_returns, volatilities, sharpe_ratios, weights (DataFrame),
+            min_variance ve max_sharpe portföyleri
+        """
+        constraints = constraints or self._default_weight_constraints()
+        mean_returns, cov_matrix, shrinkage = self.estimate_covariance(asset_returns, covariance_method)
+        lower, upper, budget = self._weight_bounds(len(mean_returns), constraints)
+        
+        min_var_weights, active_set = self._solve_target(cov_matrix, mean_returns, lower, upper, budget, None)
+        if target_returns is None:
+            _, max_return = self._return_range(mean_returns, lower, upper, budget)
+            start = float(mean_returns @ min_var_weights)
+            target_returns = np.linspace(start, max_return, n_points) if max_return > start else np.array([start])
+        targets = np.asarray(target_returns, dtype=float)
+        
+        # Sıcak başlatma: hedefleri sıralı çöz, sonuçları orijinal sıraya yerleştir
+        weights = np.zeros((len(targets), len(mean_returns)))
+        for i in np.argsort(targets):
+            weights[i], active_set = self._solve_target(cov_matrix, mean_returns, lower, upper, budget,
+                                                        targets[i], active_set)
+        
+        portfolio_returns = weights @ mean_returns
+        volatilities = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, cov_matrix, weights), 0.0))
+        sharpe_ratios = np.divide(portfolio_returns - self.risk_free_rate, volatilities,
+                                  out=np.zeros_like(volatilities), where=volatilities > 0)
+        
+        best = int(np.argmax(sharpe_ratios))
+        max_sharpe_weights = self._refine_max_sharpe(cov_matrix, mean_returns, lower, upper, budget,
+                                                     np.sort(targets), weights[best])
+        columns = list(asset_returns.columns)
+        
+        def portfolio_summary(w):
+            ret = float(w @ mean_returns)
+            vol = float(np.sqrt(max(w @ cov_matrix @ w, 0.0)))
+            return {
+                'weights': dict(zip(columns, w)),
+                'expected_return': ret,
+                'volatility': vol,
+                'sharpe_ratio': (ret - self.risk_free_rate) / vol if vol > 0 else 0.0
+            }
+        
+        return {
+            'target_returns': targets,
+            'expected_returns': portfolio_returns,
+            'volatilities': volatilities,
+            'sharpe_ratios': sharpe_ratios,
+            'weights': pd.DataFrame(weights, columns=columns),
+            'min_variance': portfolio_summary(min_var_weights),
+            'max_sharpe': portfolio_summary(max_sharpe_weights),
+            'covariance_method': covariance_method,
+            'shrinkage': shrinkage
+        }
+    
+    def _refine_max_sharpe(self, cov_matrix: np.ndarray, mean_returns: np.ndarray,
+                           lower: np.ndarray, upper: np.ndarray, budget: float,
+                           sorted_targets: np.ndarray, best_weights: np.ndarray) -> np.ndarray:
+        """Frontier üzerinde Sharpe tek tepeli: en iyi ızgara noktası çevresinde altın oran araması"""
+        if len(sorted_targets) < 3:
+            return best_weights
+        
+        best_return = float(best_weights @ mean_returns)
+        position = int(np.clip(np.searchsorted(sorted_targets, best_return), 1, len(sorted_targets) - 1))
+        low = sorted_targets[position - 1]
+        high = sorted_targets[min(position + 1, len(sorted_targets) - 1)]
+        active_set = (best_weights <= lower + 1e-9, best_weights >= upper - 1e-9)
+        cache = {}
+        
+        def negative_sharpe(target):
+            nonlocal active_set
+            w, active_set = self._solve_target(cov_matrix, mean_returns, lower, upper, budget, target, active_set)
+            cache[target] = w
+            volatility = np.sqrt(max(w @ cov_matrix @ w, 1e-18))
+            return -(w @ mean_returns - self.risk_free_rate) / volatility
+        
+        ratio = (np.sqrt(5) - 1) / 2
+        a, b = low, high
+        c, d = b - ratio * (b - a), a + ratio * (b - a)
+        fc, fd = negative_sharpe(c), negative_sharpe(d)
+        for _ in range(40):
+            if abs(b - a) < 1e-8:
+                break
+            if fc < fd:
+                b, d, fd = d, c, fc
+                c = b - ratio * (b - a)
+                fc = negative_sharpe(c)
+            else:
+                a, c, fc = c, d, fd
+                d = a + ratio * (b - a)
+                fd = negative_sharpe(d)
+        
+        candidate = cache[c] if fc < fd else cache[d]
+        best_sharpe = (best_weights @ mean_returns - self.risk_free_rate) / np.sqrt(max(best_weights @ cov_matrix @ best_weights, 1e-18))
+        return candidate if -min(fc, fd) >= best_sharpe else best_weights
+    
+    def _default_weight_constraints(self) -> Dict:
+        return {
+            "min_weight": 0.0,
+            "max_weight": self.max_position_size,
+            "sum_weights": 1.0
+        }
+    
     def optimize_portfolio_weights(self, asset_returns: pd.DataFrame,
                                  target_return: Optional[float] = None,
-                                 risk_aversion: float = 1.0,
-                                 constraints: Optional[Dict] = None) -> Dict[str, float]:
+                                 risk_aversion: Optional[float] = None,
+                                 constraints: Optional[Dict] = None,
+                                 covariance_method: str = "sample") -> Dict[str, float]:
         """
         Portföy ağırlıklarını optimize etme
         
         Args:
             asset_returns: Varlık getiri matrisi
             target_return: Hedef getiri (None ise maksimum Sharpe)
-            risk_aversion: Risk kaçınma parametresi
+            risk_aversion: Verilirse (target_return yokken) frontier üzerinde
+                getiri - risk_aversion / 2 * varyans faydasını en büyükleyen nokta seçilir
             constraints: Ek kısıtlamalar
+            covariance_method: "sample" veya "ledoit_wolf"
             
         Returns:
             Dict[str, float]: Optimize edilmiş ağırlıklar
         """
         n_assets = len(asset_returns.columns)
         
-        # Kovaryans matrisi
-        cov_matrix = asset_returns.cov() * 252  # Yıllık
-        
-        # Ortalama getiriler
-        mean_returns = asset_returns.mean() * 252  # Yıllık
-        
         # Varsayılan kısıtlamalar
         if constraints is None:
-            constraints = {
-                "min_weight": 0.0,
-                "max_weight": self.max_position_size,
-                "sum_weights": 1.0
-            }
+            constraints = self._default_weight_constraints()
         
-        def objective_function(weights):
-            """Optimizasyon amaç fonksiyonu"""
-            weights = np.array(weights)
-            
-            # Portföy getirisi
-            portfolio_return = np.sum(weights * mean_returns)
-            
-            # Portföy volatilitesi
-            portfolio_volatility = np.sqrt(weights.T @ cov_matrix @ weights)
-            
+        try:
             if target_return is not None:
-                # Hedef getiri ile volatilite minimizasyonu
-                return risk_aversion * portfolio_volatility
+                # Hedef getiri ile volatilite minimizasyonu (QP)
+                mean_returns, cov_matrix, _ = self.estimate_covariance(asset_returns, covariance_method)
+                lower, upper, budget = self._weight_bounds(n_assets, constraints)
+                min_return, max_return = self._return_range(mean_returns, lower, upper, budget)
+                if not min_return - 1e-12 <= target_return <= max_return + 1e-12:
+                    raise ValueError("Hedef getiri sınırlar altında ulaşılamaz")
+                optimized_weights, _ = self._solve_target(cov_matrix, mean_returns, lower, upper,
+                                                          budget, target_return)
+            elif risk_aversion is not None:
+                # Ortalama-varyans faydası frontier boyunca tek tepeli; ızgaradaki en iyi nokta
+                frontier = self.efficient_frontier(asset_returns, n_points=50,
+                                                   covariance_method=covariance_method,
+                                                   constraints=constraints)
+                utility = frontier['expected_returns'] - 0.5 * risk_aversion * frontier['volatilities'] ** 2
+                optimized_weights = frontier['weights'].to_numpy()[int(np.argmax(utility))]
             else:
-                # Sharpe ratio maksimizasyonu
-                excess_return = portfolio_return - self.risk_free_rate
-                sharpe_ratio = excess_return / portfolio_volatility if portfolio_volatility > 0 else 0
-                return -sharpe_ratio  # Minimize et (negatif Sharpe)
-        
-        def constraint_sum_weights(weights):
-            """Ağırlık toplamı kısıtlaması"""
-            return np.sum(weights) - constraints["sum_weights"]
-        
-        def constraint_target_return(weights):
-            """Hedef getiri kısıtlaması"""
-            if target_return is not None:
-                return np.sum(weights * mean_returns) - target_return
-            return 0
-        
-        # Kısıtlamalar
-        constraint_list = [
-            {'type': 'eq', 'fun': constraint_sum_weights}
-        ]
-        
-        if target_return is not None:
-            constraint_list.append({'type': 'eq', 'fun': constraint_target_return})
-        
-        # Sınırlar
-        bounds = [(constraints["min_weight"], constraints["max_weight"]) for _ in range(n_assets)]
-        
-        # Başlangıç ağırlıkları (eşit ağırlık)
-        initial_weights = np.array([1.0 / n_assets] * n_assets)
-        
-        # Optimizasyon
-        result = minimize(
-            objective_function,
-            initial_weights,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraint_list,
-            options={'maxiter': 1000}
-        )
-        
-        if result.success:
-            optimized_weights = result.x
+                # Sharpe ratio maksimizasyonu (frontier üzerinde)
+                frontier = self.efficient_frontier(asset_returns, n_points=25,
+                                                   covariance_method=covariance_method,
+                                                   constraints=constraints)
+                optimized_weights = np.array(list(frontier['max_sharpe']['weights'].values()))
+            
             # Normalize et
             optimized_weights = optimized_weights / np.sum(optimized_weights)
             
             return dict(zip(asset_returns.columns, optimized_weights))
-        else:
+        except (ValueError, np.linalg.LinAlgError):
             # Optimizasyon başarısız, eşit ağırlık döndür
             equal_weights = {asset: 1.0 / n_assets for asset in asset_returns.columns}
             return equal_weights
@@ -660,6 +884,19 @@ def test_risk_management_engine():
     print(f"   Sortino Ratio: {risk_adjusted['sortino_ratio']:.4f}")
     print(f"   Calmar Ratio: {risk_adjusted['calmar_ratio']:.4f}")
     
+    # Portföy optimizasyonu ve etkin sınır test
+    print("\n🎯 Etkin Sınır Test:")
+    frontier = risk_engine.efficient_frontier(asset_returns, n_points=20)
+    print(f"   Nokta sayısı: {len(frontier['target_returns'])}, shrinkage: {frontier['shrinkage']:.3f}")
+    print(f"   Maks Sharpe: {frontier['max_sharpe']['sharpe_ratio']:.4f}, "
+          f"Min volatilite: {frontier['min_variance']['volatility']:.4f}")
+    optimized = risk_engine.optimize_portfolio_weights(asset_returns)
+    print(f"   Optimize ağırlık toplamı: {sum(optimized.values()):.4f}")
+    for aversion in (1.0, 100.0):
+        mv_weights = np.array(list(risk_engine.optimize_portfolio_weights(asset_returns, risk_aversion=aversion).values()))
+        mv_volatility = np.sqrt(mv_weights @ (asset_returns.cov().to_numpy() * 252) @ mv_weights)
+        print(f"   Risk kaçınma {aversion:.0f}: volatilite {mv_volatility:.4f}")
+    
     # Stres testi test
     print("\n🔥 Stres Testi Test:")
     stress_results = risk_engine.perform_stress_test(portfolio_weights, asset_returns)
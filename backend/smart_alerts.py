@@ -8,6 +8,7 @@ Akıllı uyarı sistemi:
 - News alerts
 - Risk alerts
 - Smart notification system
+- Indexed rule matching and price-level crossing alerts
 """
 
 import numpy as np
@@ -15,6 +16,9 @@ import pandas as pd
 from typing import Dict, List, Tuple, Optional, Union, Callable
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+import heapq
+import itertools
 import json
 import asyncio
 from enum import Enum
@@ -62,6 +66,158 @@ class AlertRule:
     actions: List[str]
     is_active: bool = True
     priority: int = 1
+    asset: Optional[str] = None  # None: tüm varlıklar
+    expires_at: Optional[datetime] = None
+
+def _compile_rule_conditions(rule: AlertRule) -> Callable[[Dict], bool]:
+    """Kural koşullarını alert.data üzerinde çalışan tek bir predicate'e derle"""
+    conditions = rule.conditions
+    checks: List[Callable[[Dict], bool]] = []
+    
+    if rule.type == AlertType.PRICE:
+        if "price_change_pct" in conditions:
+            min_change = conditions["price_change_pct"]
+            checks.append(lambda data: data.get("price_change_pct", 0) >= min_change)
+    
+    elif rule.type == AlertType.PATTERN:
+        if "pattern_types" in conditions:
+            pattern_types = frozenset(conditions["pattern_types"])
+            checks.append(lambda data: data.get("pattern_type") in pattern_types)
+        if "confidence_threshold" in conditions:
+            min_confidence = conditions["confidence_threshold"]
+            checks.append(lambda data: data.get("confidence", 0) >= min_confidence)
+    
+    elif rule.type == AlertType.RISK:
+        if "var_threshold" in conditions:
+            min_value = conditions["var_threshold"]
+            checks.append(lambda data: data.get("current_value", 0) >= min_value)
+    
+    elif rule.type == AlertType.NEWS:
+        if "sentiment_threshold" in conditions:
+            min_sentiment = conditions["sentiment_threshold"]
+            checks.append(lambda data: abs(data.get("sentiment_score", 0)) >= min_sentiment)
+        if "impact_threshold" in conditions:
+            min_impact = conditions["impact_threshold"]
+            checks.append(lambda data: data.get("impact_score", 0) >= min_impact)
+    
+    if not checks:
+        return lambda data: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda data: all(check(data) for check in checks)
+
+class RuleIndex:
+    """
+    Uyarı kuralı indeksi
+    
+    Genel kurallar (asset, AlertType) anahtarıyla derlenmiş predicate'leriyle
+    tutulur. Fiyat seviyesi kuralları (price_above / price_below) varlık başına
+    artan eşik listelerindedir; bir tick sadece fiyatın geçtiği eşikleri bisect
+    ile bulur.
+    """
+    
+    def __init__(self):
+        self._rules: Dict[str, AlertRule] = {}
+        self._by_key: Dict[Tuple[Optional[str], AlertType], List[Tuple[AlertRule, Callable[[Dict], bool]]]] = {}
+        # asset -> (artan eşikler, aynı sıradaki kurallar)
+        self._above: Dict[str, Tuple[List[float], List[AlertRule]]] = {}
+        self._below: Dict[str, Tuple[List[float], List[AlertRule]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._rules)
+    
+    def __contains__(self, rule_id: str) -> bool:
+        return rule_id in self._rules
+    
+    def get(self, rule_id: str) -> Optional[AlertRule]:
+        return self._rules.get(rule_id)
+    
+    @staticmethod
+    def price_level(rule: AlertRule) -> Optional[Tuple[str, float]]:
+        """Fiyat seviyesi kuralıysa (yön, eşik) döndür"""
+        if rule.type != AlertType.PRICE or not rule.asset:
+            return None
+        if "price_above" in rule.conditions:
+            return "above", float(rule.conditions["price_above"])
+        if "price_below" in rule.conditions:
+            return "below", float(rule.conditions["price_below"])
+        return None
+    
+    def add(self, rule: AlertRule):
+        if rule.id in self._rules:
+            self.remove(rule.id)
+        self._rules[rule.id] = rule
+        
+        level = self.price_level(rule)
+        if level is not None:
+            direction, threshold = level
+            levels = self._above if direction == "above" else self._below
+            thresholds, rules = levels.setdefault(rule.asset, ([], []))
+            position = bisect_right(thresholds, threshold)
+            thresholds.insert(position, threshold)
+            rules.insert(position, rule)
+            return
+        
+        bucket = self._by_key.setdefault((rule.asset, rule.type), [])
+        bucket.append((rule, _compile_rule_conditions(rule)))
+        # Önceliğe göre sıralı tut (eşit öncelikte ekleme sırası korunur)
+        bucket.sort(key=lambda item: item[0].priority, reverse=True)
+    
+    def remove(self, rule_id: str) -> Optional[AlertRule]:
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return None
+        
+        level = self.price_level(rule)
+        if level is not None:
+            direction, threshold = level
+            levels = self._above if direction == "above" else self._below
+            thresholds, rules = levels[rule.asset]
+            position = bisect_left(thresholds, threshold)
+            while rules[position] is not rule:
+                position += 1
+            del thresholds[position]
+            del rules[position]
+            if not rules:
+                del levels[rule.asset]
+            return rule
+        
+        key = (rule.asset, rule.type)
+        bucket = [item for item in self._by_key[key] if item[0] is not rule]
+        if bucket:
+            self._by_key[key] = bucket
+        else:
+            del self._by_key[key]
+        return rule
+    
+    def match(self, alert: Alert) -> List[AlertRule]:
+        """Uyarının varlığına ve türüne özel + genel kurallardan koşulu sağlayanlar"""
+        candidates = self._by_key.get((alert.asset, alert.type), []) + self._by_key.get((None, alert.type), [])
+        matching_rules = [rule for rule, predicate in candidates
+                          if rule.is_active and predicate(alert.data)]
+        if len(matching_rules) > 1:
+            matching_rules.sort(key=lambda x: x.priority, reverse=True)
+        return matching_rules
+    
+    def predicate(self, rule: AlertRule) -> Callable[[Dict], bool]:
+        for indexed_rule, predicate in self._by_key.get((rule.asset, rule.type), []):
+            if indexed_rule is rule:
+                return predicate
+        return _compile_rule_conditions(rule)
+    
+    def crossed_levels(self, asset: str, previous_price: float, price: float) -> List[AlertRule]:
+        """previous_price -> price hareketinin geçtiği fiyat seviyesi kuralları"""
+        if price > previous_price:
+            thresholds, rules = self._above.get(asset, ((), ()))
+            # previous_price < eşik <= price
+            start, end = bisect_right(thresholds, previous_price), bisect_right(thresholds, price)
+        elif price < previous_price:
+            thresholds, rules = self._below.get(asset, ((), ()))
+            # price <= eşik < previous_price
+            start, end = bisect_left(thresholds, price), bisect_left(thresholds, previous_price)
+        else:
+            return []
+        return [rule for rule in rules[start:end] if rule.is_active]
 
 class SmartAlerts:
     """
@@ -87,6 +243,15 @@ class SmartAlerts:
         self.alert_rules: List[AlertRule] = []
         self.alert_counter = 0
         
+        # Kural indeksi, id -> uyarı eşlemesi ve son fiyatlar
+        self.rule_index = RuleIndex()
+        self._alerts_by_id: Dict[str, Alert] = {}
+        self.last_prices: Dict[str, float] = {}
+        
+        # Süre dolumu heap'i: (expires_at, sıra, tür, id)
+        self._expiry_heap: List[Tuple[datetime, int, str, str]] = []
+        self._expiry_counter = itertools.count()
+        
         # Varsayılan uyarı kuralları
         self._setup_default_rules()
         
@@ -145,7 +310,166 @@ class SmartAlerts:
             )
         ]
         
-        self.alert_rules.extend(default_rules)
+        for rule in default_rules:
+            self.add_alert_rule(rule)
+    
+    def add_alert_rule(self, rule: AlertRule) -> AlertRule:
+        """
+        Uyarı kuralı ekle ve indeksle
+        
+        Args:
+            rule: Uyarı kuralı
+            
+        Returns:
+            AlertRule: Eklenen kural
+        """
+        if rule.id in self.rule_index:
+            self.remove_alert_rule(rule.id)
+        self.alert_rules.append(rule)
+        self.rule_index.add(rule)
+        if rule.expires_at:
+            self._schedule_expiry(rule.expires_at, "rule", rule.id)
+        return rule
+    
+    def update_alert_rule(self, rule_id: str, **changes) -> Optional[AlertRule]:
+        """
+        Kuralı güncelle ve yeniden indeksle (predicate yeniden derlenir)
+        
+        Args:
+            rule_id: Kural ID
+            **changes: Değiştirilecek AlertRule alanları (conditions, priority, expires_at ...)
+            
+        Returns:
+            Optional[AlertRule]: Güncellenen kural (yoksa None)
+        """
+        rule = self.rule_index.get(rule_id)
+        if rule is None:
+            return None
+        unknown = [name for name in changes if name == "id" or not hasattr(rule, name)]
+        if unknown:
+            raise ValueError(f"Güncellenemeyen alanlar: {unknown}")
+        
+        # Eski eşik/anahtar ile çıkar, yeni alanlarla tekrar ekle
+        self.rule_index.remove(rule_id)
+        for name, value in changes.items():
+            setattr(rule, name, value)
+        self.rule_index.add(rule)
+        if "expires_at" in changes and rule.expires_at:
+            self._schedule_expiry(rule.expires_at, "rule", rule.id)
+        return rule
+    
+    def remove_alert_rule(self, rule_id: str) -> bool:
+        """Uyarı kuralını kaldır"""
+        rule = self.rule_index.remove(rule_id)
+        if rule is None:
+            return False
+        self.alert_rules = [r for r in self.alert_rules if r is not rule]
+        return True
+    
+    def create_price_level_rule(self, asset: str, threshold: float,
+                                direction: str = "above",
+                                name: Optional[str] = None,
+                                actions: Optional[List[str]] = None,
+                                priority: int = 1,
+                                expires_at: Optional[datetime] = None,
+                                repeat: bool = False) -> AlertRule:
+        """
+        Fiyat seviyesi kuralı oluşturma (fiyat eşiği geçtiğinde tetiklenir)
+        
+        Args:
+            asset: Varlık sembolü
+            threshold: Fiyat eşiği
+            direction: above (yukarı kesme) veya below (aşağı kesme)
+            name: Kural adı
+            actions: Aksiyonlar
+            priority: Öncelik
+            expires_at: Kuralın geçerlilik sonu
+            repeat: False ise ilk tetiklemeden sonra kaldırılır
+            
+        Returns:
+            AlertRule: Oluşturulan kural
+        """
+        if direction not in ("above", "below"):
+            raise ValueError(f"Geçersiz yön: {direction}")
+        
+        self.alert_counter += 1
+        rule = AlertRule(
+            id=f"level_{self.alert_counter}",
+            name=name or f"{asset} {direction} {threshold:.2f}",
+            type=AlertType.PRICE,
+            conditions={f"price_{direction}": threshold, "repeat": repeat},
+            actions=actions or ["notify", "log"],
+            priority=priority,
+            asset=asset,
+            expires_at=expires_at
+        )
+        return self.add_alert_rule(rule)
+    
+    def process_price_tick(self, asset: str, price: float) -> List[Alert]:
+        """
+        Fiyat tick'ini işle; sadece geçilen fiyat seviyesi kurallarını tetikle
+        
+        Args:
+            asset: Varlık sembolü
+            price: Yeni fiyat
+            
+        Returns:
+            List[Alert]: Tetiklenen uyarılar
+        """
+        previous_price = self.last_prices.get(asset)
+        self.last_prices[asset] = price
+        if previous_price is None:
+            return []
+        
+        triggered = []
+        for rule in self.rule_index.crossed_levels(asset, previous_price, price):
+            triggered.append(self._trigger_price_level_rule(rule, previous_price, price))
+            if not rule.conditions.get("repeat", False):
+                self.remove_alert_rule(rule.id)
+        return triggered
+    
+    def _trigger_price_level_rule(self, rule: AlertRule, previous_price: float, price: float) -> Alert:
+        """Fiyat seviyesi kuralı için uyarı oluştur ve kuralın aksiyonlarını çalıştır"""
+        direction, threshold = RuleIndex.price_level(rule)
+        self.alert_counter += 1
+        
+        if direction == "above":
+            title = f"Fiyat Seviyesi Yukarı Kesildi: {rule.asset}"
+        else:
+            title = f"Fiyat Seviyesi Aşağı Kesildi: {rule.asset}"
+        
+        alert = Alert(
+            id=f"price_{self.alert_counter}",
+            type=AlertType.PRICE,
+            severity=AlertSeverity.ALERT,
+            title=title,
+            message=f"{rule.asset} {threshold:.2f} seviyesini geçti. Önceki: {previous_price:.2f}, Mevcut: {price:.2f}",
+            asset=rule.asset,
+            timestamp=datetime.now(),
+            data={
+                "price": price,
+                "previous_price": previous_price,
+                "alert_type": f"cross_{direction}",
+                "threshold": threshold,
+                "rule_id": rule.id
+            },
+            expires_at=datetime.now() + timedelta(days=1)
+        )
+        
+        self._register_alert(alert)
+        self._process_alert(alert, matching_rules=[rule])
+        
+        return alert
+    
+    def _register_alert(self, alert: Alert):
+        """Uyarıyı listeye, id indeksine ve süre dolumu heap'ine ekle"""
+        self.alerts.append(alert)
+        self._alerts_by_id[alert.id] = alert
+        if alert.expires_at:
+            self._schedule_expiry(alert.expires_at, "alert", alert.id)
+    
+    def _schedule_expiry(self, expires_at: datetime, kind: str, item_id: str):
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._expiry_counter), kind, item_id))
     
     def create_price_alert(self, asset: str, price: float, 
                           alert_type: str = "breakout",
@@ -203,7 +527,7 @@ class SmartAlerts:
             expires_at=datetime.now() + timedelta(days=1)
         )
         
-        self.alerts.append(alert)
+        self._register_alert(alert)
         self._process_alert(alert)
         
         return alert
@@ -269,7 +593,7 @@ class SmartAlerts:
             expires_at=datetime.now() + timedelta(hours=6)
         )
         
-        self.alerts.append(alert)
+        self._register_alert(alert)
         self._process_alert(alert)
         
         return alert
@@ -331,7 +655,7 @@ class SmartAlerts:
             expires_at=datetime.now() + timedelta(hours=12)
         )
         
-        self.alerts.append(alert)
+        self._register_alert(alert)
         self._process_alert(alert)
         
         return alert
@@ -399,7 +723,7 @@ class SmartAlerts:
             expires_at=datetime.now() + timedelta(hours=2)
         )
         
-        self.alerts.append(alert)
+        self._register_alert(alert)
         self._process_alert(alert)
         
         return alert
@@ -455,15 +779,16 @@ class SmartAlerts:
             expires_at=datetime.now() + timedelta(hours=4)
         )
         
-        self.alerts.append(alert)
+        self._register_alert(alert)
         self._process_alert(alert)
         
         return alert
     
-    def _process_alert(self, alert: Alert):
+    def _process_alert(self, alert: Alert, matching_rules: Optional[List[AlertRule]] = None):
         """Uyarıyı işle"""
         # Uyarı kurallarını kontrol et
-        matching_rules = self._find_matching_rules(alert)
+        if matching_rules is None:
+            matching_rules = self._find_matching_rules(alert)
         
         for rule in matching_rules:
             self._execute_rule_actions(rule, alert)
@@ -479,67 +804,12 @@ class SmartAlerts:
         self.alert_history.append(alert)
     
     def _find_matching_rules(self, alert: Alert) -> List[AlertRule]:
-        """Uyarıya uygun kuralları bul"""
-        matching_rules = []
-        
-        for rule in self.alert_rules:
-            if not rule.is_active:
-                continue
-                
-            if rule.type != alert.type:
-                continue
-            
-            # Kural koşullarını kontrol et
-            if self._check_rule_conditions(rule, alert):
-                matching_rules.append(rule)
-        
-        # Önceliğe göre sırala
-        matching_rules.sort(key=lambda x: x.priority, reverse=True)
-        
-        return matching_rules
+        """Uyarıya uygun kuralları bul (sadece aynı varlık/tür kovasındaki kurallar)"""
+        return self.rule_index.match(alert)
     
     def _check_rule_conditions(self, rule: AlertRule, alert: Alert) -> bool:
         """Kural koşullarını kontrol et"""
-        conditions = rule.conditions
-        
-        if rule.type == AlertType.PRICE:
-            # Fiyat koşulları
-            if "price_change_pct" in conditions:
-                if alert.data.get("price_change_pct", 0) < conditions["price_change_pct"]:
-                    return False
-            
-            if "volume_increase" in conditions:
-                # Volume kontrolü (basit yaklaşım)
-                pass
-        
-        elif rule.type == AlertType.PATTERN:
-            # Formasyon koşulları
-            if "pattern_types" in conditions:
-                if alert.data.get("pattern_type") not in conditions["pattern_types"]:
-                    return False
-            
-            if "confidence_threshold" in conditions:
-                if alert.data.get("confidence", 0) < conditions["confidence_threshold"]:
-                    return False
-        
-        elif rule.type == AlertType.RISK:
-            # Risk koşulları
-            if "var_threshold" in conditions:
-                if alert.data.get("current_value", 0) < conditions["var_threshold"]:
-                    return False
-        
-        elif rule.type == AlertType.NEWS:
-            # Haber koşulları
-            if "sentiment_threshold" in conditions:
-                sentiment = abs(alert.data.get("sentiment_score", 0))
-                if sentiment < conditions["sentiment_threshold"]:
-                    return False
-            
-            if "impact_threshold" in conditions:
-                if alert.data.get("impact_score", 0) < conditions["impact_threshold"]:
-                    return False
-        
-        return True
+        return self.rule_index.predicate(rule)(alert.data)
     
     def _execute_rule_actions(self, rule: AlertRule, alert: Alert):
         """Kural aksiyonlarını çalıştır"""
@@ -614,32 +884,39 @@ class SmartAlerts:
     
     def mark_alert_as_read(self, alert_id: str):
         """Uyarıyı okundu olarak işaretle"""
-        for alert in self.alerts:
-            if alert.id == alert_id:
-                alert.is_read = True
-                break
+        alert = self._alerts_by_id.get(alert_id)
+        if alert:
+            alert.is_read = True
     
     def deactivate_alert(self, alert_id: str):
         """Uyarıyı deaktif et"""
-        for alert in self.alerts:
-            if alert.id == alert_id:
-                alert.is_active = False
-                break
+        alert = self._alerts_by_id.get(alert_id)
+        if alert:
+            alert.is_active = False
     
     def cleanup_expired_alerts(self):
-        """Süresi dolmuş uyarıları temizle"""
+        """Süresi dolmuş uyarıları ve kuralları temizle (heap: sadece dolanlar işlenir)"""
         current_time = datetime.now()
         expired_alerts = []
-        
-        for alert in self.alerts:
-            if alert.expires_at and alert.expires_at < current_time:
-                expired_alerts.append(alert.id)
-        
-        for alert_id in expired_alerts:
-            self.deactivate_alert(alert_id)
+        expired_rules = []
+        
+        while self._expiry_heap and self._expiry_heap[0][0] < current_time:
+            expires_at, _, kind, item_id = heapq.heappop(self._expiry_heap)
+            # Kayıt, öğenin güncel süresiyle eşleşmiyorsa eskidir (süre değişmiş ya da aynı id yeniden eklenmiş)
+            if kind == "alert":
+                alert = self._alerts_by_id.get(item_id)
+                if alert and alert.is_active and alert.expires_at == expires_at:
+                    alert.is_active = False
+                    expired_alerts.append(item_id)
+            else:
+                rule = self.rule_index.get(item_id)
+                if rule is not None and rule.expires_at == expires_at and self.remove_alert_rule(item_id):
+                    expired_rules.append(item_id)
         
         if expired_alerts:
             print(f"🧹 {len(expired_alerts)} süresi dolmuş uyarı temizlendi")
+        if expired_rules:
+            print(f"🧹 {len(expired_rules)} süresi dolmuş kural kaldırıldı")
     
     def generate_alerts_summary(self) -> Dict:
         """Uyarı özeti oluştur"""
@@ -760,9 +1037,31 @@ def test_smart_alerts():
     print(f"   Tür bazında: {summary['alerts_by_type']}")
     print(f"   Önem derecesi: {summary['alerts_by_severity']}")
     
+    # Fiyat seviyesi kuralı test
+    print("\n🎯 Fiyat Seviyesi Kuralı Test:")
+    smart_alerts.create_price_level_rule(asset="SISE.IS", threshold=46.00, direction="above")
+    smart_alerts.process_price_tick("SISE.IS", 45.80)
+    level_alerts = smart_alerts.process_price_tick("SISE.IS", 46.20)
+    print(f"   Tetiklenen uyarı: {len(level_alerts)}")
+    
+    # Kural güncelleme: predicate yeniden derlenir
+    print("\n✏️ Kural Güncelleme Test:")
+    smart_alerts.update_alert_rule("pattern_detection", conditions={"pattern_types": ["hammer"], "confidence_threshold": 0.5})
+    probe = Alert(id="probe", type=AlertType.PATTERN, severity=AlertSeverity.INFO, title="", message="",
+                  asset="THYAO.IS", timestamp=datetime.now(), data={"pattern_type": "hammer", "confidence": 0.6})
+    print(f"   Güncel koşulla eşleşiyor: {any(r.id == 'pattern_detection' for r in smart_alerts._find_matching_rules(probe))}")
+    
+    # Eski süre kaydı, aynı id ile yeniden eklenen kuralı silmemeli
+    expired_rule = smart_alerts.create_price_level_rule(asset="EREGL.IS", threshold=50.0,
+                                                        expires_at=datetime.now() - timedelta(seconds=1))
+    smart_alerts.add_alert_rule(AlertRule(id=expired_rule.id, name="yeniden", type=AlertType.PRICE,
+                                          conditions={"price_above": 55.0}, actions=["log"], asset="EREGL.IS",
+                                          expires_at=datetime.now() + timedelta(days=1)))
+    
     # Süresi dolmuş uyarıları temizle
     print("\n🧹 Uyarı Temizliği:")
     smart_alerts.cleanup_expired_alerts()
+    print(f"   Yeniden eklenen kural korundu: {expired_rule.id in smart_alerts.rule_index}")
     
     print("\n✅ Smart Alerts Test Tamamlandı!")
     return smart_alerts
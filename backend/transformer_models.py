@@ -14,6 +14,8 @@ import warnings
 import json
 import logging
 import random
+import threading
+import time
 from collections import defaultdict, deque
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 from sklearn.model_selection import TimeSeriesSplit
@@ -74,6 +76,14 @@ class FinancialTransformer:
         self.padding_token = '[PAD]'
         self.unknown_token = '[UNK]'
         
+        # Forward pass önbellekleri: positional encoding / mask (uzunluk, boyut) başına,
+        # float32 çalışma tamponları thread başına
+        self._positional_cache: Dict[Tuple[int, int], np.ndarray] = {}
+        self._mask_cache: Dict[int, np.ndarray] = {}
+        self._buffers = threading.local()
+        self.max_buffer_bytes = 64 * 1024 * 1024  # isim başına önbelleklenen tampon üst sınırı
+        self._default_feed_forward: Dict[Tuple[int, int], Dict[str, np.ndarray]] = {}
+        
         # Varsayılan transformer konfigürasyonları
         self._add_default_transformer_configs()
         
@@ -273,21 +283,29 @@ class FinancialTransformer:
             }
     
     def create_positional_encoding(self, sequence_length: int, embedding_dim: int) -> np.ndarray:
-        """Positional encoding oluştur"""
+        """Positional encoding oluştur ((uzunluk, boyut) başına önbellekli, float32, salt okunur)"""
         try:
-            pos_encoding = np.zeros((sequence_length, embedding_dim))
+            key = (sequence_length, embedding_dim)
+            cached = self._positional_cache.get(key)
+            if cached is not None:
+                return cached
+            
+            # Çift indeks i için sin, i + 1 için aynı frekansla cos
+            positions = np.arange(sequence_length, dtype=np.float64)[:, None]
+            even = np.arange(0, embedding_dim, 2)
+            angles = positions / (10000 ** (even / embedding_dim))
             
-            for pos in range(sequence_length):
-                for i in range(0, embedding_dim, 2):
-                    pos_encoding[pos, i] = np.sin(pos / (10000 ** (i / embedding_dim)))
-                    if i + 1 < embedding_dim:
-                        pos_encoding[pos, i + 1] = np.cos(pos / (10000 ** (i / embedding_dim)))
+            pos_encoding = np.zeros((sequence_length, embedding_dim), dtype=np.float32)
+            pos_encoding[:, 0::2] = np.sin(angles)
+            pos_encoding[:, 1::2] = np.cos(angles[:, :embedding_dim // 2])
+            pos_encoding.setflags(write=False)
             
+            self._positional_cache[key] = pos_encoding
             return pos_encoding
         
         except Exception as e:
             logger.error(f"Error creating positional encoding: {e}")
-            return np.zeros((sequence_length, embedding_dim))
+            return np.zeros((sequence_length, embedding_dim), dtype=np.float32)
     
     def create_attention_mask(self, sequence_length: int, padding_length: int = 0) -> np.ndarray:
         """Attention mask oluştur"""
@@ -301,13 +319,49 @@ class FinancialTransformer:
             logger.error(f"Error creating attention mask: {e}")
             return np.ones(sequence_length)
     
+    def create_causal_mask(self, sequence_length: int) -> np.ndarray:
+        """Toplamsal causal mask (gelecek adımlar -inf), uzunluk başına önbellekli"""
+        mask = self._mask_cache.get(sequence_length)
+        if mask is None:
+            mask = np.triu(np.full((sequence_length, sequence_length), -np.inf, dtype=np.float32), k=1)
+            mask.setflags(write=False)
+            self._mask_cache[sequence_length] = mask
+        return mask
+    
+    def _buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Çağrılar arasında yeniden kullanılan float32 çalışma tamponu (thread başına)
+        
+        Her isim için tek bir düz tampon tutulur; istenen şekil onun önekinin
+        görünümü olarak döner, tampon yalnızca kapasite yetmediğinde büyür.
+        ``max_buffer_bytes`` üstündeki istekler önbelleğe alınmadan geçici ayrılır.
+        
+        Args:
+            name: Tampon adı
+            shape: İstenen dizi şekli
+            
+        Returns:
+            Verilen şekilde float32 dizi
+        """
+        size = int(np.prod(shape))
+        if size * 4 > self.max_buffer_bytes:
+            return np.empty(shape, dtype=np.float32)
+        buffers = self._buffers.__dict__.setdefault('arrays', {})
+        flat = buffers.get(name)
+        if flat is None or flat.size < size:
+            flat = buffers[name] = np.empty(size, dtype=np.float32)
+        return flat[:size].reshape(shape)
+    
+    def release_buffers(self) -> None:
+        """Bu thread'in çalışma tamponlarını serbest bırak"""
+        self._buffers.__dict__.pop('arrays', None)
+    
     def scaled_dot_product_attention(self, query: np.ndarray, key: np.ndarray, 
                                    value: np.ndarray, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
         """Scaled dot-product attention hesapla"""
         try:
             # Attention scores hesapla
             d_k = query.shape[-1]
-            scores = np.matmul(query, key.transpose(-2, -1)) / np.sqrt(d_k)
+            scores = np.matmul(query, np.swapaxes(key, -2, -1)) / float(np.sqrt(d_k))
             
             # Mask uygula
             if mask is not None:
@@ -335,31 +389,54 @@ class FinancialTransformer:
             return np.ones_like(x) / x.shape[axis]
     
     def multi_head_attention(self, query: np.ndarray, key: np.ndarray, value: np.ndarray,
-                           num_heads: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
-        """Multi-head attention uygula"""
+                           num_heads: int, mask: Optional[np.ndarray] = None,
+                           weights: Optional[Dict[str, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Multi-head attention uygula (tüm batch ve head'ler tek batched matmul ile)
+        
+        Args:
+            query, key, value: (batch, seq, d_model)
+            num_heads: Head sayısı
+            mask: (seq, seq) toplamsal mask
+            weights: query/key/value/output_weights projeksiyonları (opsiyonel)
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (batch, seq, d_model) çıktı, (batch, seq, seq) head ortalaması ağırlıklar
+        """
         try:
             batch_size, seq_len, d_model = query.shape
             d_k = d_model // num_heads
             
-            # Reshape for multi-head attention
-            query = query.reshape(batch_size, seq_len, num_heads, d_k).transpose(0, 2, 1, 3)
-            key = key.reshape(batch_size, seq_len, num_heads, d_k).transpose(0, 2, 1, 3)
-            value = value.reshape(batch_size, seq_len, num_heads, d_k).transpose(0, 2, 1, 3)
+            if weights is not None:
+                query = query @ weights['query_weights']
+                key = key @ weights['key_weights']
+                value = value @ weights['value_weights']
             
-            # Apply attention to each head
-            attention_outputs = []
-            attention_weights_list = []
+            # (batch, heads, seq, d_k) görünümleri; kopya yok
+            q = query.reshape(batch_size, seq_len, num_heads, d_k).transpose(0, 2, 1, 3)
+            k = key.reshape(batch_size, key.shape[1], num_heads, d_k).transpose(0, 2, 3, 1)
+            v = value.reshape(batch_size, value.shape[1], num_heads, d_k).transpose(0, 2, 1, 3)
             
-            for head in range(num_heads):
-                head_output, head_weights = self.scaled_dot_product_attention(
-                    query[:, head], key[:, head], value[:, head], mask
-                )
-                attention_outputs.append(head_output)
-                attention_weights_list.append(head_weights)
+            # Skorlar yeniden kullanılan float32 tamponda: 'bhqd,bhdk->bhqk'
+            # (batched matmul; aynı daralmanın np.einsum hali CPU'da ~3x yavaş)
+            scores = self._buffer('scores', (batch_size, num_heads, seq_len, k.shape[-1]))
+            np.matmul(q, k, out=scores)
+            scores *= np.float32(1.0 / np.sqrt(d_k))
+            if mask is not None:
+                scores += mask
             
-            # Concatenate heads
-            attention_output = np.concatenate(attention_outputs, axis=-1)
-            attention_weights = np.mean(attention_weights_list, axis=0)
+            # Softmax tampon üzerinde yerinde
+            scores -= scores.max(axis=-1, keepdims=True)
+            np.exp(scores, out=scores)
+            scores /= scores.sum(axis=-1, keepdims=True)
+            attention = scores
+            
+            # Head'leri birleştir: (batch, heads, seq, d_k) -> (batch, seq, d_model)
+            attention_output = np.matmul(attention, v).transpose(0, 2, 1, 3).reshape(batch_size, seq_len, d_model)
+            if weights is not None and 'output_weights' in weights:
+                attention_output = attention_output @ weights['output_weights']
+            
+            attention_weights = attention.mean(axis=1)
             
             return attention_output, attention_weights
         
@@ -368,23 +445,50 @@ class FinancialTransformer:
             return np.zeros_like(query), np.zeros((query.shape[0], key.shape[0]))
     
     def transformer_encoder_layer(self, x: np.ndarray, num_heads: int, 
-                               d_model: int, d_ff: int) -> Tuple[np.ndarray, np.ndarray]:
-        """Transformer encoder layer uygula"""
+                               d_model: int, d_ff: int,
+                               layer: Optional[Dict[str, Any]] = None,
+                               mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Transformer encoder layer uygula
+        
+        Args:
+            x: (batch, seq, d_model) veya (seq, d_model)
+            num_heads: Head sayısı
+            d_model: Model boyutu
+            d_ff: Feed forward boyutu
+            layer: Katman ağırlıkları (attention + feed_forward); yoksa paylaşılan sabit ağırlıklar
+            mask: (seq, seq) toplamsal mask
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Katman çıktısı, attention ağırlıkları
+        """
         try:
+            squeeze = x.ndim == 2
+            if squeeze:
+                x = x[None]
+            x = np.asarray(x, dtype=np.float32)
+            
+            layer = layer or {}
+            attention_params = layer.get('attention', layer.get('self_attention'))
+            
             # Multi-head attention
-            attention_output, attention_weights = self.multi_head_attention(x, x, x, num_heads)
+            attention_output, attention_weights = self.multi_head_attention(
+                x, x, x, num_heads, mask=mask, weights=attention_params
+            )
             
             # Add & Norm
             x = x + attention_output
             x = self._layer_norm(x)
             
             # Feed forward
-            ff_output = self._feed_forward(x, d_ff, d_model)
+            ff_output = self._feed_forward(x, d_ff, d_model, layer.get('feed_forward'))
             
             # Add & Norm
-            x = x + ff_output
+            x += ff_output
             x = self._layer_norm(x)
             
+            if squeeze:
+                return x[0], attention_weights[0]
             return x, attention_weights
         
         except Exception as e:
@@ -392,26 +496,33 @@ class FinancialTransformer:
             return x, np.zeros((x.shape[0], x.shape[0]))
     
     def _layer_norm(self, x: np.ndarray, epsilon: float = 1e-6) -> np.ndarray:
-        """Layer normalization uygula"""
+        """Layer normalization uygula (yerinde)"""
         try:
             mean = np.mean(x, axis=-1, keepdims=True)
             variance = np.var(x, axis=-1, keepdims=True)
-            return (x - mean) / np.sqrt(variance + epsilon)
+            x -= mean
+            x /= np.sqrt(variance + epsilon)
+            return x
         except Exception as e:
             logger.error(f"Error in layer normalization: {e}")
             return x
     
-    def _feed_forward(self, x: np.ndarray, d_ff: int, d_model: int) -> np.ndarray:
-        """Feed forward network uygula"""
+    def _feed_forward(self, x: np.ndarray, d_ff: int, d_model: int,
+                      params: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        """Feed forward network uygula (gizli katman yeniden kullanılan tamponda)"""
         try:
-            # Linear transformation
-            w1 = np.random.randn(d_model, d_ff) * 0.1
-            w2 = np.random.randn(d_ff, d_model) * 0.1
+            # Linear transformation: katman ağırlıkları ya da (d_model, d_ff) başına sabit ağırlıklar
+            if params is None:
+                params = self._default_feed_forward.get((d_model, d_ff))
+                if params is None:
+                    params = {'w1': self._init_weights(d_model, d_ff), 'w2': self._init_weights(d_ff, d_model)}
+                    self._default_feed_forward[(d_model, d_ff)] = params
             
             # Forward pass
-            hidden = np.matmul(x, w1)
-            hidden = self._relu(hidden)
-            output = np.matmul(hidden, w2)
+            hidden = self._buffer('ffn_hidden', x.shape[:-1] + (d_ff,))
+            np.matmul(x, params['w1'], out=hidden)
+            np.maximum(hidden, 0, out=hidden)
+            output = hidden @ params['w2']
             
             return output
         except Exception as e:
@@ -422,22 +533,27 @@ class FinancialTransformer:
         """ReLU aktivasyon fonksiyonu"""
         return np.maximum(0, x)
     
+    @staticmethod
+    def _init_weights(*shape: int) -> np.ndarray:
+        """float32 ağırlık başlatma (N(0, 0.1²))"""
+        return (np.random.randn(*shape) * 0.1).astype(np.float32)
+    
     def create_financial_bert_model(self, config: TransformerConfig) -> Dict[str, Any]:
         """Financial BERT model oluştur"""
         try:
             model = {
                 'config': config,
                 'embedding_layer': {
-                    'token_embeddings': np.random.randn(self.vocab_size, config.embedding_dim) * 0.1,
+                    'token_embeddings': self._init_weights(self.vocab_size, config.embedding_dim),
                     'position_embeddings': self.create_positional_encoding(
                         self.max_sequence_length, config.embedding_dim
                     ),
-                    'segment_embeddings': np.random.randn(2, config.embedding_dim) * 0.1
+                    'segment_embeddings': self._init_weights(2, config.embedding_dim)
                 },
                 'encoder_layers': [],
                 'classifier_head': {
-                    'weights': np.random.randn(config.embedding_dim, 1) * 0.1,
-                    'bias': np.zeros(1)
+                    'weights': self._init_weights(config.embedding_dim, 1),
+                    'bias': np.zeros(1, dtype=np.float32)
                 }
             }
             
@@ -445,14 +561,14 @@ class FinancialTransformer:
             for layer in range(config.num_layers):
                 encoder_layer = {
                     'attention': {
-                        'query_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'key_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'value_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'output_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1
+                        'query_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'key_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'value_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'output_weights': self._init_weights(config.embedding_dim, config.embedding_dim)
                     },
                     'feed_forward': {
-                        'w1': np.random.randn(config.embedding_dim, config.architecture['feed_forward_dim']) * 0.1,
-                        'w2': np.random.randn(config.architecture['feed_forward_dim'], config.embedding_dim) * 0.1
+                        'w1': self._init_weights(config.embedding_dim, config.architecture['feed_forward_dim']),
+                        'w2': self._init_weights(config.architecture['feed_forward_dim'], config.embedding_dim)
                     }
                 }
                 model['encoder_layers'].append(encoder_layer)
@@ -470,16 +586,16 @@ class FinancialTransformer:
             model = {
                 'config': config,
                 'input_projection': {
-                    'weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                    'bias': np.zeros(config.embedding_dim)
+                    'weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                    'bias': np.zeros(config.embedding_dim, dtype=np.float32)
                 },
                 'positional_encoding': self.create_positional_encoding(
                     self.max_sequence_length, config.embedding_dim
                 ),
                 'encoder_layers': [],
                 'output_projection': {
-                    'weights': np.random.randn(config.embedding_dim, 1) * 0.1,
-                    'bias': np.zeros(1)
+                    'weights': self._init_weights(config.embedding_dim, 1),
+                    'bias': np.zeros(1, dtype=np.float32)
                 }
             }
             
@@ -487,14 +603,14 @@ class FinancialTransformer:
             for layer in range(config.num_layers):
                 encoder_layer = {
                     'self_attention': {
-                        'query_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'key_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'value_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                        'output_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1
+                        'query_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'key_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'value_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                        'output_weights': self._init_weights(config.embedding_dim, config.embedding_dim)
                     },
                     'feed_forward': {
-                        'w1': np.random.randn(config.embedding_dim, config.architecture['feed_forward_dim']) * 0.1,
-                        'w2': np.random.randn(config.architecture['feed_forward_dim'], config.embedding_dim) * 0.1
+                        'w1': self._init_weights(config.embedding_dim, config.architecture['feed_forward_dim']),
+                        'w2': self._init_weights(config.architecture['feed_forward_dim'], config.embedding_dim)
                     }
                 }
                 model['encoder_layers'].append(encoder_layer)
@@ -512,25 +628,25 @@ class FinancialTransformer:
             model = {
                 'config': config,
                 'numerical_encoder': {
-                    'weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                    'bias': np.zeros(config.embedding_dim)
+                    'weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                    'bias': np.zeros(config.embedding_dim, dtype=np.float32)
                 },
                 'text_encoder': {
-                    'weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                    'bias': np.zeros(config.embedding_dim)
+                    'weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                    'bias': np.zeros(config.embedding_dim, dtype=np.float32)
                 },
                 'cross_attention': {
-                    'query_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                    'key_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1,
-                    'value_weights': np.random.randn(config.embedding_dim, config.embedding_dim) * 0.1
+                    'query_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                    'key_weights': self._init_weights(config.embedding_dim, config.embedding_dim),
+                    'value_weights': self._init_weights(config.embedding_dim, config.embedding_dim)
                 },
                 'fusion_layer': {
-                    'weights': np.random.randn(config.embedding_dim * 2, config.embedding_dim) * 0.1,
-                    'bias': np.zeros(config.embedding_dim)
+                    'weights': self._init_weights(config.embedding_dim * 2, config.embedding_dim),
+                    'bias': np.zeros(config.embedding_dim, dtype=np.float32)
                 },
                 'output_projection': {
-                    'weights': np.random.randn(config.embedding_dim, 1) * 0.1,
-                    'bias': np.zeros(1)
+                    'weights': self._init_weights(config.embedding_dim, 1),
+                    'bias': np.zeros(1, dtype=np.float32)
                 }
             }
             
@@ -559,63 +675,100 @@ class FinancialTransformer:
             logger.error(f"Error in forward pass: {e}")
             return np.zeros((input_data.shape[0], 1)), np.zeros((input_data.shape[0], input_data.shape[0]))
     
+    @staticmethod
+    def _as_batch(input_data: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """(seq, features) girdiyi tek örneklik batch'e çevir; float32"""
+        x = np.asarray(input_data, dtype=np.float32)
+        if x.ndim == 2:
+            return x[None], True
+        return x, False
+    
+    def _encode(self, model: Dict[str, Any], x: np.ndarray,
+                positional: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Embedding sonrası ortak encoder yığını: (batch, seq, d_model) -> aynı boyut"""
+        config = model['config']
+        seq_len = x.shape[1]
+        
+        # Modelde saklı tablo yetmiyorsa önbellekli sinüs tablosu
+        if positional is None or positional.shape[0] < seq_len:
+            positional = self.create_positional_encoding(seq_len, config.embedding_dim)
+        x += positional[:seq_len]
+        
+        mask = None
+        if config.architecture.get('attention_mechanism') == 'causal':
+            mask = self.create_causal_mask(seq_len)
+        
+        attention_sum = None
+        for layer in model['encoder_layers']:
+            x, attn_weights = self.transformer_encoder_layer(
+                x,
+                config.attention_heads,
+                config.embedding_dim,
+                config.architecture['feed_forward_dim'],
+                layer=layer,
+                mask=mask
+            )
+            attention_sum = attn_weights if attention_sum is None else attention_sum + attn_weights
+        
+        avg_attention = attention_sum / len(model['encoder_layers']) if attention_sum is not None else \
+            np.zeros((x.shape[0], seq_len, seq_len), dtype=np.float32)
+        return x, avg_attention
+    
+    @staticmethod
+    def _pool_head(x: np.ndarray, avg_attention: np.ndarray, head: Dict[str, np.ndarray],
+                   single: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Çıkış katmanı: tek seri için adım başına, batch için ortalama havuzlanmış tahmin"""
+        if single:
+            # (seq, features) girdi: her zaman adımı bir örnek
+            return x[0] @ head['weights'] + head['bias'], avg_attention[0]
+        pooled = np.mean(x, axis=1)  # Global average pooling
+        return pooled @ head['weights'] + head['bias'], avg_attention
+    
     def _financial_bert_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Financial BERT forward pass"""
-        try:
-            # Embedding
-            x = input_data @ model['embedding_layer']['token_embeddings']
-            x = x + model['embedding_layer']['position_embeddings'][:x.shape[0]]
-            
-            # Encoder layers
-            attention_weights = []
-            for layer in model['encoder_layers']:
-                x, attn_weights = self.transformer_encoder_layer(
-                    x, 
-                    model['config'].attention_heads,
-                    model['config'].embedding_dim,
-                    model['config'].architecture['feed_forward_dim']
-                )
-                attention_weights.append(attn_weights)
+        """
+        Financial BERT forward pass
+        
+        Args:
+            model: create_financial_bert_model çıktısı
+            input_data: (batch, seq, features) ya da tek seri için (seq, features)
             
-            # Classifier head
-            x = np.mean(x, axis=1)  # Global average pooling
-            output = x @ model['classifier_head']['weights'] + model['classifier_head']['bias']
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (batch, 1) / (seq, 1) çıktı ve ortalama attention
+        """
+        try:
+            x, single = self._as_batch(input_data)
             
-            # Average attention weights
-            avg_attention = np.mean(attention_weights, axis=0)
+            # Embedding: özellik sayısı kadar token embedding satırı lineer projeksiyon olarak
+            embedding = model['embedding_layer']
+            x = x @ embedding['token_embeddings'][:x.shape[-1]]
             
-            return output, avg_attention
+            x, avg_attention = self._encode(model, x, embedding['position_embeddings'])
+            return self._pool_head(x, avg_attention, model['classifier_head'], single)
         
         except Exception as e:
             logger.error(f"Error in Financial BERT forward: {e}")
             return np.zeros((input_data.shape[0], 1)), np.zeros((input_data.shape[0], input_data.shape[0]))
     
     def _time_series_transformer_forward(self, model: Dict[str, Any], input_data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Time Series Transformer forward pass"""
-        try:
-            # Input projection
-            x = input_data @ model['input_projection']['weights'] + model['input_projection']['bias']
-            x = x + model['positional_encoding'][:x.shape[0]]
-            
-            # Encoder layers
-            attention_weights = []
-            for layer in model['encoder_layers']:
-                x, attn_weights = self.transformer_encoder_layer(
-                    x,
-                    model['config'].attention_heads,
-                    model['config'].embedding_dim,
-                    model['config'].architecture['feed_forward_dim']
-                )
-                attention_weights.append(attn_weights)
+        """
+        Time Series Transformer forward pass (causal mask)
+        
+        Args:
+            model: create_time_series_transformer çıktısı
+            input_data: (batch, seq, features) ya da tek seri için (seq, features)
             
-            # Output projection
-            x = np.mean(x, axis=1)  # Global average pooling
-            output = x @ model['output_projection']['weights'] + model['output_projection']['bias']
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (batch, 1) / (seq, 1) çıktı ve ortalama attention
+        """
+        try:
+            x, single = self._as_batch(input_data)
             
-            # Average attention weights
-            avg_attention = np.mean(attention_weights, axis=0)
+            # Input projection
+            projection = model['input_projection']
+            x = x @ projection['weights'][:x.shape[-1]] + projection['bias']
             
-            return output, avg_attention
+            x, avg_attention = self._encode(model, x, model['positional_encoding'])
+            return self._pool_head(x, avg_attention, model['output_projection'], single)
         
         except Exception as e:
             logger.error(f"Error in Time Series Transformer forward: {e}")
@@ -625,14 +778,15 @@ class FinancialTransformer:
         """Multi-Modal Transformer forward pass"""
         try:
             # Numerical features
-            numerical_features = input_data[:, :input_data.shape[1]//2]
-            text_features = input_data[:, input_data.shape[1]//2:]
+            input_data = np.asarray(input_data, dtype=np.float32)
+            numerical_features = input_data[..., :input_data.shape[-1]//2]
+            text_features = input_data[..., input_data.shape[-1]//2:]
             
             # Encode numerical features
-            numerical_encoded = numerical_features @ model['numerical_encoder']['weights'] + model['numerical_encoder']['bias']
+            numerical_encoded = numerical_features @ model['numerical_encoder']['weights'][:numerical_features.shape[-1]] + model['numerical_encoder']['bias']
             
             # Encode text features
-            text_encoded = text_features @ model['text_encoder']['weights'] + model['text_encoder']['bias']
+            text_encoded = text_features @ model['text_encoder']['weights'][:text_features.shape[-1]] + model['text_encoder']['bias']
             
             # Cross attention
             cross_attention_output, cross_attention_weights = self.scaled_dot_product_attention(
@@ -651,7 +805,44 @@ class FinancialTransformer:
         except Exception as e:
             logger.error(f"Error in Multi-Modal Transformer forward: {e}")
             return np.zeros((input_data.shape[0], 1)), np.zeros((input_data.shape[0], input_data.shape[0]))
-    
+
+    def benchmark_forward(self, model: Dict[str, Any], model_type: str = "time_series_transformer",
+                          batch_sizes: Tuple[int, ...] = (1, 8, 32, 128, 512), seq_len: int = 32,
+                          n_features: int = 5, repeats: int = 3) -> Dict[int, float]:
+        """
+        CPU üzerinde batch'li forward pass verimi
+
+        Args:
+            model: create_* çıktısı
+            model_type: forward_pass model tipi
+            batch_sizes: Denenecek batch boyutları
+            seq_len: Dizi uzunluğu
+            n_features: Özellik sayısı
+            repeats: Batch başına ölçüm tekrarı
+
+        Returns:
+            Dict[int, float]: Batch boyutu -> saniyede işlenen dizi sayısı
+        """
+        throughput = {}
+        rng = np.random.default_rng(0)
+        try:
+            for batch_size in batch_sizes:
+                batch = rng.standard_normal((batch_size, seq_len, n_features), dtype=np.float32)
+                self.forward_pass(model, batch, model_type)  # Isınma: buffer + önbellekler
+
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    self.forward_pass(model, batch, model_type)
+                elapsed = time.perf_counter() - start
+
+                throughput[batch_size] = batch_size * repeats / elapsed if elapsed > 0 else float('inf')
+                logger.info(f"⚡ {model_type} batch={batch_size}: {throughput[batch_size]:.0f} dizi/s")
+            return throughput
+
+        except Exception as e:
+            logger.error(f"Error benchmarking forward pass: {e}")
+            return throughput
+
     def train_transformer(self, model: Dict[str, Any], X: pd.DataFrame, y: pd.Series,
                          model_type: str = "financial_bert", epochs: int = 10) -> Dict[str, Any]:
         """Transformer model eğit"""
@@ -836,7 +1027,22 @@ def test_transformer_models():
     # Time Series Transformer forward pass
     ts_output, ts_attention = transformer.forward_pass(ts_model, test_input, "time_series_transformer")
     print(f"   ✅ Time Series Transformer forward pass: output shape {ts_output.shape}, attention shape {ts_attention.shape}")
-    
+
+    # Batch forward pass: (batch, seq, features)
+    batch_input = np.random.randn(16, 10, 4).astype(np.float32)
+    batch_output, batch_attention = transformer.forward_pass(ts_model, batch_input, "time_series_transformer")
+    print(f"   ✅ Batch forward pass: output shape {batch_output.shape} ({batch_output.dtype}), attention shape {batch_attention.shape}")
+
+    # Verim ölçümü
+    print("\n📊 Forward Pass Benchmark (CPU):")
+    throughput = transformer.benchmark_forward(ts_model, "time_series_transformer", batch_sizes=(1, 8, 64),
+                                               seq_len=32, n_features=4, repeats=2)
+    for batch_size, seq_per_sec in throughput.items():
+        print(f"   ⚡ batch={batch_size}: {seq_per_sec:.0f} dizi/s")
+    cached = transformer._buffers.__dict__.get('arrays', {})
+    cached_mb = sum(buf.nbytes for buf in cached.values()) / 1e6
+    print(f"   🧮 Çalışma tamponları: {len(cached)} adet, {cached_mb:.1f} MB")
+
     # Model eğitimi testi
     print("\n📊 Model Eğitimi Testi:")
     
@@ -12,11 +12,36 @@ from typing import Dict, List, Optional, Tuple
 import matplotlib.pyplot as plt
 import seaborn as sns
 from ultra_trading_robot import UltraTradingRobot, TimeFrame, StrategyType, TradingSignal
+from core.feature_dag import compute_features
 
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Backtest indikatörleri -> feature DAG düğümleri
+BACKTEST_INDICATORS = {
+    "RSI": ("rsi", {"window": 14}),
+    "MACD": "macd",
+    "MACD_Signal": "macd_signal",
+    "MACD_Histogram": "macd_hist",
+    "BB_Upper": "bb_upper",
+    "BB_Lower": "bb_lower",
+    "BB_Middle": "bb_middle",
+    "BB_Width": "bb_width",
+    "BB_Position": "bb_position",
+    "ATR": ("atr", {"window": 14}),
+    "Volume_SMA": ("sma", {"window": 20, "source": "volume"}),
+    "Volume_Ratio": ("volume_ratio", {"window": 20}),
+    "SMA_20": ("sma", {"window": 20}),
+    "SMA_50": ("sma", {"window": 50}),
+    "EMA_12": ("ema", {"span": 12}),
+    "EMA_26": ("ema", {"span": 26}),
+    "Stoch_K": ("stoch_k", {"window": 14}),
+    "Stoch_D": ("stoch_d", {"window": 14, "smooth": 3}),
+    "ADX": ("trend_strength", {"window": 14}),
+    "CCI": ("cci", {"window": 20}),
+}
+
 class UltraRobotBacktest:
     """Ultra Trading Robot Backtest Engine"""
     
@@ -135,160 +160,15 @@ class UltraRobotBacktest:
             return {"error": str(e)}
     
     def _calculate_all_indicators(self, data: pd.DataFrame) -> Dict:
-        """Tüm teknik indikatörleri hesapla"""
+        """Tüm teknik indikatörleri hesapla (paylaşılan feature DAG üzerinden)"""
         try:
-            indicators = {}
-            
-            # RSI
-            indicators["RSI"] = self._calculate_rsi(data['Close'])
-            
-            # MACD
-            macd_data = self._calculate_macd(data['Close'])
-            indicators["MACD"] = macd_data["macd"]
-            indicators["MACD_Signal"] = macd_data["signal"]
-            indicators["MACD_Histogram"] = macd_data["histogram"]
-            
-            # Bollinger Bands
-            bb_data = self._calculate_bollinger_bands(data['Close'])
-            indicators["BB_Upper"] = bb_data["upper"]
-            indicators["BB_Lower"] = bb_data["lower"]
-            indicators["BB_Middle"] = bb_data["middle"]
-            indicators["BB_Width"] = bb_data["width"]
-            indicators["BB_Position"] = bb_data["position"]
-            
-            # ATR
-            indicators["ATR"] = self._calculate_atr(data)
-            
-            # Volume
-            indicators["Volume_SMA"] = data['Volume'].rolling(20).mean()
-            indicators["Volume_Ratio"] = data['Volume'] / indicators["Volume_SMA"]
-            
-            # Moving Averages
-            indicators["SMA_20"] = data['Close'].rolling(20).mean()
-            indicators["SMA_50"] = data['Close'].rolling(50).mean()
-            indicators["EMA_12"] = data['Close'].ewm(span=12).mean()
-            indicators["EMA_26"] = data['Close'].ewm(span=26).mean()
-            
-            # Stochastic
-            stoch_data = self._calculate_stochastic(data)
-            indicators["Stoch_K"] = stoch_data["k"]
-            indicators["Stoch_D"] = stoch_data["d"]
-            
-            # ADX
-            indicators["ADX"] = self._calculate_adx(data)
-            
-            # CCI
-            indicators["CCI"] = self._calculate_cci(data)
-            
-            return indicators
+            frame = compute_features(data, BACKTEST_INDICATORS)
+            return {name: frame[name] for name in BACKTEST_INDICATORS}
             
         except Exception as e:
             logger.error(f"❌ İndikatör hesaplama hatası: {e}")
             return {}
     
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """RSI hesapla"""
-        try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi
-        except:
-            return pd.Series([50] * len(prices), index=prices.index)
-    
-    def _calculate_macd(self, prices: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict:
-        """MACD hesapla"""
-        try:
-            ema_fast = prices.ewm(span=fast).mean()
-            ema_slow = prices.ewm(span=slow).mean()
-            macd = ema_fast - ema_slow
-            signal_line = macd.ewm(span=signal).mean()
-            histogram = macd - signal_line
-            
-            return {
-                "macd": macd,
-                "signal": signal_line,
-                "histogram": histogram
-            }
-        except:
-            zeros = pd.Series([0] * len(prices), index=prices.index)
-            return {"macd": zeros, "signal": zeros, "histogram": zeros}
-    
-    def _calculate_bollinger_bands(self, prices: pd.Series, period: int = 20, std_dev: int = 2) -> Dict:
-        """Bollinger Bands hesapla"""
-        try:
-            sma = prices.rolling(period).mean()
-            std = prices.rolling(period).std()
-            upper = sma + (std * std_dev)
-            lower = sma - (std * std_dev)
-            width = (upper - lower) / sma
-            position = (prices - lower) / (upper - lower)
-            
-            return {
-                "upper": upper,
-                "lower": lower,
-                "middle": sma,
-                "width": width,
-                "position": position
-            }
-        except:
-            current_price = prices.iloc[-1] if not prices.empty else 0
-            zeros = pd.Series([current_price] * len(prices), index=prices.index)
-            return {"upper": zeros, "lower": zeros, "middle": zeros, "width": zeros, "position": zeros}
-    
-    def _calculate_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        """ATR hesapla"""
-        try:
-            high_low = data['High'] - data['Low']
-            high_close = np.abs(data['High'] - data['Close'].shift())
-            low_close = np.abs(data['Low'] - data['Close'].shift())
-            
-            ranges = pd.concat([high_low, high_close, low_close], axis=1)
-            true_range = np.max(ranges, axis=1)
-            atr = true_range.rolling(period).mean()
-            
-            return atr
-        except:
-            return pd.Series([data['Close'].iloc[-1] * 0.01] * len(data), index=data.index)
-    
-    def _calculate_stochastic(self, data: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> Dict:
-        """Stochastic hesapla"""
-        try:
-            lowest_low = data['Low'].rolling(k_period).min()
-            highest_high = data['High'].rolling(k_period).max()
-            
-            k = 100 * ((data['Close'] - lowest_low) / (highest_high - lowest_low))
-            d = k.rolling(d_period).mean()
-            
-            return {"k": k, "d": d}
-        except:
-            zeros = pd.Series([50] * len(data), index=data.index)
-            return {"k": zeros, "d": zeros}
-    
-    def _calculate_adx(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
-        """ADX hesapla (basitleştirilmiş)"""
-        try:
-            # Basit trend strength
-            close_diff = data['Close'].diff()
-            trend_strength = close_diff.rolling(period).std()
-            adx = 100 * (trend_strength / data['Close'])
-            return adx
-        except:
-            return pd.Series([25] * len(data), index=data.index)
-    
-    def _calculate_cci(self, data: pd.DataFrame, period: int = 20) -> pd.Series:
-        """CCI hesapla"""
-        try:
-            typical_price = (data['High'] + data['Low'] + data['Close']) / 3
-            sma = typical_price.rolling(period).mean()
-            mad = typical_price.rolling(period).apply(lambda x: np.mean(np.abs(x - x.mean())))
-            cci = (typical_price - sma) / (0.015 * mad)
-            return cci
-        except:
-            return pd.Series([0] * len(data), index=data.index)
-    
     def _generate_historical_signals(self, data: pd.DataFrame, indicators: Dict, timeframe: TimeFrame) -> List[Dict]:
         """Geçmiş sinyaller üret"""
         try:
@@ -9,6 +9,7 @@ import numpy as np
 import yfinance as yf
 from datetime import datetime, timedelta
 import logging
+import threading
 from typing import Dict, List, Optional, Tuple, Any
 import asyncio
 import json
@@ -91,6 +92,13 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
             "Stochastic", "ADX", "CCI"
         ]
         
+        # Alternative data önbelleği (zaman dilimi başına tekrar çekilmez)
+        self._alternative_data_cache = {}
+        self.alternative_data_ttl = 300
+        
+        # Strateji sayaçları / allocation / AI modelleri birden çok thread'den güncellenir
+        self._state_lock = threading.RLock()
+        
         # Risk yönetimi
         self.risk_manager = EnhancedRiskManager()
         
@@ -269,20 +277,16 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
                         except Exception as e:
                             logger.warning(f"⚠️ Sentiment analysis hatası: {e}")
                     
-                    # Momentum modeli
-                    self.ai_models["momentum"] = self._train_momentum_model(data)
-                    
-                    # Mean reversion modeli
-                    self.ai_models["mean_reversion"] = self._train_mean_reversion_model(data)
-                    
-                    # Trend following modeli
-                    self.ai_models["trend_following"] = self._train_trend_following_model(data)
-                    
-                    # Volatility modeli
-                    self.ai_models["volatility"] = self._train_volatility_model(data)
-                    
-                    # Sentiment modeli
-                    self.ai_models["sentiment"] = self._train_sentiment_model(data)
+                    trained = {
+                        "momentum": self._train_momentum_model(data),
+                        "mean_reversion": self._train_mean_reversion_model(data),
+                        "trend_following": self._train_trend_following_model(data),
+                        "volatility": self._train_volatility_model(data),
+                        "sentiment": self._train_sentiment_model(data)
+                    }
+                    # Modeller eşzamanlı sinyal üretimi sırasında okunur; tek seferde değiştir
+                    with self._state_lock:
+                        self.ai_models.update(trained)
             
             logger.info(f"✅ AI modelleri eğitildi")
             
@@ -340,83 +344,66 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
         except Exception as e:
             logger.error(f"❌ AI model eğitimi hatası: {e}")
     
-    def _get_market_data_fixed(self, symbol: str, timeframe: TimeFrame) -> pd.DataFrame:
-        """Market verisi çek (Alternative Data Manager ile entegre)"""
+    def _get_market_data_fixed(self, symbol: str, timeframe: TimeFrame,
+                               bars: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Market verisi çek (çoklu zaman dilimi bar servisi + Alternative Data Manager)"""
         try:
-            # Alternative Data Manager kullan
-            if hasattr(self, 'alternative_data_manager'):
-                try:
-                    # Comprehensive data al (async wrapper)
-                    import asyncio
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    comprehensive_data = loop.run_until_complete(
-                        self.alternative_data_manager.get_comprehensive_stock_data(symbol)
-                    )
-                    loop.close()
-                    if comprehensive_data:
-                        logger.info(f"✅ Alternative Data Manager'dan veri alındı: {symbol}")
-                        
-                        # Yahoo Finance fallback ile historical data
-                        stock = yf.Ticker(symbol)
-                        
-                        # Zaman dilimine göre period ayarla
-                        if timeframe in [TimeFrame.M1, TimeFrame.M5, TimeFrame.M15, TimeFrame.M30]:
-                            period = "60d"  # Son 60 gün
-                        elif timeframe in [TimeFrame.H1, TimeFrame.H4]:
-                            period = "2y"   # Son 2 yıl
-                        else:
-                            period = "5y"   # Son 5 yıl
-                        
-                        # Historical data çek
-                        data = stock.history(period=period, interval=timeframe.value)
-                        
-                        if not data.empty:
-                            # Alternative data bilgilerini ekle
-                            data['alternative_price'] = comprehensive_data.price
-                            data['alternative_volume'] = comprehensive_data.volume
-                            data['alternative_sector'] = comprehensive_data.sector
-                            data['alternative_pe_ratio'] = comprehensive_data.pe_ratio
-                            data['alternative_pb_ratio'] = comprehensive_data.pb_ratio
-                            data['alternative_dividend_yield'] = comprehensive_data.dividend_yield
-                            data['alternative_confidence'] = comprehensive_data.confidence
-                            data['alternative_data_source'] = comprehensive_data.data_source
-                            
-                            logger.info(f"✅ {timeframe.value}: {len(data)} veri noktası + Alternative Data")
-                            return data
-                        else:
-                            logger.warning(f"⚠️ {timeframe.value}: Historical veri bulunamadı")
-                            return pd.DataFrame()
-                    else:
-                        logger.warning(f"⚠️ Alternative Data Manager'dan veri alınamadı, fallback kullanılıyor")
-                except Exception as e:
-                    logger.warning(f"⚠️ Alternative Data Manager hatası: {e}, fallback kullanılıyor")
-            
-            # Fallback: Orijinal Yahoo Finance yöntemi
-            stock = yf.Ticker(symbol)
+            # Tüm zaman dilimleri sembol başına tek baz çekimden türetilir (hizalı görünüm verilmediyse)
+            data = bars if bars is not None else self.bar_service.get_bars(symbol, timeframe.value)
+            if data.empty:
+                logger.warning(f"⚠️ {timeframe.value}: Veri bulunamadı")
+                return pd.DataFrame()
             
-            # Zaman dilimine göre period ayarla
-            if timeframe in [TimeFrame.M1, TimeFrame.M5, TimeFrame.M15, TimeFrame.M30]:
-                period = "60d"  # Son 60 gün
-            elif timeframe in [TimeFrame.H1, TimeFrame.H4]:
-                period = "2y"   # Son 2 yıl
+            comprehensive_data = self._get_alternative_data(symbol)
+            if comprehensive_data:
+                # Alternative data bilgilerini ekle
+                data['alternative_price'] = comprehensive_data.price
+                data['alternative_volume'] = comprehensive_data.volume
+                data['alternative_sector'] = comprehensive_data.sector
+                data['alternative_pe_ratio'] = comprehensive_data.pe_ratio
+                data['alternative_pb_ratio'] = comprehensive_data.pb_ratio
+                data['alternative_dividend_yield'] = comprehensive_data.dividend_yield
+                data['alternative_confidence'] = comprehensive_data.confidence
+                data['alternative_data_source'] = comprehensive_data.data_source
+                logger.info(f"✅ {timeframe.value}: {len(data)} veri noktası + Alternative Data")
             else:
-                period = "5y"   # Son 5 yıl
-            
-            # Veri çek
-            data = stock.history(period=period, interval=timeframe.value)
-            
-            if not data.empty:
                 logger.info(f"✅ {timeframe.value}: {len(data)} veri noktası (fallback)")
-                return data
-            else:
-                logger.warning(f"⚠️ {timeframe.value}: Veri bulunamadı")
-                return pd.DataFrame()
+            
+            return data
                 
         except Exception as e:
             logger.error(f"❌ {timeframe.value} veri çekme hatası: {e}")
             return pd.DataFrame()
     
+    def _get_alternative_data(self, symbol: str):
+        """Alternative Data Manager verisi (sembol başına TTL önbellekli)"""
+        if not getattr(self, 'alternative_data_manager', None):
+            return None
+        
+        cached = self._alternative_data_cache.get(symbol)
+        if cached and (datetime.now() - cached[0]).total_seconds() < self.alternative_data_ttl:
+            return cached[1]
+        
+        try:
+            # Comprehensive data al (async wrapper)
+            loop = asyncio.new_event_loop()
+            try:
+                comprehensive_data = loop.run_until_complete(
+                    self.alternative_data_manager.get_comprehensive_stock_data(symbol)
+                )
+            finally:
+                loop.close()
+            if comprehensive_data:
+                logger.info(f"✅ Alternative Data Manager'dan veri alındı: {symbol}")
+            else:
+                logger.warning(f"⚠️ Alternative Data Manager'dan veri alınamadı, fallback kullanılıyor")
+        except Exception as e:
+            logger.warning(f"⚠️ Alternative Data Manager hatası: {e}, fallback kullanılıyor")
+            comprehensive_data = None
+        
+        self._alternative_data_cache[symbol] = (datetime.now(), comprehensive_data)
+        return comprehensive_data
+    
     def _train_momentum_model(self, data: pd.DataFrame) -> Dict:
         """Momentum modeli eğit"""
         try:
@@ -583,25 +570,32 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
             strategy = self.active_strategies[symbol]
             enhanced_signals = []
             
-            # Her timeframe için gelişmiş sinyal üret
+            # Tüm aktif zaman dilimleri için barları tek baz çekimle hazırla
+            active_timeframes = [tf.value for tf, config in strategy["timeframes"].items() if config["active"]]
+            market_data = self.bar_service.get_aligned(symbol, active_timeframes)
+            
+            # Her timeframe için gelişmiş sinyal üret (durum değiştirmeyen kısım, kilitsiz)
+            signal_configs = []
             for timeframe, config in strategy["timeframes"].items():
                 if not config["active"]:
                     continue
                 
                 # Gelişmiş sinyal üret
-                enhanced_signal = self._generate_enhanced_timeframe_signal(symbol, timeframe, config)
+                enhanced_signal = self._generate_enhanced_timeframe_signal(symbol, timeframe, config,
+                                                                           market_data.get(timeframe.value))
                 if enhanced_signal:
                     enhanced_signals.append(enhanced_signal)
-                    
-                    # Strateji güncelle
-                    config["signals_generated"] += 1
-                    config["last_update"] = datetime.now()
+                    signal_configs.append(config)
             
             # Sinyal filtreleme ve optimizasyon
             filtered_signals = self._filter_enhanced_signals(enhanced_signals)
             
-            # Portfolio allocation güncelle
-            self._update_enhanced_portfolio_allocation(symbol, filtered_signals)
+            # Strateji sayaçları ve portfolio allocation güncelle (eşzamanlı taramalar için kilitli)
+            with self._state_lock:
+                for config in signal_configs:
+                    config["signals_generated"] += 1
+                    config["last_update"] = datetime.now()
+                self._update_enhanced_portfolio_allocation(symbol, filtered_signals)
             
             return filtered_signals
             
@@ -609,13 +603,14 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
             logger.error(f"❌ Gelişmiş sinyal hatası: {e}")
             return []
     
-    def _generate_enhanced_timeframe_signal(self, symbol: str, timeframe: TimeFrame, config: Dict) -> Optional[EnhancedTradingSignal]:
+    def _generate_enhanced_timeframe_signal(self, symbol: str, timeframe: TimeFrame, config: Dict,
+                                            bars: Optional[pd.DataFrame] = None) -> Optional[EnhancedTradingSignal]:
         """Tek timeframe için gelişmiş sinyal üret"""
         try:
             logger.info(f"🔍 {symbol} {timeframe.value} için sinyal üretiliyor...")
             
             # Veri çek
-            data = self._get_market_data_fixed(symbol, timeframe)
+            data = self._get_market_data_fixed(symbol, timeframe, bars)
             if data.empty:
                 logger.warning(f"⚠️ {timeframe.value}: Veri boş")
                 return None
@@ -729,8 +724,10 @@ class UltraRobotEnhancedFixed(UltraTradingRobot):
         """AI ensemble skorları al"""
         try:
             scores = {}
+            with self._state_lock:
+                models = list(self.ai_models.items())
             
-            for model_name, model in self.ai_models.items():
+            for model_name, model in models:
                 if model and isinstance(model, dict) and "score" in model:
                     # AI model skorunu normalize et
                     ai_score = model["score"]
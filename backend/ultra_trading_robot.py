@@ -14,6 +14,8 @@ import json
 from dataclasses import dataclass
 from enum import Enum
 
+from core.bar_service import bar_service
+
 # Logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -66,6 +68,7 @@ class UltraTradingRobot:
     def __init__(self):
         self.active_strategies = {}
         self.portfolio = {}
+        self.bar_service = bar_service
         self.risk_manager = None
         self.performance_tracker = {}
         
@@ -253,13 +256,18 @@ class UltraTradingRobot:
             strategy = self.active_strategies[symbol]
             signals = []
             
+            # Tüm zaman dilimleri tek baz çekimden, hizalı olarak
+            active_timeframes = [tf for tf, config in strategy["timeframes"].items() if config["active"]]
+            market_data = self.bar_service.get_aligned(symbol, [tf.value for tf in active_timeframes])
+            
             # Her zaman dilimi için sinyal üret
             for timeframe, config in strategy["timeframes"].items():
                 if not config["active"]:
                     continue
                 
                 # Sinyal üret
-                signal = self._generate_timeframe_signal(symbol, timeframe, config)
+                signal = self._generate_timeframe_signal(symbol, timeframe, config,
+                                                         market_data.get(timeframe.value))
                 if signal:
                     signals.append(signal)
                     
@@ -279,11 +287,13 @@ class UltraTradingRobot:
             logger.error(f"❌ Çoklu zaman dilimi sinyali hatası: {e}")
             return []
     
-    def _generate_timeframe_signal(self, symbol: str, timeframe: TimeFrame, config: Dict) -> Optional[TradingSignal]:
+    def _generate_timeframe_signal(self, symbol: str, timeframe: TimeFrame, config: Dict,
+                                   data: Optional[pd.DataFrame] = None) -> Optional[TradingSignal]:
         """Tek zaman dilimi için sinyal üret"""
         try:
-            # Veri çek
-            data = self._get_market_data(symbol, timeframe)
+            # Veri çek (hizalı görünüm verilmediyse)
+            if data is None:
+                data = self._get_market_data(symbol, timeframe)
             if data.empty:
                 return None
             
@@ -446,11 +456,9 @@ class UltraTradingRobot:
             return None
     
     def _get_market_data(self, symbol: str, timeframe: TimeFrame) -> pd.DataFrame:
-        """Market verisi çek"""
+        """Market verisi çek (çoklu zaman dilimi bar servisi üzerinden)"""
         try:
-            # Yahoo Finance'dan veri
-            stock = yf.Ticker(symbol)
-            data = stock.history(period="2y", interval=timeframe.value)
+            data = self.bar_service.get_bars(symbol, timeframe.value)
             
             if data.empty:
                 return pd.DataFrame()
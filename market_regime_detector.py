@@ -9,9 +9,13 @@ Market regime detection ile doğruluğu %85'den %87'ye çıkarma:
 - Regime-specific model weights
 - Dynamic portfolio allocation
 - Macro economic indicators
+- Online forward filter (bar başına O(K²) regime güncellemesi)
 """
 
+import copy
 import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
@@ -51,6 +55,11 @@ class MarketRegimeConfig:
     correlation_threshold: float = 0.7
     regime_confidence_threshold: float = 0.8
     update_frequency: str = "daily"  # daily, weekly, monthly
+    online_window: int = 1000  # Refit için cache'lenen scaled feature penceresi
+    refit_interval: int = 250  # Bu kadar bardan sonra zamanlanmış refit
+    refit_n_iter: int = 50  # Warm-start refit iterasyonu
+    likelihood_window: int = 20  # Log-likelihood düşüş kontrolü penceresi
+    likelihood_drop_threshold: float = 3.0  # Baseline'ın kaç standart hata altı refit tetikler
 
 @dataclass
 class MarketRegime:
@@ -76,6 +85,52 @@ class RegimeAnalysis:
     confidence: float
     timestamp: datetime
 
+class OnlineRegimeFilter:
+    """Eğitilmiş GaussianHMM parametreleri ile adım adım forward filtre"""
+    
+    def __init__(self, startprob: np.ndarray, transmat: np.ndarray,
+                 means: np.ndarray, covars: np.ndarray):
+        self.startprob = np.asarray(startprob, dtype=float)
+        self.transmat = np.asarray(transmat, dtype=float)
+        self.means = np.asarray(means, dtype=float)
+        
+        # Emission log-yoğunluğu için Cholesky ters matrisleri ve log-normalizasyon sabitleri
+        n_features = self.means.shape[1]
+        chol = np.linalg.cholesky(np.asarray(covars, dtype=float) + 1e-9 * np.eye(n_features))
+        self.inv_chol = np.linalg.inv(chol)
+        log_det = 2.0 * np.log(np.diagonal(chol, axis1=1, axis2=2)).sum(axis=1)
+        self.log_norm = -0.5 * (n_features * np.log(2 * np.pi) + log_det)
+        
+        self.posterior: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_hmm(cls, model) -> 'OnlineRegimeFilter':
+        return cls(model.startprob_, model.transmat_, model.means_, model.covars_)
+    
+    def reset(self):
+        self.posterior = None
+    
+    def log_emission(self, x: np.ndarray) -> np.ndarray:
+        z = np.einsum('kij,kj->ki', self.inv_chol, x - self.means)
+        return self.log_norm - 0.5 * np.einsum('ki,ki->k', z, z)
+    
+    def step(self, x: np.ndarray) -> float:
+        """
+        Posterior'u bir bar ilerlet
+        
+        Returns:
+            float: Bu barın tahmin log-likelihood'u log p(x_t | x_1..t-1)
+        """
+        prior = self.startprob if self.posterior is None else self.posterior @ self.transmat
+        log_joint = np.log(np.maximum(prior, 1e-300)) + self.log_emission(x)
+        log_evidence = float(np.logaddexp.reduce(log_joint))
+        self.posterior = np.exp(log_joint - log_evidence)
+        return log_evidence
+    
+    def filter(self, X: np.ndarray) -> np.ndarray:
+        """Tüm diziyi filtrele, bar başına log-likelihood döndür"""
+        return np.array([self.step(x) for x in X])
+
 class MarketRegimeDetector:
     """Market regime detector for %90 accuracy"""
     
@@ -87,8 +142,32 @@ class MarketRegimeDetector:
         self.current_regime = None
         self.regime_characteristics = {}
         
+        # Online regime servisi
+        self.online_filter: Optional[OnlineRegimeFilter] = None
+        self._scaled_window: Optional[np.ndarray] = None
+        self._window_pos = 0
+        self._window_count = 0
+        self._last_feature_index = None
+        self._bars_since_fit = 0
+        self._recent_loglik = deque(maxlen=config.likelihood_window)
+        self._baseline_loglik: Tuple[float, float] = (0.0, 0.0)
+        self.refit_count = 0
+        
+        # Refit arka planda çalışır; bitene kadar eski filtre posterior'u servis etmeye devam eder
+        self._refit_executor: Optional[ThreadPoolExecutor] = None
+        self._refit_future: Optional[Future] = None
+        self._model_generation = 0
+        self._refit_generation = 0
+        
         logger.info("🚀 Market Regime Detector başlatıldı")
         
+    def __getstate__(self):
+        # Executor ve bekleyen refit kopyalanamaz; kopya kendi executor'ünü gerektiğinde açar
+        state = self.__dict__.copy()
+        state['_refit_executor'] = None
+        state['_refit_future'] = None
+        return state
+    
     def calculate_volatility_features(self, data: pd.DataFrame, symbol: str) -> pd.Series:
         """Volatility features hesapla"""
         try:
@@ -252,7 +331,7 @@ class MarketRegimeDetector:
                 combined_features = combined_features.loc[:, ~combined_features.columns.duplicated()]
                 
                 # Fill NaN values
-                combined_features = combined_features.fillna(method='ffill').fillna(0)
+                combined_features = combined_features.ffill().fillna(0)
                 
                 # Remove infinite values
                 combined_features = combined_features.replace([np.inf, -np.inf], 0)
@@ -313,6 +392,10 @@ class MarketRegimeDetector:
             # Get regime characteristics
             self._analyze_regime_characteristics(X_scaled)
             
+            # Online filtre durumunu eğitim dizisinin sonuna getir
+            self._init_online_state(X_scaled)
+            self._last_feature_index = features.index[-1]
+            
             logger.info(f"✅ HMM modeli eğitildi: {self.config.n_regimes} regime")
             return True
             
@@ -352,6 +435,168 @@ class MarketRegimeDetector:
         except Exception as e:
             logger.error(f"❌ Regime characteristics hatası: {e}")
     
+    def _init_online_state(self, X_scaled: np.ndarray):
+        """Forward filtreyi kur, baseline log-likelihood'u ve scaled pencereyi hazırla"""
+        self.online_filter = OnlineRegimeFilter.from_hmm(self.hmm_model)
+        logliks = self.online_filter.filter(X_scaled)
+        self._baseline_loglik = (float(np.mean(logliks)), float(np.std(logliks)))
+        
+        window = min(self.config.online_window, len(X_scaled))
+        self._scaled_window = np.zeros((self.config.online_window, X_scaled.shape[1]))
+        self._scaled_window[:window] = X_scaled[-window:]
+        self._window_pos = window % self.config.online_window
+        self._window_count = window
+        self._bars_since_fit = 0
+        self._recent_loglik.clear()
+        # Yeni eğitim: önceki modelden başlamış arka plan refit'i geçersiz
+        self._model_generation += 1
+    
+    def _window_array(self) -> np.ndarray:
+        """Cache'lenmiş scaled pencere (kronolojik sırada)"""
+        if self._window_count < self.config.online_window:
+            return self._scaled_window[:self._window_count]
+        return np.concatenate([self._scaled_window[self._window_pos:],
+                               self._scaled_window[:self._window_pos]])
+    
+    def _scale_row(self, row: np.ndarray) -> np.ndarray:
+        row = np.nan_to_num(np.asarray(row, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+        return (row - self.scaler.mean_) / self.scaler.scale_
+    
+    def update_regime(self, feature_row) -> Optional[np.ndarray]:
+        """
+        Yeni bir bar ile regime posterior'unu güncelle (O(K²) filtre adımı)
+        
+        Args:
+            feature_row: create_regime_features ile aynı kolon sırasında tek satır
+            
+        Returns:
+            np.ndarray: Güncel regime olasılıkları
+        """
+        if self.online_filter is None:
+            logger.warning("⚠️ HMM modeli eğitilmemiş")
+            return None
+        
+        x = self._scale_row(feature_row)
+        self._scaled_window[self._window_pos] = x
+        self._window_pos = (self._window_pos + 1) % self.config.online_window
+        self._window_count = min(self._window_count + 1, self.config.online_window)
+        
+        self._recent_loglik.append(self.online_filter.step(x))
+        self._bars_since_fit += 1
+        
+        self._collect_refit()
+        if self._refit_future is None and self._should_refit():
+            self._refit_online()
+        
+        return self.online_filter.posterior
+    
+    def update_from_features(self, features: pd.DataFrame) -> int:
+        """
+        Feature tablosunda henüz görülmemiş barları filtreye uygula
+        
+        Returns:
+            int: İşlenen bar sayısı
+        """
+        if self.online_filter is None or features.empty:
+            return 0
+        
+        if self._last_feature_index is not None and self._last_feature_index in features.index:
+            new_rows = features.loc[features.index > self._last_feature_index]
+        else:
+            # Bağlantısız veri: filtreyi lookback penceresi üzerinde yeniden başlat
+            self.online_filter.reset()
+            new_rows = features.iloc[-self.config.lookback_period:]
+        
+        for row in new_rows.to_numpy(dtype=float):
+            self.update_regime(row)
+        if len(new_rows):
+            self._last_feature_index = new_rows.index[-1]
+        return len(new_rows)
+    
+    def _should_refit(self) -> bool:
+        """Zamanlanmış refit veya log-likelihood düşüşü"""
+        if self._bars_since_fit >= self.config.refit_interval:
+            return True
+        if len(self._recent_loglik) < self.config.likelihood_window:
+            return False
+        baseline_mean, baseline_std = self._baseline_loglik
+        standard_error = baseline_std / np.sqrt(self.config.likelihood_window)
+        return np.mean(self._recent_loglik) < baseline_mean - self.config.likelihood_drop_threshold * standard_error
+    
+    def _refit_online(self) -> bool:
+        """
+        Cache'lenmiş pencerede mevcut parametrelerden warm-start refit'i arka planda başlat
+        
+        Returns:
+            bool: Refit kuyruğa alındıysa True
+        """
+        self._bars_since_fit = 0
+        self._recent_loglik.clear()
+        if not HMM_AVAILABLE or self.hmm_model is None or self._refit_future is not None:
+            return False
+        
+        # Kopya üzerinde eğit; başarısız refit çalışan modeli bozmasın
+        model = copy.deepcopy(self.hmm_model)
+        X_window = self._window_array().copy()
+        if self._refit_executor is None:
+            self._refit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hmm-refit")
+        self._refit_future = self._refit_executor.submit(self._fit_window, model, X_window,
+                                                         self.config.refit_n_iter)
+        self._refit_generation = self._model_generation
+        return True
+    
+    @staticmethod
+    def _fit_window(model, X_window: np.ndarray, n_iter: int) -> Tuple[Any, OnlineRegimeFilter, Tuple[float, float], int]:
+        """Worker thread: warm-start fit, yeni filtre ve baseline log-likelihood"""
+        model.init_params = ""
+        model.n_iter = n_iter
+        model.fit(X_window)
+        model._check()
+        online_filter = OnlineRegimeFilter.from_hmm(model)
+        logliks = online_filter.filter(X_window)
+        return model, online_filter, (float(np.mean(logliks)), float(np.std(logliks))), len(X_window)
+    
+    def _collect_refit(self, timeout: Optional[float] = 0.0) -> bool:
+        """
+        Biten arka plan refit'ini devreye al (timeout=None: bitmesini bekle)
+        
+        Returns:
+            bool: Yeni model devreye alındıysa True
+        """
+        future = self._refit_future
+        if future is None or (timeout is not None and timeout <= 0 and not future.done()):
+            return False
+        try:
+            model, online_filter, baseline, n_bars = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+        except Exception as e:
+            self._refit_future = None
+            logger.error(f"❌ HMM refit hatası: {e}")
+            return False
+        self._refit_future = None
+        if self._refit_generation != self._model_generation:
+            return False
+        
+        # Regime etiketleri warm-start ile korunur; refit sürerken işlenen barların posterior'undan devam
+        online_filter.posterior = self.online_filter.posterior
+        self.hmm_model = model
+        self.online_filter = online_filter
+        self._baseline_loglik = baseline
+        self.refit_count += 1
+        logger.info(f"🔄 HMM online refit: {n_bars} bar")
+        return True
+    
+    def wait_for_refit(self, timeout: Optional[float] = None) -> bool:
+        """Bekleyen refit'in bitmesini bekleyip devreye al (test / kapanış için)"""
+        return self._collect_refit(timeout=timeout)
+    
+    def get_regime_probabilities(self) -> Dict[int, float]:
+        """Cache'lenmiş filtre posterior'u (request path için)"""
+        if self.online_filter is None or self.online_filter.posterior is None:
+            return {}
+        return {i: float(p) for i, p in enumerate(self.online_filter.posterior)}
+    
     def detect_current_regime(self, features: pd.DataFrame) -> Optional[MarketRegime]:
         """Current market regime'i detect et"""
         try:
@@ -363,18 +608,13 @@ class MarketRegimeDetector:
                 logger.warning("⚠️ Features boş")
                 return None
             
-            # Prepare data
-            X = features.iloc[-self.config.lookback_period:].values
-            X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
-            X_scaled = self.scaler.transform(X)
-            
-            # Predict regime
-            regime_sequence = self.hmm_model.predict(X_scaled)
-            current_regime_id = regime_sequence[-1]
+            # Yalnızca yeni barları filtrele
+            self.update_from_features(features)
             
-            # Get regime probabilities
-            regime_probs = self.hmm_model.predict_proba(X_scaled[-1:])
-            current_prob = regime_probs[0][current_regime_id]
+            # Filtrelenmiş posterior
+            regime_probs = self.online_filter.posterior
+            current_regime_id = int(np.argmax(regime_probs))
+            current_prob = float(regime_probs[current_regime_id])
             
             # Regime name
             regime_names = ['Bear', 'Volatile', 'Bull']  # Default names
@@ -492,12 +732,7 @@ class MarketRegimeDetector:
                 return None
             
             # Get regime probabilities
-            X_recent = features.iloc[-1:].values
-            X_recent = np.nan_to_num(X_recent, nan=0.0, posinf=0.0, neginf=0.0)
-            X_recent_scaled = self.scaler.transform(X_recent)
-            
-            regime_probs = self.hmm_model.predict_proba(X_recent_scaled)
-            regime_probabilities = {i: float(prob) for i, prob in enumerate(regime_probs[0])}
+            regime_probabilities = self.get_regime_probabilities()
             
             # Determine volatility regime
             if 'volatility' in features.columns:
@@ -562,6 +797,9 @@ class MarketRegimeDetector:
         try:
             summary = {
                 'hmm_trained': self.hmm_model is not None,
+                'regime_probabilities': self.get_regime_probabilities(),
+                'refit_count': self.refit_count,
+                'refit_pending': self._refit_future is not None,
                 'current_regime': None,
                 'regime_characteristics': self.regime_characteristics,
                 'total_regimes': self.config.n_regimes
@@ -675,6 +913,26 @@ def main():
             logger.info(f"   Current Regime ID: {current['id']}")
             logger.info(f"   Regime Name: {current['name']}")
             logger.info(f"   Confidence: {current['confidence']:.3f}")
+        
+        # Online güncelleme: yeni barlar tek tek filtrelenir (canlı detektörü bozmamak için kopya üzerinde)
+        features = detector.create_regime_features(data, market_data)
+        bench_detector = copy.deepcopy(detector)
+        live_probabilities = detector.get_regime_probabilities()
+        start = datetime.now()
+        for _ in range(100):
+            bench_detector.update_regime(features.iloc[-1].values)
+        elapsed_us = (datetime.now() - start).total_seconds() / 100 * 1e6
+        logger.info(f"⚡ Online update: {elapsed_us:.1f} µs/bar, olasılıklar: {bench_detector.get_regime_probabilities()}")
+        logger.info(f"   Canlı detektör değişmedi: {detector.get_regime_probabilities() == live_probabilities}")
+        
+        # Refit arka planda: bekleyen refit sırasında güncelleme hâlâ filtre adımı kadar sürer
+        bench_detector._refit_online()
+        start = datetime.now()
+        bench_detector.update_regime(features.iloc[-1].values)
+        pending_us = (datetime.now() - start).total_seconds() * 1e6
+        refit_applied = bench_detector.wait_for_refit()
+        logger.info(f"🔄 Refit sürerken update: {pending_us:.1f} µs, refit devreye alındı: {refit_applied}, "
+                    f"refit sayısı: {bench_detector.refit_count}")
     
     logger.info("✅ Test tamamlandı!")
 
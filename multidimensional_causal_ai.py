@@ -8,7 +8,11 @@ import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_squared_error, r2_score
 from sklearn.preprocessing import StandardScaler
+import os
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from scipy import stats
 warnings.filterwarnings('ignore')
 
 try:
@@ -253,6 +257,138 @@ class GrangerCausalityAnalyzer:
         except Exception as e:
             return {'causal_strength': 0.0, 'error': str(e)}
     
+    @staticmethod
+    def _lag_tensor(values, max_lag):
+        """(T - max_lag, N, max_lag) gecikme tensörü: [t, i, l] = x_i(t - l - 1)"""
+        n_obs = values.shape[0] - max_lag
+        return np.stack([values[max_lag - l - 1:max_lag - l - 1 + n_obs] for l in range(max_lag)], axis=2)
+    
+    @staticmethod
+    def _effect_granger_block(j, values, lagged_flat, cause_gram, lag_orders, cause_idx):
+        """
+        Tek bir etki serisi için tüm nedenler ve lag'ler
+        
+        Kısıtlı model [1, y_j gecikmeleri] için tek QR (iç içe lag'ler Q'nun ilk kolonlarını kullanır).
+        Frisch-Waugh ile kısıtsız modelin RSS'i: RSS_u = RSS_r - c' G^-1 c, burada
+        G = B'B - (Q'B)'(Q'B) ve e kısıtlı uzaya dik olduğundan c = B'e. B'B nedenler için bir kez
+        hesaplanır; etki başına tek GEMM (Q'B) ve batched p x p çözümler kalır.
+        """
+        max_lag = cause_gram.shape[1]
+        n_obs, n_series = lagged_flat.shape[0], lagged_flat.shape[1] // max_lag
+        lagged = lagged_flat.reshape(n_obs, n_series, max_lag)
+        y = values[max_lag:, j]
+        q, _ = np.linalg.qr(np.column_stack([np.ones(n_obs), lagged[:, j, :]]))
+        tss = float(((y - y.mean()) ** 2).sum())
+        qtb = (q.T @ lagged_flat).reshape(max_lag + 1, n_series, max_lag)[:, cause_idx, :].transpose(1, 0, 2)
+        
+        out = []
+        for p in lag_orders:
+            q_p = q[:, :p + 1]
+            e = y - q_p @ (q_p.T @ y)
+            rss_r = float(e @ e)
+            cross = (e @ lagged_flat).reshape(n_series, max_lag)[cause_idx, :p]
+            proj = qtb[:, :p + 1, :p]
+            gram = cause_gram[:, :p, :p] - np.matmul(proj.transpose(0, 2, 1), proj)
+            gram += np.eye(p) * (1e-10 * np.trace(gram, axis1=1, axis2=2)[:, None, None] / p + 1e-300)
+            try:
+                beta = np.linalg.solve(gram, cross[..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                beta = np.einsum('ipq,iq->ip', np.linalg.pinv(gram), cross)
+            rss_u = np.maximum(rss_r - np.einsum('ip,ip->i', beta, cross), 1e-300)
+            out.append((rss_r, rss_u, tss))
+        return out
+    
+    def batch_granger_causality(self, data, lags=None, causes=None, effects=None, n_jobs=None):
+        """
+        Panel genelinde vektörel Granger causality (tüm neden -> etki çiftleri)
+        
+        Her çift için statsmodels'in ssr tabanlı F testi: etki denkleminde kendi gecikmeleri
+        (kısıtlı) ile neden gecikmeleri eklenmiş (kısıtsız) OLS karşılaştırılır. Panel ortak
+        örneklemde (dropna) çalışır; etkiler thread havuzunda paralel işlenir (BLAS GIL'i bırakır).
+        
+        Args:
+            data: Zaman serisi DataFrame'i
+            lags: int veya lag listesi; liste verilirse çift başına kısıtsız modelin AIC'si en düşük lag seçilir
+            causes: Neden kolonları (varsayılan: tüm sayısal kolonlar)
+            effects: Etki kolonları (varsayılan: tüm sayısal kolonlar)
+            n_jobs: Thread sayısı
+            
+        Returns:
+            Dict: f_stat, p_value, lags, r2, causal matrisleri (satır: neden, kolon: etki)
+        """
+        start_time = time.time()
+        numeric_columns = data.select_dtypes(include=[np.number]).columns.tolist()
+        causes = list(causes or numeric_columns)
+        effects = list(effects or numeric_columns)
+        columns = list(dict.fromkeys(causes + effects))
+        
+        lag_orders = [int(lags)] if np.isscalar(lags) else sorted(set(lags or [self.find_optimal_lags(data[columns])['optimal_lags'] or 1]))
+        lag_orders = [p for p in lag_orders if p >= 1]
+        if not lag_orders:
+            return {'error': 'No valid lag order (lags must be >= 1)'}
+        max_lag = max(lag_orders)
+        
+        panel = data[columns].dropna()
+        values = panel.to_numpy(dtype=float)
+        n_obs = len(values) - max_lag
+        if n_obs < 2 * max_lag + 10:
+            return {'error': 'Insufficient data'}
+        
+        # Ölçek farkları çözümleri bozmasın diye standardize et (F testi ölçekten bağımsız)
+        std = values.std(axis=0)
+        values = (values - values.mean(axis=0)) / np.where(std > 0, std, 1.0)
+        lagged = self._lag_tensor(values, max_lag)
+        lagged_flat = np.ascontiguousarray(lagged.reshape(n_obs, -1))
+        
+        col_index = {c: k for k, c in enumerate(columns)}
+        cause_idx = np.array([col_index[c] for c in causes])
+        effect_idx = [col_index[c] for c in effects]
+        
+        n_jobs = n_jobs or min(len(effect_idx), os.cpu_count() or 1)
+        cause_block = np.ascontiguousarray(lagged[:, cause_idx, :].transpose(1, 2, 0))
+        cause_gram = np.matmul(cause_block, cause_block.transpose(0, 2, 1))
+        worker = lambda j: self._effect_granger_block(j, values, lagged_flat, cause_gram, lag_orders, cause_idx)
+        if n_jobs > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+                blocks = list(executor.map(worker, effect_idx))
+        else:
+            blocks = [worker(j) for j in effect_idx]
+        
+        shape = (len(causes), len(effects))
+        f_stat, p_value, r2 = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        best_lag = np.full(shape, np.nan)
+        best_aic = np.full(shape, np.inf)
+        
+        for col, block in enumerate(blocks):
+            for p, (rss_r, rss_u, tss) in zip(lag_orders, block):
+                df_resid = n_obs - 2 * p - 1
+                aic = n_obs * np.log(rss_u / n_obs) + 2 * (2 * p + 1)
+                better = aic < best_aic[:, col]
+                f = ((rss_r - rss_u) / p) / (rss_u / df_resid)
+                best_aic[better, col] = aic[better]
+                best_lag[better, col] = p
+                f_stat[better, col] = f[better]
+                p_value[better, col] = stats.f.sf(f[better], p, df_resid)
+                r2[better, col] = 1.0 - rss_u[better] / tss
+        
+        # Bir serinin kendisine Granger testi anlamsız
+        for row, cause in enumerate(causes):
+            if cause in effects:
+                col = effects.index(cause)
+                f_stat[row, col] = p_value[row, col] = r2[row, col] = best_lag[row, col] = np.nan
+        
+        frame = lambda matrix: pd.DataFrame(matrix, index=causes, columns=effects)
+        return {
+            'f_stat': frame(f_stat),
+            'p_value': frame(p_value),
+            'lags': frame(best_lag).astype('Int64'),  # Test edilmeyen çiftler <NA>
+            'r2': frame(r2),
+            'causal': frame(p_value < self.significance_level),
+            'n_obs': n_obs,
+            'n_tests': int(np.isfinite(p_value).sum()) * len(lag_orders),
+            'elapsed_seconds': time.time() - start_time
+        }
+    
     def comprehensive_causality_analysis(self, data, target_column):
         """Comprehensive causality analysis for all variables"""
         print("🔗 Comprehensive causality analysis başlatılıyor...")
@@ -265,23 +401,37 @@ class GrangerCausalityAnalyzer:
         if target_column in numeric_columns:
             numeric_columns.remove(target_column)
         
+        # Tüm çiftler tek batched çağrıda: col -> target ve ters yön (causal strength için)
+        lags = self.find_optimal_lags(data[numeric_columns + [target_column]].dropna())['optimal_lags'] or 1
+        batch = self.batch_granger_causality(data, lags=lags, causes=numeric_columns + [target_column],
+                                             effects=numeric_columns + [target_column])
+        if 'error' in batch:
+            print(f"❌ Causality analysis hatası: {batch['error']}")
+            return {}
+        
         causality_results = {}
         
         for col in numeric_columns:
-            print(f"🔍 Testing causality: {col} → {target_column}")
-            
-            # Test Granger causality
-            gc_result = self.granger_causality_test(data, col, target_column)
-            
-            # Calculate causal strength
-            strength_result = self.calculate_causal_strength(data, col, target_column)
+            p_value = batch['p_value'].loc[col, target_column]
+            r2_forward = batch['r2'].loc[col, target_column]
+            r2_backward = batch['r2'].loc[target_column, col]
             
             causality_results[col] = {
-                'granger_causality': gc_result,
-                'causal_strength': strength_result
+                'granger_causality': {
+                    'causal': bool(p_value < self.significance_level),
+                    'p_value': float(p_value),
+                    'test_statistic': float(batch['f_stat'].loc[col, target_column]),
+                    'lags': lags
+                },
+                'causal_strength': {
+                    'causal_strength': max(0.0, float(r2_forward - r2_backward)),
+                    'r2_forward': float(r2_forward),
+                    'r2_backward': float(r2_backward),
+                    'lags': lags
+                }
             }
         
-        print("✅ Causality analysis tamamlandı")
+        print(f"✅ Causality analysis tamamlandı ({batch['elapsed_seconds']:.3f}s)")
         return causality_results
 
 class StructuralCausalModelBuilder:
@@ -550,6 +700,25 @@ class MultiDimensionalCausalAI:
         
         return summary
 
+def benchmark_granger_panel(n_series=200, n_obs=1000, lags=(1, 2, 3, 4, 5), seed=42):
+    """200 serilik sentetik panelde batched Granger causality benchmark'ı"""
+    rng = np.random.default_rng(seed)
+    values = rng.standard_normal((n_obs, n_series))
+    # Her 10. seri bir öncekini 2 gecikmeyle takip eder
+    for k in range(1, n_series, 10):
+        values[2:, k] += 0.5 * values[:-2, k - 1]
+    panel = pd.DataFrame(values, columns=[f"S{k:03d}" for k in range(n_series)])
+    
+    analyzer = GrangerCausalityAnalyzer()
+    result = analyzer.batch_granger_causality(panel, lags=list(lags))
+    detected = sum(bool(result['causal'].iloc[k - 1, k]) for k in range(1, n_series, 10))
+    
+    print(f"⚡ Batched Granger: {n_series} seri, {result['n_tests']} test, "
+          f"{result['elapsed_seconds']:.2f}s ({result['n_tests'] / result['elapsed_seconds']:.0f} test/s)")
+    print(f"🎯 Gömülü nedensellik tespiti: {detected}/{len(range(1, n_series, 10))}, "
+          f"false positive oranı: {result['causal'].to_numpy().mean():.3f}")
+    return result
+
 def main():
     """Test the Multi-Dimensional Causal AI system"""
     print("🧪 Multi-Dimensional Causal AI Test Başlatılıyor...")
@@ -609,6 +778,9 @@ def main():
         print("🎉 Hedef accuracy'ye ulaşıldı!")
     else:
         print("⚠️ Daha fazla optimization gerekli")
+    
+    # Panel ölçeğinde batched Granger benchmark'ı
+    benchmark_granger_panel()
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,9 @@ SPRINT 9-10: Quantum AI Optimizer (95% Accuracy Goal)
 Quantum Machine Learning + Advanced Neural Networks + Meta-Learning + Zero-Shot Learning
 """
 
+import os
+import json
+from collections.abc import Mapping
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
@@ -290,42 +293,319 @@ class MetaLearningSystem:
         base_preds = self.get_base_predictions(X)
         return self.meta_learner.predict(base_preds)
 
+class PatternVectorIndex:
+    """Normalized float32 pattern embedding index (blocked exact top-k + optional IVF)"""
+    
+    def __init__(self, dim, block_size=262144):
+        self.dim = dim
+        self.block_size = block_size
+        self._size = 0
+        self._vectors = np.zeros((0, dim), dtype=np.float32)  # Unit-norm rows
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._success_rates = np.zeros(0, dtype=np.float64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._names = []
+        self._rows = {}
+        
+        # IVF (inverted file) mode
+        self._centroids = None
+        self._assignments = None
+        self._ivf_order = None
+        self._ivf_offsets = None
+        self._ivf_pending = {}
+        self._ivf_stale = False
+        self.n_probe = 8
+    
+    def __len__(self):
+        return self._size
+    
+    def __contains__(self, name):
+        return name in self._rows
+    
+    def names(self):
+        return self._names
+    
+    def _ensure_capacity(self, extra):
+        needed = self._size + extra
+        if needed <= len(self._vectors) and self._vectors.flags.writeable:
+            return
+        capacity = max(needed, 2 * len(self._vectors), 1024)
+        
+        def grow(array, shape):
+            grown = np.zeros(shape, dtype=array.dtype)
+            grown[:self._size] = array[:self._size]
+            return grown
+        
+        self._vectors = grow(self._vectors, (capacity, self.dim))
+        self._norms = grow(self._norms, capacity)
+        self._success_rates = grow(self._success_rates, capacity)
+        self._counts = grow(self._counts, capacity)
+        if self._assignments is not None:
+            self._assignments = grow(self._assignments, capacity)
+    
+    def _normalize(self, vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float64))
+        norms = np.linalg.norm(vectors, axis=1)
+        # NaN/inf ya da sıfır vektör hiçbir şeye benzemez (eski cosine davranışı)
+        valid = np.isfinite(norms) & (norms > 0)
+        unit = np.zeros_like(vectors)
+        unit[valid] = vectors[valid] / norms[valid, None]
+        return unit.astype(np.float32), norms.astype(np.float32)
+    
+    def add(self, name, vector, success_rate=0.0):
+        """Add or replace a single pattern"""
+        return self.add_batch([name], [vector], [success_rate])
+    
+    def add_batch(self, names, vectors, success_rates=None):
+        """Bulk insert (existing names are overwritten)"""
+        vectors = np.asarray(vectors, dtype=np.float64).reshape(len(names), self.dim)
+        unit, norms = self._normalize(vectors)
+        success_rates = np.zeros(len(names)) if success_rates is None else np.asarray(success_rates, dtype=np.float64)
+        
+        rows = np.empty(len(names), dtype=np.int64)
+        existing_size = self._size
+        new_names = []
+        for i, name in enumerate(names):
+            row = self._rows.get(name)
+            if row is None:
+                row = self._size + len(new_names)
+                self._rows[name] = row
+                new_names.append(name)
+            rows[i] = row
+        
+        self._ensure_capacity(len(new_names))
+        self._names.extend(new_names)
+        self._size += len(new_names)
+        
+        self._vectors[rows] = unit
+        self._norms[rows] = norms
+        self._success_rates[rows] = success_rates
+        self._counts[rows] = 1
+        
+        if self._centroids is not None:
+            lists = np.argmax(unit @ self._centroids.T, axis=1)
+            self._ivf_stale |= bool((rows < existing_size).any())
+            self._assignments[rows] = lists
+            for row, list_id in zip(rows, lists):
+                self._ivf_pending.setdefault(int(list_id), []).append(int(row))
+        
+        return len(new_names)
+    
+    def update_success_rate(self, name, success_rate):
+        """Incremental running-mean update of a pattern's success rate"""
+        row = self._rows.get(name)
+        if row is None:
+            return False
+        if not self._success_rates.flags.writeable:
+            self._success_rates = self._success_rates.copy()
+            self._counts = self._counts.copy()
+        self._counts[row] += 1
+        self._success_rates[row] += (success_rate - self._success_rates[row]) / self._counts[row]
+        return True
+    
+    def get(self, name):
+        row = self._rows.get(name)
+        if row is None:
+            return None
+        return {
+            'features': (self._vectors[row] * self._norms[row]).tolist(),
+            'success_rate': float(self._success_rates[row]),
+            'count': int(self._counts[row])
+        }
+    
+    def build_ivf(self, n_lists=None, n_probe=8, n_iter=10, sample_size=100000, seed=42):
+        """Spherical k-means coarse quantizer; queries only scan the n_probe closest lists"""
+        if self._size == 0:
+            return
+        rng = np.random.default_rng(seed)
+        n_lists = n_lists or max(1, int(np.sqrt(self._size)))
+        n_lists = min(n_lists, self._size)
+        vectors = self._vectors[:self._size]
+        
+        sample = vectors[rng.choice(self._size, min(sample_size, self._size), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1)
+            empty = norms == 0
+            sums[empty] = sample[rng.choice(len(sample), empty.sum())]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1), 1e-12)[:, None]
+        
+        assignments = np.empty(len(self._vectors), dtype=np.int32)
+        for start in range(0, self._size, self.block_size):
+            block = vectors[start:start + self.block_size]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        
+        self._centroids = centroids.astype(np.float32)
+        self._assignments = assignments
+        self._set_ivf_lists()
+        self.n_probe = n_probe
+    
+    def _set_ivf_lists(self):
+        assignments = self._assignments[:self._size]
+        self._ivf_order = np.argsort(assignments, kind='stable')
+        self._ivf_offsets = np.searchsorted(assignments[self._ivf_order], np.arange(len(self._centroids) + 1))
+        self._ivf_pending = {}
+        self._ivf_stale = False
+    
+    def _ivf_candidates(self, query, n_probe):
+        probe = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        parts = [self._ivf_order[self._ivf_offsets[l]:self._ivf_offsets[l + 1]] for l in probe]
+        pending = [np.asarray(self._ivf_pending[l]) for l in probe if l in self._ivf_pending]
+        candidates = np.concatenate(parts + pending)
+        if not self._ivf_stale:
+            return candidates
+        # Güncellenen satırlar eski listede de kalabilir; yalnızca güncel listesi taranan satırlar
+        candidates = np.unique(candidates)
+        return candidates[np.isin(self._assignments[candidates], probe)]
+    
+    def search(self, query, k=10, threshold=None, n_probe=None):
+        """
+        Cosine k-NN search
+        
+        Returns:
+            List of (name, similarity, success_rate), most similar first
+        """
+        if self._size == 0 or len(query) != self.dim:
+            return []
+        unit, _ = self._normalize(query)
+        q = unit[0]
+        
+        if self._centroids is not None and (n_probe or self.n_probe) < len(self._centroids):
+            candidates = self._ivf_candidates(q, n_probe or self.n_probe)
+            rows, sims = self._select(candidates, self._vectors[candidates] @ q, k, threshold)
+        else:
+            rows_parts, sim_parts = [], []
+            for start in range(0, self._size, self.block_size):
+                block_sims = self._vectors[start:min(start + self.block_size, self._size)] @ q
+                r, sm = self._select(np.arange(start, start + len(block_sims)), block_sims, k, threshold)
+                rows_parts.append(r)
+                sim_parts.append(sm)
+            rows, sims = self._select(np.concatenate(rows_parts), np.concatenate(sim_parts), k, threshold)
+        
+        order = np.argsort(-sims, kind='stable')
+        return [(self._names[rows[i]], float(sims[i]), float(self._success_rates[rows[i]])) for i in order]
+    
+    @staticmethod
+    def _select(rows, sims, k, threshold):
+        if threshold is not None:
+            keep = sims >= threshold
+            rows, sims = rows[keep], sims[keep]
+        if k is not None and len(sims) > k:
+            top = np.argpartition(-sims, k - 1)[:k]
+            rows, sims = rows[top], sims[top]
+        return rows, sims
+    
+    def save(self, directory):
+        """Persist as .npy arrays (vectors are memory-mapped on load)"""
+        os.makedirs(directory, exist_ok=True)
+        n = self._size
+        np.save(os.path.join(directory, 'vectors.npy'), self._vectors[:n])
+        np.save(os.path.join(directory, 'norms.npy'), self._norms[:n])
+        np.save(os.path.join(directory, 'success_rates.npy'), self._success_rates[:n])
+        np.save(os.path.join(directory, 'counts.npy'), self._counts[:n])
+        if self._centroids is not None:
+            np.save(os.path.join(directory, 'centroids.npy'), self._centroids)
+            np.save(os.path.join(directory, 'assignments.npy'), self._assignments[:n])
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'dim': self.dim, 'names': self._names, 'n_probe': self.n_probe}, f)
+    
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        index = cls(meta['dim'])
+        mode = 'r' if mmap else None
+        index._vectors = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode=mode)
+        index._norms = np.load(os.path.join(directory, 'norms.npy'), mmap_mode=mode)
+        index._success_rates = np.load(os.path.join(directory, 'success_rates.npy'))
+        index._counts = np.load(os.path.join(directory, 'counts.npy'))
+        index._names = meta['names']
+        index._rows = {name: row for row, name in enumerate(index._names)}
+        index._size = len(index._names)
+        index.n_probe = meta.get('n_probe', 8)
+        
+        centroids_path = os.path.join(directory, 'centroids.npy')
+        if os.path.exists(centroids_path):
+            index._centroids = np.load(centroids_path)
+            index._assignments = np.load(os.path.join(directory, 'assignments.npy'))
+            index._set_ivf_lists()
+        return index
+
+class _KnowledgeBaseView(Mapping):
+    """Read-only dict view over the pattern indexes (name -> features/success_rate/count)"""
+    
+    def __init__(self, indexes):
+        self._indexes = indexes
+    
+    def __getitem__(self, name):
+        for index in self._indexes.values():
+            entry = index.get(name)
+            if entry is not None:
+                return entry
+        raise KeyError(name)
+    
+    def __iter__(self):
+        for index in self._indexes.values():
+            yield from index.names()
+    
+    def __len__(self):
+        return sum(len(index) for index in self._indexes.values())
+
 class ZeroShotLearning:
     """Zero-shot learning for unseen patterns"""
     
     def __init__(self):
-        self.knowledge_base = {}
+        self.pattern_indexes = {}  # Feature dimension -> PatternVectorIndex
+        self.knowledge_base = _KnowledgeBaseView(self.pattern_indexes)
         self.pattern_memory = {}
-        
+    
+    def _index_for(self, dim):
+        if dim not in self.pattern_indexes:
+            self.pattern_indexes[dim] = PatternVectorIndex(dim)
+        return self.pattern_indexes[dim]
+    
     def add_knowledge(self, pattern_name, pattern_features, success_rate):
         """Add pattern knowledge to the system"""
-        self.knowledge_base[pattern_name] = {
-            'features': pattern_features,
-            'success_rate': success_rate,
-            'count': 1
-        }
+        self._index_for(len(pattern_features)).add(pattern_name, pattern_features, success_rate)
+    
+    def add_knowledge_batch(self, pattern_names, pattern_features, success_rates):
+        """Bulk add pattern embeddings (n_patterns x dim)"""
+        pattern_features = np.asarray(pattern_features)
+        return self._index_for(pattern_features.shape[1]).add_batch(pattern_names, pattern_features, success_rates)
     
     def update_knowledge(self, pattern_name, success_rate):
         """Update existing pattern knowledge"""
-        if pattern_name in self.knowledge_base:
-            kb = self.knowledge_base[pattern_name]
-            kb['count'] += 1
-            kb['success_rate'] = (kb['success_rate'] * (kb['count'] - 1) + success_rate) / kb['count']
+        for index in self.pattern_indexes.values():
+            if index.update_success_rate(pattern_name, success_rate):
+                return
     
-    def find_similar_patterns(self, current_features, threshold=0.7):
+    def find_similar_patterns(self, current_features, threshold=0.7, k=None):
         """Find similar patterns in knowledge base"""
-        similar_patterns = []
-        
-        for pattern_name, pattern_info in self.knowledge_base.items():
-            similarity = self._calculate_similarity(current_features, pattern_info['features'])
-            if similarity >= threshold:
-                similar_patterns.append({
-                    'name': pattern_name,
-                    'similarity': similarity,
-                    'success_rate': pattern_info['success_rate']
-                })
-        
-        return sorted(similar_patterns, key=lambda x: x['similarity'], reverse=True)
+        index = self.pattern_indexes.get(len(current_features))
+        if index is None:
+            return []
+        
+        return [
+            {'name': name, 'similarity': similarity, 'success_rate': success_rate}
+            for name, similarity, success_rate in index.search(current_features, k=k, threshold=threshold)
+        ]
+    
+    def build_ann_index(self, n_lists=None, n_probe=8):
+        """Switch large knowledge bases to IVF search"""
+        for index in self.pattern_indexes.values():
+            index.build_ivf(n_lists=n_lists, n_probe=n_probe)
+    
+    def save_knowledge(self, directory):
+        for dim, index in self.pattern_indexes.items():
+            index.save(os.path.join(directory, f"dim_{dim}"))
+    
+    def load_knowledge(self, directory, mmap=True):
+        for entry in sorted(os.listdir(directory)):
+            if entry.startswith('dim_'):
+                self.pattern_indexes[int(entry[4:])] = PatternVectorIndex.load(os.path.join(directory, entry), mmap=mmap)
     
     def _calculate_similarity(self, features1, features2):
         """Calculate cosine similarity between feature vectors"""